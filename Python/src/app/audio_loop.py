@@ -3,129 +3,342 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
 
 import numpy as np
-import sounddevice as sd
 
 from Python.src.tools.ws_bridge import WsBridge
-from Python.src.tools.messages.base import make_message
-from Python.src.tools.messages.audio import build_audio_payload
+from Python.src.tools.messages.base import make_message, trace_now
+from Python.src.tools.messages.audio import build_audio_features_payload, build_audio_payload, build_vad_payload
+from Python.src.tools.audio_ring import AudioBlockReader
+from Python.src.tools.audio_features import SpectralAnalyzer
+from Python.src.tools.audio_vad import VoiceActivityDetector
+from Python.src.tools.loudness import LoudnessMeter
+from Python.src.tools.emission import EMIT_KEEPALIVE, AudioEmitPolicy, emit_deadline
+from Python.src.tools.profiler import PROFILER
+from Python.src.tools.startup import STARTUP
+from Python.src.tools.control import CONTROLS, PAUSED, ControlError, LoopControl, Param
+# find_c922_device_index 以前定义在本模块，这里保留导出以兼容旧的 import
+from Python.src.tools.audio_sources import AudioSource, DeviceAudioSource, find_c922_device_index
 
 logger = logging.getLogger(__name__)
 
-# 只保留“每多久算一次音量”
-BLOCK_DURATION = 0.05  # 每 50 ms 计算一次音量
+# 分析窗长与跳步分开配置：
+# - BLOCK_DURATION: 每次分析覆盖多长的音频（窗长，决定电平估计的平滑程度）
+# - HOP_DURATION:   每隔多久出一次结果（跳步，决定更新频率）
+# 例如 50 ms 窗 + 10 ms 跳步 = 每 10 ms 发一次、基于最近 50 ms 的音量。
+# 两者相等时退化为原来的不重叠分块。
+BLOCK_DURATION = 0.05  # 窗长 50 ms
+HOP_DURATION = 0.05    # 跳步 50 ms
 
+# 环形缓冲区能容纳多少秒音频（消费者短暂卡顿时的余量）
+RING_SECONDS = 2.0
 
-def find_c922_device_index(preferred_hostapis=("Windows WASAPI", "Windows DirectSound")):
-    devices = sd.query_devices()
-    hostapis = sd.query_hostapis()
+# 客户端可以在运行时修改的参数（control 消息，target = "audio"）：
+# 改窗长只影响分析；改跳步要按新的块长重开输入；暂停时关闭输入，恢复时丢弃旧数据重新打开
+AUDIO_CONTROL_PARAMS = {
+    "block_duration": Param(float, 0.005, RING_SECONDS),
+    "hop_duration": Param(float, 0.005, 1.0),
+}
 
-    candidates = []
-    for idx, dev in enumerate(devices):
-        if dev["max_input_channels"] <= 0:
-            continue
-        if "C922 Pro Stream Webcam" in dev["name"]:
-            hostapi_name = hostapis[dev["hostapi"]]["name"]
-            candidates.append((idx, dev["name"], hostapi_name))
+# 是否发送扩展的 audio_features（频带能量 / 谱质心 / 起音 / 基频），
+# 关闭时只发送 Unity 当前使用的 audio_level
+AUDIO_FEATURES = False
 
-    if not candidates:
-        return None
+# 是否启用 VAD 门控：只在有声音活动时发送，静默时每 AUDIO_HEARTBEAT_INTERVAL 秒发一次心跳，
+# 每条消息都带自适应噪声底估计（payload.vad）
+AUDIO_VAD = False
+AUDIO_HEARTBEAT_INTERVAL = 1.0
 
-    # 按首选 hostapi 排序
-    for pref in preferred_hostapis:
-        for idx, name, hostapi_name in candidates:
-            if hostapi_name == pref:
-                return idx
+# 是否计算 K 加权响度（瞬时 400 ms / 短期 3 s LUFS），与 level_dbfs 一起发送
+AUDIO_LOUDNESS = False
 
-    # 实在不行就随便拿第一个
-    return candidates[0][0]
+
+def _probe_device(device: Optional[int | str]) -> DeviceAudioSource:
+    with STARTUP.phase("audio.probe"):
+        return DeviceAudioSource(device)
 
 
 async def audio_loop(
     bridge: WsBridge,
     device: Optional[int | str] = None,
+    trace: bool = False,
+    features: bool = AUDIO_FEATURES,
+    source: Optional[AudioSource] = None,
+    vad: bool = AUDIO_VAD,
+    loudness: bool = AUDIO_LOUDNESS,
+    record_dir: Optional[str] = None,
 ) -> None:
     """
     采集麦克风音量，计算 dBFS，通过 WebSocket 周期发送给 Unity。
-    """
-    # 1. 先决定用哪个设备
-    if device is None:
-        device = find_c922_device_index()
-    logger.info("初始化音频输入 device=%r", device)
 
+    source:   音频输入（见 tools/audio_sources.py）；为 None 时使用实时设备 device
+              （device 也为 None 时自动寻找 C922）。传入 WAV / 合成信号源即可在无麦克风环境下
+              测试和做基准，有限长度的输入播完后本协程正常返回。
+    features=True 时改为发送 audio_features（audio_level 的超集，额外包含频谱特征）。
+    vad=True 时只在有声音活动时发送（外加低频心跳），消息中附带噪声底估计。
+    loudness=True 时在 level 下附带瞬时 / 短期响度（LUFS）。
+    trace=True 时每条消息附带 capture / infer_start / infer_end 等追踪时间戳。
+    record_dir 不为 None 时把输入的原始样本录进该目录（见 tools/recording.py，可用 RecordedAudioSource 回放）。
+    运行中可通过 control 消息（target = "audio"）暂停 / 恢复、修改窗长和跳步（AUDIO_CONTROL_PARAMS）。
+    """
+    # 1. 先决定用哪个输入（查询设备列表较慢，放到线程池里，与摄像头 / 模型的初始化并行）
+    loop = asyncio.get_running_loop()
     try:
-        # 2. 查这个设备的默认采样率，并用它来算 block_size
-        if device is None:
-            # 真找不到 C922 的话，就用系统默认输入设备
-            device_info = sd.query_devices(kind="input")
-            device_index = sd.default.device[0]
-        else:
-            device_info = sd.query_devices(device, "input")
-            device_index = device
-
-        sample_rate = int(device_info["default_samplerate"])
-        block_size = int(sample_rate * BLOCK_DURATION)
+        if source is None:
+            source = await loop.run_in_executor(None, _probe_device, device)
+    except Exception as e:
+        logger.error("无法打开音频输入设备: %r", e)
+        return
+    if record_dir is not None:
+        # tools/recording 会导入 cv2（回放帧源），只在需要录制时导入
+        from Python.src.tools.recording import RecordingAudioSource
+        source = RecordingAudioSource(source, record_dir)
 
-        logger.info(
-            "使用音频设备 #%s: %s, samplerate=%s, block_size=%s",
-            device_index,
-            device_info["name"],
-            sample_rate,
-            block_size,
-        )
+    # 2. 用输入的采样率计算窗长 / 跳步
+    sample_rate = source.sample_rate
+    control = LoopControl("audio", AUDIO_CONTROL_PARAMS, block_duration=BLOCK_DURATION, hop_duration=HOP_DURATION)
 
-        # 3. 用“设备默认采样率”和对应的 block_size 打开输入流
-        stream = sd.InputStream(
-            device=device_index,
-            channels=1,          # 单声道即可
-            samplerate=sample_rate,
-            blocksize=block_size,
-            dtype="float32",     # [-1, 1]
-        )
+    def sizes(config: dict) -> tuple[int, int]:
+        return int(sample_rate * config["block_duration"]), int(sample_rate * config["hop_duration"])
+
+    window_size, hop_size = sizes(control.config)
+
+    logger.info(
+        "使用音频输入: %s, samplerate=%s, window=%s, hop=%s",
+        source.name,
+        sample_rate,
+        window_size,
+        hop_size,
+    )
+
+    # 3. 启动回调式输入（回调块长 = 跳步）：
+    #    输入线程把数据写进环形缓冲区，事件循环不会阻塞在读取上
+    reader = AudioBlockReader(
+        loop,
+        capacity=int(sample_rate * RING_SECONDS),
+    )
+    try:
+        source.start(reader.callback, hop_size, on_end=reader.close_threadsafe)
     except Exception as e:
         logger.error("无法打开音频输入设备: %r", e)
         return
 
+    logger.info("音频输入已打开: %s", source.name)
+    STARTUP.ready("audio")
+
+    def apply(changes: dict) -> None:
+        config = {**control.config, **changes}
+        window, hop = sizes(config)
+        if hop < 1 or hop > window:
+            raise ControlError("hop_duration 不能大于 block_duration")
+        if window > reader.ring.capacity:
+            raise ControlError(f"block_duration 不能超过 {RING_SECONDS} s")
+        if PAUSED in changes or "hop_duration" in changes:
+            source.stop()
+            # 暂停期间 / 旧块长的数据不再分析
+            reader.discard()
+            if not config[PAUSED]:
+                source.start(reader.callback, hop, on_end=reader.close_threadsafe)
+
+    # 有请求时让 windows() 结束，哪怕输入已暂停、正在等数据
+    control.on_request = reader.interrupt
+    CONTROLS.register(control)
+
+    # 4. 消费；收到控制请求时退出 consume_audio_blocks，在这里应用后按新的窗长 / 跳步继续
+    #    （分析器的状态与窗长 / 跳步绑定，只在两者变化时重建）
     frame_id = 0
+    built_for = None
+    try:
+        while True:
+            window_size, hop_size = sizes(control.config)
+            if built_for != (window_size, hop_size):
+                built_for = (window_size, hop_size)
+                analyzer = SpectralAnalyzer(sample_rate, window_size) if features else None
+                detector = VoiceActivityDetector(sample_rate, window_size, hop_sec=hop_size / sample_rate) if vad else None
+                emit_policy = AudioEmitPolicy(AUDIO_HEARTBEAT_INTERVAL) if vad else None
+                meter = LoudnessMeter(sample_rate, hop_size) if loudness else None
+
+            reader.interrupted = False
+            frame_id = await consume_audio_blocks(
+                bridge,
+                reader,
+                window_size=window_size,
+                hop_size=hop_size,
+                sample_rate=sample_rate,
+                device_name=source.name,
+                source=source.source_id,
+                trace=trace,
+                analyzer=analyzer,
+                vad=detector,
+                emit_policy=emit_policy,
+                loudness=meter,
+                frame_id=frame_id,
+            )
+            if not control.pending:
+                # 输入结束（有限长度的文件 / 合成信号）
+                break
+            await control.checkpoint(apply)
+    finally:
+        CONTROLS.unregister(control)
+        source.stop()
+        if record_dir is not None:
+            source.close()
+        logger.info(
+            "audio_loop 结束，关闭音频输入（overflows=%d, dropped_blocks=%d）",
+            reader.overflows,
+            reader.dropped_blocks,
+        )
 
-    with stream:
-        device_name = device_info["name"]
-        logger.info("音频输入设备已打开: %s", device_name)
-
-        try:
-            while True:
-                # 读取一个 block（阻塞式），长度就是 block_size
-                audio_block, _ = stream.read(block_size)   # shape: (N, 1)
-                samples = audio_block[:, 0]
-
-                # 计算 RMS，避免除零
-                rms = float(np.sqrt(np.mean(samples ** 2)))
-                rms = max(rms, 1e-8)
-
-                # dBFS: 0 dBFS 表示满幅度（|sample|==1），一般结果是负数
-                level_dbfs = 20.0 * float(np.log10(rms))
-
-                payload = build_audio_payload(
-                    level_dbfs=level_dbfs,
-                    rms=rms,
-                    device_name=device_name,
-                    sample_rate=sample_rate,          # 用刚刚查到的采样率
-                    block_duration=BLOCK_DURATION,
-                )
-
-                msg = make_message(
-                    msg_type="audio_level",
-                    payload=payload,
-                    frame_id=frame_id,
-                    source="c922_mic",
-                )
-
-                bridge.send_json(msg)
-                frame_id += 1
 
-                # 把控制权交还给事件循环，避免饿死 WsBridge
-                await asyncio.sleep(0)
-        finally:
-            logger.info("audio_loop 结束，关闭音频输入")
+def compute_levels(frames: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """批量计算 (n, window) 帧的 (rms, dBFS)，返回两个 (n,) 数组。"""
+    frames = np.atleast_2d(frames)
+    # 计算 RMS，避免除零
+    rms = np.sqrt(np.mean(np.square(frames, dtype=np.float64), axis=1))
+    rms = np.maximum(rms, 1e-8)
+
+    # dBFS: 0 dBFS 表示满幅度（|sample|==1），一般结果是负数
+    level_dbfs = 20.0 * np.log10(rms)
+    return rms, level_dbfs
+
+
+def compute_level(samples: np.ndarray) -> tuple[float, float]:
+    """计算一块样本的 (rms, dBFS)。"""
+    rms, level_dbfs = compute_levels(samples)
+    return float(rms[0]), float(level_dbfs[0])
+
+
+def _analyze_batch(
+    frames: np.ndarray,
+    analyzer: Optional[SpectralAnalyzer],
+    vad: Optional[VoiceActivityDetector] = None,
+    loudness: Optional[LoudnessMeter] = None,
+) -> Dict[str, np.ndarray]:
+    """在分析线程里运行：一次向量化处理整批帧。"""
+    if analyzer is not None:
+        with PROFILER.stage("audio.features"):
+            feats = analyzer.process(frames)
+    else:
+        with PROFILER.stage("audio.levels"):
+            rms, level_dbfs = compute_levels(frames)
+        feats = {"rms": rms, "dbfs": level_dbfs}
+    if vad is not None:
+        with PROFILER.stage("audio.vad"):
+            feats.update(vad.process(frames, feats["dbfs"]))
+    if loudness is not None:
+        # 响度滤波器要求输入是连续的流：每帧只取新到的最后 hop 个样本
+        with PROFILER.stage("audio.loudness"):
+            feats.update(loudness.process(frames[:, -loudness.block_size:]))
+    return feats
+
+
+async def consume_audio_blocks(
+    bridge: WsBridge,
+    reader: AudioBlockReader,
+    window_size: int,
+    hop_size: int,
+    sample_rate: int,
+    device_name: str | None,
+    source: str = "c922_mic",
+    trace: bool = False,
+    analyzer: Optional[SpectralAnalyzer] = None,
+    vad: Optional[VoiceActivityDetector] = None,
+    emit_policy: Optional[AudioEmitPolicy] = None,
+    loudness: Optional[LoudnessMeter] = None,
+    frame_id: int = 0,
+) -> int:
+    """
+    消费者协程：从 AudioBlockReader 按 (window_size, hop_size) 取重叠帧，
+    整批帧（环形缓冲区上的跨步视图，不拷贝）一次交给分析线程，
+    事件循环只负责等待和发送，不会被音频 I/O 或计算卡住。
+
+    每个跳步发送一条消息：传入 analyzer 时为 audio_features，否则为 audio_level。
+    传入 vad 时消息附带 payload.vad；同时传入 emit_policy 时由它决定哪些帧被抑制
+    （判断用音频时间 = 已处理帧数 * 跳步，与墙钟无关）。
+    传入 loudness（块长须等于 hop_size）时 level 下附带瞬时 / 短期 LUFS。
+    frame_id 从给定值开始编号，返回下一个 frame_id（重新进入时编号连续）。
+    """
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="audio-analysis")
+    window_sec = window_size / sample_rate
+    hop_sec = hop_size / sample_rate
+
+    try:
+        async for frames in reader.windows(window_size, hop_size):
+            t_capture = reader.last_write_time
+            t_infer_start = trace_now()
+            feats = await loop.run_in_executor(executor, _analyze_batch, frames, analyzer, vad, loudness)
+            t_infer_end = trace_now()
+
+            common = dict(
+                device_name=device_name,
+                sample_rate=sample_rate,          # 用刚刚查到的采样率
+                block_duration=window_sec,
+                hop_duration=hop_sec,
+                overflows=reader.overflows,
+                dropped_blocks=reader.dropped_blocks,
+            )
+
+            for i in range(frames.shape[0]):
+                if loudness is not None:
+                    common["lufs_momentary"] = round(float(feats["momentary_lufs"][i]), 2)
+                    common["lufs_short_term"] = round(float(feats["short_term_lufs"][i]), 2)
+
+                reason = None
+                if emit_policy is not None:
+                    reason = emit_policy.decide(bool(feats["active"][i]), frame_id * hop_sec)
+                    if reason is None:
+                        # 被抑制的帧也占用 frame_id，客户端能从间隔看出抑制了多少
+                        frame_id += 1
+                        continue
+
+                with PROFILER.stage("audio.build_payload"):
+                    if analyzer is None:
+                        msg_type = "audio_level"
+                        payload = build_audio_payload(
+                            level_dbfs=float(feats["dbfs"][i]),
+                            rms=float(feats["rms"][i]),
+                            **common,
+                        )
+                    else:
+                        msg_type = "audio_features"
+                        payload = build_audio_features_payload(
+                            level_dbfs=float(feats["dbfs"][i]),
+                            rms=float(feats["rms"][i]),
+                            bands_db=np.round(feats["bands_db"][i], 1).tolist(),
+                            centroid_hz=float(feats["centroid_hz"][i]),
+                            flux=float(feats["flux"][i]),
+                            onset=bool(feats["onset"][i]),
+                            pitch_hz=float(feats["pitch_hz"][i]),
+                            pitch_confidence=float(feats["pitch_confidence"][i]),
+                            **common,
+                        )
+                    if vad is not None:
+                        payload["vad"] = build_vad_payload(
+                            active=bool(feats["active"][i]),
+                            noise_floor_dbfs=round(float(feats["noise_floor_dbfs"][i]), 2),
+                            snr_db=round(float(feats["snr_db"][i]), 2),
+                        )
+                    if reason == EMIT_KEEPALIVE:
+                        payload["keepalive"] = True
+
+                with PROFILER.stage("audio.make_message"):
+                    msg = make_message(
+                        msg_type=msg_type,
+                        payload=payload,
+                        frame_id=frame_id,
+                        source=source,
+                        trace={
+                            "capture": t_capture,
+                            "infer_start": t_infer_start,
+                            "infer_end": t_infer_end,
+                        } if trace else None,
+                    )
+
+                bridge.send_json(msg, deadline=emit_deadline(reason))
+                frame_id += 1
+    finally:
+        executor.shutdown(wait=False)
+    return frame_id
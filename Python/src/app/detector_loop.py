@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Sequence
+
+from Python.src.tools.ws_bridge import WsBridge
+from Python.src.tools.messages.base import make_message
+from Python.src.tools.messages.stats import build_scheduler_stats_payload
+from Python.src.tools.frame_graph import FrameHub
+from Python.src.tools.detectors import Detector, DetectorScheduler
+from Python.src.tools.control import CONTROLS, ControlError, LoopControl, Param
+from Python.src.tools.startup import STARTUP
+
+
+logger = logging.getLogger(__name__)
+
+
+# 每帧推理预算（毫秒）：所有模型在一帧上的总耗时尽量不超过它（30 fps 一帧 33 ms，留出余量）
+DETECTOR_BUDGET_MS = 25.0
+
+# 调度统计的日志 / stats 消息间隔（秒）
+DETECTOR_STATS_INTERVAL = 5.0
+
+DETECTOR_CONTROL_PARAMS = {
+    "budget_ms": Param(float, 1.0, 1000.0),
+}
+
+
+async def detector_loop(
+    bridge: WsBridge,
+    frames: FrameHub,
+    detectors: Sequence[Detector],
+    budget_ms: float = DETECTOR_BUDGET_MS,
+    trace: bool = False,
+    stats_interval: float = DETECTOR_STATS_INTERVAL,
+    name: str = "detectors",
+) -> None:
+    """
+    多个模型共用一个推理线程的调度循环（见 tools/detectors.py）。
+
+    - 订阅 FrameHub 的共享采集；每帧由 DetectorScheduler 选出到期且放得进 budget_ms 的模型，
+      在同一个工作线程里依次运行，payload 按各自的 msg_type 发送（frame_id 为采集帧号）
+    - 例如 hands 每帧、目标检测每 4 帧、运动每 2 帧；实测耗时超出预算时自动放大次要模型的间隔
+    - 各模型的 init() 在线程池里并行执行，全部完成后报告 STARTUP.ready(name)
+    - 每 stats_interval 秒写一次日志并发送 type = "stats"（kind = "scheduler"）消息
+    - 运行时控制（LoopControl name）：暂停 / 恢复、修改 budget_ms
+    - trace=True 时每条消息附带 capture / infer_start / infer_end（该模型自己的起止时刻）
+    """
+    loop = asyncio.get_running_loop()
+    with STARTUP.phase(f"{name}.init"):
+        await asyncio.gather(*(loop.run_in_executor(None, d.init) for d in detectors))
+    STARTUP.ready(name)
+
+    scheduler = DetectorScheduler(detectors, budget_ms / 1e3)
+    subscription = frames.subscribe(name)
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+    logger.info(
+        "%s 开始调度: %s, 预算 %.1f ms/帧",
+        name, ", ".join(f"{d.name}(每 {d.every} 帧)" for d in detectors), budget_ms,
+    )
+
+    control = CONTROLS.register(LoopControl(name, DETECTOR_CONTROL_PARAMS, budget_ms=budget_ms))
+
+    def apply(changes: dict) -> None:
+        if "budget_ms" in changes:
+            # 先算好新的间隔再一起生效：失败时预算和间隔都保持原样
+            try:
+                scheduler.set_budget(changes["budget_ms"] / 1e3)
+            except ValueError as e:
+                raise ControlError(str(e)) from e
+
+    window_start = loop.time()
+    try:
+        while True:
+            if control.pending:
+                await control.checkpoint(apply)
+
+            products = await subscription.next()
+            if products is None:
+                logger.info("共享采集结束，退出 %s", name)
+                break
+
+            chosen = scheduler.plan(products.frame_id)
+            if chosen:
+                results = await loop.run_in_executor(executor, scheduler.run, chosen, products)
+                for detector, payload, t_start, t_end in results:
+                    frame_trace = {
+                        "capture": products.capture_time,
+                        "infer_start": t_start,
+                        "infer_end": t_end,
+                    } if trace else None
+                    if payload is not None:
+                        bridge.send_json(make_message(
+                            msg_type=detector.msg_type,
+                            payload=payload,
+                            frame_id=products.frame_id,
+                            source=detector.source or detector.name,
+                            trace=dict(frame_trace) if frame_trace else None,
+                        ), deadline=detector.deadline)
+                    for msg_type, body in detector.events():
+                        bridge.send_json(make_message(
+                            msg_type=msg_type,
+                            payload=body,
+                            frame_id=products.frame_id,
+                            source=detector.source or detector.name,
+                            trace=dict(frame_trace) if frame_trace else None,
+                        ))
+
+            now = loop.time()
+            if now - window_start >= stats_interval:
+                stats = scheduler.stats(reset=True)
+                logger.info(
+                    "[%s] %d 帧, 超预算 %d, 每帧 p50 %.1f / max %.1f ms, 间隔 %s",
+                    name, stats["frames"], stats["over_budget"], stats["frame_ms_p50"], stats["frame_ms_max"],
+                    {d["name"]: d["stride"] for d in stats["detectors"]},
+                )
+                bridge.send_json(make_message(
+                    msg_type="stats",
+                    payload=build_scheduler_stats_payload(window_sec=now - window_start, process_name=name, **stats),
+                    source="detector_scheduler",
+                ))
+                window_start = now
+    finally:
+        logger.info("%s 结束，释放模型", name)
+        CONTROLS.unregister(control)
+        subscription.close()
+        executor.shutdown(wait=True)
+        for detector in detectors:
+            try:
+                detector.close()
+            except Exception:
+                logger.exception("[%s] close 失败", detector.name)
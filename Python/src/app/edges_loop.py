@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import cv2
+
+from Python.src.tools.ws_bridge import WsBridge
+from Python.src.tools.messages.base import make_message, trace_now
+from Python.src.tools.messages.edges import EDGES_BITMASK, EDGES_POLYLINES, build_edges_payload
+from Python.src.tools.frame_sources import CameraFrameSource, FrameSource
+from Python.src.tools.edges import EdgeExtractor
+from Python.src.tools.frame_graph import MIRRORED, FrameHub, FrameProducts, blurred
+from Python.src.tools.control import CONTROLS, LoopControl, Param
+from Python.src.tools.detectors import Detector
+
+
+logger = logging.getLogger(__name__)
+
+
+# 边缘计算分辨率（远小于采集分辨率，shader 效果不需要细节）
+EDGES_WIDTH = 320
+EDGES_HEIGHT = 180
+
+# 输出格式：EDGES_POLYLINES（简化折线）或 EDGES_BITMASK（低分辨率打包位图）
+EDGES_FORMAT = EDGES_POLYLINES
+
+# 最高发送频率（Hz）；按帧的媒体时间限速，未到时间的帧只读取不处理
+EDGES_MAX_RATE = 15.0
+
+# 客户端可通过 control 消息（target = "edges"）在运行时修改的参数（max_rate = 0 表示不限速）
+EDGES_CONTROL_PARAMS = {
+    "max_rate": Param(float, 0, 120),
+}
+
+# 与 hands_loop 一致使用镜像（自拍视角），坐标系和手部数据对齐
+EDGES_MIRROR = True
+
+
+def _process_frame(
+    source: FrameSource,
+    extractor: EdgeExtractor,
+    output: str,
+    next_due: float,
+    mirror: bool,
+):
+    """
+    在工作线程里运行：读一帧；到了发送时间才做 Canny + 轮廓 / 位图。
+    返回 None 表示输入结束；返回 (t, None, t_capture) 表示本帧被限速跳过。
+    """
+    ok, frame = source.read()
+    t_capture = trace_now()
+    if not ok:
+        return None
+    t = source.timestamp
+    if t < next_due:
+        return t, None, t_capture
+
+    if mirror:
+        frame = cv2.flip(frame, 1)
+    return t, _build_payload(extractor, extractor.edges(frame), output), t_capture
+
+
+def _process_products(products: FrameProducts, extractor: EdgeExtractor, output: str):
+    """
+    共享采集版本：若 EdgeExtractor 的分辨率正好是某一层金字塔（1280x720 时 320x180 = 第 2 层），
+    直接用 FrameHub 缓存的 blur{k}，只剩 Canny 本身；否则退回从镜像帧缩放。
+    """
+    graph = products.graph
+    size = (extractor.width, extractor.height)
+    blur_matches = graph.blur_ksize == extractor.blur or (graph.blur_ksize < 3 and extractor.blur < 3)
+    for level in range(graph.levels + 1):
+        if blur_matches and products.level_size(level) == size and blurred(level) in graph:
+            edges = extractor.edges_gray(products.get(blurred(level)))
+            break
+    else:
+        edges = extractor.edges(products.get(MIRRORED))
+    return products.timestamp, _build_payload(extractor, edges, output), products.capture_time
+
+
+def _build_payload(extractor: EdgeExtractor, edges, output: str) -> dict:
+    if output == EDGES_BITMASK:
+        bits, mw, mh = extractor.bitmask(edges)
+        return build_edges_payload(
+            extractor.width, extractor.height, bitmask=bits, mask_width=mw, mask_height=mh,
+        )
+    return build_edges_payload(
+        extractor.width, extractor.height, polylines=extractor.polylines(edges),
+    )
+
+
+class EdgesDetector(Detector):
+    """edges_loop 的处理步骤作为 detector_loop 的插件（频率由调度间隔决定，默认每 2 帧一次）。"""
+
+    name = "edges"
+    msg_type = "edges"
+    every = 2
+    priority = 2
+    cost_hint = 0.003
+
+    def __init__(self, output: str = EDGES_FORMAT, extractor: Optional[EdgeExtractor] = None, **kwargs) -> None:
+        super().__init__(**kwargs)
+        if output not in (EDGES_POLYLINES, EDGES_BITMASK):
+            raise ValueError(f"未知的边缘输出格式: {output!r}")
+        self.output = output
+        self.extractor = extractor or EdgeExtractor(EDGES_WIDTH, EDGES_HEIGHT)
+
+    def process(self, products: FrameProducts) -> dict:
+        return _process_products(products, self.extractor, self.output)[1]
+
+
+async def edges_loop(
+    bridge: WsBridge,
+    source: Optional[FrameSource] = None,
+    output: str = EDGES_FORMAT,
+    max_rate: float = EDGES_MAX_RATE,
+    extractor: Optional[EdgeExtractor] = None,
+    mirror: bool = EDGES_MIRROR,
+    trace: bool = False,
+    frames: Optional[FrameHub] = None,
+) -> None:
+    """
+    边缘 / 轮廓特征流（给 TunnelPixelBackground、SpellQuad 等 shader 效果使用）。
+
+    - source: 帧输入（见 tools/frame_sources.py），为 None 时打开默认摄像头
+    - 在 EDGES_WIDTH x EDGES_HEIGHT 上做 Canny（阈值 50 / 150、模糊 3，与 Edge_demo 一致）
+    - output = EDGES_POLYLINES 时发送 approxPolyDP 简化后的折线；
+      EDGES_BITMASK 时发送低分辨率的打包位图（base64）
+    - 每秒最多发送 max_rate 条 edges 消息
+    - 读帧和图像处理都在工作线程里执行，不会阻塞 bridge
+    - 若传入 frames（FrameHub），则忽略 source / mirror，订阅共享采集（镜像由 FrameHub 决定），
+      缩放、灰度、模糊与其它订阅者共用
+    - 运行时控制（LoopControl "edges"）：暂停 / 恢复、修改 max_rate，在帧之间生效
+    """
+    if output not in (EDGES_POLYLINES, EDGES_BITMASK):
+        raise ValueError(f"未知的边缘输出格式: {output!r}")
+    extractor = extractor or EdgeExtractor(EDGES_WIDTH, EDGES_HEIGHT)
+    period = 1.0 / max_rate if max_rate > 0 else 0.0
+
+    subscription = None
+    if frames is not None:
+        source = frames.source
+        subscription = frames.subscribe("edges")
+    else:
+        if source is None:
+            source = CameraFrameSource()
+        if not source.open():
+            logger.error("无法打开帧输入 %s", source.name)
+            return
+    logger.info(
+        "edges_loop 使用帧输入: %s, %dx%d, format=%s, max_rate=%.1f",
+        source.name, extractor.width, extractor.height, output, max_rate,
+    )
+
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="edges")
+    next_due = float("-inf")
+    frame_id = 0
+
+    control = CONTROLS.register(LoopControl("edges", EDGES_CONTROL_PARAMS, max_rate=max_rate))
+
+    def apply(changes: dict) -> None:
+        nonlocal period, next_due
+        if "max_rate" in changes:
+            rate = changes["max_rate"]
+            period = 1.0 / rate if rate > 0 else 0.0
+            next_due = float("-inf")
+
+    try:
+        while True:
+            if control.pending:
+                await control.checkpoint(apply)
+
+            if subscription is not None:
+                products = await subscription.next()
+                if products is not None and products.timestamp < next_due:
+                    # 限速：未到时间的帧不处理，共享帧里也就不会计算 edges 专用的节点
+                    continue
+                t_infer_start = trace_now()
+                result = None if products is None else await loop.run_in_executor(
+                    executor, _process_products, products, extractor, output,
+                )
+            else:
+                t_infer_start = trace_now()
+                result = await loop.run_in_executor(
+                    executor, _process_frame, source, extractor, output, next_due, mirror,
+                )
+            t_infer_end = trace_now()
+            if result is None:
+                logger.info("帧输入结束，退出 edges_loop")
+                break
+
+            t, payload, t_capture = result
+            if payload is None:
+                continue
+
+            # 按固定节拍推进；落后超过一个周期（例如输入卡顿）就从当前帧重新对齐
+            next_due = next_due + period if t - next_due < period else t + period
+
+            bridge.send_json(make_message(
+                msg_type="edges",
+                payload=payload,
+                frame_id=frame_id,
+                source="edges",
+                trace={
+                    "capture": t_capture,
+                    "infer_start": t_infer_start,
+                    "infer_end": t_infer_end,
+                } if trace else None,
+            ))
+            frame_id += 1
+
+    finally:
+        logger.info("edges_loop 结束，释放资源")
+        CONTROLS.unregister(control)
+        executor.shutdown(wait=True)
+        if subscription is not None:
+            subscription.close()
+        else:
+            source.release()
@@ -2,14 +2,22 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import time
 from typing import Optional
 
 import cv2
-import mediapipe as mp
+import numpy as np
 
 from Python.src.tools.ws_bridge import WsBridge
-from Python.src.tools.messages.base import make_message
-from Python.src.tools.messages.hands import build_hands_payload
+from Python.src.tools.messages.base import make_message, trace_now
+from Python.src.tools.messages.hands import LAYOUT_DICTS, HandsPayloadBuilder
+from Python.src.tools.gestures import GestureEngine
+from Python.src.tools.emission import EMIT_KEEPALIVE, HandsEmitPolicy, emit_deadline
+from Python.src.tools.frame_graph import MIRRORED, FrameHub, FrameProducts, rgb
+from Python.src.tools.control import CONTROLS, LoopControl, Param, RateLimiter
+from Python.src.tools.detectors import Detector
+from Python.src.tools.profiler import PROFILER
+from Python.src.tools.startup import STARTUP
 
 
 logger = logging.getLogger(__name__)
@@ -24,11 +32,157 @@ TARGET_FPS = 60
 INFER_WIDTH = 640    # 推理分辨率（与 demo2 一致：小图推理）
 INFER_HEIGHT = 360
 
+# MediaPipe Hands 模型参数
+MODEL_COMPLEXITY = 0                # 低复杂度模型，速度快
+MIN_DETECTION_CONFIDENCE = 0.7
+MIN_TRACKING_CONFIDENCE = 0.7
+
+# 推理频率上限（Hz），0 = 每个采集帧都推理
+HANDS_TARGET_FPS = 0.0
+
+# 客户端可通过 control 消息（target = "hands"）在运行时修改的参数
+HANDS_CONTROL_PARAMS = {
+    "model_complexity": Param(int, choices=(0, 1)),
+    "min_detection_confidence": Param(float, 0.0, 1.0),
+    "min_tracking_confidence": Param(float, 0.0, 1.0),
+    "infer_width": Param(int, 64, 1920),
+    "infer_height": Param(int, 64, 1080),
+    "target_fps": Param(float, 0, 240),
+}
+_MODEL_KEYS = ("model_complexity", "min_detection_confidence", "min_tracking_confidence")
+
+# hands payload 布局：LAYOUT_DICTS（Unity 当前解析的旧格式）或 LAYOUT_COLUMNAR
+HANDS_LAYOUT = LAYOUT_DICTS
+
+
+def create_hands(
+    model_complexity: int = MODEL_COMPLEXITY,
+    min_detection_confidence: float = MIN_DETECTION_CONFIDENCE,
+    min_tracking_confidence: float = MIN_TRACKING_CONFIDENCE,
+):
+    """加载 MediaPipe Hands 模型（mediapipe 的导入很慢，推迟到真正需要时并放在线程池里做）。"""
+    with STARTUP.phase("hands.model"):
+        import mediapipe as mp
+
+        logger.info("初始化 MediaPipe Hands (model_complexity=%d)", model_complexity)
+        return mp.solutions.hands.Hands(
+            model_complexity=model_complexity,
+            max_num_hands=2,
+            min_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+        )
+
+
+def open_camera(cam_index: int) -> cv2.VideoCapture:
+    """打开摄像头并设置 MJPG + 分辨率 + 目标 FPS（阻塞，放在线程池里与模型加载并行）。"""
+    with STARTUP.phase("camera.open"):
+        logger.info("打开摄像头 index=%d", cam_index)
+        cap = cv2.VideoCapture(cam_index, cv2.CAP_DSHOW)
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*"MJPG"))
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, CAP_WIDTH)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, CAP_HEIGHT)
+        cap.set(cv2.CAP_PROP_FPS, TARGET_FPS)
+    return cap
+
+
+def warm_up(hands, width: int = INFER_WIDTH, height: int = INFER_HEIGHT) -> None:
+    """在推理分辨率的空白帧上跑一次 hands.process（空白帧检测不到手，不影响之后的跟踪状态）。"""
+    with STARTUP.phase("hands.warmup"):
+        hands.process(np.zeros((height, width, 3), dtype=np.uint8))
+
+
+def _shared_rgb(products: FrameProducts, size) -> np.ndarray:
+    """共享采集里取推理输入：尺寸正好是某层金字塔时直接用缓存的 rgbK，否则自己缩放。"""
+    for level in range(1, products.graph.levels + 1):
+        if products.level_size(level) == size and rgb(level) in products.graph:
+            return products.get(rgb(level))
+    with PROFILER.stage("hands.resize"):
+        small = cv2.resize(products.get(MIRRORED), size, interpolation=cv2.INTER_AREA)
+    with PROFILER.stage("hands.cvtColor"):
+        small_rgb = cv2.cvtColor(small, cv2.COLOR_BGR2RGB)
+    small_rgb.flags.writeable = False
+    return small_rgb
+
+
+class HandsDetector(Detector):
+    """
+    hands_loop 的推理步骤作为 detector_loop 的插件（默认每帧、最高优先级；预算极紧时最多放宽到每 3 帧）。
+    emit_policy / gesture_engine 的用法与 hands_loop 相同，手势事件通过 events() 发出。
+    """
+
+    name = "hands"
+    msg_type = "hands"
+    source = "mediapipe_hands"
+    every = 1
+    priority = 0
+    cost_hint = 0.015
+    max_every = 3
+
+    def __init__(
+        self,
+        gesture_engine: Optional[GestureEngine] = None,
+        emit_policy: Optional[HandsEmitPolicy] = None,
+        layout: str = HANDS_LAYOUT,
+        include_pixels: bool = False,
+        infer_size=(INFER_WIDTH, INFER_HEIGHT),
+        **kwargs,
+    ) -> None:
+        super().__init__(**kwargs)
+        self.gesture_engine = gesture_engine
+        self.emit_policy = emit_policy
+        self.include_pixels = include_pixels
+        self.infer_size = tuple(infer_size)
+        self.builder = HandsPayloadBuilder(max_hands=2, layout=layout)
+        self.hands = None
+        self._events: list = []
+
+    def init(self) -> None:
+        self.hands = create_hands()
+        warm_up(self.hands, *self.infer_size)
+
+    def process(self, products: FrameProducts) -> Optional[dict]:
+        small_rgb = _shared_rgb(products, self.infer_size)
+        with PROFILER.stage("hands.process"):
+            results = self.hands.process(small_rgb)
+        with PROFILER.stage("hands.fill"):
+            self.builder.fill(results)
+        hand_arrays = self.builder.hand_arrays()
+        now = time.monotonic()
+        if self.gesture_engine is not None:
+            self._events.extend(("gesture_event", e) for e in self.gesture_engine.update(hand_arrays, now))
+
+        emit_reason = None
+        if self.emit_policy is not None:
+            emit_reason = self.emit_policy.decide(hand_arrays, now)
+            if emit_reason is None:
+                return None
+        self.deadline = emit_deadline(emit_reason)
+        payload = self.builder.build(CAP_WIDTH, CAP_HEIGHT, include_pixels=self.include_pixels)
+        if emit_reason == EMIT_KEEPALIVE:
+            payload["keepalive"] = True
+        return payload
+
+    def events(self) -> list:
+        events, self._events = self._events, []
+        return events
+
+    def close(self) -> None:
+        if self.hands is not None:
+            self.hands.close()
+            self.hands = None
+
 
 async def hands_loop(
     bridge: WsBridge,
     cam_index: int = CAM_INDEX,
     debug_show: bool = False,
+    gesture_engine: Optional[GestureEngine] = None,
+    send_frames: bool = True,
+    emit_policy: Optional[HandsEmitPolicy] = None,
+    layout: str = HANDS_LAYOUT,
+    include_pixels: bool = False,
+    trace: bool = False,
+    frames: Optional[FrameHub] = None,
 ) -> None:
     """
     高性能 Hands 捕捉 + JSON 发送循环。
@@ -37,50 +191,134 @@ async def hands_loop(
     - 640x360 缩小图送入 MediaPipe Hands
     - 不画图、不显示窗口（除非 debug_show=True）
     - 每帧构造 hands payload -> 顶层 message -> 通过 WsBridge.send_json 广播
+    - 若传入 gesture_engine，则额外在手势状态切换时发送 gesture_event 消息；
+      只关心手势的场景可以设 send_frames=False，完全不发逐帧 landmarks
+    - 若传入 emit_policy，则只在手部数据变化时发送 hands 消息（外加低频 keepalive）
+    - layout 选择 payload 布局；列式布局下只有 include_pixels=True 才附带 px/py
+    - trace=True 时每条消息附带 capture / infer_start / infer_end 等追踪时间戳
+    - 若传入 frames（FrameHub），则不自己打开摄像头，而是订阅共享采集：
+      镜像和 rgb1（采集分辨率的一半，1280x720 时即 640x360）由 FrameHub 每帧只算一次，
+      与 motion_loop / edges_loop 等其它订阅者共用；推理尺寸不是金字塔某一层时自己缩放
+    - 模型加载与摄像头打开在线程池里并行，并先做一次预热推理，之后才报告 STARTUP.ready("hands")
+    - 运行时控制（LoopControl "hands"，见 HANDS_CONTROL_PARAMS）：暂停 / 恢复、推理尺寸、
+      推理频率上限、模型复杂度与置信度阈值（在线程池里重建并预热模型后再切换），都在帧之间生效
     """
 
-    logger.info("初始化 MediaPipe Hands")
-    mp_hands = mp.solutions.hands
-    hands = mp_hands.Hands(
-        model_complexity=0,             # 低复杂度模型，速度快
-        max_num_hands=2,
-        min_detection_confidence=0.7,
-        min_tracking_confidence=0.7,
-    )
+    # 模型加载（含 mediapipe 的导入）和摄像头打开都是阻塞的，放到线程池里并行：
+    # 共享采集时摄像头由 FrameHub.run 在另一个线程里打开，这里只需要加载模型
+    loop = asyncio.get_running_loop()
+    cap = None
+    subscription = None
+    if frames is not None:
+        logger.info("hands_loop 订阅共享采集: %s", frames.source.name)
+        subscription = frames.subscribe("hands")
+        hands = await loop.run_in_executor(None, create_hands)
+    else:
+        hands, cap = await asyncio.gather(
+            loop.run_in_executor(None, create_hands),
+            loop.run_in_executor(None, open_camera, cam_index),
+        )
+        if not cap.isOpened():
+            logger.error("无法打开摄像头 %d", cam_index)
+            hands.close()
+            return
+        STARTUP.ready("camera")
 
-    logger.info("打开摄像头 index=%d", cam_index)
-    cap = cv2.VideoCapture(cam_index, cv2.CAP_DSHOW)
+    # 第一次推理要初始化计算图，比稳态慢很多；先用空白帧跑一次再宣布就绪
+    await loop.run_in_executor(None, warm_up, hands)
+    STARTUP.ready("hands")
 
-    # 摄像头配置：MJPG + 分辨率 + 目标 FPS
-    cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*"MJPG"))
-    cap.set(cv2.CAP_PROP_FRAME_WIDTH, CAP_WIDTH)
-    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, CAP_HEIGHT)
-    cap.set(cv2.CAP_PROP_FPS, TARGET_FPS)
+    control = CONTROLS.register(LoopControl(
+        "hands", HANDS_CONTROL_PARAMS,
+        model_complexity=MODEL_COMPLEXITY,
+        min_detection_confidence=MIN_DETECTION_CONFIDENCE,
+        min_tracking_confidence=MIN_TRACKING_CONFIDENCE,
+        infer_width=INFER_WIDTH,
+        infer_height=INFER_HEIGHT,
+        target_fps=HANDS_TARGET_FPS,
+    ))
+    limiter = RateLimiter(HANDS_TARGET_FPS)
+    infer_size = (INFER_WIDTH, INFER_HEIGHT)
 
-    if not cap.isOpened():
-        logger.error("无法打开摄像头 %d", cam_index)
-        return
+    async def apply(changes: dict) -> None:
+        nonlocal hands, infer_size
+        config = {**control.config, **changes}
+        size = (config["infer_width"], config["infer_height"])
+        if any(k in changes for k in _MODEL_KEYS):
+            # 新模型建好并预热之后再替换，切换期间不会有一帧特别慢
+            new_hands = await loop.run_in_executor(None, lambda: create_hands(**{k: config[k] for k in _MODEL_KEYS}))
+            await loop.run_in_executor(None, warm_up, new_hands, *size)
+            hands.close()
+            hands = new_hands
+        infer_size = size
+        limiter.fps = config["target_fps"]
 
+    builder = HandsPayloadBuilder(max_hands=2, layout=layout)
     frame_id = 0
 
     try:
         while True:
-            ok, frame = cap.read()
-            if not ok:
-                logger.warning("读取摄像头帧失败，退出 hands_loop")
-                break
+            if control.pending:
+                await control.checkpoint(apply)
+            await limiter.wait()
 
-            # 镜像（自拍视角）
-            frame = cv2.flip(frame, 1)
+            if subscription is not None:
+                # 共享采集：镜像 / 缩小 / 转 RGB 都从 FrameHub 的每帧缓存里取（只读）
+                products = await subscription.next()
+                if products is None:
+                    logger.info("共享采集结束，退出 hands_loop")
+                    break
+                t_capture = products.capture_time
+                frame = products.get(MIRRORED)
+                small_rgb = _shared_rgb(products, infer_size)
+                t_infer_start = trace_now()
+                with PROFILER.stage("hands.process"):
+                    results = hands.process(small_rgb)
+                t_infer_end = trace_now()
+            else:
+                with PROFILER.stage("hands.read"):
+                    ok, frame = cap.read()
+                t_capture = trace_now()
+                if not ok:
+                    logger.warning("读取摄像头帧失败，退出 hands_loop")
+                    break
 
-            # ---------------------------------------
-            # 1. 生成缩小版图像用于推理（demo2 核心）
-            # ---------------------------------------
-            small = cv2.resize(frame, (INFER_WIDTH, INFER_HEIGHT))
-            small_rgb = cv2.cvtColor(small, cv2.COLOR_BGR2RGB)
-            small_rgb.flags.writeable = False
-            results = hands.process(small_rgb)
-            small_rgb.flags.writeable = True
+                # 镜像（自拍视角）
+                with PROFILER.stage("hands.flip"):
+                    frame = cv2.flip(frame, 1)
+
+                # ---------------------------------------
+                # 1. 生成缩小版图像用于推理（demo2 核心）
+                # ---------------------------------------
+                with PROFILER.stage("hands.resize"):
+                    small = cv2.resize(frame, infer_size)
+                with PROFILER.stage("hands.cvtColor"):
+                    small_rgb = cv2.cvtColor(small, cv2.COLOR_BGR2RGB)
+                small_rgb.flags.writeable = False
+                t_infer_start = trace_now()
+                with PROFILER.stage("hands.process"):
+                    results = hands.process(small_rgb)
+                t_infer_end = trace_now()
+                small_rgb.flags.writeable = True
+
+            frame_trace = None
+            if trace:
+                frame_trace = {
+                    "capture": t_capture,
+                    "infer_start": t_infer_start,
+                    "infer_end": t_infer_end,
+                }
+
+            # 手部关键点数组：供变化检测和手势引擎共用
+            now = time.monotonic()
+            with PROFILER.stage("hands.fill"):
+                builder.fill(results)
+            hand_arrays = builder.hand_arrays()
+
+            # 变化检测：没有变化的帧直接跳过（emit_reason 为 None）
+            emit_reason = None
+            if send_frames and emit_policy is not None:
+                emit_reason = emit_policy.decide(hand_arrays, now)
 
             # ---------------------------------------
             # 2. 构造 payload + 顶层 message
@@ -102,17 +340,37 @@ async def hands_loop(
             #          => px = x * CAP_WIDTH
             #   所以实际上用 CAP_WIDTH/HEIGHT 也是正确的。
             #
-            # 因此我们直接传 CAP_WIDTH/CAP_HEIGHT 给 build_hands_payload。
-            payload = build_hands_payload(results, CAP_WIDTH, CAP_HEIGHT)
-            msg = make_message(
-                msg_type="hands",
-                payload=payload,
-                frame_id=frame_id,
-                source="mediapipe_hands",
-            )
-
-            # 通过 WebSocket 广播给所有客户端（例如 Unity）
-            bridge.send_json(msg)
+            # 因此我们直接传 CAP_WIDTH/CAP_HEIGHT 给 builder.build。
+            if send_frames and (emit_policy is None or emit_reason is not None):
+                with PROFILER.stage("hands.build_payload"):
+                    payload = builder.build(CAP_WIDTH, CAP_HEIGHT, include_pixels=include_pixels)
+                if emit_reason == EMIT_KEEPALIVE:
+                    # 内容与上一条相比没有变化，只是告诉客户端“我还活着”
+                    payload["keepalive"] = True
+                with PROFILER.stage("hands.make_message"):
+                    msg = make_message(
+                        msg_type="hands",
+                        payload=payload,
+                        frame_id=frame_id,
+                        source="mediapipe_hands",
+                        trace=dict(frame_trace) if frame_trace else None,
+                    )
+
+                # 通过 WebSocket 广播给所有客户端（例如 Unity）；settle 帧不过期（见 emit_deadline）
+                bridge.send_json(msg, deadline=emit_deadline(emit_reason))
+
+            # 手势事件：只有状态切换（start / end）时才会有输出
+            if gesture_engine is not None:
+                events = gesture_engine.update(hand_arrays, now)
+                for event in events:
+                    bridge.send_json(make_message(
+                        msg_type="gesture_event",
+                        payload=event,
+                        frame_id=frame_id,
+                        source="gesture_engine",
+                        trace=dict(frame_trace) if frame_trace else None,
+                    ))
+
             frame_id += 1
 
             # ---------------------------------------
@@ -136,6 +394,10 @@ async def hands_loop(
 
     finally:
         logger.info("hands_loop 结束，释放资源")
-        cap.release()
+        CONTROLS.unregister(control)
+        if cap is not None:
+            cap.release()
+        if subscription is not None:
+            subscription.close()
         cv2.destroyAllWindows()
         hands.close()
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+from Python.src.tools.ws_bridge import WsBridge
+from Python.src.tools.messages.base import make_message, trace_now
+from Python.src.tools.messages.motion import build_motion_payload
+from Python.src.tools.frame_sources import CameraFrameSource, FrameSource
+from Python.src.tools.frame_graph import MIRRORED, FrameHub, FrameProducts, gray
+from Python.src.tools.motion import MotionDetector, draw_tracks
+from Python.src.tools.tracking import ArrayTracker, TrackSnapshot
+from Python.src.tools.control import CONTROLS, LoopControl, Param, RateLimiter
+from Python.src.tools.detectors import Detector
+
+
+logger = logging.getLogger(__name__)
+
+
+# 跟踪参数（与 MotionStable_demo 一致）
+MAX_AGE = 20            # 允许丢失帧数
+MIN_HITS = 6            # 新目标确认所需连续命中帧
+TRACK_IOU = 0.3         # 轨迹与检测匹配的 IOU 阈值
+TRAIL = 24              # 轨迹长度
+
+# 分割在金字塔第 PYRAMID_LEVEL 层上进行（2 = 1/4 分辨率，1280x720 -> 320x180），
+# REFINE=True 时只在检测区域里回到原图分辨率精修框。
+# 精度 / 开销对比见 test_demos/MotionPyramid_bench.py
+PYRAMID_LEVEL = 2
+REFINE = True
+
+# 处理频率上限（Hz），0 = 每帧都处理；客户端可通过 control 消息（target = "motion"）修改
+MOTION_TARGET_FPS = 0.0
+MOTION_CONTROL_PARAMS = {
+    "target_fps": Param(float, 0, 240),
+}
+
+
+def _process_frame(
+    source: FrameSource,
+    detector: MotionDetector,
+    tracker: ArrayTracker,
+) -> Optional[Tuple[np.ndarray, float, float, TrackSnapshot, np.ndarray]]:
+    """
+    在工作线程里运行：读一帧 + 背景减除 + 连通域 + 跟踪（全部是阻塞的 OpenCV 调用）。
+    输入结束时返回 None。
+    """
+    ok, frame = source.read()
+    t_capture = trace_now()
+    if not ok:
+        return None
+    boxes, fg = detector.detect(frame)
+    tracks = tracker.step(boxes, source.timestamp)
+    return frame, source.timestamp, t_capture, tracks, fg
+
+
+def _process_products(
+    products: FrameProducts,
+    detector: MotionDetector,
+    tracker: ArrayTracker,
+) -> Tuple[np.ndarray, float, float, TrackSnapshot, np.ndarray]:
+    """共享采集版本：分割输入直接取 FrameHub 缓存的 gray{pyramid_level}，不再自己缩放 / 转灰度。"""
+    frame = products.get(MIRRORED)
+    boxes, fg = detector.detect_gray(products.get(gray(detector.pyramid_level)), frame)
+    tracks = tracker.step(boxes, products.timestamp)
+    return frame, products.timestamp, products.capture_time, tracks, fg
+
+
+class MotionTrackerDetector(Detector):
+    """motion_loop 的处理步骤作为 detector_loop 的插件（共享采集的 gray{PYRAMID_LEVEL}，默认每 2 帧一次）。"""
+
+    name = "motion"
+    msg_type = "motion"
+    source = "motion_tracker"
+    every = 2
+    priority = 1
+    cost_hint = 0.004
+
+    def init(self) -> None:
+        self.detector = MotionDetector(pyramid_level=PYRAMID_LEVEL, refine=REFINE)
+        self.tracker = ArrayTracker(iou_th=TRACK_IOU, max_age=MAX_AGE, min_hits=MIN_HITS, trail_len=TRAIL)
+
+    def process(self, products: FrameProducts) -> dict:
+        _, media_time, _, tracks, _ = _process_products(products, self.detector, self.tracker)
+        return build_motion_payload(tracks, products.width, products.height, media_time=media_time)
+
+
+async def motion_loop(
+    bridge: WsBridge,
+    source: Optional[FrameSource] = None,
+    detector: Optional[MotionDetector] = None,
+    tracker: Optional[ArrayTracker] = None,
+    debug_show: bool = False,
+    trace: bool = False,
+    frames: Optional[FrameHub] = None,
+) -> None:
+    """
+    运动跟踪循环（MOG2 + 连通域 + IOU 跟踪，来自 MotionStable_demo）。
+
+    - source: 帧输入（见 tools/frame_sources.py），为 None 时打开默认摄像头；
+              传入 VideoFileFrameSource / SyntheticFrameSource 即可在录好的素材上
+              以超过实时的速度做基准，输入结束后本协程正常返回
+    - 读帧、背景减除、跟踪都在单独的工作线程里执行，事件循环只负责发送
+    - 每帧发送一条 motion 消息（已确认轨迹的框、ID、速度、轨迹线）
+    - debug_show=True 时显示轨迹 + 前景掩码窗口，按 q 退出、r 重置背景
+    - trace=True 时每条消息附带 capture / infer_start / infer_end 追踪时间戳
+    - 若传入 frames（FrameHub），则忽略 source，订阅共享采集：分割用 FrameHub 缓存的
+      gray{PYRAMID_LEVEL}，坐标为镜像后的画面（与 hands / edges 一致）；处理不过来时只跳帧
+    - 运行时控制（LoopControl "motion"）：暂停 / 恢复、处理频率上限 target_fps，在帧之间生效
+    """
+    detector = detector or MotionDetector(pyramid_level=PYRAMID_LEVEL, refine=REFINE)
+    tracker = tracker or ArrayTracker(iou_th=TRACK_IOU, max_age=MAX_AGE, min_hits=MIN_HITS, trail_len=TRAIL)
+
+    subscription = None
+    if frames is not None:
+        source = frames.source
+        subscription = frames.subscribe("motion")
+        logger.info("motion_loop 订阅共享采集: %s", source.name)
+    else:
+        if source is None:
+            source = CameraFrameSource()
+        if not source.open():
+            logger.error("无法打开帧输入 %s", source.name)
+            return
+        logger.info("motion_loop 使用帧输入: %s (%dx%d)", source.name, source.width, source.height)
+
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="motion")
+    frame_id = 0
+
+    control = CONTROLS.register(LoopControl("motion", MOTION_CONTROL_PARAMS, target_fps=MOTION_TARGET_FPS))
+    limiter = RateLimiter(MOTION_TARGET_FPS)
+
+    def apply(changes: dict) -> None:
+        if "target_fps" in changes:
+            limiter.fps = changes["target_fps"]
+
+    try:
+        while True:
+            if control.pending:
+                await control.checkpoint(apply)
+            await limiter.wait()
+
+            if subscription is not None:
+                products = await subscription.next()
+                t_infer_start = trace_now()
+                result = None if products is None else await loop.run_in_executor(
+                    executor, _process_products, products, detector, tracker,
+                )
+            else:
+                t_infer_start = trace_now()
+                result = await loop.run_in_executor(executor, _process_frame, source, detector, tracker)
+            t_infer_end = trace_now()
+            if result is None:
+                logger.info("帧输入结束，退出 motion_loop")
+                break
+            frame, media_time, t_capture, tracks, fg = result
+
+            payload = build_motion_payload(tracks, source.width, source.height, media_time=media_time)
+            bridge.send_json(make_message(
+                msg_type="motion",
+                payload=payload,
+                frame_id=frame_id,
+                source="motion_tracker",
+                trace={
+                    # 读帧也在工作线程里完成，capture 会略晚于 infer_start
+                    "capture": t_capture,
+                    "infer_start": t_infer_start,
+                    "infer_end": t_infer_end,
+                } if trace else None,
+            ))
+            frame_id += 1
+
+            if debug_show:
+                vis = cv2.hconcat([
+                    cv2.resize(draw_tracks(frame, tracks), (640, 360)),
+                    cv2.cvtColor(cv2.resize(fg, (640, 360)), cv2.COLOR_GRAY2BGR),
+                ])
+                cv2.imshow("motion (left=tracks, right=mask)", vis)
+                k = cv2.waitKey(1) & 0xFF
+                if k == ord("q"):
+                    logger.info("检测到 'q' 键，退出 motion_loop")
+                    break
+                if k == ord("r"):
+                    # 背景模型 / 轨迹只在工作线程里使用，这里重置时工作线程是空闲的
+                    detector.reset()
+                    tracker.reset()
+                    logger.info("背景 & 跟踪重置")
+
+    finally:
+        logger.info("motion_loop 结束，释放资源")
+        CONTROLS.unregister(control)
+        executor.shutdown(wait=True)
+        if subscription is not None:
+            subscription.close()
+        else:
+            source.release()
+        if debug_show:
+            cv2.destroyAllWindows()
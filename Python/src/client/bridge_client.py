@@ -0,0 +1,265 @@
+# Python/src/client/bridge_client.py
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Collection, Deque, List, Optional
+
+import websockets
+
+from Python.src.client.decoding import Message, decode_message, loads, peek_type
+from Python.src.tools.clock_sync import CLOCK_PONG, ClockOffsetEstimator, make_clock_ping
+from Python.src.tools.messages.control import make_control_request
+
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_URI = "ws://127.0.0.1:8765"
+
+
+class BridgeClient:
+    """
+    读取 WsBridge 数据流的 Python 客户端（分析 / 监控脚本用）：
+
+    - async for msg in client: 逐条得到 Message（见 client/decoding.py），
+      hands / motion / edges / audio 的 msg.data 是 NumPy 数组化的结构，不为每个点创建对象
+    - async for batch in client.batches(n): 每次最多 n 条，一次唤醒处理一批，跟得上 60 Hz 全量数据流
+    - types: 只要这些 type；其余消息从开头看出 type 后直接跳过，不做 JSON 解析
+    - 断线后按指数退避自动重连；重连后重发 subscribe() 登记的消息（例如 control 设置），
+      桥会补发保留消息（ready 等）
+    - clock_sync=True 时周期发送 clock_ping，client.clock 给出服务端时钟偏移（trace 换算用）
+    - compression=None：本机连接不压缩，两端都省下 deflate 的 CPU
+
+    接收在后台任务里进行，消费跟不上时最多缓存 max_pending 条，超出丢弃最旧的（计入 dropped）；
+    无法解析的帧（非法 JSON、二进制帧）丢弃并计入 malformed，接收继续。
+
+    用法：
+        async with BridgeClient(types={"hands"}) as client:
+            async for msg in client:
+                left = msg.data.hand("Left")
+    """
+
+    def __init__(
+        self,
+        uri: str = DEFAULT_URI,
+        types: Optional[Collection[str]] = None,
+        decode: bool = True,
+        reconnect_delay: float = 0.2,
+        max_reconnect_delay: float = 5.0,
+        max_pending: int = 10000,
+        clock_sync: bool = False,
+        ping_interval: float = 0.5,
+        compression: Optional[str] = None,
+    ) -> None:
+        self.uri = uri
+        self.types = frozenset(types) if types is not None else None
+        self.decode = decode
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.clock_sync = clock_sync
+        self.ping_interval = ping_interval
+        self.compression = compression
+        self.clock = ClockOffsetEstimator()
+
+        self._subscriptions: List[str] = []
+        self._pending: Deque[Message] = deque(maxlen=max_pending)
+        self._wakeup = asyncio.Event()
+        self._ws = None
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+
+        # 统计
+        self.connects = 0
+        self.received = 0
+        self.skipped = 0
+        self.malformed = 0
+        self.dropped = 0
+
+    # ---------- 连接 ----------
+
+    @property
+    def connected(self) -> bool:
+        return self._ws is not None
+
+    def start(self) -> None:
+        """启动后台接收任务（__aenter__ / 第一次迭代时自动调用）。"""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self) -> None:
+        self._closed = True
+        self._wakeup.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def __aenter__(self) -> "BridgeClient":
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    async def wait_connected(self, timeout: Optional[float] = None) -> None:
+        self.start()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.connected:
+            if deadline is not None and time.monotonic() > deadline:
+                raise asyncio.TimeoutError(f"{timeout} 秒内没有连上 {self.uri}")
+            await asyncio.sleep(0.01)
+
+    async def _run(self) -> None:
+        delay = self.reconnect_delay
+        while not self._closed:
+            try:
+                async with websockets.connect(self.uri, compression=self.compression, max_queue=None) as ws:
+                    self._ws = ws
+                    self.connects += 1
+                    delay = self.reconnect_delay
+                    logger.info("已连接 %s（第 %d 次）", self.uri, self.connects)
+                    for text in self._subscriptions:
+                        await ws.send(text)
+                    pinger = asyncio.ensure_future(self._pinger(ws)) if self.clock_sync else None
+                    try:
+                        await self._receive(ws)
+                    finally:
+                        if pinger is not None:
+                            pinger.cancel()
+            except (OSError, websockets.ConnectionClosed, websockets.InvalidHandshake) as e:
+                if self.connects:
+                    logger.info("与 %s 的连接断开: %r，%.1f 秒后重连", self.uri, e, delay)
+                else:
+                    logger.debug("连接 %s 失败: %r，%.1f 秒后重试", self.uri, e, delay)
+            finally:
+                self._ws = None
+            if self._closed:
+                break
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def _receive(self, ws) -> None:
+        pending = self._pending
+        types = self.types
+        async for text in ws:
+            recv_time = time.monotonic()
+            try:
+                if self.clock_sync and peek_type(text) == CLOCK_PONG:
+                    pong = loads(text)
+                    self.clock.add_sample(pong["t0"], pong["t1"], pong["t2"], recv_time)
+                    continue
+                msg = decode_message(text, recv_time, types, self.decode)
+            except (ValueError, TypeError, KeyError) as e:
+                # 不是合法 JSON 文本的帧（含二进制帧）只计数，不能让接收任务退出
+                self.malformed += 1
+                logger.warning("丢弃无法解析的消息: %r (%.80r)", e, text)
+                continue
+            if msg is None:
+                self.skipped += 1
+                continue
+            self.received += 1
+            if len(pending) == pending.maxlen:
+                self.dropped += 1
+            pending.append(msg)
+            self._wakeup.set()
+
+    async def _pinger(self, ws) -> None:
+        while True:
+            await ws.send(json.dumps(make_clock_ping(time.monotonic())))
+            await asyncio.sleep(self.ping_interval)
+
+    # ---------- 发送 ----------
+
+    async def send_json(self, obj: Any) -> bool:
+        """发送一条消息；当前没有连接时返回 False（不排队）。"""
+        ws = self._ws
+        if ws is None:
+            return False
+        try:
+            await ws.send(json.dumps(obj))
+        except websockets.ConnectionClosed:
+            return False
+        return True
+
+    async def subscribe(self, obj: Any) -> None:
+        """登记一条每次（重新）连上都要发送的消息，已连接时立即发送。"""
+        text = json.dumps(obj)
+        self._subscriptions.append(text)
+        ws = self._ws
+        if ws is not None:
+            try:
+                await ws.send(text)
+            except websockets.ConnectionClosed:
+                pass   # 重连后会补发
+
+    async def control(
+        self,
+        target: str,
+        action: str,
+        params: Optional[dict] = None,
+        request_id: Any = None,
+        persistent: bool = False,
+    ) -> bool:
+        """
+        发送控制消息（见 tools/messages/control.py），应答作为 control_ack 消息出现在数据流里。
+        persistent=True 时登记为订阅，重连后重发（服务端重启后设置仍然生效）。
+        """
+        request = make_control_request(target, action, params, request_id)
+        if persistent:
+            await self.subscribe(request)
+            return self.connected
+        return await self.send_json(request)
+
+    # ---------- 读取 ----------
+
+    async def recv(self) -> Optional[Message]:
+        """等待并返回下一条消息；close() 之后返回 None。"""
+        self.start()
+        while not self._pending:
+            if self._closed:
+                return None
+            self._wakeup.clear()
+            await self._wakeup.wait()
+        return self._pending.popleft()
+
+    def __aiter__(self) -> AsyncIterator[Message]:
+        return self._iterate()
+
+    async def _iterate(self) -> AsyncIterator[Message]:
+        while True:
+            msg = await self.recv()
+            if msg is None:
+                return
+            yield msg
+
+    async def batches(self, n: int, max_wait: float = 0.0) -> AsyncIterator[List[Message]]:
+        """
+        每次产出 1 ~ n 条消息：先取已经到达的；不足 n 条时最多再等 max_wait 秒凑满（0 = 不等）。
+        """
+        pending = self._pending
+        while True:
+            first = await self.recv()
+            if first is None:
+                return
+            batch = [first]
+            if max_wait > 0 and len(pending) < n - 1:
+                deadline = time.monotonic() + max_wait
+                while len(pending) < n - 1 and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+            while pending and len(batch) < n:
+                batch.append(pending.popleft())
+            yield batch
@@ -0,0 +1,283 @@
+# Python/src/client/decoding.py
+from __future__ import annotations
+
+import base64
+import json
+import logging
+from dataclasses import dataclass, field
+from itertools import chain
+from operator import itemgetter
+from typing import Any, Callable, Collection, Dict, List, Optional
+
+import numpy as np
+
+from Python.src.tools.messages.edges import EDGES_BITMASK
+from Python.src.tools.messages.hands import LANDMARK_COUNT, LAYOUT_COLUMNAR
+from Python.src.tools.tracking import TrackSnapshot
+
+try:
+    import orjson   # 可选：装了 orjson 时 JSON 解析快 2~3 倍
+except ImportError:
+    orjson = None
+
+
+logger = logging.getLogger(__name__)
+
+
+loads: Callable[[Any], Any] = orjson.loads if orjson is not None else json.loads
+
+
+# ---------- 消息 ----------
+
+@dataclass
+class Message:
+    """
+    解码后的一条桥消息（顶层字段见 tools/messages/base.make_message）。
+
+    payload 是原始 dict；data 是按 type 解码出的数组化结构（见 DECODERS），
+    没有对应解码器或解码失败时为 None。recv_time 为客户端收到时刻（time.monotonic）。
+    """
+
+    type: str
+    payload: Any
+    frame_id: Optional[int] = None
+    timestamp: Optional[float] = None
+    source: Optional[str] = None
+    trace: Optional[dict] = None
+    recv_time: float = 0.0
+    data: Any = None
+
+
+def peek_type(text: str) -> Optional[str]:
+    """
+    不解析整条 JSON，直接从开头取出 type（make_message / json.dumps 生成的消息 type 总是第一个键）。
+    格式不符时返回 None，由调用方完整解析。
+    """
+    if not text.startswith('{"type":'):
+        return None
+    start = text.find('"', 8) + 1
+    end = text.find('"', start)
+    if start == 0 or end < 0:
+        return None
+    return text[start:end]
+
+
+def decode_message(
+    text: str,
+    recv_time: float = 0.0,
+    types: Optional[Collection[str]] = None,
+    decode: bool = True,
+) -> Optional[Message]:
+    """
+    解析一条文本消息；types 不为 None 时，不在其中的消息返回 None（能从开头看出 type 的不做 JSON 解析）。
+    decode=False 时只解析 JSON，不填 data。解码失败只记日志，data 为 None。
+    """
+    if types is not None:
+        msg_type = peek_type(text)
+        if msg_type is not None and msg_type not in types:
+            return None
+    obj = loads(text)
+    if not isinstance(obj, dict):
+        return None
+    msg_type = obj.get("type")
+    if types is not None and msg_type not in types:
+        return None
+
+    msg = Message(
+        type=msg_type,
+        payload=obj.get("payload"),
+        frame_id=obj.get("frame_id"),
+        timestamp=obj.get("timestamp"),
+        source=obj.get("source"),
+        trace=obj.get("trace"),
+        recv_time=recv_time,
+    )
+    decoder = DECODERS.get(msg_type) if decode else None
+    if decoder is not None and isinstance(msg.payload, dict):
+        try:
+            msg.data = decoder(msg.payload)
+        except (KeyError, TypeError, ValueError):
+            logger.exception("解码 %s 失败", msg_type)
+    return msg
+
+
+# ---------- hands ----------
+
+_XYZ = itemgetter("x", "y", "z")
+
+
+@dataclass
+class HandsFrame:
+    """
+    一帧 hands（两种布局解码结果相同）：
+
+    landmarks (n, 21, 3) float32 归一化坐标；ids (n,)、scores (n,)、labels 长度 n。
+    hand(label) 返回 landmarks 的视图，不复制。
+    """
+
+    width: int
+    height: int
+    landmarks: np.ndarray
+    ids: np.ndarray
+    scores: np.ndarray
+    labels: List[str]
+    keepalive: bool = False
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def hand(self, label: str) -> Optional[np.ndarray]:
+        """按左右手标签取 (21, 3) 视图（同标签只取第一只，与 HandsPayloadBuilder.hand_arrays 一致）。"""
+        for i, name in enumerate(self.labels):
+            if name == label:
+                return self.landmarks[i]
+        return None
+
+    def pixels(self) -> np.ndarray:
+        """(n, 21, 2) 像素坐标，与服务端 px / py 的算法相同（截断取整）。"""
+        scale = np.array([self.width, self.height], dtype=np.float64)
+        return (self.landmarks[..., :2].astype(np.float64) * scale).astype(np.int32)
+
+
+def decode_hands(payload: dict) -> HandsFrame:
+    hands = payload["hands"]
+    n = len(hands)
+    if n == 0:
+        landmarks = np.zeros((0, LANDMARK_COUNT, 3), dtype=np.float32)
+    elif payload.get("layout") == LAYOUT_COLUMNAR:
+        # 每只手一个扁平 "xyz" 列表：一次 np.array 拷完所有手
+        landmarks = np.array([h["xyz"] for h in hands], dtype=np.float32).reshape(n, LANDMARK_COUNT, 3)
+    else:
+        # 旧布局每个点是一个 dict：逐点取值不可避免，但直接写进一个数组，不再构造中间对象
+        landmarks = np.fromiter(
+            chain.from_iterable(map(_XYZ, chain.from_iterable(h["landmarks"] for h in hands))),
+            dtype=np.float32,
+            count=n * LANDMARK_COUNT * 3,
+        ).reshape(n, LANDMARK_COUNT, 3)
+    image = payload["image"]
+    return HandsFrame(
+        width=image["width"],
+        height=image["height"],
+        landmarks=landmarks,
+        ids=np.array([h["id"] for h in hands], dtype=np.int64),
+        scores=np.array([h["score"] for h in hands], dtype=np.float32),
+        labels=[h["label"] for h in hands],
+        keepalive=bool(payload.get("keepalive", False)),
+    )
+
+
+# ---------- motion ----------
+
+@dataclass
+class MotionFrame:
+    """一帧 motion：tracks 与服务端 ArrayTracker 的快照结构相同（全部是数组）。"""
+
+    width: int
+    height: int
+    media_time: Optional[float]
+    tracks: TrackSnapshot
+
+
+_BOX = itemgetter("x", "y", "w", "h")
+_CENTER = itemgetter("x", "y")
+_VELOCITY = itemgetter("vx", "vy")
+
+
+def decode_motion(payload: dict) -> MotionFrame:
+    tracks = payload["tracks"]
+    n = len(tracks)
+
+    def column(get, width: int, dtype) -> np.ndarray:
+        return np.fromiter(chain.from_iterable(map(get, tracks)), dtype=dtype, count=n * width).reshape(n, width)
+
+    snapshot = TrackSnapshot(
+        ids=np.array([t["id"] for t in tracks], dtype=np.int64),
+        boxes=column(lambda t: _BOX(t["box"]), 4, np.int64),
+        centers=column(lambda t: _CENTER(t["center"]), 2, np.int64),
+        velocities=column(lambda t: _VELOCITY(t["velocity"]), 2, np.float64),
+        hits=np.array([t["hits"] for t in tracks], dtype=np.int64),
+        ages=np.array([t["age"] for t in tracks], dtype=np.int64),
+        trails=[np.array(t["trail"], dtype=np.int64).reshape(-1, 2) for t in tracks],
+    )
+    image = payload["image"]
+    return MotionFrame(image["width"], image["height"], payload.get("media_time"), snapshot)
+
+
+# ---------- edges ----------
+
+@dataclass
+class EdgesFrame:
+    """
+    一帧 edges：
+    - polylines 编码：points (k, 2) int32 为所有折线的点，polylines 是按折线切开的视图
+    - bitmask 编码：mask (h, w) bool
+    """
+
+    format: str
+    width: int
+    height: int
+    points: Optional[np.ndarray] = None
+    polylines: List[np.ndarray] = field(default_factory=list)
+    mask: Optional[np.ndarray] = None
+
+
+def decode_edges(payload: dict) -> EdgesFrame:
+    image = payload["image"]
+    frame = EdgesFrame(payload["format"], image["width"], image["height"])
+    if frame.format == EDGES_BITMASK:
+        mask = payload["mask"]
+        h, w = mask["height"], mask["width"]
+        packed = np.frombuffer(base64.b64decode(mask["data"]), dtype=np.uint8).reshape(h, mask["row_bytes"])
+        frame.mask = np.unpackbits(packed, axis=1, count=w).view(bool)
+        return frame
+
+    lines = payload["polylines"]
+    lengths = [len(line) // 2 for line in lines]
+    total = sum(lengths)
+    frame.points = np.fromiter(chain.from_iterable(lines), dtype=np.int32, count=total * 2).reshape(total, 2)
+    frame.polylines = np.split(frame.points, np.cumsum(lengths)[:-1]) if lines else []
+    return frame
+
+
+# ---------- audio ----------
+
+@dataclass
+class AudioFrame:
+    """audio_level / audio_features：常用标量 + bands_db 数组（只有 audio_features 有）。"""
+
+    level_dbfs: float
+    rms: float
+    lufs_momentary: Optional[float] = None
+    vad_active: Optional[bool] = None
+    bands_db: Optional[np.ndarray] = None
+    centroid_hz: Optional[float] = None
+    onset: Optional[bool] = None
+    pitch_hz: Optional[float] = None
+
+
+def decode_audio(payload: dict) -> AudioFrame:
+    level = payload["level"]
+    vad = payload.get("vad")
+    frame = AudioFrame(
+        level_dbfs=level["dbfs"],
+        rms=level["rms"],
+        lufs_momentary=level.get("lufs_momentary"),
+        vad_active=vad["active"] if vad else None,
+    )
+    spectrum = payload.get("spectrum")
+    if spectrum is not None:
+        frame.bands_db = np.array(spectrum["bands_db"], dtype=np.float32)
+        frame.centroid_hz = spectrum["centroid_hz"]
+        frame.onset = payload["onset"]
+        frame.pitch_hz = payload["pitch"]["hz"]
+    return frame
+
+
+# 消息 type -> 解码器（payload dict -> 数组化结构）；其它 type 只保留原始 payload
+DECODERS: Dict[str, Callable[[dict], Any]] = {
+    "hands": decode_hands,
+    "motion": decode_motion,
+    "edges": decode_edges,
+    "audio_level": decode_audio,
+    "audio_features": decode_audio,
+}
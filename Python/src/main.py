@@ -1,14 +1,145 @@
 from __future__ import annotations
 
+# 启动计时从这里开始（先于其它导入），见 tools/startup.py
+from Python.src.tools.startup import STARTUP
+
+STARTUP.begin()
+
 import asyncio
 import logging
+import sys
 
 from Python.src.app.audio_loop import audio_loop
 from Python.src.tools.ws_bridge import WsBridge
-from Python.src.app.hands_loop import hands_loop
+from Python.src.tools.gestures import GestureEngine
+from Python.src.tools.emission import HandsEmitPolicy
+from Python.src.tools.process_supervisor import Supervisor, WorkerSpec
+from Python.src.tools import event_loop
+from Python.src.tools.event_loop import LoopMonitor
+from Python.src.tools.outgoing import report_outgoing
+from Python.src.tools.control import CONTROLS
+from Python.src.tools.profiler import PROFILER, report_profile
 
 
-async def main():
+# 共享同一个摄像头的视觉 loop（都订阅同一个 FrameHub，公共的缩放 / 灰度只算一次）
+ENABLE_MOTION = False
+ENABLE_EDGES = False
+
+# True = hands / motion / edges 不再各开一个 loop，而是作为插件由 detector_loop 在同一个推理线程里分时调度，
+# 每帧总耗时控制在 DETECTOR_BUDGET_MS 内（见 tools/detectors.py）；新模型（例如目标检测）实现 Detector 后加进列表即可
+USE_DETECTOR_SCHEDULER = False
+
+# 运行模式：False = 所有 loop 在同一个进程 / 事件循环里（简单、启动快）；
+# True = 桥在主进程，视觉和音频各一个工作进程（各自的 GIL，崩溃自动重启）。
+# 命令行加 --processes 同样会启用多进程模式。
+USE_PROCESSES = False
+
+# 在 uvloop 上运行（需要 pip install uvloop，仅 Linux / macOS；未安装时自动退回 asyncio）。
+# 命令行加 --uvloop 同样会启用。对比数据见 test_demos/BridgeLoad_bench.py
+USE_UVLOOP = False
+
+# 分阶段耗时统计（hands / audio / bridge 各阶段直方图），每 PROFILE_INTERVAL 秒写日志并发 stats 消息。
+# 命令行加 --profile 同样会启用；关闭时几乎没有开销。
+PROFILE = False
+PROFILE_INTERVAL = 5.0
+
+# 录制原始输入（摄像头帧 + 麦克风样本，memmap 文件，见 tools/recording.py），用于离线调参 / 复现：
+# 设为目录名，或命令行加 --record <目录>。回放用 RecordedFrameSource / RecordedAudioSource。
+RECORD_DIR = None
+
+
+def _record_dir():
+    if "--record" in sys.argv:
+        i = sys.argv.index("--record")
+        if i + 1 < len(sys.argv):
+            return sys.argv[i + 1]
+    return RECORD_DIR
+
+
+def _monitors(bridge, name: str) -> list:
+    """每个进程各自的事件循环监视 + （可选）分阶段耗时统计，结果以 stats 消息发出。"""
+    # 本进程的组件全部就绪时通过同一个 bridge 发 ready 消息
+    STARTUP.bridge = bridge
+    monitors = [LoopMonitor(bridge, name=name).run()]
+    # 多进程模式下子进程由 spawn 启动，sys.argv 与主进程相同
+    if PROFILE or "--profile" in sys.argv:
+        PROFILER.enabled = True
+        monitors.append(report_profile(bridge, PROFILE_INTERVAL, name=name))
+    return monitors
+
+
+def _vision_loops(bridge) -> list:
+    """共享一个摄像头的视觉 loop（同一个 FrameHub 的订阅者必须在同一个进程里）。"""
+    # cv2 / 视觉模块只在需要视觉 loop 的进程里导入（mediapipe 更晚，在 hands_loop 的线程池里导入）
+    from Python.src.app.hands_loop import hands_loop
+    from Python.src.tools.frame_graph import FrameHub
+    from Python.src.tools.frame_sources import CameraFrameSource
+
+    STARTUP.expect("camera")
+    source = CameraFrameSource()
+    record_dir = _record_dir()
+    if record_dir is not None:
+        from Python.src.tools.recording import RecordingFrameSource
+        source = RecordingFrameSource(source, record_dir)
+    hub = FrameHub(source)
+    if USE_DETECTOR_SCHEDULER:
+        return [hub.run(), _detector_loop(bridge, hub)]
+    STARTUP.expect("hands")
+    loops = [
+        hub.run(),
+        hands_loop(
+            bridge,
+            debug_show=False,
+            gesture_engine=GestureEngine(),
+            emit_policy=HandsEmitPolicy(epsilon=0.002, keepalive_interval=1.0),
+            frames=hub,
+        ),
+    ]
+    if ENABLE_MOTION:
+        from Python.src.app.motion_loop import motion_loop
+        loops.append(motion_loop(bridge, frames=hub))
+    if ENABLE_EDGES:
+        from Python.src.app.edges_loop import edges_loop
+        loops.append(edges_loop(bridge, frames=hub))
+    return loops
+
+
+def _detector_loop(bridge, hub):
+    from Python.src.app.detector_loop import detector_loop
+    from Python.src.app.hands_loop import HandsDetector
+
+    # hands 的就绪改由 detector_loop 报告（所有模型加载、预热完成后）
+    STARTUP.expect("detectors")
+    detectors = [
+        HandsDetector(
+            gesture_engine=GestureEngine(),
+            emit_policy=HandsEmitPolicy(epsilon=0.002, keepalive_interval=1.0),
+        ),
+    ]
+    if ENABLE_MOTION:
+        from Python.src.app.motion_loop import MotionTrackerDetector
+        detectors.append(MotionTrackerDetector())
+    if ENABLE_EDGES:
+        from Python.src.app.edges_loop import EdgesDetector
+        detectors.append(EdgesDetector())
+    return detector_loop(bridge, hub, detectors)
+
+
+def _audio_loops(bridge) -> list:
+    STARTUP.expect("audio")
+    return [audio_loop(bridge, device=None, vad=True, loudness=True, record_dir=_record_dir())]
+
+
+# 多进程模式下的工作进程入口（模块顶层函数，spawn 时按名字导入）
+async def vision_worker(bridge) -> None:
+    await asyncio.gather(*_monitors(bridge, "vision"), *_vision_loops(bridge))
+
+
+async def audio_worker(bridge) -> None:
+    await asyncio.gather(*_monitors(bridge, "audio"), *_audio_loops(bridge))
+
+
+def _setup_logging() -> None:
     logging.basicConfig(
         # 设置日志格式和级别
         # 不显示debug级别日志，避免过多输出
@@ -16,20 +147,56 @@ async def main():
         format="[%(levelname)s] %(name)s: %(message)s"
     )
 
+
+async def main_processes():
+    _setup_logging()
+    bridge = WsBridge(host="127.0.0.1", port=8765)
+    supervisor = Supervisor(bridge, [
+        WorkerSpec("vision", vision_worker),
+        WorkerSpec("audio", audio_worker),
+    ])
+    try:
+        await asyncio.gather(
+            bridge.run_forever(),
+            *_monitors(bridge, "bridge"),
+            report_outgoing(bridge, name="bridge"),
+            # 客户端的 control 消息：目标 loop 在哪个工作进程，就由 Supervisor 转发过去
+            CONTROLS.serve(bridge, supervisor),
+            supervisor.run(),
+        )
+    finally:
+        supervisor.shutdown()
+
+
+async def main():
+    _setup_logging()
+
     bridge = WsBridge(host="127.0.0.1", port=8765)
+    STARTUP.expect("bridge")
 
     # 将来可以在这里把更多 loop 加进来，例如:
     # from Python.src.app.yolo_loop import yolo_loop
     # await asyncio.gather(bridge.run_forever(), hands_loop(bridge), yolo_loop(bridge))
+    # 与 hands 共用摄像头和 CPU 的模型更适合写成 Detector 插件，见 USE_DETECTOR_SCHEDULER
+    # 摄像头只由 FrameHub 打开一次；需要另一个摄像头的 loop 仍可单独传入帧输入，例如
+    # motion_loop(bridge, source=CameraFrameSource(cam_index=1))
     await asyncio.gather(
         bridge.run_forever(),
-        hands_loop(bridge, debug_show=False),
-        audio_loop(bridge, device=None),
+        *_monitors(bridge, "main"),
+        report_outgoing(bridge, name="main"),
+        # 客户端的 control 消息（暂停 / 恢复、改参数），见 tools/control.py
+        CONTROLS.serve(bridge),
+        *_vision_loops(bridge),
+        *_audio_loops(bridge),
     )
 
 
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        use_uvloop = USE_UVLOOP or "--uvloop" in sys.argv
+        if USE_PROCESSES or "--processes" in sys.argv:
+            event_loop.run(main_processes, use_uvloop=use_uvloop)
+        else:
+            event_loop.run(main, use_uvloop=use_uvloop)
     except KeyboardInterrupt:
         print("退出程序")
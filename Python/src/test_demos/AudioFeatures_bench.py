@@ -0,0 +1,75 @@
+"""
+SpectralAnalyzer 每块 CPU 预算测试（48 kHz，不需要麦克风）。
+
+- 对多种块长分别测量单块分析耗时（p50 / p99 / max），
+  要求 p99 不超过块时长的 BUDGET_FRACTION；
+- 顺带用合成信号检查特征是否合理：440 Hz 正弦的基频 / 谱质心、噪声中的一次短促爆音能触发 onset。
+
+运行：
+    python -m Python.src.test_demos.AudioFeatures_bench
+"""
+import time
+
+import numpy as np
+
+from Python.src.tools.audio_features import SpectralAnalyzer
+
+SAMPLE_RATE = 48000
+BLOCK_DURATIONS = (0.01, 0.02, 0.05)
+N_BLOCKS = 500
+BUDGET_FRACTION = 0.1   # 分析耗时不超过块时长的 10%
+
+
+def bench_block(duration):
+    block_size = int(SAMPLE_RATE * duration)
+    analyzer = SpectralAnalyzer(SAMPLE_RATE, block_size)
+    rng = np.random.default_rng(0)
+    blocks = (0.1 * rng.standard_normal((N_BLOCKS, block_size))).astype(np.float32)
+
+    analyzer.process(blocks[0])   # 预热
+    times = np.empty(N_BLOCKS)
+    for i, block in enumerate(blocks):
+        t0 = time.perf_counter()
+        analyzer.process(block)
+        times[i] = time.perf_counter() - t0
+
+    p50, p99 = np.percentile(times, [50, 99])
+    budget = duration * BUDGET_FRACTION
+    ok = p99 <= budget
+    print(f"block {duration * 1e3:5.1f} ms ({block_size:5d} samples): "
+          f"p50 {p50 * 1e3:6.3f} ms  p99 {p99 * 1e3:6.3f} ms  max {times.max() * 1e3:6.3f} ms  "
+          f"budget {budget * 1e3:5.2f} ms  {'OK' if ok else 'OVER'}")
+    return ok
+
+
+def check_accuracy():
+    block_size = int(SAMPLE_RATE * 0.05)
+    analyzer = SpectralAnalyzer(SAMPLE_RATE, block_size)
+
+    t = np.arange(block_size * 4) / SAMPLE_RATE
+    tone = (0.5 * np.sin(2 * np.pi * 440.0 * t)).astype(np.float32).reshape(4, block_size)
+    out = analyzer.process(tone)
+    pitch = float(np.median(out["pitch_hz"]))
+    centroid = float(np.median(out["centroid_hz"]))
+    print(f"440 Hz tone: pitch {pitch:.1f} Hz, centroid {centroid:.1f} Hz, dBFS {out['dbfs'][0]:.1f}")
+    assert abs(pitch - 440.0) < 5.0
+    assert abs(centroid - 440.0) < 50.0
+
+    analyzer.reset()
+    rng = np.random.default_rng(1)
+    noise = (0.01 * rng.standard_normal((12, block_size))).astype(np.float32)
+    noise[8, 1000:1300] += 0.5 * rng.standard_normal(300).astype(np.float32)
+    onsets = np.nonzero(analyzer.process(noise)["onset"])[0].tolist()
+    print(f"burst at block 8: onsets at {onsets}")
+    assert onsets == [8]
+
+
+def main():
+    check_accuracy()
+    results = [bench_block(d) for d in BLOCK_DURATIONS]
+    assert all(results), "部分块长超出 CPU 预算"
+    print("✅ 所有块长都在 CPU 预算内")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+用可复现的音频源跑完整的 audio_loop（不需要麦克风），统计吞吐与特征准确度。
+
+- 默认：合成 440 Hz 正弦 + 底噪，10 倍速播放 5 秒
+- 传入 WAV 路径时改用文件输入：
+    python -m Python.src.test_demos.AudioPipeline_bench path/to/file.wav [speed]
+
+输出：消息数、墙钟耗时、相对实时的倍率、丢块数，以及基频 / 电平的统计。
+"""
+import asyncio
+import sys
+import time
+
+import numpy as np
+
+from Python.src.app.audio_loop import audio_loop
+from Python.src.tools.audio_sources import SyntheticAudioSource, WavFileAudioSource
+
+TONE_HZ = 440.0
+DURATION = 5.0
+SPEED = 10.0
+
+
+class CollectBridge:
+    """收集所有消息的假 bridge。"""
+
+    def __init__(self):
+        self.messages = []
+
+    def send_json(self, obj, **kwargs):
+        self.messages.append(obj)
+
+
+async def run(source):
+    bridge = CollectBridge()
+    t0 = time.perf_counter()
+    await audio_loop(bridge, source=source, features=True)
+    return bridge.messages, time.perf_counter() - t0
+
+
+def main():
+    if len(sys.argv) > 1:
+        speed = float(sys.argv[2]) if len(sys.argv) > 2 else SPEED
+        source = WavFileAudioSource(sys.argv[1], speed=speed)
+        expected_pitch = None
+        audio_sec = source.duration
+    else:
+        source = SyntheticAudioSource(
+            kind="tone", frequency=TONE_HZ, amplitude=0.3, noise_floor=0.005,
+            duration=DURATION, speed=SPEED,
+        )
+        expected_pitch = TONE_HZ
+        audio_sec = DURATION
+
+    messages, wall = asyncio.run(run(source))
+    if not messages:
+        print("没有收到任何消息")
+        return
+
+    payloads = [m["payload"] for m in messages]
+    pitch = np.array([p["pitch"]["hz"] for p in payloads])
+    dbfs = np.array([p["level"]["dbfs"] for p in payloads])
+    dropped = payloads[-1]["capture"]["dropped_blocks"]
+
+    print(f"source {source.name}: {len(messages)} 条消息, 音频 {audio_sec:.2f} s, "
+          f"墙钟 {wall:.2f} s ({audio_sec / wall:.1f}x 实时), dropped_blocks={dropped}")
+    print(f"dBFS median {np.median(dbfs):.2f}, pitch median {np.median(pitch[pitch > 0]) if (pitch > 0).any() else 0:.1f} Hz")
+    if expected_pitch is not None:
+        err = np.abs(pitch - expected_pitch)
+        print(f"pitch |error| p50 {np.median(err):.2f} Hz, max {err.max():.2f} Hz")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+验证回调式音频采集不会卡住事件循环（不需要麦克风）。
+
+对比两种方式下，一个每 1 ms 醒来一次的探针协程观察到的事件循环延迟：
+- blocking: 旧做法，在事件循环上直接调用阻塞的 read（这里用 time.sleep 模拟 stream.read）
+- callback: 新做法，合成噪声源（SyntheticAudioSource）在独立线程里按实时节奏调用 AudioBlockReader.callback，
+            audio 消费协程只在数据到齐时被唤醒，分析在线程池里运行
+
+运行：
+    python -m Python.src.test_demos.AudioStall_demo
+"""
+import asyncio
+import time
+
+import numpy as np
+
+from Python.src.app.audio_loop import compute_level, consume_audio_blocks
+from Python.src.tools.audio_ring import AudioBlockReader
+from Python.src.tools.audio_sources import SyntheticAudioSource
+
+SAMPLE_RATE = 48000
+BLOCK_DURATION = 0.05
+BLOCK_SIZE = int(SAMPLE_RATE * BLOCK_DURATION)
+RUN_SECONDS = 2.0
+PROBE_INTERVAL = 0.001
+# callback 模式的判定：只看单个最大值会被系统调度抖动误伤，所以看 p99 和“大卡顿”的次数；
+# blocking 模式每读一块就卡住约 BLOCK_DURATION（50 ms），两条都远远超出
+MAX_P99_LAG = 0.010       # 循环延迟的 p99 上限
+STALL_LAG = BLOCK_DURATION / 2   # 超过它算一次卡顿（阻塞读会卡住整整一个块）
+MAX_STALLS = 3            # 允许的卡顿次数（偶发的系统抖动）
+
+
+class NullBridge:
+    """只计数、不发送的假 bridge。"""
+
+    def __init__(self):
+        self.sent = 0
+
+    def send_json(self, obj, **kwargs):
+        self.sent += 1
+
+
+async def probe(lags, stop_at):
+    while time.monotonic() < stop_at:
+        t0 = time.monotonic()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(time.monotonic() - t0 - PROBE_INTERVAL)
+
+
+async def run_blocking():
+    lags = []
+    stop_at = time.monotonic() + RUN_SECONDS
+    rng = np.random.default_rng(0)
+
+    async def blocking_audio():
+        while time.monotonic() < stop_at:
+            time.sleep(BLOCK_DURATION)   # 模拟 stream.read(block_size) 阻塞
+            compute_level(rng.standard_normal(BLOCK_SIZE).astype(np.float32))
+            await asyncio.sleep(0)
+
+    await asyncio.gather(probe(lags, stop_at), blocking_audio())
+    return np.array(lags)
+
+
+async def run_callback():
+    lags = []
+    stop_at = time.monotonic() + RUN_SECONDS
+    bridge = NullBridge()
+    reader = AudioBlockReader(asyncio.get_running_loop(), capacity=SAMPLE_RATE)
+
+    source = SyntheticAudioSource(kind="noise", sample_rate=SAMPLE_RATE, amplitude=0.1)
+    source.start(reader.callback, BLOCK_SIZE)
+    try:
+        consumer = asyncio.create_task(consume_audio_blocks(
+            bridge, reader, window_size=BLOCK_SIZE, hop_size=BLOCK_SIZE,
+            sample_rate=SAMPLE_RATE, device_name=source.name,
+        ))
+        await probe(lags, stop_at)
+        consumer.cancel()
+        try:
+            await consumer
+        except asyncio.CancelledError:
+            pass
+    finally:
+        source.stop()
+
+    print(f"callback: 发送 {bridge.sent} 条, overflows={reader.overflows}, dropped_blocks={reader.dropped_blocks}")
+    return np.array(lags)
+
+
+def summary(name, lags):
+    p50, p99 = np.percentile(lags, [50, 99]) * 1e3
+    print(f"{name:<9} loop lag p50 {p50:6.2f} ms   p99 {p99:6.2f} ms   max {lags.max() * 1e3:6.2f} ms")
+
+
+def main():
+    summary("blocking", asyncio.run(run_blocking()))
+    lags = asyncio.run(run_callback())
+    summary("callback", lags)
+    p99 = np.percentile(lags, 99)
+    stalls = int((lags >= STALL_LAG).sum())
+    print(f"callback: p99 {p99 * 1e3:.2f} ms（上限 {MAX_P99_LAG * 1e3:.0f} ms），"
+          f"超过 {STALL_LAG * 1e3:.0f} ms 的卡顿 {stalls} 次（上限 {MAX_STALLS}）")
+    assert p99 < MAX_P99_LAG and stalls <= MAX_STALLS, "回调模式下事件循环仍然出现了卡顿"
+    print("✅ 回调模式下没有事件循环卡顿")
+
+
+if __name__ == "__main__":
+    main()
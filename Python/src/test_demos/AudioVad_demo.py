@@ -0,0 +1,107 @@
+"""
+VAD + 自适应噪声底的离线演示（不需要麦克风）。
+
+拼一段“房间录音”：安静底噪 -> 说话（谐波音）-> 安静 -> 风扇打开（底噪抬高 10 dB，
+噪声底约 5 s 跟上）-> 风扇下的说话 -> 拍手 -> 持续 8 s 的 220 + 440 Hz 嗡嗡声（比噪声底窗口长，
+必须一直判为活动，不能被当成底噪），逐段打印：
+- VAD 判为活动的帧比例
+- 噪声底估计（应跟上风扇带来的底噪变化）
+- AudioEmitPolicy 门控后实际发送的消息数（相对每帧都发的节省比例）
+有预期的段落判定不符时最后 assert 失败。
+
+运行：
+    python -m Python.src.test_demos.AudioVad_demo
+"""
+import numpy as np
+
+from Python.src.app.audio_loop import AUDIO_HEARTBEAT_INTERVAL, compute_levels
+from Python.src.tools.audio_vad import VoiceActivityDetector
+from Python.src.tools.emission import AudioEmitPolicy
+
+SAMPLE_RATE = 48000
+WINDOW = 2400   # 50 ms
+HOP = 2400
+
+
+def voiced(n, f0, amp, rng):
+    """带几个谐波的“元音”，模拟人声。"""
+    t = np.arange(n) / SAMPLE_RATE
+    sig = sum(amp / k * np.sin(2 * np.pi * f0 * k * t + rng.uniform(0, 6.28)) for k in range(1, 6))
+    return sig
+
+
+def build_signal(rng):
+    quiet = 0.002   # 约 -54 dBFS
+    fan = 0.0065    # 约 -44 dBFS
+    segments = []
+
+    def add(name, seconds, floor, extra=None, expect=None):
+        n = int(seconds * SAMPLE_RATE)
+        x = floor * rng.standard_normal(n)
+        if extra is not None:
+            x = x + extra(n)
+        segments.append((name, x, expect))
+
+    add("quiet", 3.0, quiet, expect=False)
+    add("speech", 1.5, quiet, lambda n: voiced(n, 180, 0.03, rng), expect=True)
+    add("quiet 2", 2.0, quiet, expect=False)
+    add("fan on", 6.0, fan, expect=False)
+    add("speech+fan", 1.5, fan, lambda n: voiced(n, 220, 0.05, rng), expect=True)
+    add("fan 2", 2.0, fan, expect=False)
+
+    def clap(n):
+        x = np.zeros(n)
+        x[:int(0.03 * SAMPLE_RATE)] = 0.4 * rng.standard_normal(int(0.03 * SAMPLE_RATE))
+        return x
+
+    add("clap", 0.5, fan, clap, expect=True)
+    add("fan 3", 2.0, fan, expect=False)
+
+    def hum(n):
+        t = np.arange(n) / SAMPLE_RATE
+        return 0.1 * np.sin(2 * np.pi * 220 * t) + 0.1 * np.sin(2 * np.pi * 440 * t)
+
+    add("hum 8s", 8.0, fan, hum, expect="all")
+    return segments
+
+
+def main():
+    rng = np.random.default_rng(0)
+    segments = build_signal(rng)
+
+    vad = VoiceActivityDetector(SAMPLE_RATE, WINDOW, hop_sec=HOP / SAMPLE_RATE)
+    policy = AudioEmitPolicy(AUDIO_HEARTBEAT_INTERVAL)
+    hop_sec = HOP / SAMPLE_RATE
+    frame_id = 0
+    total_frames = 0
+    failures = []
+
+    print(f"{'segment':<12}{'frames':>7}{'active%':>9}{'floor dBFS':>12}{'level dBFS':>12}{'sent':>6}")
+    for name, x, expect in segments:
+        frames = x[: len(x) // HOP * HOP].reshape(-1, HOP).astype(np.float32)
+        _, dbfs = compute_levels(frames)
+        out = vad.process(frames, dbfs)
+
+        sent = 0
+        for active in out["active"]:
+            if policy.decide(bool(active), frame_id * hop_sec) is not None:
+                sent += 1
+            frame_id += 1
+        total_frames += len(frames)
+
+        frac = out["active"].mean() * 100
+        # expect = "all": 每一帧都必须是活动（持续的声音）
+        ok = out["active"].all() if expect == "all" else (frac > 50) == expect
+        if not ok:
+            failures.append(name)
+        mark = "  ✅" if ok else "  ❌"
+        print(f"{name:<12}{len(frames):>7}{frac:>8.0f}%{out['noise_floor_dbfs'][-1]:>12.1f}"
+              f"{np.median(dbfs):>12.1f}{sent:>6}{mark}")
+
+    print(f"\n每帧都发: {total_frames} 条；VAD 门控后: {policy.sent} 条 "
+          f"(节省 {100 * policy.suppressed / total_frames:.0f}%)")
+    assert not failures, f"VAD 判定与预期不符: {failures}"
+
+
+if __name__ == "__main__":
+    main()
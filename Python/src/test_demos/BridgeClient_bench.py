@@ -0,0 +1,262 @@
+"""
+Python 客户端（client/bridge_client.py + client/decoding.py）的基准，不需要摄像头 / Unity：
+
+    python -m Python.src.test_demos.BridgeClient_bench [--seconds 4] [--hz 60]
+
+服务端在子进程里（WsBridge + 合成数据 + CONTROLS.serve），这样 time.process_time() 只统计客户端：
+hands --hz（两只手）、motion --hz/2（5 条轨迹）、edges --hz/4（polylines）、audio_features 50 Hz。
+
+1) 解码正确性：各种 payload 经 JSON 往返后与原始数组比较（hands 两种布局、motion、edges 两种编码）
+2) 客户端 CPU：手写的 json.loads + 逐点重建（旧客户端的做法）/ BridgeClient 逐条 / batches(8) / 只要 hands
+3) 断线重连：重启服务端进程，客户端自动重连并重发 persistent 控制请求（hands 频率减半）
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import time
+from collections import Counter
+
+import numpy as np
+import websockets
+
+from Python.src.client.bridge_client import BridgeClient
+from Python.src.client.decoding import decode_message
+from Python.src.test_demos.bench_fixtures import fake_hand_results
+from Python.src.tools.messages.audio import build_audio_features_payload
+from Python.src.tools.messages.base import make_message
+from Python.src.tools.messages.control import ACTION_SET, CONTROL_ACK
+from Python.src.tools.messages.edges import build_edges_payload
+from Python.src.tools.messages.hands import LAYOUT_COLUMNAR, LAYOUT_DICTS, HandsPayloadBuilder
+from Python.src.tools.messages.motion import build_motion_payload
+from Python.src.tools.tracking import TrackSnapshot
+
+PORT = 8797
+URI = f"ws://127.0.0.1:{PORT}"
+W, H = 1280, 720
+
+
+def make_tracks(rng, n: int) -> TrackSnapshot:
+    return TrackSnapshot(
+        ids=np.arange(n, dtype=np.int64),
+        boxes=rng.integers(0, 600, size=(n, 4)),
+        centers=rng.integers(0, 600, size=(n, 2)),
+        velocities=rng.normal(0, 50, size=(n, 2)),
+        hits=rng.integers(1, 100, size=n),
+        ages=np.zeros(n, dtype=np.int64),
+        trails=[rng.integers(0, 600, size=(16, 2)) for _ in range(n)],
+    )
+
+
+def make_polylines(rng, n: int = 40) -> list:
+    return [rng.integers(0, 320, size=(rng.integers(4, 30), 2)).astype(np.int32) for _ in range(n)]
+
+
+# ---------- 服务端子进程 ----------
+
+async def serve(hz: float) -> None:
+    from Python.src.tools.control import CONTROLS, LoopControl, Param
+    from Python.src.tools.ws_bridge import WsBridge
+
+    bridge = WsBridge(port=PORT)
+    control = CONTROLS.register(LoopControl("producer", {"hz": Param(float, 1, 1000)}, hz=hz))
+    rng = np.random.default_rng(0)
+    builder = HandsPayloadBuilder(layout=LAYOUT_DICTS)
+    builder.fill(fake_hand_results(2))
+    bands = list(np.linspace(-60, -20, 32))
+
+    async def produce() -> None:
+        frame_id = 0
+        audio_next = next_frame = time.monotonic()
+        while True:
+            if control.pending:
+                await control.checkpoint()
+            now = time.monotonic()
+            if now >= next_frame:
+                next_frame += 1.0 / control.config["hz"]
+                bridge.send_json(make_message("hands", builder.build(W, H), frame_id=frame_id))
+                if frame_id % 2 == 0:
+                    bridge.send_json(make_message("motion", build_motion_payload(make_tracks(rng, 5), W, H), frame_id=frame_id))
+                if frame_id % 4 == 0:
+                    bridge.send_json(make_message("edges", build_edges_payload(320, 180, make_polylines(rng)), frame_id=frame_id))
+                frame_id += 1
+            if now >= audio_next:
+                audio_next += 0.02
+                payload = build_audio_features_payload(-30.0, 0.03, bands, 1200.0, 0.1, False, 220.0, 0.9)
+                bridge.send_json(make_message("audio_features", payload, source="audio"))
+            await asyncio.sleep(max(0.0, min(next_frame, audio_next) - time.monotonic()))
+
+    await asyncio.gather(bridge.run_forever(), CONTROLS.serve(bridge), produce())
+
+
+def server_main(hz: float) -> None:
+    asyncio.run(serve(hz))
+
+
+def start_server(hz: float) -> multiprocessing.Process:
+    process = multiprocessing.get_context("spawn").Process(target=server_main, args=(hz,), daemon=True)
+    process.start()
+    return process
+
+
+# ---------- 1) 解码正确性 ----------
+
+def roundtrip(msg_type: str, payload: dict):
+    return decode_message(json.dumps(make_message(msg_type, payload))).data
+
+
+def check_decoding() -> None:
+    rng = np.random.default_rng(1)
+    builder = HandsPayloadBuilder()
+    builder.fill(fake_hand_results(2))
+    expected = builder.landmarks[:2]
+    dicts = roundtrip("hands", builder.build(W, H, layout=LAYOUT_DICTS))
+    columnar = roundtrip("hands", builder.build(W, H, layout=LAYOUT_COLUMNAR))
+    print(
+        f"hands dicts:    landmarks {dicts.landmarks.shape} 完全相同 {np.array_equal(dicts.landmarks, expected)}，"
+        f"像素相同 {np.array_equal(dicts.pixels(), (expected[..., :2].astype(np.float64) * [W, H]).astype(np.int32))}"
+    )
+    print(f"hands columnar: 最大误差 {np.abs(columnar.landmarks - expected).max():.1e}（5 位小数舍入），"
+          f"hand('Left') 是视图 {np.shares_memory(columnar.hand('Left'), columnar.landmarks)}")
+
+    tracks = make_tracks(rng, 5)
+    motion = roundtrip("motion", build_motion_payload(tracks, W, H)).tracks
+    same = all(
+        np.array_equal(getattr(motion, k), getattr(tracks, k)) for k in ("ids", "boxes", "centers", "hits", "ages")
+    ) and all(np.array_equal(a, b) for a, b in zip(motion.trails, tracks.trails))
+    print(f"motion:         {len(motion)} 条轨迹数组相同 {same}，速度最大误差 {np.abs(motion.velocities - tracks.velocities).max():.3f}")
+
+    lines = make_polylines(rng)
+    edges = roundtrip("edges", build_edges_payload(320, 180, lines))
+    print(f"edges polylines: {len(edges.polylines)} 条、{len(edges.points)} 点，相同 "
+          f"{all(np.array_equal(a, b) for a, b in zip(edges.polylines, lines))}")
+    mask = rng.random((180, 317)) < 0.1
+    packed = np.packbits(mask, axis=1).tobytes()
+    edges = roundtrip("edges", build_edges_payload(320, 180, bitmask=packed, mask_width=317, mask_height=180))
+    print(f"edges bitmask:  {edges.mask.shape} 相同 {np.array_equal(edges.mask, mask)}")
+
+
+# ---------- 2) 客户端 CPU ----------
+
+async def naive_client(seconds: float) -> Counter:
+    """旧客户端的做法：默认参数连接，json.loads 后逐点重建列表再转数组。"""
+    counts: Counter = Counter()
+    async with websockets.connect(URI) as ws:
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            try:
+                text = await asyncio.wait_for(ws.recv(), deadline - time.monotonic())
+            except asyncio.TimeoutError:
+                break
+            msg = json.loads(text)
+            if msg["type"] == "hands":
+                for hand in msg["payload"]["hands"]:
+                    np.array([[p["x"], p["y"], p["z"]] for p in hand["landmarks"]], dtype=np.float32)
+            elif msg["type"] == "motion":
+                for t in msg["payload"]["tracks"]:
+                    np.array(t["trail"])
+            counts[msg["type"]] += 1
+    return counts
+
+
+async def library_client(seconds: float, batch: int = 0, types=None) -> Counter:
+    counts: Counter = Counter()
+    async with BridgeClient(URI, types=types) as client:
+        await client.wait_connected(5.0)
+        deadline = time.monotonic() + seconds
+
+        async def consume() -> None:
+            if batch:
+                async for msgs in client.batches(batch):
+                    for msg in msgs:
+                        counts[msg.type] += 1
+            else:
+                async for msg in client:
+                    counts[msg.type] += 1
+
+        try:
+            await asyncio.wait_for(consume(), max(0.0, deadline - time.monotonic()))
+        except asyncio.TimeoutError:
+            pass
+        counts["(skipped)"] = client.skipped
+    return counts
+
+
+def measure(name: str, seconds: float, make) -> None:
+    t_wall, t_cpu = time.perf_counter(), time.process_time()
+    counts = asyncio.run(make())
+    wall, cpu = time.perf_counter() - t_wall, time.process_time() - t_cpu
+    total = sum(v for k, v in counts.items() if not k.startswith("("))
+    arrived = total + counts["(skipped)"]
+    print(
+        f"{name:22s} CPU {cpu / wall * 100:5.1f}%  {total / seconds:6.0f} 条/s  "
+        f"每条到达的消息 {cpu / max(arrived, 1) * 1e6:6.1f} µs  hands {counts['hands'] / seconds:5.1f}/s"
+        + (f"  跳过 {counts['(skipped)']}" if counts["(skipped)"] else "")
+    )
+
+
+# ---------- 3) 断线重连 ----------
+
+async def reconnect_check(server: multiprocessing.Process, hz: float) -> multiprocessing.Process:
+    async with BridgeClient(URI, types={"hands", CONTROL_ACK}, reconnect_delay=0.1) as client:
+        await client.wait_connected(5.0)
+        await client.control("producer", ACTION_SET, {"hz": hz / 2}, persistent=True)
+
+        async def rate(window: float) -> tuple:
+            counts: Counter = Counter()
+            end = time.monotonic() + window
+            while time.monotonic() < end:
+                try:
+                    msg = await asyncio.wait_for(client.recv(), end - time.monotonic())
+                except asyncio.TimeoutError:
+                    break
+                counts[msg.type] += 1
+            return counts["hands"] / window, counts[CONTROL_ACK]
+
+        await asyncio.sleep(0.3)
+        before = await rate(1.0)
+        print(f"重启前: hands {before[0]:.1f}/s（control_ack {before[1]}）")
+
+        loop = asyncio.get_running_loop()
+        server.terminate()
+        await loop.run_in_executor(None, server.join)
+        t_down = time.monotonic()
+        await asyncio.sleep(0.5)
+        server = start_server(hz)
+        connects = client.connects
+        while client.connects == connects:
+            await asyncio.sleep(0.01)
+        print(f"服务端重启（默认 {hz:g} Hz），断开 {time.monotonic() - t_down:.2f} s 后重连（第 {client.connects} 次连接）")
+        await asyncio.sleep(0.3)
+        after = await rate(1.0)
+        print(f"重连后: hands {after[0]:.1f}/s（重发的控制请求 control_ack {after[1]}）")
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=4.0)
+    parser.add_argument("--hz", type=float, default=60.0)
+    args = parser.parse_args()
+
+    print("== 解码正确性 ==")
+    check_decoding()
+
+    server = start_server(args.hz)
+    time.sleep(1.0)
+    try:
+        print(f"\n== 客户端 CPU（hands {args.hz:g} Hz 全量数据流，{args.seconds:g} s）==")
+        measure("json.loads + 逐点重建", args.seconds, lambda: naive_client(args.seconds))
+        measure("BridgeClient", args.seconds, lambda: library_client(args.seconds))
+        measure("BridgeClient batch 8", args.seconds, lambda: library_client(args.seconds, batch=8))
+        measure("BridgeClient 只要 hands", args.seconds, lambda: library_client(args.seconds, types={"hands"}))
+
+        print("\n== 断线重连 ==")
+        server = asyncio.run(reconnect_check(server, args.hz))
+    finally:
+        server.terminate()
+        server.join()
+
+
+if __name__ == "__main__":
+    main()
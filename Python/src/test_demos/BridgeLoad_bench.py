@@ -0,0 +1,159 @@
+"""
+WsBridge 负载测试（本机回环，不需要 Unity）：
+
+    python -m Python.src.test_demos.BridgeLoad_bench [--uvloop] [--rate 600] [--clients 4] [--seconds 5]
+
+- 生产者以 --rate 条/秒发送 hands 大小（约 1.5 KB）的 JSON 消息
+- --clients 个 websockets 客户端同时接收，统计吞吐和 生产 -> 客户端收到 的延迟
+- LoopMonitor 同时记录事件循环延迟；中途故意阻塞事件循环一次（模拟 hands.process），
+  检查看门狗能抓到调用栈
+- 依次在标准 asyncio 和 uvloop（已安装时；或只跑 --uvloop 指定的一种）上运行并对比
+"""
+import argparse
+import asyncio
+import json
+import logging
+import time
+
+import numpy as np
+import websockets
+
+from Python.src.tools import event_loop
+from Python.src.tools.event_loop import LoopMonitor, current_runtime
+from Python.src.tools.messages.base import make_message, trace_now
+from Python.src.tools.ws_bridge import WsBridge
+
+PORT = 8799
+STALL_SEC = 0.15
+
+
+def hands_like_payload(i: int) -> dict:
+    rng = np.random.default_rng(i)
+    return {
+        "t": trace_now(),
+        "hands": [
+            {"handedness": "Right", "landmarks": [
+                {"x": float(x), "y": float(y), "z": float(z)} for x, y, z in rng.random((21, 3))
+            ]},
+        ],
+    }
+
+
+async def client(stop: asyncio.Event, latencies: list, counts: list, idx: int) -> None:
+    async with websockets.connect(f"ws://127.0.0.1:{PORT}", max_queue=None) as ws:
+        while not stop.is_set():
+            try:
+                text = await asyncio.wait_for(ws.recv(), timeout=0.2)
+            except asyncio.TimeoutError:
+                continue
+            now = trace_now()
+            msg = json.loads(text)
+            if msg.get("type") == "load":
+                latencies.append(now - msg["payload"]["t"])
+                counts[idx] += 1
+
+
+def blocking_inference() -> None:
+    """模拟同步推理阻塞事件循环（LoopMonitor 的看门狗应该在这里抓到调用栈）。"""
+    time.sleep(STALL_SEC)
+
+
+async def producer(bridge: WsBridge, rate: float, seconds: float) -> int:
+    period = 1.0 / rate
+    n = int(rate * seconds)
+    start = time.monotonic()
+    for i in range(n):
+        bridge.send_json(make_message("load", hands_like_payload(i), frame_id=i, source="load"))
+        if i == n // 2:
+            blocking_inference()
+        delay = start + (i + 1) * period - time.monotonic()
+        await asyncio.sleep(max(0.0, delay))
+    return n
+
+
+async def run_once(args, results: dict) -> None:
+    bridge = WsBridge(port=PORT)
+    monitor = LoopMonitor(None, name="bench", stall_threshold=0.1, report_interval=3600)
+    server = asyncio.create_task(bridge.run_forever())
+    mon = asyncio.create_task(monitor.run())
+    await asyncio.sleep(0.3)
+
+    stop = asyncio.Event()
+    latencies, counts = [], [0] * args.clients
+    clients = [asyncio.create_task(client(stop, latencies, counts, k)) for k in range(args.clients)]
+    await asyncio.sleep(0.3)
+
+    t0 = time.monotonic()
+    sent = await producer(bridge, args.rate, args.seconds)
+    # 等待发送队列清空
+    while not bridge.outgoing.empty() and time.monotonic() - t0 < args.seconds + 10:
+        await asyncio.sleep(0.05)
+    await asyncio.sleep(0.3)
+    wall = time.monotonic() - t0
+    stop.set()
+    await asyncio.gather(*clients, return_exceptions=True)
+
+    snap = monitor.snapshot()
+    for t in (server, mon):
+        t.cancel()
+    await asyncio.gather(server, mon, return_exceptions=True)
+
+    lat = np.array(latencies) * 1e3
+    results[current_runtime()] = {
+        "sent": sent,
+        "received": sum(counts),
+        "expected": sent * args.clients,
+        "msgs_per_s": sum(counts) / wall,
+        "lat_p50": float(np.percentile(lat, 50)) if len(lat) else float("nan"),
+        "lat_p99": float(np.percentile(lat, 99)) if len(lat) else float("nan"),
+        "loop_p50": snap["lag_ms"]["p50"],
+        "loop_p99": snap["lag_ms"]["p99"],
+        "loop_max": snap["lag_ms"]["max"],
+        "stalls": snap["stalls"],
+        "last_stall": snap.get("last_stall"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--uvloop", action="store_true", help="只在 uvloop 上运行")
+    parser.add_argument("--asyncio", action="store_true", help="只在标准 asyncio 上运行")
+    parser.add_argument("--rate", type=float, default=600.0)
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING, format="[%(levelname)s] %(name)s: %(message)s")
+
+    try:
+        import uvloop  # noqa: F401
+        have_uvloop = True
+    except ImportError:
+        have_uvloop = False
+
+    runtimes = []
+    if not args.uvloop:
+        runtimes.append(False)
+    if not args.asyncio and (args.uvloop or have_uvloop):
+        runtimes.append(True)
+
+    results = {}
+    for use_uvloop in runtimes:
+        event_loop.run(lambda: run_once(args, results), use_uvloop=use_uvloop)
+
+    print(f"\n== WsBridge 负载: {args.rate:.0f} msg/s x {args.clients} 客户端, {args.seconds:.0f} s ==")
+    print(f"{'runtime':8s} {'收到/应收':>14s} {'msg/s':>8s} {'延迟p50':>8s} {'延迟p99':>8s} "
+          f"{'loop p50':>9s} {'loop p99':>9s} {'loop max':>9s} {'卡顿':>4s}")
+    for name, r in results.items():
+        print(
+            f"{name:8s} {r['received']:>6d}/{r['expected']:<7d} {r['msgs_per_s']:8.0f} "
+            f"{r['lat_p50']:7.2f}ms {r['lat_p99']:7.2f}ms "
+            f"{r['loop_p50']:8.1f}ms {r['loop_p99']:8.1f}ms {r['loop_max']:8.1f}ms {r['stalls']:4d}"
+        )
+        if r["last_stall"]:
+            print(f"         最近一次卡顿: {r['last_stall']}")
+    if not have_uvloop:
+        print("（未安装 uvloop，只有标准 asyncio 的结果；pip install uvloop 后重跑即可得到对比）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+运行时控制（tools/control.py）的检查，不需要摄像头 / 麦克风：
+
+    python -m Python.src.test_demos.Control_demo
+
+按 main.py 的方式启动 WsBridge + FrameHub（合成画面）+ motion_loop + audio_loop（合成音频）+ CONTROLS.serve，
+一个 WebSocket 客户端依次发送 control 消息，打印每个 control_ack（从发送到收到应答的耗时、生效后的配置），
+以及每一步之后 1 秒内收到的 motion / audio_level 条数：
+
+- motion: pause / resume / target_fps
+- audio:  hop_duration（更新频率）/ pause / resume
+- capture: pause / resume；合成画面不支持改分辨率，应得到 ok = false
+- 非法请求（未知参数、hop 大于窗长、未知 target）都应立即得到 ok = false，loop 不受影响
+"""
+import asyncio
+import itertools
+import json
+import time
+from collections import Counter
+
+import websockets
+
+from Python.src.app.audio_loop import audio_loop
+from Python.src.app.motion_loop import motion_loop
+from Python.src.tools.audio_sources import SyntheticAudioSource
+from Python.src.tools.control import CONTROLS
+from Python.src.tools.frame_graph import FrameHub
+from Python.src.tools.frame_sources import SyntheticFrameSource
+from Python.src.tools.messages.control import (
+    ACTION_GET,
+    ACTION_PAUSE,
+    ACTION_RESUME,
+    ACTION_SET,
+    CONTROL_ACK,
+    make_control_request,
+)
+from Python.src.tools.ws_bridge import WsBridge
+
+PORT = 8796
+WINDOW = 1.0
+
+# (说明, target, action, params)
+STEPS = [
+    ("基线", None, None, None),
+    ("motion 暂停", "motion", ACTION_PAUSE, None),
+    ("motion 恢复", "motion", ACTION_RESUME, None),
+    ("motion 限速 5 fps", "motion", ACTION_SET, {"target_fps": 5}),
+    ("audio 跳步 50 -> 20 ms", "audio", ACTION_SET, {"hop_duration": 0.02}),
+    ("audio 暂停", "audio", ACTION_PAUSE, None),
+    ("audio 恢复", "audio", ACTION_RESUME, None),
+    ("capture 暂停", "capture", ACTION_PAUSE, None),
+    ("capture 恢复", "capture", ACTION_RESUME, None),
+    ("读取 audio 配置", "audio", ACTION_GET, None),
+    ("非法: 未知参数", "motion", ACTION_SET, {"speed": 2}),
+    ("非法: 跳步大于窗长", "audio", ACTION_SET, {"hop_duration": 0.5}),
+    ("非法: 未知 target", "yolo", ACTION_PAUSE, None),
+    ("合成画面改分辨率", "capture", ACTION_SET, {"width": 320, "height": 180}),
+]
+
+
+class Client:
+    def __init__(self, ws) -> None:
+        self.ws = ws
+        self.counts: Counter = Counter()
+        self.acks: dict = {}
+        self._ids = itertools.count(1)
+
+    async def receive(self) -> None:
+        async for text in self.ws:
+            msg = json.loads(text)
+            if msg["type"] == CONTROL_ACK:
+                self.acks[msg["payload"]["id"]] = (time.perf_counter(), msg["payload"])
+            else:
+                self.counts[msg["type"]] += 1
+
+    async def request(self, target: str, action: str, params) -> tuple:
+        request_id = next(self._ids)
+        t0 = time.perf_counter()
+        await self.ws.send(json.dumps(make_control_request(target, action, params, request_id)))
+        while request_id not in self.acks:
+            await asyncio.sleep(0.005)
+        t1, ack = self.acks.pop(request_id)
+        return (t1 - t0) * 1e3, ack
+
+
+async def run() -> None:
+    bridge = WsBridge(port=PORT)
+    hub = FrameHub(SyntheticFrameSource(width=640, height=360, n_frames=None, speed=1.0))
+    pipeline = asyncio.ensure_future(asyncio.gather(
+        bridge.run_forever(),
+        hub.run(),
+        CONTROLS.serve(bridge),
+        motion_loop(bridge, frames=hub),
+        audio_loop(bridge, source=SyntheticAudioSource(kind="tone", frequency=440.0, amplitude=0.3)),
+    ))
+
+    # 等所有 loop 注册好自己的 LoopControl
+    while not {"capture", "motion", "audio"} <= set(CONTROLS.names()):
+        await asyncio.sleep(0.05)
+    print("已注册的 target:", CONTROLS.names())
+
+    async with websockets.connect(f"ws://127.0.0.1:{PORT}") as ws:
+        client = Client(ws)
+        receiver = asyncio.create_task(client.receive())
+        print(f"\n{'步骤':24s} {'应答':>9s}  {'motion/s':>8s} {'audio/s':>8s}  结果")
+        for title, target, action, params in STEPS:
+            ack_text = ""
+            latency = "-"
+            if target is not None:
+                ms, ack = await client.request(target, action, params)
+                latency = f"{ms:.1f}ms"
+                if ack["ok"]:
+                    ack_text = f"ok {ack['config']}"
+                else:
+                    ack_text = f"失败: {ack['error']}"
+            client.counts.clear()
+            await asyncio.sleep(WINDOW)
+            print(
+                f"{title:24s} {latency:>9s}  {client.counts['motion'] / WINDOW:8.1f} "
+                f"{client.counts['audio_level'] / WINDOW:8.1f}  {ack_text}"
+            )
+        receiver.cancel()
+
+    hub.stop()
+    pipeline.cancel()
+    try:
+        await pipeline
+    except asyncio.CancelledError:
+        pass
+
+
+def main() -> None:
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
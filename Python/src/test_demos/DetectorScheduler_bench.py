@@ -0,0 +1,126 @@
+"""
+多模型分时调度（tools/detectors.py + app/detector_loop.py）的基准，不需要摄像头：
+
+    python -m Python.src.test_demos.DetectorScheduler_bench [--seconds 6]
+
+FrameHub（合成画面 1280x720，实时 30 fps）上用 detector_loop 调度：
+- hands:   装了 mediapipe 时用真实的 HandsDetector，否则用每次 8 ms 的替身，每帧
+- objects: 目标检测的替身，每次 40 ms（超过整帧预算），期望每 4 帧
+- motion:  真实的 MotionTrackerDetector，每 2 帧
+- edges:   真实的 EdgesDetector，每 2 帧
+
+替身用 sleep 模拟耗时（结果稳定、不受机器噪声影响）。对比不同的每帧预算：
+各模型的实际间隔、每秒消息数、每帧总耗时 p50 / max 和超预算帧数。
+"""
+import argparse
+import asyncio
+import importlib.util
+import json
+import time
+from collections import Counter
+from typing import Optional
+
+from Python.src.app.detector_loop import detector_loop
+from Python.src.app.edges_loop import EdgesDetector
+from Python.src.app.motion_loop import MotionTrackerDetector
+from Python.src.tools.detectors import Detector
+from Python.src.tools.frame_graph import FrameHub
+from Python.src.tools.frame_sources import SyntheticFrameSource
+
+
+class StandInDetector(Detector):
+    """固定耗时的模型替身。"""
+
+    def __init__(self, name: str, cost: float, **kwargs) -> None:
+        self.name = self.msg_type = name
+        self.cost_hint = cost
+        super().__init__(**kwargs)
+        self.cost = cost
+
+    def process(self, products) -> Optional[dict]:
+        time.sleep(self.cost)
+        return {"frame": products.frame_id}
+
+
+class RecordingBridge:
+    def __init__(self) -> None:
+        self.counts: Counter = Counter()
+        self.stats: list = []
+
+    def send_json(self, obj, **kwargs) -> None:
+        self.counts[obj["type"]] += 1
+        if obj["type"] == "stats":
+            self.stats.append(obj["payload"])
+
+
+def make_detectors(with_hands: bool) -> list:
+    if with_hands:
+        from Python.src.app.hands_loop import HandsDetector
+
+        hands = HandsDetector()
+    else:
+        hands = StandInDetector("hands", 0.008, every=1, priority=0, max_every=3)
+    return [
+        hands,
+        StandInDetector("objects", 0.040, every=4, priority=2),
+        MotionTrackerDetector(every=2),
+        EdgesDetector(every=2),
+    ]
+
+
+async def run(budget_ms: float, seconds: float, with_hands: bool) -> RecordingBridge:
+    bridge = RecordingBridge()
+    hub = FrameHub(SyntheticFrameSource(n_objects=3, n_frames=None, speed=1.0))
+    pipeline = asyncio.ensure_future(asyncio.gather(
+        hub.run(),
+        detector_loop(bridge, hub, make_detectors(with_hands), budget_ms=budget_ms, stats_interval=seconds / 2),
+    ))
+    await asyncio.sleep(seconds + 0.5)
+    hub.stop()
+    pipeline.cancel()
+    try:
+        await pipeline
+    except asyncio.CancelledError:
+        pass
+    return bridge
+
+
+def report(budget_ms: float, seconds: float, bridge: RecordingBridge) -> None:
+    # 只看后半段（前半段包含启动和耗时估计的收敛）
+    stats = bridge.stats[-1]
+    print(f"\n== 预算 {budget_ms:g} ms/帧 ==")
+    print(
+        f"每帧总耗时 p50 {stats['frame_ms']['p50']:.1f} ms, max {stats['frame_ms']['max']:.1f} ms, "
+        f"超预算 {stats['over_budget']}/{stats['frames']} 帧, 预估平均负载 {stats['load_ms']:.1f} ms/帧"
+    )
+    print(f"{'模型':10s} {'期望间隔':>8s} {'实际间隔':>8s} {'单次 ms':>8s} {'运行/s':>8s} {'推迟':>6s}")
+    window = stats["window_sec"]
+    for d in stats["detectors"]:
+        print(
+            f"{d['name']:10s} {d['every']:8d} {d['stride']:8d} {d['cost_ms']:8.1f} "
+            f"{d['runs'] / window:8.1f} {d['deferred']:6d}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=6.0)
+    parser.add_argument("--budgets", type=float, nargs="+", default=[1000.0, 25.0, 15.0])
+    parser.add_argument("--json", help="把各预算下最后一个统计窗口写成 JSON")
+    args = parser.parse_args()
+
+    with_hands = importlib.util.find_spec("mediapipe") is not None
+    if not with_hands:
+        print("未安装 mediapipe，hands 用 8 ms 的替身")
+    results = {}
+    for budget in args.budgets:
+        bridge = asyncio.run(run(budget, args.seconds, with_hands))
+        report(budget, args.seconds, bridge)
+        results[str(budget)] = bridge.stats[-1]
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+edges_loop 的离线检查（合成画面或视频文件，不限速回放）：
+
+    python -m Python.src.test_demos.EdgesLoop_bench [clip.mp4]
+
+对 polylines / bitmask 两种格式分别报告：发送条数（应约等于 媒体时长 x 最高频率）、
+平均消息大小（JSON 字节）、平均点数，以及单帧边缘 + 轮廓处理耗时。
+"""
+import asyncio
+import json
+import sys
+import time
+
+import numpy as np
+
+from Python.src.app.edges_loop import EDGES_MAX_RATE, edges_loop
+from Python.src.tools.edges import EdgeExtractor
+from Python.src.tools.frame_sources import SyntheticFrameSource, VideoFileFrameSource
+from Python.src.tools.messages.edges import EDGES_BITMASK, EDGES_POLYLINES
+
+
+class CollectBridge:
+    def __init__(self):
+        self.messages = []
+
+    def send_json(self, obj):
+        self.messages.append(obj)
+
+
+def make_source():
+    if len(sys.argv) > 1:
+        return VideoFileFrameSource(sys.argv[1], speed=None)
+    return SyntheticFrameSource(n_objects=6, n_frames=300, speed=None)
+
+
+def bench_extract(source):
+    """单帧处理耗时（不含读帧）。"""
+    extractor = EdgeExtractor()
+    source.open()
+    frames = []
+    while len(frames) < 100:
+        ok, frame = source.read()
+        if not ok:
+            break
+        frames.append(frame)
+    source.release()
+
+    t_poly, t_mask = [], []
+    for frame in frames:
+        t0 = time.perf_counter()
+        edges = extractor.edges(frame)
+        extractor.polylines(edges)
+        t1 = time.perf_counter()
+        extractor.edges(frame)
+        extractor.bitmask(edges)
+        t2 = time.perf_counter()
+        t_poly.append(t1 - t0)
+        t_mask.append(t2 - t1)
+    print(f"单帧处理: polylines {np.median(t_poly) * 1e3:.2f} ms, bitmask {np.median(t_mask) * 1e3:.2f} ms")
+
+
+def main():
+    for output in (EDGES_POLYLINES, EDGES_BITMASK):
+        source = make_source()
+        bridge = CollectBridge()
+        asyncio.run(edges_loop(bridge, source=source, output=output))
+        msgs = bridge.messages
+        media_sec = source.timestamp + 1.0 / source.fps
+        sizes = [len(json.dumps(m)) for m in msgs]
+        points = [m["payload"].get("points", 0) for m in msgs]
+        print(f"{output:<9}: {len(msgs)} 条 / 媒体时长 {media_sec:.1f} s "
+              f"(期望约 {media_sec * EDGES_MAX_RATE:.0f}), 平均 {np.mean(sizes):.0f} B, "
+              f"平均点数 {np.mean(points):.0f}")
+    bench_extract(make_source())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+共享采集 + 每帧派生图像缓存（tools/frame_graph.py）的离线检查，不需要摄像头：
+
+    python -m Python.src.test_demos.FrameGraph_bench
+
+1) 预处理耗时：hands / motion / edges 各自从原图缩放、转色 vs 通过 FrameProducts 共享
+2) FrameHub + motion_loop + edges_loop + 模拟 hands 推理的订阅者同时运行（实时速度回放）：
+   报告各订阅者处理 / 跳过的帧数，并检查每一帧里每个节点最多只计算了一次
+"""
+import asyncio
+import time
+from collections import Counter
+
+import cv2
+
+from Python.src.app.edges_loop import edges_loop
+from Python.src.app.motion_loop import motion_loop
+from Python.src.tools.frame_graph import (
+    MIRRORED, FrameGraph, FrameHub, FrameProducts, blurred, gray, rgb,
+)
+from Python.src.tools.frame_sources import SyntheticFrameSource
+
+
+class CollectBridge:
+    def __init__(self):
+        self.messages = []
+
+    def send_json(self, obj, **kwargs):
+        self.messages.append(obj)
+
+
+def load_frames(n=120):
+    source = SyntheticFrameSource(n_objects=4, n_frames=n, speed=None)
+    source.open()
+    frames = []
+    while True:
+        ok, frame = source.read()
+        if not ok:
+            break
+        frames.append(frame)
+    source.release()
+    return frames
+
+
+def separate(frame):
+    """改造前：每个 loop 各自从原图做一遍（与各 loop 原来的实现相同）。"""
+    # hands_loop
+    mirrored = cv2.flip(frame, 1)
+    small = cv2.resize(mirrored, (640, 360))
+    cv2.cvtColor(small, cv2.COLOR_BGR2RGB)
+    # motion_loop（MotionDetector.downscale，level 2）
+    cv2.cvtColor(cv2.resize(frame, (320, 180), interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY)
+    # edges_loop（镜像 + EdgeExtractor.edges 的预处理部分）
+    mirrored = cv2.flip(frame, 1)
+    g = cv2.cvtColor(cv2.resize(mirrored, (320, 180), interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY)
+    cv2.GaussianBlur(g, (3, 3), 0)
+
+
+def shared(graph, frame, i):
+    products = FrameProducts(graph, frame.copy(), i, 0.0, 0.0)
+    products.get(MIRRORED)
+    products.get(rgb(1))
+    products.get(gray(2))
+    products.get(blurred(2))
+    return products
+
+
+def bench_preprocess(frames, repeat=3):
+    graph = FrameGraph.default()
+
+    best_sep = best_shared = best_copy = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for f in frames:
+            separate(f)
+        best_sep = min(best_sep, time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        for i, f in enumerate(frames):
+            shared(graph, f, i)
+        best_shared = min(best_shared, time.perf_counter() - t0)
+
+        # shared() 里的 copy 只是为了每次都是新帧，单独扣掉
+        t0 = time.perf_counter()
+        for f in frames:
+            f.copy()
+        best_copy = min(best_copy, time.perf_counter() - t0)
+
+    n = len(frames)
+    print("== 预处理耗时（每帧，1280x720）==")
+    print(f"各 loop 分别处理:  {best_sep / n * 1e3:6.2f} ms")
+    print(f"FrameProducts 共享: {(best_shared - best_copy) / n * 1e3:6.2f} ms")
+
+
+async def hands_like_consumer(hub, infer_sec, seen):
+    """模拟 hands_loop：取 rgb1，然后“推理” infer_sec 秒（阻塞事件循环，与 hands_loop 一样）。"""
+    sub = hub.subscribe("hands_sim")
+    handled = 0
+    async for products in sub.frames():
+        products.get(rgb(1))
+        seen[products.frame_id] = products
+        time.sleep(infer_sec)
+        handled += 1
+        await asyncio.sleep(0)
+    sub.close()
+    return handled, sub.skipped
+
+
+async def run_hub(n_frames=150, fps=30.0):
+    source = SyntheticFrameSource(n_objects=4, n_frames=n_frames, fps=fps, speed=1.0)
+    hub = FrameHub(source)
+    bridge = CollectBridge()
+    seen = {}
+
+    t0 = time.perf_counter()
+    _, (handled, skipped), _, _ = await asyncio.gather(
+        hub.run(),
+        hands_like_consumer(hub, 0.012, seen),
+        motion_loop(bridge, frames=hub),
+        edges_loop(bridge, frames=hub),
+    )
+    wall = time.perf_counter() - t0
+
+    counts = Counter(m["type"] for m in bridge.messages)
+    print("\n== FrameHub: hands(模拟 12 ms 推理) + motion + edges，实时回放 ==")
+    print(f"采集 {hub.frames_captured} 帧，用时 {wall:.2f} s")
+    print(f"hands_sim: 处理 {handled} 帧，跳过 {skipped} 帧")
+    print(f"motion:    发送 {counts['motion']} 条")
+    print(f"edges:     发送 {counts['edges']} 条（限速 15 Hz）")
+
+    dup = 0
+    node_counts = Counter()
+    for products in seen.values():
+        c = Counter(products.computed)
+        dup += sum(v - 1 for v in c.values())
+        node_counts.update(c)
+    print(f"每帧重复计算的节点数: {dup}（应为 0）")
+    print("各节点计算次数（hands 看到的帧）:", dict(sorted(node_counts.items())))
+    assert dup == 0
+
+
+def main():
+    frames = load_frames()
+    bench_preprocess(frames)
+    asyncio.run(run_hub())
+
+
+if __name__ == "__main__":
+    main()
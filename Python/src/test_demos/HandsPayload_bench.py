@@ -0,0 +1,94 @@
+"""
+对比 build_hands_payload（旧实现）与 HandsPayloadBuilder（预分配数组 + 列式布局）：
+- 每帧构造耗时：
+  * 只构造 payload：旧函数 vs builder.build（fill 之后）
+  * hands_loop 每帧的完整路径：旧 extract_hand_arrays + build_hands_payload
+    vs builder.fill + build（数组给变化检测 / 手势引擎，payload 给客户端）
+- json.dumps 耗时
+- 编码后字节数
+
+不需要摄像头 / MediaPipe，用 SimpleNamespace 模拟 results 结构。
+
+运行：
+    python -m Python.src.test_demos.HandsPayload_bench
+"""
+import json
+import timeit
+
+from Python.src.tools.messages.hands import (
+    LAYOUT_COLUMNAR,
+    LAYOUT_DICTS,
+    HandsPayloadBuilder,
+    build_hands_payload,
+    extract_hand_arrays,
+)
+from Python.src.test_demos.bench_fixtures import fake_hand_results
+
+W, H = 1280, 720
+N_HANDS = 2
+ROUNDS = 500
+REPEAT = 20  # 取多次重复中的最小值，减少系统抖动影响（每次较短，更容易落在安静的时间片里）
+
+
+def _best(fn):
+    return min(timeit.repeat(fn, number=ROUNDS, repeat=REPEAT)) / ROUNDS
+
+
+def _best_interleaved(fns):
+    """交替测量几个函数（同一时间段里的抖动对它们影响相同），返回各自的最小单次耗时。"""
+    best = [float("inf")] * len(fns)
+    for _ in range(REPEAT):
+        for i, fn in enumerate(fns):
+            best[i] = min(best[i], timeit.timeit(fn, number=ROUNDS) / ROUNDS)
+    return best
+
+
+def bench(name, build, t_build=None):
+    payload = build()
+    text = json.dumps(payload)
+    if t_build is None:
+        t_build = _best(build)
+    t_dumps = _best(lambda: json.dumps(payload))
+
+    print(f"{name:<36} build {t_build * 1e6:8.1f} us   dumps {t_dumps * 1e6:8.1f} us   "
+          f"size {len(text.encode('utf-8')):6d} B")
+    return t_build
+
+
+def main():
+    results = fake_hand_results(N_HANDS)
+    builder = HandsPayloadBuilder(max_hands=N_HANDS)
+
+    def builder_build(layout, include_pixels=False):
+        def run():
+            builder.fill(results)
+            return builder.build(W, H, layout=layout, include_pixels=include_pixels)
+        return run
+
+    def old_loop_path():
+        extract_hand_arrays(results)
+        return build_hands_payload(results, W, H)
+
+    # 先确认旧布局输出完全一致
+    builder.fill(results)
+    assert builder.build(W, H, layout=LAYOUT_DICTS) == build_hands_payload(results, W, H)
+
+    print(f"{N_HANDS} hands, best of {REPEAT} x {ROUNDS} rounds")
+    print("-- 只构造 payload（builder 已 fill）")
+    old_fn, new_fn = lambda: build_hands_payload(results, W, H), lambda: builder.build(W, H, layout=LAYOUT_DICTS)
+    old, new = _best_interleaved([old_fn, new_fn])
+    bench("build_hands_payload (old)", old_fn, old)
+    bench("builder.build dicts", new_fn, new)
+    print(f"   dicts / old: {new / old:.2f}x")
+    print("-- hands_loop 每帧：关键点数组 + payload")
+    new_fn = builder_build(LAYOUT_DICTS)
+    old, new = _best_interleaved([old_loop_path, new_fn])
+    bench("extract_hand_arrays + old", old_loop_path, old)
+    bench("fill + builder dicts", new_fn, new)
+    print(f"   dicts / old: {new / old:.2f}x")
+    bench("fill + builder columnar", builder_build(LAYOUT_COLUMNAR))
+    bench("fill + builder columnar + pxy", builder_build(LAYOUT_COLUMNAR, include_pixels=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,511 @@
+"""
+Python 热路径基准套件（无需摄像头 / 麦克风 / MediaPipe / Unity），结果存成稳定的 JSON，
+部署前与基线对比即可发现性能回退。
+
+运行并保存结果：
+    python -m Python.src.test_demos.HotPaths_bench run --out bench_new.json [--filter hands.] [--quick]
+与基线对比（任一项变慢超过阈值时退出码为 1）：
+    python -m Python.src.test_demos.HotPaths_bench compare bench_base.json bench_new.json [--threshold 0.10]
+
+覆盖：
+- hands:   build_hands_payload（0 / 1 / 2 只手）、HandsPayloadBuilder（dicts / columnar）、extract_hand_arrays
+- message: make_message、hands payload 的 json.dumps
+- audio:   build_audio_payload、compute_level / compute_levels（audio_loop 的 RMS / dBFS）
+- bridge:  WsBridge.send_json（入队 + 编码）、发送循环向 1 / 4 个客户端广播
+- motion:  MotionStable_demo 的 iou / merge_boxes / Tracker.step（tools/motion.py）
+           及向量化版本 iou_matrix / merge_boxes_array / ArrayTracker.step
+
+计时方法：每项先标定循环次数使单次测量约 target_sec 秒，各项按轮次交替测量 repeat 轮，
+记录每次调用的最小值和中位数（ns）；对比默认用最小值（受系统抖动影响最小）。
+calibration.* 两项只测机器本身的速度（纯 Python 循环 / numpy 向量运算）：
+对比时默认用它们的比值把两份结果归一化，抵消 CPU 频率、其它负载等整体漂移；
+--no-normalize 关闭归一化。
+"""
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import timeit
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Tuple
+
+import cv2
+import numpy as np
+
+from Python.src.app.audio_loop import compute_level, compute_levels
+from Python.src.tools.messages.audio import build_audio_payload, build_vad_payload
+from Python.src.tools.messages.base import make_message
+from Python.src.tools.messages.hands import (
+    LAYOUT_COLUMNAR,
+    LAYOUT_DICTS,
+    HandsPayloadBuilder,
+    build_hands_payload,
+    extract_hand_arrays,
+)
+from Python.src.tools.motion import Tracker, iou, merge_boxes
+from Python.src.tools.tracking import ArrayTracker, iou_matrix, merge_boxes_array
+from Python.src.tools.ws_bridge import WsBridge
+from Python.src.test_demos.bench_fixtures import (
+    audio_frames,
+    fake_hand_results,
+    random_boxes,
+    random_track_fixture,
+)
+
+FORMAT_VERSION = 1
+W, H = 1280, 720
+
+# name -> 构造函数（返回无参可调用对象，或 (可调用对象, 清理函数)；构造开销不计入）
+Bench = Callable[[], object]
+BENCHMARKS: Dict[str, Bench] = {}
+
+
+def bench(name: str):
+    def register(fn: Bench) -> Bench:
+        BENCHMARKS[name] = fn
+        return fn
+    return register
+
+
+# ---------- calibration ----------
+
+@bench("calibration.python_loop")
+def _():
+    def run():
+        acc = 0
+        for i in range(1000):
+            acc += i * i
+        return acc
+    return run
+
+
+@bench("calibration.numpy")
+def _():
+    x = np.random.default_rng(0).standard_normal(100_000).astype(np.float32)
+    return lambda: float(np.sqrt(np.mean(np.square(x, dtype=np.float64))))
+
+
+# ---------- hands ----------
+
+for _n in (0, 1, 2):
+    @bench(f"hands.build_hands_payload.{_n}hands")
+    def _(n=_n):
+        results = fake_hand_results(n)
+        return lambda: build_hands_payload(results, W, H)
+
+
+@bench("hands.builder_dicts.2hands")
+def _():
+    results, builder = fake_hand_results(2), HandsPayloadBuilder(max_hands=2)
+
+    def run():
+        builder.fill(results)
+        return builder.build(W, H, layout=LAYOUT_DICTS)
+    return run
+
+
+@bench("hands.builder_columnar.2hands")
+def _():
+    results, builder = fake_hand_results(2), HandsPayloadBuilder(max_hands=2)
+
+    def run():
+        builder.fill(results)
+        return builder.build(W, H, layout=LAYOUT_COLUMNAR)
+    return run
+
+
+@bench("hands.extract_hand_arrays.2hands")
+def _():
+    results = fake_hand_results(2)
+    return lambda: extract_hand_arrays(results)
+
+
+# ---------- message ----------
+
+@bench("message.make_message")
+def _():
+    payload = build_hands_payload(fake_hand_results(2), W, H)
+    return lambda: make_message("hands", payload, frame_id=1, source="mediapipe_hands")
+
+
+@bench("message.json_dumps.hands_2hands")
+def _():
+    msg = make_message("hands", build_hands_payload(fake_hand_results(2), W, H), frame_id=1)
+    return lambda: json.dumps(msg)
+
+
+# ---------- audio ----------
+
+_AUDIO_COMMON = dict(
+    device_name="bench", sample_rate=48000, block_duration=0.05, hop_duration=0.05,
+    overflows=0, dropped_blocks=0,
+)
+
+
+@bench("audio.build_audio_payload")
+def _():
+    return lambda: build_audio_payload(level_dbfs=-23.4, rms=0.067, **_AUDIO_COMMON)
+
+
+@bench("audio.build_audio_payload.vad_loudness")
+def _():
+    def run():
+        payload = build_audio_payload(
+            level_dbfs=-23.4, rms=0.067, lufs_momentary=-24.1, lufs_short_term=-25.0, **_AUDIO_COMMON,
+        )
+        payload["vad"] = build_vad_payload(active=True, noise_floor_dbfs=-60.2, snr_db=36.8)
+        return payload
+    return run
+
+
+@bench("audio.compute_level.1x2400")
+def _():
+    frame = audio_frames(1)[0]
+    return lambda: compute_level(frame)
+
+
+@bench("audio.compute_levels.10x2400")
+def _():
+    frames = audio_frames(10)
+    return lambda: compute_levels(frames)
+
+
+# ---------- bridge ----------
+
+class _NullClient:
+    """假的 websocket 连接：send 什么也不做，只计数。"""
+
+    remote_address = ("bench", 0)
+
+    def __init__(self, bench_state):
+        self._state = bench_state
+
+    async def send(self, text):
+        self._state["sent"] += 1
+        if self._state["sent"] >= self._state["target"]:
+            self._state["done"].set()
+
+
+@bench("bridge.send_json")
+def _():
+    # 只测 send_json（json 编码 + 入队），每 1000 次清空队列避免无限增长
+    bridge = WsBridge()
+    msg = make_message("hands", build_hands_payload(fake_hand_results(2), W, H), frame_id=1)
+    state = {"n": 0}
+
+    def run():
+        bridge.send_json(msg)
+        state["n"] += 1
+        if state["n"] % 1000 == 0:
+            while not bridge.outgoing.empty():
+                bridge.outgoing.get_nowait()
+    return run
+
+
+def _fanout(n_clients: int, batch: int = 200):
+    def build():
+        loop = asyncio.new_event_loop()
+        bridge = WsBridge()
+        state = {"sent": 0, "target": 0, "done": None}
+        for _ in range(n_clients):
+            bridge._clients.add(_NullClient(state))
+        msg = make_message("hands", build_hands_payload(fake_hand_results(2), W, H), frame_id=1)
+        loop.run_until_complete(_start_sender(bridge))
+
+        async def push_and_drain():
+            state["sent"] = 0
+            state["target"] = batch * n_clients
+            state["done"] = asyncio.Event()
+            # 一批 batch 条排队后再发送，hands 默认 50 ms 就过期；这里只测广播开销，不让它过期
+            for _ in range(batch):
+                bridge.send_json(msg, max_age=float("inf"))
+            await state["done"].wait()
+
+        def close():
+            bridge._sender_task.cancel()
+            try:
+                loop.run_until_complete(bridge._sender_task)
+            except asyncio.CancelledError:
+                pass
+            loop.close()
+
+        # 每次调用处理 batch 条消息；结果按条换算（见 PER_CALL）
+        return (lambda: loop.run_until_complete(push_and_drain())), close
+    return build
+
+
+async def _start_sender(bridge: WsBridge) -> None:
+    bridge._sender_task = asyncio.get_running_loop().create_task(bridge._sender_loop())
+    await asyncio.sleep(0)
+
+
+# 一次调用里包含多次操作的基准：结果除以这个数，统一成“每次操作”的耗时
+PER_CALL: Dict[str, int] = {}
+for _n in (1, 4):
+    BENCHMARKS[f"bridge.fanout.{_n}clients"] = _fanout(_n)
+    PER_CALL[f"bridge.fanout.{_n}clients"] = 200
+
+
+# ---------- motion ----------
+
+@bench("motion.iou.pair")
+def _():
+    a, b = (100, 100, 60, 80), (120, 110, 60, 80)
+    return lambda: iou(a, b)
+
+
+@bench("motion.merge_boxes.50")
+def _():
+    boxes = random_boxes(np.random.default_rng(0), 50)
+    return lambda: merge_boxes(boxes, 0.3)
+
+
+@bench("tracking.merge_boxes_array.50")
+def _():
+    boxes = random_boxes(np.random.default_rng(0), 50)
+    return lambda: merge_boxes_array(boxes, 0.3)
+
+
+@bench("tracking.iou_matrix.200x200")
+def _():
+    rng = np.random.default_rng(0)
+    a = np.array(random_boxes(rng, 200))
+    b = np.array(random_boxes(rng, 200))
+    return lambda: iou_matrix(a, b)
+
+
+def _replay(make_tracker, n_objects):
+    """每次调用对跟踪器喂下一帧；夹具播完后换一个新跟踪器从头开始。"""
+    def build():
+        frames = random_track_fixture(0, n_objects)
+        state = {"i": 0, "tracker": make_tracker()}
+
+        def run():
+            i = state["i"]
+            if i == len(frames):
+                state["tracker"] = make_tracker()
+                i = 0
+            t, boxes = frames[i]
+            state["i"] = i + 1
+            return state["tracker"].step(boxes, t)
+        return run
+    return build
+
+
+for _n in (5, 30):
+    BENCHMARKS[f"motion.tracker_step.{_n}obj"] = _replay(Tracker, _n)
+    BENCHMARKS[f"tracking.array_tracker_step.{_n}obj"] = _replay(ArrayTracker, _n)
+
+
+# ---------- 运行 ----------
+
+def _calibrate(fn: Callable[[], object], target_sec: float) -> int:
+    number = 1
+    while True:
+        elapsed = timeit.timeit(fn, number=number)
+        if elapsed >= target_sec / 5 or number >= 1 << 24:
+            return max(1, int(number * target_sec / max(elapsed, 1e-9)))
+        number *= 4
+
+
+def run_all(names: List[str], target_sec: float, repeat: int, progress: bool = True) -> Dict[str, dict]:
+    """
+    先构造、预热、标定全部基准，再按轮次交替测量（每轮每项测一次）：
+    系统负载的突发会均匀落在各项上，每项的最小值取自整个运行期间最安静的时刻。
+    """
+    prepared = []
+    try:
+        for name in names:
+            fn = BENCHMARKS[name]()
+            fn, cleanup = fn if isinstance(fn, tuple) else (fn, None)
+            prepared.append((name, fn, cleanup))
+            fn()  # 预热（首次调用的缓存 / 惰性初始化不计入）
+        numbers = {name: _calibrate(fn, target_sec) for name, fn, _ in prepared}
+
+        samples: Dict[str, List[float]] = {name: [] for name in names}
+        for r in range(repeat):
+            if progress:
+                print(f"\r第 {r + 1}/{repeat} 轮", end="", file=sys.stderr, flush=True)
+            for name, fn, _ in prepared:
+                t = timeit.timeit(fn, number=numbers[name])
+                samples[name].append(t / numbers[name] / PER_CALL.get(name, 1) * 1e9)
+        if progress:
+            print(file=sys.stderr)
+    finally:
+        for _, _, cleanup in prepared:
+            if cleanup is not None:
+                cleanup()
+
+    return {
+        name: {
+            "min_ns": round(min(samples[name]), 1),
+            "median_ns": round(statistics.median(samples[name]), 1),
+            "number": numbers[name],
+            "repeat": repeat,
+            "ops_per_call": PER_CALL.get(name, 1),
+        }
+        for name in names
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=10,
+        ).stdout.strip() or "unknown"
+    except (OSError, subprocess.SubprocessError):
+        return "unknown"
+
+
+def environment() -> dict:
+    import os
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "git_commit": _git_commit(),
+    }
+
+
+def cmd_run(args) -> int:
+    names = sorted(n for n in BENCHMARKS if not args.filter or any(f in n for f in args.filter))
+    target_sec = 0.02 if args.quick else args.target_sec
+    repeat = 3 if args.quick else args.repeat
+
+    results = run_all(names, target_sec, repeat)
+    print(f"{'benchmark':42s} {'min':>12s} {'median':>12s}")
+    for name, r in results.items():
+        print(f"{name:42s} {_fmt_ns(r['min_ns']):>12s} {_fmt_ns(r['median_ns']):>12s}")
+
+    doc = {
+        "format_version": FORMAT_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": environment(),
+        "config": {"target_sec": target_sec, "repeat": repeat},
+        "benchmarks": results,
+    }
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(doc, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\n结果已写入 {args.out}")
+    return 0
+
+
+def _fmt_ns(ns: float) -> str:
+    if ns >= 1e6:
+        return f"{ns / 1e6:.2f} ms"
+    if ns >= 1e3:
+        return f"{ns / 1e3:.2f} µs"
+    return f"{ns:.0f} ns"
+
+
+CALIBRATION_PREFIX = "calibration."
+
+
+def machine_factor(base: dict, new: dict, metric: str) -> float:
+    """new 机器状态相对 base 的整体快慢（calibration.* 比值的几何平均；没有时为 1）。"""
+    b, n = base["benchmarks"], new["benchmarks"]
+    ratios = [
+        n[k][metric] / b[k][metric]
+        for k in b if k.startswith(CALIBRATION_PREFIX) and k in n and b[k][metric] > 0
+    ]
+    return float(np.exp(np.mean(np.log(ratios)))) if ratios else 1.0
+
+
+def compare(
+    base: dict,
+    new: dict,
+    threshold: float,
+    metric: str,
+    normalize: bool = True,
+) -> Tuple[List[tuple], List[str], List[str], float]:
+    """
+    返回 ([(name, base, new, ratio, status)], 只在 base 中的名字, 只在 new 中的名字, 机器系数)。
+    normalize=True 时 ratio 已除以机器系数。
+    """
+    b, n = base["benchmarks"], new["benchmarks"]
+    factor = machine_factor(base, new, metric) if normalize else 1.0
+    rows = []
+    for name in sorted(set(b) & set(n)):
+        if name.startswith(CALIBRATION_PREFIX):
+            continue
+        ratio = n[name][metric] / b[name][metric] / factor if b[name][metric] else float("inf")
+        if ratio > 1 + threshold:
+            status = "REGRESSION"
+        elif ratio < 1 / (1 + threshold):
+            status = "faster"
+        else:
+            status = "ok"
+        rows.append((name, b[name][metric], n[name][metric], ratio, status))
+    return rows, sorted(set(b) - set(n)), sorted(set(n) - set(b)), factor
+
+
+def cmd_compare(args) -> int:
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.new, encoding="utf-8") as f:
+        new = json.load(f)
+
+    for key in ("python", "numpy", "opencv", "machine", "cpu_count"):
+        if base["environment"].get(key) != new["environment"].get(key):
+            print(f"⚠️ 环境不同: {key} {base['environment'].get(key)} -> {new['environment'].get(key)}")
+
+    rows, removed, added, factor = compare(base, new, args.threshold, args.metric, not args.no_normalize)
+    print(f"{base['environment'].get('git_commit')} -> {new['environment'].get('git_commit')}  "
+          f"(metric={args.metric}, threshold=±{args.threshold:.0%})")
+    if not args.no_normalize:
+        print(f"机器系数 {factor:.2f}（calibration.* 新/旧；ratio 已除以该系数）")
+    print(f"{'benchmark':42s} {'base':>12s} {'new':>12s} {'ratio':>7s}  status")
+    for name, b, n, ratio, status in rows:
+        print(f"{name:42s} {_fmt_ns(b):>12s} {_fmt_ns(n):>12s} {ratio:7.2f}  {status}")
+    for name in removed:
+        print(f"{name:42s} （新结果中没有）")
+    for name in added:
+        print(f"{name:42s} （基线中没有）")
+
+    regressions = [r for r in rows if r[4] == "REGRESSION"]
+    if regressions:
+        print(f"\n❌ {len(regressions)} 项变慢超过 {args.threshold:.0%}")
+        return 1
+    print("\n✅ 没有回退")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Python 热路径基准套件")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_run = sub.add_parser("run", help="运行基准")
+    p_run.add_argument("--out", help="结果 JSON 路径")
+    p_run.add_argument("--filter", nargs="*", help="只运行名字包含这些子串的基准")
+    p_run.add_argument("--target-sec", type=float, default=0.05, help="单次测量的目标时长（秒）")
+    p_run.add_argument("--repeat", type=int, default=15)
+    p_run.add_argument("--quick", action="store_true", help="更短的测量（冒烟测试用，结果不够稳定）")
+    p_run.add_argument("--list", action="store_true", help="只列出基准名")
+
+    p_cmp = sub.add_parser("compare", help="对比两份结果")
+    p_cmp.add_argument("base")
+    p_cmp.add_argument("new")
+    p_cmp.add_argument("--threshold", type=float, default=0.10, help="变慢超过该比例即视为回退")
+    p_cmp.add_argument("--metric", choices=("min_ns", "median_ns"), default="min_ns")
+    p_cmp.add_argument("--no-normalize", action="store_true", help="不按 calibration.* 归一化")
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        if args.list:
+            print("\n".join(sorted(BENCHMARKS)))
+            return 0
+        return cmd_run(args)
+    return cmd_compare(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+"""
+K 加权响度计（tools/loudness.py）的校验与基准：
+
+1. BlockIIRFilter 分块滤波与逐样本递推（lfilter_reference）的最大误差；
+2. 997 Hz 正弦的响度：0 dBFS 单声道正弦按 BS.1770 应为 -3.01 LUFS，-20 dBFS 为 -23.01 LUFS；
+3. 每块开销与短期窗口长度无关（3 s / 30 s / 300 s 对比）。
+
+运行：
+    python -m Python.src.test_demos.Loudness_bench
+"""
+import timeit
+
+import numpy as np
+
+from Python.src.tools.loudness import (
+    BlockIIRFilter,
+    LoudnessMeter,
+    k_weighting_coefficients,
+    lfilter_reference,
+)
+
+SAMPLE_RATE = 48000
+BLOCK = 2400   # 50 ms 跳步
+
+
+def check_filter():
+    rng = np.random.default_rng(0)
+    x = rng.standard_normal(SAMPLE_RATE // 2)
+    b, a = k_weighting_coefficients(SAMPLE_RATE)
+    ref = lfilter_reference(b, a, x)
+
+    for block in (64, 480, BLOCK):
+        f = BlockIIRFilter(b, a)
+        y = np.concatenate([f.process(x[i:i + block]) for i in range(0, len(x), block)])
+        print(f"分块滤波 block={block:<5} 最大误差 {np.abs(y - ref).max():.2e}")
+
+
+def check_sine():
+    t = np.arange(SAMPLE_RATE * 4) / SAMPLE_RATE
+    for dbfs, expected in ((0.0, -3.01), (-20.0, -23.01)):
+        amp = 10.0 ** (dbfs / 20.0)
+        meter = LoudnessMeter(SAMPLE_RATE, BLOCK)
+        out = meter.process((amp * np.sin(2 * np.pi * 997 * t)).reshape(-1, BLOCK))
+        m, s = out["momentary_lufs"][-1], out["short_term_lufs"][-1]
+        ok = "✅" if abs(m - expected) < 0.05 and abs(s - expected) < 0.05 else "❌"
+        print(f"997 Hz @ {dbfs:5.1f} dBFS: momentary {m:.2f} LUFS, short-term {s:.2f} LUFS "
+              f"(期望 {expected}) {ok}")
+
+
+def bench():
+    rng = np.random.default_rng(1)
+    blk = rng.standard_normal((1, BLOCK)).astype(np.float32)
+    for short_term in (3.0, 30.0, 300.0):
+        meter = LoudnessMeter(SAMPLE_RATE, BLOCK, short_term_sec=short_term)
+        meter.process(blk)   # 预热：计算 h / Z
+        n = 500
+        best = min(timeit.repeat(lambda: meter.process(blk), number=n, repeat=5)) / n
+        budget = BLOCK / SAMPLE_RATE
+        print(f"short-term {short_term:6.1f} s: {best * 1e6:7.1f} us / 块 "
+              f"({100 * best / budget:.2f}% 的实时预算)")
+
+
+if __name__ == "__main__":
+    check_filter()
+    check_sine()
+    bench()
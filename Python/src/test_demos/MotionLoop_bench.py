@@ -0,0 +1,54 @@
+"""
+在录好的视频（或合成画面）上以不限速的方式跑完整的 motion_loop，统计吞吐：
+
+    python -m Python.src.test_demos.MotionLoop_bench                 # 合成画面 1280x720, 300 帧
+    python -m Python.src.test_demos.MotionLoop_bench clip.mp4        # 视频文件
+
+输出：处理帧数、墙钟耗时、FPS 以及相对素材 FPS 的倍率，
+出现过的轨迹 ID 数（ID 切换越多，数量越大）和每帧平均确认轨迹数。
+"""
+import asyncio
+import sys
+import time
+
+from Python.src.app.motion_loop import motion_loop
+from Python.src.tools.frame_sources import SyntheticFrameSource, VideoFileFrameSource
+
+
+class CollectBridge:
+    def __init__(self):
+        self.messages = []
+
+    def send_json(self, obj):
+        self.messages.append(obj)
+
+
+async def run(source):
+    bridge = CollectBridge()
+    t0 = time.perf_counter()
+    await motion_loop(bridge, source=source)
+    return bridge.messages, time.perf_counter() - t0
+
+
+def main():
+    if len(sys.argv) > 1:
+        source = VideoFileFrameSource(sys.argv[1], speed=None)
+    else:
+        source = SyntheticFrameSource(n_objects=3, n_frames=300, speed=None)
+
+    messages, wall = asyncio.run(run(source))
+    if not messages:
+        print("没有收到任何消息")
+        return
+
+    n = len(messages)
+    ids = {t["id"] for m in messages for t in m["payload"]["tracks"]}
+    avg_tracks = sum(len(m["payload"]["tracks"]) for m in messages) / n
+    fps = n / wall
+    print(f"source {source.name}: {n} 帧, 墙钟 {wall:.2f} s, {fps:.1f} FPS "
+          f"({fps / source.fps:.1f}x 素材 {source.fps:.0f} FPS)")
+    print(f"轨迹 ID 数 {len(ids)}, 每帧平均确认轨迹 {avg_tracks:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+多分辨率运动分割的精度 / 开销权衡：
+
+    python -m Python.src.test_demos.MotionPyramid_bench                # 合成画面（有真值）
+    python -m Python.src.test_demos.MotionPyramid_bench clip.mp4       # 录好的视频（以第 0 层结果为参照）
+
+对每种配置（金字塔层 0/1/2/3，是否在原图分辨率精修）报告：
+- 每帧 detect() 的耗时（帧预先解码到内存，不含解码）
+- 相对参照的召回率 / 精确率（IOU >= 0.5 算命中）和命中框的平均 IOU
+"""
+import sys
+import time
+
+import numpy as np
+
+from Python.src.tools.frame_sources import SyntheticFrameSource, VideoFileFrameSource
+from Python.src.tools.motion import MotionDetector
+from Python.src.tools.tracking import assign_greedy, iou_matrix
+
+MAX_FRAMES = 300
+WARMUP = 30      # 前几帧背景模型还在学习，不计入精度
+MATCH_IOU = 0.5
+
+CONFIGS = (
+    (0, False),
+    (1, False),
+    (1, True),
+    (2, False),
+    (2, True),
+    (3, False),
+    (3, True),
+)
+
+
+def load_frames(source):
+    source.open()
+    frames, truth = [], []
+    while len(frames) < MAX_FRAMES:
+        ok, frame = source.read()
+        if not ok:
+            break
+        frames.append(frame)
+        if isinstance(source, SyntheticFrameSource):
+            truth.append(np.array(source.ground_truth()).reshape(-1, 4))
+    source.release()
+    return frames, truth or None
+
+
+def run(frames, level, refine):
+    detector = MotionDetector(pyramid_level=level, refine=refine)
+    boxes, times = [], []
+    for frame in frames:
+        t0 = time.perf_counter()
+        b, _ = detector.detect(frame)
+        times.append(time.perf_counter() - t0)
+        boxes.append(b)
+    return boxes, np.array(times[WARMUP:])
+
+
+def score(pred, ref):
+    tp = n_pred = n_ref = 0
+    ious = []
+    for p, r in zip(pred[WARMUP:], ref[WARMUP:]):
+        n_pred += len(p)
+        n_ref += len(r)
+        if len(p) == 0 or len(r) == 0:
+            continue
+        iou = iou_matrix(r, p)
+        match = assign_greedy(iou, MATCH_IOU)
+        hit = match >= 0
+        tp += int(hit.sum())
+        ious.extend(iou[np.nonzero(hit)[0], match[hit]].tolist())
+    recall = tp / n_ref if n_ref else 1.0
+    precision = tp / n_pred if n_pred else 1.0
+    return recall, precision, float(np.mean(ious)) if ious else 0.0
+
+
+def main():
+    if len(sys.argv) > 1:
+        source = VideoFileFrameSource(sys.argv[1], speed=None)
+    else:
+        source = SyntheticFrameSource(n_objects=4, n_frames=MAX_FRAMES, seed=3)
+    frames, truth = load_frames(source)
+    h, w = frames[0].shape[:2]
+    print(f"source {source.name}: {len(frames)} 帧 {w}x{h}, 参照 = {'真值' if truth else '第 0 层结果'}")
+
+    results = {}
+    for level, refine in CONFIGS:
+        results[(level, refine)] = run(frames, level, refine)
+    reference = truth if truth is not None else results[(0, False)][0]
+    base_ms = np.median(results[(0, False)][1]) * 1e3
+
+    print(f"{'level':>5} {'refine':>6} {'size':>10} {'ms/frame':>9} {'speedup':>8} "
+          f"{'recall':>7} {'prec':>6} {'mIOU':>6}")
+    for (level, refine), (boxes, times) in results.items():
+        ms = np.median(times) * 1e3
+        recall, precision, miou = score(boxes, reference)
+        size = f"{w >> level}x{h >> level}"
+        print(f"{level:>5} {str(refine):>6} {size:>10} {ms:>9.2f} {base_ms / ms:>7.1f}x "
+              f"{recall:>7.3f} {precision:>6.3f} {miou:>6.3f}")
+
+
+if __name__ == "__main__":
+    main()
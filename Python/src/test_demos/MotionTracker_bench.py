@@ -0,0 +1,144 @@
+"""
+运动跟踪核心：逐对象参考实现（tools/motion.py）与向量化实现（tools/tracking.py）的
+一致性校验 + 基准。
+
+1. 一致性（fixtures）：
+   - 合成场景（SyntheticFrameSource + MotionDetector 的真实连通域框）逐帧比较
+     merge_boxes vs merge_boxes_array，以及 Tracker vs ArrayTracker 的全部输出
+     （ID、框、速度、命中、年龄、轨迹）；
+   - 合成场景里的框很少重叠，合并另用随机框（5 / 10 / 20 / 50 个，每种 200 组，
+     含链式重叠）比较，并统计其中真正发生合并的组数；
+   - 随机生成的检测序列（目标移动 + 抖动 + 漏检 + 误检）比较 Tracker vs ArrayTracker。
+2. 基准：10 / 100 / 1000 个框时 IOU、合并、跟踪单步的耗时。
+
+运行：
+    python -m Python.src.test_demos.MotionTracker_bench
+"""
+import timeit
+
+import numpy as np
+
+from Python.src.tools.frame_sources import SyntheticFrameSource
+from Python.src.tools.motion import MotionDetector, Tracker, iou, merge_boxes
+from Python.src.tools.tracking import (
+    ArrayTracker,
+    TrackSnapshot,
+    iou_matrix,
+    merge_boxes_array,
+    snapshot_rows,
+)
+from Python.src.test_demos.bench_fixtures import random_boxes, random_track_fixture
+
+MERGE_IOU = 0.3
+
+
+# ---------- fixtures ----------
+
+def scene_fixture(seed, n_objects, n_frames=150):
+    """合成场景经过真实的前景检测后得到的逐帧原始连通域框（合并前）。"""
+    source = SyntheticFrameSource(n_objects=n_objects, n_frames=n_frames, seed=seed)
+    source.open()
+    detector = MotionDetector(merge_iou=1.1)   # 阈值 > 1：不合并，拿到原始框
+    frames = []
+    while True:
+        ok, frame = source.read()
+        if not ok:
+            break
+        boxes, _ = detector.detect(frame)
+        frames.append((source.timestamp, [tuple(b) for b in boxes.tolist()]))
+    return frames
+
+
+def check_merge(frames):
+    """返回 (结果相同的帧数, 其中真正发生合并的帧数, 总帧数)。"""
+    same = merged = 0
+    for _, boxes in frames:
+        legacy = merge_boxes(boxes, iou_th=MERGE_IOU)
+        new = [tuple(b) for b in merge_boxes_array(boxes, iou_th=MERGE_IOU).tolist()]
+        same += legacy == new
+        merged += len(legacy) < len(boxes)
+    return same, merged, len(frames)
+
+
+def random_merge_fixture(n_boxes, seeds=200):
+    return [(0.0, random_boxes(np.random.default_rng(seed), n_boxes)) for seed in range(seeds)]
+
+
+def check_tracker(frames):
+    legacy = Tracker(iou_th=0.3, max_age=20, min_hits=6)
+    new = ArrayTracker(iou_th=0.3, max_age=20, min_hits=6)
+    for k, (t, boxes) in enumerate(frames):
+        a = snapshot_rows(TrackSnapshot.from_tracks(legacy.step(boxes, t)))
+        b = snapshot_rows(new.step(boxes, t))
+        if a != b:
+            return k
+    return None
+
+
+def check_equivalence():
+    print("=== 一致性 ===")
+    ok = True
+    for seed, n_objects in ((0, 3), (1, 6), (2, 10)):
+        frames = scene_fixture(seed, n_objects)
+        merged = [(t, merge_boxes(boxes, iou_th=MERGE_IOU)) for t, boxes in frames]
+        same, n_merged, total = check_merge(frames)
+        bad = check_tracker(merged)
+        ok &= same == total and bad is None
+        print(f"scene seed={seed} objects={n_objects:<3} merge 相同 {same}/{total}（有合并 {n_merged}）  "
+              f"tracker {'相同' if bad is None else f'第 {bad} 帧不同'}")
+
+    for n_boxes in (5, 10, 20, 50):
+        same, n_merged, total = check_merge(random_merge_fixture(n_boxes))
+        ok &= same == total
+        print(f"random boxes={n_boxes:<3} merge 相同 {same}/{total}（有合并 {n_merged}）")
+
+    for seed, n_objects in ((0, 10), (1, 50), (2, 200)):
+        bad = check_tracker(random_track_fixture(seed, n_objects))
+        ok &= bad is None
+        print(f"random seed={seed} objects={n_objects:<4} tracker {'相同' if bad is None else f'第 {bad} 帧不同'}")
+    print("✅ 全部一致" if ok else "❌ 存在差异")
+
+
+# ---------- 基准 ----------
+
+def best(fn, number):
+    return min(timeit.repeat(fn, number=number, repeat=3)) / number
+
+
+def bench():
+    print("\n=== 基准（单次耗时，ms）===")
+    print(f"{'boxes':>6} {'iou loop':>10} {'iou mat':>9} {'merge':>9} {'merge arr':>9} "
+          f"{'track':>9} {'track arr':>10}")
+    rng = np.random.default_rng(0)
+    for n in (10, 100, 1000):
+        boxes = random_boxes(rng, n)
+        arr = np.array(boxes)
+        number = {10: 200, 100: 5, 1000: 1}[n]
+
+        t_loop = best(lambda: [[iou(a, b) for b in boxes] for a in boxes], number)
+        t_mat = best(lambda: iou_matrix(arr, arr), number * 10)
+        t_merge = best(lambda: merge_boxes(boxes, MERGE_IOU), number)
+        t_merge_arr = best(lambda: merge_boxes_array(arr, MERGE_IOU), number)
+
+        # 跟踪单步：先用同一批框建立 n 条轨迹，再对抖动后的框做一步
+        shifted = [(x + 2, y + 1, w, h) for x, y, w, h in boxes]
+
+        def legacy_step():
+            tr = Tracker()
+            tr.step(boxes, 0.0)
+            tr.step(shifted, 1 / 30)
+
+        def array_step():
+            tr = ArrayTracker()
+            tr.step(arr, 0.0)
+            tr.step(shifted, 1 / 30)
+
+        t_track = best(legacy_step, number)
+        t_arr = best(array_step, number)
+        print(f"{n:>6} {t_loop * 1e3:>10.3f} {t_mat * 1e3:>9.3f} {t_merge * 1e3:>9.3f} "
+              f"{t_merge_arr * 1e3:>9.3f} {t_track * 1e3:>9.3f} {t_arr * 1e3:>10.3f}")
+
+
+if __name__ == "__main__":
+    check_equivalence()
+    bench()
@@ -0,0 +1,118 @@
+"""
+发送队列的优先级 + 截止时间（tools/outgoing.py）在事件循环卡顿后的表现，不需要摄像头：
+
+    python -m Python.src.test_demos.OutgoingQueue_demo
+
+一个“工作进程”线程以 60 Hz 产生 hands 帧、每 200 ms 一个 gesture_event、每 500 ms 一条 stats，
+和 Supervisor 的管道转发一样在生产时定好优先级 / 截止时间，再用 call_soon_threadsafe 交给事件循环；
+事件循环每秒被阻塞 STALL_MS。一个 WebSocket 客户端统计收到的消息：
+
+- fifo:     所有消息同一优先级、不过期（原来的行为）
+- priority: 按 MESSAGE_POLICIES（hands 50 ms 过期，手势优先且不丢，stats 最后）
+"""
+import asyncio
+import json
+import statistics
+import threading
+import time
+
+import websockets
+
+from Python.src.tools.messages.base import make_message
+from Python.src.tools.outgoing import PRIORITY_NORMAL, schedule
+from Python.src.tools.ws_bridge import WsBridge
+
+PORT = 8797
+DURATION = 5.0
+STALL_MS = 300
+HANDS_HZ = 60
+
+
+def producer(loop, bridge, stop: threading.Event, use_policies: bool) -> None:
+    def forward(msg_type, payload):
+        text = json.dumps(make_message(msg_type, payload, source="demo"))
+        if use_policies:
+            priority, deadline = schedule(msg_type)
+        else:
+            priority, deadline = PRIORITY_NORMAL, None
+        loop.call_soon_threadsafe(bridge.outgoing.put_nowait, text, priority, deadline, msg_type)
+
+    i = 0
+    period = 1.0 / HANDS_HZ
+    next_t = time.monotonic()
+    while not stop.is_set():
+        now = time.monotonic()
+        forward("hands", {"t": now, "i": i})
+        if i % (HANDS_HZ // 5) == 0:
+            forward("gesture_event", {"t": now})
+        if i % (HANDS_HZ // 2) == 0:
+            forward("stats", {"t": now})
+        i += 1
+        next_t += period
+        time.sleep(max(0.0, next_t - time.monotonic()))
+
+
+async def client(port: int, ages: dict, done: asyncio.Event) -> None:
+    async with websockets.connect(f"ws://127.0.0.1:{port}") as ws:
+        while not done.is_set():
+            try:
+                text = await asyncio.wait_for(ws.recv(), timeout=0.2)
+            except asyncio.TimeoutError:
+                continue
+            msg = json.loads(text)
+            ages.setdefault(msg["type"], []).append((time.monotonic() - msg["payload"]["t"]) * 1e3)
+
+
+async def run(port: int, use_policies: bool) -> dict:
+    bridge = WsBridge(port=port)
+    server = asyncio.create_task(bridge.run_forever())
+    await asyncio.sleep(0.2)
+
+    ages: dict = {}
+    done = asyncio.Event()
+    receiver = asyncio.create_task(client(port, ages, done))
+    await asyncio.sleep(0.2)
+
+    stop = threading.Event()
+    thread = threading.Thread(target=producer, args=(asyncio.get_running_loop(), bridge, stop, use_policies))
+    thread.start()
+    t_end = time.monotonic() + DURATION
+    while time.monotonic() < t_end:
+        await asyncio.sleep(0.7)
+        time.sleep(STALL_MS / 1e3)     # 模拟事件循环卡顿
+    stop.set()
+    thread.join()
+    await asyncio.sleep(0.3)
+    done.set()
+    await receiver
+    server.cancel()
+    try:
+        await server
+    except asyncio.CancelledError:
+        pass
+    return {"ages": ages, "queue": bridge.outgoing.stats()}
+
+
+def report(name: str, result: dict) -> None:
+    print(f"\n== {name} ==")
+    for msg_type in ("hands", "gesture_event", "stats"):
+        ages = result["ages"].get(msg_type, [])
+        if not ages:
+            print(f"{msg_type:14s} 收到 0 条")
+            continue
+        stale = sum(a > 50.0 for a in ages)
+        print(
+            f"{msg_type:14s} 收到 {len(ages):4d} 条  年龄 中位数 {statistics.median(ages):6.1f} ms  "
+            f"最大 {max(ages):6.1f} ms  超过 50 ms 的 {stale:4d} 条"
+        )
+    print("队列统计:", result["queue"])
+
+
+def main() -> None:
+    # 两次运行用不同端口（WsBridge 被取消时不主动关闭监听）
+    for k, (name, use_policies) in enumerate((("fifo", False), ("priority", True))):
+        report(name, asyncio.run(run(PORT + k, use_policies)))
+
+
+if __name__ == "__main__":
+    main()
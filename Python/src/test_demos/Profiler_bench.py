@@ -0,0 +1,115 @@
+"""
+分阶段耗时统计（tools/profiler.py）的离线检查，不需要摄像头 / 麦克风 / MediaPipe：
+
+    python -m Python.src.test_demos.Profiler_bench
+
+1) 开销：PROFILER 关闭 / 打开时每次 `with PROFILER.stage(...)` 的耗时
+2) 打开 PROFILER 跑一遍 audio_loop（合成音频，加速回放）和 hands_loop 摄像头路径的
+   预处理 + 发送阶段（合成画面，用固定耗时代替 hands.process），经过真实的 WsBridge.send_json，
+   打印各阶段的直方图统计
+"""
+import asyncio
+import json
+import time
+from time import perf_counter_ns
+
+import cv2
+
+from Python.src.app.audio_loop import audio_loop
+from Python.src.tools.audio_sources import SyntheticAudioSource
+from Python.src.tools.frame_sources import SyntheticFrameSource
+from Python.src.tools.messages.base import make_message
+from Python.src.tools.profiler import PROFILER, N_BUCKETS, bucket_upper_us
+from Python.src.tools.ws_bridge import WsBridge
+
+N_CALLS = 200_000
+
+# 与 hands_loop 的推理分辨率一致（hands_loop 依赖 mediapipe，这里不导入）
+INFER_WIDTH = 640
+INFER_HEIGHT = 360
+
+
+def bench_overhead() -> None:
+    def loop_plain():
+        t0 = perf_counter_ns()
+        for _ in range(N_CALLS):
+            pass
+        return perf_counter_ns() - t0
+
+    def loop_stage():
+        stage = PROFILER.stage
+        t0 = perf_counter_ns()
+        for _ in range(N_CALLS):
+            with stage("bench.empty"):
+                pass
+        return perf_counter_ns() - t0
+
+    base = min(loop_plain() for _ in range(3))
+    PROFILER.enabled = False
+    off = min(loop_stage() for _ in range(3))
+    PROFILER.enabled = True
+    on = min(loop_stage() for _ in range(3))
+    PROFILER.reset()
+
+    print("== 每次 with PROFILER.stage(...) 的开销 ==")
+    print(f"关闭: {(off - base) / N_CALLS:6.0f} ns")
+    print(f"打开: {(on - base) / N_CALLS:6.0f} ns")
+
+
+async def hands_camera_path(bridge: WsBridge, n_frames: int = 120) -> None:
+    """与 hands_loop 摄像头路径相同的阶段划分（hands.process 用 8 ms 的 sleep 代替）。"""
+    source = SyntheticFrameSource(n_objects=3, n_frames=n_frames, speed=None)
+    source.open()
+    frame_id = 0
+    while True:
+        with PROFILER.stage("hands.read"):
+            ok, frame = source.read()
+        if not ok:
+            break
+        with PROFILER.stage("hands.flip"):
+            frame = cv2.flip(frame, 1)
+        with PROFILER.stage("hands.resize"):
+            small = cv2.resize(frame, (INFER_WIDTH, INFER_HEIGHT))
+        with PROFILER.stage("hands.cvtColor"):
+            cv2.cvtColor(small, cv2.COLOR_BGR2RGB)
+        with PROFILER.stage("hands.process"):
+            time.sleep(0.008)
+        with PROFILER.stage("hands.build_payload"):
+            payload = {"hands": [{"landmarks": [{"x": 0.5, "y": 0.5, "z": 0.0}] * 21}]}
+        with PROFILER.stage("hands.make_message"):
+            msg = make_message("hands", payload, frame_id=frame_id, source="mediapipe_hands")
+        bridge.send_json(msg)
+        frame_id += 1
+        await asyncio.sleep(0)
+    source.release()
+
+
+async def run_pipeline() -> None:
+    bridge = WsBridge()
+    source = SyntheticAudioSource(kind="tone", frequency=440.0, amplitude=0.3, duration=5.0, speed=10.0)
+    await asyncio.gather(
+        audio_loop(bridge, source=source, vad=True, loudness=True),
+        hands_camera_path(bridge),
+    )
+
+
+def main() -> None:
+    bench_overhead()
+
+    PROFILER.enabled = True
+    PROFILER.reset()
+    asyncio.run(run_pipeline())
+
+    rows = PROFILER.snapshot()
+    print("\n== 各阶段耗时（audio_loop 5 s 合成音频 10 倍速 + hands 摄像头路径 120 帧）==")
+    print(PROFILER.format_table(rows))
+
+    process = next(r for r in rows if r["stage"] == "hands.process")
+    nonzero = [(bucket_upper_us(i), c) for i, c in enumerate(process["counts"][:N_BUCKETS - 1]) if c]
+    print("\nhands.process 直方图（桶上界 µs: 次数）:", ", ".join(f"{b:.0f}: {c}" for b, c in nonzero))
+    # stats 消息里的内容可以直接 JSON 编码
+    json.dumps(rows)
+
+
+if __name__ == "__main__":
+    main()
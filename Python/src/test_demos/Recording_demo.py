@@ -0,0 +1,187 @@
+"""
+原始输入录制 / 回放（tools/recording.py）的检查，不需要摄像头 / 麦克风：
+
+    python -m Python.src.test_demos.Recording_demo [--seconds 3]
+
+1) 录制：FrameHub（合成画面，包一层 RecordingFrameSource）+ motion_loop + audio_loop（合成音频，record_dir）
+   实时跑 --seconds 秒，写进临时目录
+2) 采集线程上的开销：RecordingFrameSource.read 相比原输入多出的耗时（写盘在后台线程）
+3) 逐帧 / 逐样本比对：回放源读出的内容与同一 seed 重新生成的合成输入完全相同，timestamp 也相同
+4) 按录制时刻回放（speed=1.0）：每帧的回放时刻与录制时的采集时刻之差，音视频起点是否对齐
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+import numpy as np
+
+from Python.src.app.audio_loop import audio_loop
+from Python.src.app.motion_loop import motion_loop
+from Python.src.tools.audio_sources import SyntheticAudioSource
+from Python.src.tools.frame_graph import FrameHub
+from Python.src.tools.frame_sources import SyntheticFrameSource
+from Python.src.tools.recording import (
+    AUDIO,
+    VIDEO,
+    RecordedAudioSource,
+    RecordedFrameSource,
+    RecordingFrameSource,
+    load_meta,
+    recording_origin,
+)
+
+WIDTH, HEIGHT, FPS = 640, 360, 30.0
+SAMPLE_RATE = 48000
+
+
+class NullBridge:
+    def send_json(self, obj, **kwargs) -> None:
+        pass
+
+
+def frame_source(seconds: float) -> SyntheticFrameSource:
+    return SyntheticFrameSource(width=WIDTH, height=HEIGHT, fps=FPS, n_frames=int(seconds * FPS), speed=1.0, seed=1)
+
+
+def audio_source(seconds: float) -> SyntheticAudioSource:
+    return SyntheticAudioSource(kind="noise", sample_rate=SAMPLE_RATE, amplitude=0.2, duration=seconds, seed=1)
+
+
+async def record(directory: str, seconds: float) -> None:
+    hub = FrameHub(RecordingFrameSource(frame_source(seconds), directory, segment_frames=32))
+    bridge = NullBridge()
+    await asyncio.gather(
+        hub.run(),
+        motion_loop(bridge, frames=hub),
+        audio_loop(bridge, source=audio_source(seconds), record_dir=directory),
+    )
+
+
+def capture_overhead(directory: str, n: int = 90) -> tuple:
+    """同一合成输入直接读 / 经 RecordingFrameSource 读，每帧耗时（不限速）。"""
+    def per_read(source) -> list:
+        source.open()
+        times = []
+        for _ in range(n):
+            t = time.perf_counter()
+            source.read()
+            times.append((time.perf_counter() - t) * 1e3)
+        source.release()
+        return times
+
+    plain = SyntheticFrameSource(width=WIDTH, height=HEIGHT, fps=FPS, n_frames=n, seed=1)
+    recording = RecordingFrameSource(
+        SyntheticFrameSource(width=WIDTH, height=HEIGHT, fps=FPS, n_frames=n, seed=1), directory,
+    )
+    return per_read(plain), per_read(recording)
+
+
+def compare_frames(directory: str, seconds: float) -> None:
+    replay = RecordedFrameSource(directory, speed=None)
+    replay.open()
+    reference = frame_source(seconds)
+    reference.speed = None
+    reference.open()
+    n = mismatched = 0
+    while True:
+        ok, frame = replay.read()
+        if not ok:
+            break
+        _, expected = reference.read()
+        if not (np.array_equal(frame, expected) and replay.timestamp == reference.timestamp):
+            mismatched += 1
+        n += 1
+    print(f"视频: 录到 {n} 帧（{int(seconds * FPS)} 帧输入），与重新生成的输入不一致 {mismatched} 帧")
+
+
+def compare_audio(directory: str, seconds: float) -> None:
+    replay = RecordedAudioSource(directory)
+    recorded = replay._next_block(replay.total_samples)
+    expected = audio_source(seconds)._next_block(int(seconds * SAMPLE_RATE))
+    same = recorded is not None and np.array_equal(recorded, expected)
+    print(f"音频: 录到 {replay.total_samples} 样本（{len(expected)} 样本输入），逐样本相同: {same}")
+
+
+async def replay_timing(directory: str) -> None:
+    """speed=1.0 回放：帧源在线程里读，音频源推块；记录各自相对回放起点的时刻。"""
+    loop = asyncio.get_running_loop()
+    origin = recording_origin(directory)
+    frames = RecordedFrameSource(directory, speed=1.0, origin=origin)
+    audio = RecordedAudioSource(directory, speed=1.0, origin=origin)
+    first_block = loop.create_future()
+
+    def on_block(indata, n, time_info, status) -> None:
+        if not first_block.done():
+            loop.call_soon_threadsafe(lambda: first_block.done() or first_block.set_result(time.monotonic()))
+
+    def read_all() -> list:
+        frames.open()
+        times = []
+        while True:
+            ok, _ = frames.read()
+            if not ok:
+                return times
+            times.append(time.monotonic() - frames._start)
+
+    t0 = time.monotonic()
+    audio.start(on_block, 480)
+    reads = loop.run_in_executor(None, read_all)
+    replay_times = await reads
+    t_audio = await first_block
+    audio.stop()
+
+    # 录制时的采集时刻（相对 origin）
+    capture = []
+    for frames_path, index_path in sorted(
+        (os.path.join(directory, f), os.path.join(directory, f.replace(".frames.", ".index.")))
+        for f in os.listdir(directory) if f.startswith(VIDEO) and f.endswith(".frames.npy")
+    ):
+        index = np.load(index_path)
+        capture.extend(index[~np.isnan(index[:, 1]), 1] - origin)
+    errors = [abs(r - c) * 1e3 for r, c in zip(replay_times, capture)]
+    print(
+        f"按录制时刻回放 {len(errors)} 帧: 与录制时采集时刻之差 中位数 {statistics.median(errors):.2f} ms，"
+        f"最大 {max(errors):.2f} ms"
+    )
+    audio_start = RecordedAudioSource(directory, origin=origin)._lead
+    print(
+        f"音频: 录制时从起点后 {audio_start * 1e3:.1f} ms 开始，回放的第一块（10 ms）"
+        f"应在 {audio_start * 1e3 + 10:.1f} ms 到达，实际 {(t_audio - t0) * 1e3:.1f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = os.path.join(tmp, "session")
+        t = time.perf_counter()
+        asyncio.run(record(directory, args.seconds))
+        print(f"== 录制 {time.perf_counter() - t:.1f} s -> {directory} ==")
+        print("video.json:", load_meta(directory, VIDEO))
+        print("audio.json:", load_meta(directory, AUDIO))
+        for name in sorted(os.listdir(directory)):
+            path = os.path.join(directory, name)
+            print(f"  {name:24s} 逻辑大小 {os.path.getsize(path) / 1e6:7.1f} MB  "
+                  f"实际占用 {os.stat(path).st_blocks * 512 / 1e6:7.1f} MB")
+
+        plain, recording = capture_overhead(os.path.join(tmp, "overhead"))
+        print(
+            f"\n采集线程每帧耗时: 原输入 中位数 {statistics.median(plain):.3f} ms，"
+            f"录制 {statistics.median(recording):.3f} ms（写盘在后台线程）"
+        )
+
+        print()
+        compare_frames(directory, args.seconds)
+        compare_audio(directory, args.seconds)
+        print()
+        asyncio.run(replay_timing(directory))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+启动耗时（tools/startup.py）的检查，不需要摄像头 / 麦克风：
+
+    python -m Python.src.test_demos.Startup_demo
+
+1) 在新进程里 import Python.src.main：耗时，以及 cv2 / mediapipe 是否被提前导入
+   （两者都应推迟到视觉 loop 真正启动时）
+2) 按 main.py 的方式启动 WsBridge + FrameHub（合成画面）+ motion_loop + audio_loop（合成音频），
+   装了 mediapipe 时再加上 hands_loop（真实的模型加载 + 预热推理）；
+   一个 WebSocket 客户端记录收到 ready 消息和各类第一条消息的时刻，
+   最后打印各初始化阶段（哪些在线程池里重叠）和 time-to-first-message
+"""
+import argparse
+import asyncio
+import importlib.util
+import json
+import subprocess
+import sys
+import time
+
+import websockets
+
+from Python.src.app.audio_loop import audio_loop
+from Python.src.app.motion_loop import motion_loop
+from Python.src.tools.audio_sources import SyntheticAudioSource
+from Python.src.tools.frame_graph import FrameHub
+from Python.src.tools.frame_sources import SyntheticFrameSource
+from Python.src.tools.startup import STARTUP
+from Python.src.tools.ws_bridge import WsBridge
+
+PORT = 8798
+
+_IMPORT_PROBE = (
+    "import sys, time\n"
+    "t = time.perf_counter()\n"
+    "import Python.src.main\n"
+    "print((time.perf_counter() - t) * 1e3, 'cv2' in sys.modules, 'mediapipe' in sys.modules)\n"
+)
+
+
+def check_import() -> None:
+    out = subprocess.run([sys.executable, "-c", _IMPORT_PROBE], capture_output=True, text=True, check=True)
+    ms, cv2_loaded, mp_loaded = out.stdout.split()
+    print("== import Python.src.main（新进程）==")
+    print(f"耗时 {float(ms):.0f} ms, cv2 已导入: {cv2_loaded}, mediapipe 已导入: {mp_loaded}")
+
+
+async def client(received: dict, kinds: set) -> None:
+    """连上桥后记录每类消息第一次到达的时刻（相对 STARTUP 起点）。"""
+    while True:
+        try:
+            ws = await websockets.connect(f"ws://127.0.0.1:{PORT}")
+            break
+        except OSError:
+            await asyncio.sleep(0.01)
+    async with ws:
+        async for text in ws:
+            msg_type = json.loads(text).get("type")
+            received.setdefault(msg_type, STARTUP.elapsed())
+            if kinds <= received.keys():
+                return
+
+
+async def run_pipeline(frame_source: SyntheticFrameSource, with_hands: bool) -> dict:
+    bridge = WsBridge(port=PORT)
+    STARTUP.bridge = bridge
+    STARTUP.expect("bridge", "camera", "audio")
+
+    hub = FrameHub(frame_source)
+    loops = [
+        bridge.run_forever(),
+        hub.run(),
+        motion_loop(bridge, frames=hub),
+        audio_loop(bridge, source=SyntheticAudioSource(kind="tone", frequency=440.0, amplitude=0.3)),
+    ]
+    kinds = {"ready", "audio_level", "motion"}
+    if with_hands:
+        from Python.src.app.hands_loop import hands_loop
+
+        STARTUP.expect("hands")
+        loops.append(hands_loop(bridge, frames=hub))
+        kinds.add("hands")
+
+    received: dict = {}
+    pipeline = asyncio.ensure_future(asyncio.gather(*loops))
+    try:
+        await asyncio.wait_for(client(received, kinds), timeout=30.0)
+    finally:
+        hub.stop()
+        pipeline.cancel()
+        try:
+            await pipeline
+        except asyncio.CancelledError:
+            pass
+    return received
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--no-import-check", action="store_true", help="跳过新进程 import 检查")
+    args = parser.parse_args()
+
+    if not args.no_import_check:
+        check_import()
+
+    with_hands = importlib.util.find_spec("mediapipe") is not None
+    # 合成画面在构造时预先渲染（约 0.5 s），它只是摄像头的替身，不计入启动时间
+    frame_source = SyntheticFrameSource(n_objects=3, speed=1.0)
+    STARTUP.begin()
+    t0 = time.perf_counter()
+    received = asyncio.run(run_pipeline(frame_source, with_hands))
+    wall = time.perf_counter() - t0
+
+    print("\n== 启动阶段 ==" + ("" if with_hands else "（未安装 mediapipe，跳过 hands_loop）"))
+    print(STARTUP.format_phases())
+    print(f"\ntime-to-ready: {STARTUP.ready_at:.3f} s")
+    print("time-to-first-message（排队时刻 / 客户端收到时刻）:")
+    queued = STARTUP.first_messages()
+    for kind in sorted(received, key=received.get):
+        q = queued.get(kind)
+        print(f"  {kind:14s} {q if q is not None else float('nan'):7.3f} s  {received[kind]:7.3f} s")
+    print(f"总耗时 {wall:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+多进程 Supervisor（tools/process_supervisor.py）的离线演示，不需要摄像头 / 麦克风 / Unity：
+
+    python -m Python.src.test_demos.Supervisor_demo
+
+三个工作进程：
+- motion:  在合成画面上跑 motion_loop（真实的 OpenCV 负载，循环播放）
+- ticker:  每 10 ms 发一条带 trace 的消息（检查 trace 字段跨进程保留）
+- crasher: 运行 1 s 后抛异常（检查指数退避重启）
+运行 DURATION 秒后打印每个进程的消息数、重启次数、CPU 占用和 RSS。
+"""
+import asyncio
+import json
+import logging
+import time
+from collections import Counter
+
+from Python.src.app.motion_loop import motion_loop
+from Python.src.tools.frame_sources import SyntheticFrameSource
+from Python.src.tools.messages.base import make_message
+from Python.src.tools.outgoing import OutgoingQueue
+from Python.src.tools.process_supervisor import Supervisor, WorkerSpec
+
+DURATION = 8.0
+
+
+class QueueBridge:
+    """只有 outgoing 队列的 WsBridge 替身（Supervisor 只往这里排队）。"""
+
+    def __init__(self):
+        self.outgoing = OutgoingQueue()
+
+
+async def motion_worker(bridge):
+    source = SyntheticFrameSource(n_objects=3, n_frames=300, fps=30, speed=1.0)
+    while True:
+        await motion_loop(bridge, source=source)
+
+
+async def ticker_worker(bridge):
+    i = 0
+    while True:
+        bridge.send_json(make_message("tick", {"i": i}, frame_id=i, source="ticker", trace={"capture": time.monotonic()}))
+        i += 1
+        await asyncio.sleep(0.01)
+
+
+async def crasher_worker(bridge):
+    bridge.send_json(make_message("hello", {}, source="crasher"))
+    await asyncio.sleep(1.0)
+    raise RuntimeError("故意崩溃")
+
+
+async def drain(bridge, counts, traced):
+    while True:
+        item = await bridge.outgoing.get()
+        if isinstance(item, str):
+            counts[json.loads(item)["type"]] += 1
+        else:
+            body, trace = item
+            counts[json.loads(body)["type"]] += 1
+            traced.append(trace)
+
+
+async def run():
+    bridge = QueueBridge()
+    supervisor = Supervisor(
+        bridge,
+        [
+            WorkerSpec("motion", motion_worker),
+            WorkerSpec("ticker", ticker_worker),
+            WorkerSpec("crasher", crasher_worker),
+        ],
+        restart_delay=0.5,
+        stats_interval=1.0,
+        report_interval=4.0,
+    )
+    counts, traced = Counter(), []
+    drainer = asyncio.create_task(drain(bridge, counts, traced))
+    task = asyncio.create_task(supervisor.run())
+    await asyncio.sleep(DURATION)
+    stats = supervisor.stats()
+    task.cancel()
+    drainer.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+
+    print(f"\n== {DURATION:.0f} s 后 ==")
+    print("消息类型计数:", dict(counts))
+    for w in stats:
+        print(
+            f"{w['name']:8s} pid={w['pid']} alive={w['alive']} restarts={w['restarts']} "
+            f"msgs={w['messages']} cpu={w['cpu_percent']}% rss={w['rss_mb']} MB"
+        )
+    if traced:
+        lat = sorted(t["enqueue"] - t["capture"] for t in traced)
+        print(f"trace 消息 {len(traced)} 条，capture -> enqueue 中位数 {lat[len(lat) // 2] * 1e3:.3f} ms")
+    crasher = next(w for w in stats if w["name"] == "crasher")
+    # 退避 0.5 + 1 + 2 s，再加每次 1 s 的运行时间：8 s 内应重启 3 次左右
+    assert crasher["restarts"] >= 2, crasher
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(name)s: %(message)s")
+    asyncio.run(run())
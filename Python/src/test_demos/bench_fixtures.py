@@ -0,0 +1,74 @@
+"""
+基准脚本共用的可复现输入（不需要摄像头 / 麦克风 / MediaPipe）：
+
+- fake_hand_results: 模拟 MediaPipe Hands 的 results（multi_hand_landmarks / multi_handedness）
+- random_boxes / random_track_fixture: 运动检测框与逐帧检测序列
+- audio_frames: (n, window) 的音频帧（正弦 + 底噪）
+"""
+import random
+from types import SimpleNamespace
+
+import numpy as np
+
+
+def _f32(v):
+    # MediaPipe 的 landmark 在 protobuf 中是 float32，这里模拟同样的精度
+    return float(np.float32(v))
+
+
+def fake_hand_results(n_hands=2, seed=0):
+    """与 hands.process() 返回值结构相同；n_hands=0 时两个字段都是 None（与 MediaPipe 一致）。"""
+    if n_hands == 0:
+        return SimpleNamespace(multi_hand_landmarks=None, multi_handedness=None)
+    rnd = random.Random(seed)
+    lm_list, hd_list = [], []
+    for h in range(n_hands):
+        points = [
+            SimpleNamespace(x=_f32(rnd.random()), y=_f32(rnd.random()), z=_f32(rnd.uniform(-0.1, 0.1)))
+            for _ in range(21)
+        ]
+        lm_list.append(SimpleNamespace(landmark=points))
+        cls = SimpleNamespace(label="Left" if h == 0 else "Right", score=rnd.uniform(0.8, 1.0))
+        hd_list.append(SimpleNamespace(classification=[cls]))
+    return SimpleNamespace(multi_hand_landmarks=lm_list, multi_handedness=hd_list)
+
+
+def random_boxes(rng, n):
+    """n 个 (x, y, w, h) 框；画布随框数增大，保持大致相同的密度（部分框互相重叠）。"""
+    side = int(120 * np.sqrt(n)) + 200
+    xy = rng.integers(0, side, size=(n, 2))
+    wh = rng.integers(20, 80, size=(n, 2))
+    return [tuple(map(int, b)) for b in np.hstack([xy, wh])]
+
+
+def random_track_fixture(seed, n_objects, n_frames=200, fps=30.0):
+    """随机检测序列 [(t, [box, ...]), ...]：目标匀速移动 + 尺寸抖动 + 10% 漏检 + 少量误检。"""
+    rng = np.random.default_rng(seed)
+    size = rng.integers(30, 90, size=(n_objects, 2))
+    pos = rng.uniform(0, 1000, size=(n_objects, 2))
+    vel = rng.uniform(-120, 120, size=(n_objects, 2))
+    frames = []
+    for k in range(n_frames):
+        t = k / fps
+        boxes = []
+        for i in range(n_objects):
+            if rng.random() < 0.1:
+                continue
+            jitter = rng.integers(-3, 4, size=4)
+            x, y = (pos[i] + vel[i] * t).astype(int) + jitter[:2]
+            w, h = size[i] + jitter[2:]
+            boxes.append((int(x), int(y), int(w), int(h)))
+        for _ in range(rng.poisson(0.5)):
+            x, y = rng.integers(0, 1000, size=2)
+            boxes.append((int(x), int(y), 40, 40))
+        order = rng.permutation(len(boxes))
+        frames.append((t, [boxes[i] for i in order]))
+    return frames
+
+
+def audio_frames(n=1, window=2400, sample_rate=48000, frequency=440.0, amplitude=0.3, seed=0):
+    """(n, window) float32 音频帧：正弦 + 底噪，相邻帧在时间上连续。"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(n * window) / sample_rate
+    x = amplitude * np.sin(2 * np.pi * frequency * t) + 0.005 * rng.standard_normal(n * window)
+    return x.astype(np.float32).reshape(n, window)
@@ -0,0 +1,100 @@
+"""
+端到端延迟参考客户端：
+
+- 周期发送 clock_ping，用 ClockOffsetEstimator 估计服务端与本机的时钟偏移；
+- 读取带 trace 字段的消息（hands_loop / audio_loop 需以 trace=True 启动）；
+- 每秒打印各阶段延迟的 p50 / p99（毫秒）。
+
+阶段划分：
+    capture -> infer_start   等待推理
+    infer_start -> infer_end 推理 / 分析
+    infer_end -> enqueue     构造 payload / 消息
+    enqueue -> send          发送队列排队
+    send -> recv             网络 + 客户端接收（需时钟偏移）
+    capture -> recv          总延迟（需时钟偏移）
+
+运行：
+    python -m Python.src.test_demos.latency_client [ws://127.0.0.1:8765]
+"""
+import asyncio
+import json
+import sys
+import time
+from collections import defaultdict, deque
+
+import numpy as np
+import websockets
+
+from Python.src.tools.clock_sync import CLOCK_PONG, ClockOffsetEstimator, make_clock_ping
+
+PING_INTERVAL = 0.5
+REPORT_INTERVAL = 1.0
+WINDOW = 600   # 每个阶段保留的最近样本数
+
+STAGES = (
+    ("wait", "capture", "infer_start"),
+    ("infer", "infer_start", "infer_end"),
+    ("build", "infer_end", "enqueue"),
+    ("queue", "enqueue", "send"),
+)
+
+
+async def pinger(ws):
+    while True:
+        await ws.send(json.dumps(make_clock_ping(time.monotonic())))
+        await asyncio.sleep(PING_INTERVAL)
+
+
+def report(samples, clock):
+    offset = clock.offset
+    head = "offset n/a" if offset is None else f"offset {offset * 1e3:+.2f} ms (rtt {clock.delay * 1e3:.2f} ms)"
+    print(f"--- {head}")
+    for key in sorted(samples):
+        arr = np.fromiter(samples[key], dtype=np.float64)
+        if arr.size == 0:
+            continue
+        p50, p99 = np.percentile(arr, [50, 99]) * 1e3
+        print(f"  {key:<16} p50 {p50:7.2f} ms   p99 {p99:7.2f} ms   n={arr.size}")
+
+
+async def main(uri):
+    clock = ClockOffsetEstimator()
+    samples = defaultdict(lambda: deque(maxlen=WINDOW))
+
+    async with websockets.connect(uri) as ws:
+        print("✅ 已连接到服务器", uri)
+        ping_task = asyncio.create_task(pinger(ws))
+        last_report = time.monotonic()
+        try:
+            async for text in ws:
+                t_recv = time.monotonic()
+                msg = json.loads(text)
+
+                if msg.get("type") == CLOCK_PONG:
+                    clock.add_sample(msg["t0"], msg["t1"], msg["t2"], t_recv)
+                    continue
+
+                trace = msg.get("trace")
+                if trace:
+                    kind = msg.get("type", "?")
+                    for name, a, b in STAGES:
+                        if a in trace and b in trace:
+                            samples[f"{kind}.{name}"].append(trace[b] - trace[a])
+
+                    # 需要时钟偏移才能跨进程比较
+                    if "send" in trace and clock.offset is not None:
+                        samples[f"{kind}.network"].append(t_recv - clock.to_local(trace["send"]))
+                        samples[f"{kind}.total"].append(t_recv - clock.to_local(trace["capture"]))
+
+                if t_recv - last_report >= REPORT_INTERVAL:
+                    report(samples, clock)
+                    last_report = t_recv
+        finally:
+            ping_task.cancel()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main(sys.argv[1] if len(sys.argv) > 1 else "ws://127.0.0.1:8765"))
+    except KeyboardInterrupt:
+        print("退出 latency_client")
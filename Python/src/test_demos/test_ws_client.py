@@ -1,17 +1,27 @@
+"""
+最简单的桥客户端：连上后打印收到的消息（用 client/bridge_client.py，断线自动重连）。
+
+    python -m Python.src.test_demos.test_ws_client [ws://127.0.0.1:8765]
+"""
 import asyncio
-import websockets
+import sys
+
+from Python.src.client.bridge_client import DEFAULT_URI, BridgeClient
+
 
-async def main():
-    uri = "ws://127.0.0.1:8765"
-    async with websockets.connect(uri) as ws:
-        print("✅ 已连接到服务器")
-        # 接收几条消息看看
-        for _ in range(5):
-            msg = await ws.recv()
-            print("收到:", msg)
+async def main(uri: str) -> None:
+    async with BridgeClient(uri) as client:
+        await client.wait_connected()
+        print("✅ 已连接到服务器", uri)
+        async for msg in client:
+            if msg.type == "hands" and msg.data is not None:
+                print(f"收到 hands #{msg.frame_id}: {msg.data.labels}, landmarks {msg.data.landmarks.shape}")
+            else:
+                print(f"收到 {msg.type} #{msg.frame_id}: {str(msg.payload)[:100]}")
 
-        # 也可以发一条消息回去
-        await ws.send("hello from client")
-        print("已发送一条测试消息")
 
-asyncio.run(main())
+if __name__ == "__main__":
+    try:
+        asyncio.run(main(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_URI))
+    except KeyboardInterrupt:
+        print("退出 test_ws_client")
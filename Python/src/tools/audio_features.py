@@ -0,0 +1,196 @@
+# Python/src/tools/audio_features.py
+from __future__ import annotations
+
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+
+def hz_to_mel(f: np.ndarray | float) -> np.ndarray:
+    return 2595.0 * np.log10(1.0 + np.asarray(f, dtype=np.float64) / 700.0)
+
+
+def mel_to_hz(m: np.ndarray | float) -> np.ndarray:
+    return 700.0 * (10.0 ** (np.asarray(m, dtype=np.float64) / 2595.0) - 1.0)
+
+
+def mel_filterbank(
+    n_bands: int,
+    n_fft: int,
+    sample_rate: int,
+    fmin: float = 40.0,
+    fmax: Optional[float] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    三角形 mel 滤波器组。
+
+    返回 (fb, edges)：
+    - fb:    (n_bands, n_fft // 2 + 1) float32 矩阵，功率谱 @ fb.T 即得各频带能量
+    - edges: (n_bands + 2,) 各三角形的边界频率（Hz）
+    """
+    fmax = fmax or sample_rate / 2.0
+    freqs = np.fft.rfftfreq(n_fft, 1.0 / sample_rate)
+    edges = mel_to_hz(np.linspace(hz_to_mel(fmin), hz_to_mel(fmax), n_bands + 2))
+
+    lo = edges[:-2, None]
+    mid = edges[1:-1, None]
+    hi = edges[2:, None]
+    rising = (freqs[None, :] - lo) / np.maximum(mid - lo, 1e-9)
+    falling = (hi - freqs[None, :]) / np.maximum(hi - mid, 1e-9)
+    fb = np.maximum(0.0, np.minimum(rising, falling))
+
+    # 频带太窄、落不到任何 bin 上时，至少给它最近的一个 bin，避免出现恒为 0 的频带
+    empty = fb.sum(axis=1) == 0
+    if empty.any():
+        nearest = np.abs(freqs[None, :] - mid[empty]).argmin(axis=1)
+        fb[np.nonzero(empty)[0], nearest] = 1.0
+
+    return fb.astype(np.float32), edges
+
+
+class SpectralAnalyzer:
+    """
+    向量化的逐帧频谱分析。窗函数、mel 滤波器组、频率轴都在构造时预先算好，
+    process() 一次处理一批帧 (n_frames, frame_size)，全部是矩阵运算：
+
+    - rfft 幅度谱（补零到 2 * frame_size，同时用于自相关求基频）
+    - log-mel 频带能量（dB）
+    - 谱质心（Hz）与谱通量（对数幅度谱的半波整流增量）
+    - 起音检测：谱通量超过最近历史中位数的 onset_ratio 倍（并有最短间隔）
+    - 基频：功率谱逆变换得到自相关，在 [pitch_min, pitch_max] 对应的延迟范围内找峰
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        frame_size: int,
+        n_bands: int = 24,
+        fmin: float = 40.0,
+        fmax: Optional[float] = None,
+        pitch_min: float = 60.0,
+        pitch_max: float = 1000.0,
+        pitch_min_confidence: float = 0.3,
+        flux_compression: float = 100.0,
+        onset_ratio: float = 2.0,
+        onset_min_flux: float = 0.05,
+        onset_min_interval: int = 3,
+        flux_history: int = 32,
+    ) -> None:
+        self.sample_rate = sample_rate
+        self.frame_size = frame_size
+        self.n_fft = 2 * frame_size
+
+        self.window = np.hanning(frame_size).astype(np.float32)
+        self.freqs = np.fft.rfftfreq(self.n_fft, 1.0 / sample_rate).astype(np.float32)
+        self.mel_fb, self.band_edges = mel_filterbank(n_bands, self.n_fft, sample_rate, fmin, fmax)
+
+        # 自相关的延迟搜索范围（样本数）
+        self._lag_min = max(2, int(sample_rate / pitch_max))
+        self._lag_max = min(frame_size - 2, int(sample_rate / pitch_min))
+        self.pitch_min_confidence = pitch_min_confidence
+
+        # 起音检测状态
+        self.flux_compression = flux_compression
+        self.onset_ratio = onset_ratio
+        self.onset_min_flux = onset_min_flux
+        self.onset_min_interval = onset_min_interval
+        self._flux_hist = np.zeros(flux_history, dtype=np.float32)
+        self._flux_count = 0
+        self._since_onset = onset_min_interval
+
+        # 谱通量需要上一帧的（对数压缩）幅度谱
+        self._prev_mag: Optional[np.ndarray] = None
+
+    @property
+    def n_bands(self) -> int:
+        return self.mel_fb.shape[0]
+
+    def reset(self) -> None:
+        self._prev_mag = None
+        self._flux_count = 0
+        self._since_onset = self.onset_min_interval
+
+    def process(self, frames: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        分析一批帧。frames 形状为 (frame_size,) 或 (n_frames, frame_size)。
+
+        返回 dict，每个值的第一维都是 n_frames：
+        rms, dbfs, bands_db (n, n_bands), centroid_hz, flux, onset (bool),
+        pitch_hz（无明显基频时为 0）, pitch_confidence
+        """
+        x = np.atleast_2d(np.asarray(frames, dtype=np.float32))
+        n = x.shape[0]
+
+        # ---- 电平 ----
+        rms = np.sqrt(np.mean(np.square(x, dtype=np.float64), axis=1))
+        rms = np.maximum(rms, 1e-8)
+        dbfs = 20.0 * np.log10(rms)
+
+        # ---- 频谱 ----
+        spec = np.fft.rfft(x * self.window, n=self.n_fft, axis=1)
+        power = spec.real ** 2 + spec.imag ** 2
+        mag = np.sqrt(power)
+
+        bands = power @ self.mel_fb.T
+        bands_db = 10.0 * np.log10(np.maximum(bands, 1e-12))
+
+        mag_sum = mag.sum(axis=1)
+        centroid = (mag @ self.freqs) / np.maximum(mag_sum, 1e-12)
+
+        # ---- 谱通量：相邻帧对数压缩幅度谱的正向增量（按 bin 平均） ----
+        log_mag = np.log1p(self.flux_compression * mag)
+        prev = log_mag[:1] if self._prev_mag is None else self._prev_mag[None, :]
+        diff = np.diff(np.concatenate([prev, log_mag], axis=0), axis=0)
+        flux = np.maximum(diff, 0.0).mean(axis=1)
+        self._prev_mag = log_mag[-1].copy()
+
+        onset = self._detect_onsets(flux)
+
+        # ---- 基频：功率谱 -> 自相关 ----
+        ac = np.fft.irfft(power, n=self.n_fft, axis=1)[:, : self._lag_max + 2]
+        energy = np.maximum(ac[:, 0], 1e-12)
+        search = ac[:, self._lag_min:self._lag_max + 1]
+        peak = search.argmax(axis=1)
+        lag = peak + self._lag_min
+        rows = np.arange(n)
+        confidence = search[rows, peak] / energy
+
+        # 抛物线插值得到亚样本精度的延迟
+        y0 = ac[rows, lag - 1]
+        y1 = ac[rows, lag]
+        y2 = ac[rows, lag + 1]
+        denom = y0 - 2.0 * y1 + y2
+        with np.errstate(divide="ignore", invalid="ignore"):
+            shift = np.where(np.abs(denom) > 1e-12, 0.5 * (y0 - y2) / denom, 0.0)
+        pitch = self.sample_rate / (lag + np.clip(shift, -0.5, 0.5))
+        voiced = confidence >= self.pitch_min_confidence
+        pitch = np.where(voiced, pitch, 0.0)
+
+        return {
+            "rms": rms,
+            "dbfs": dbfs,
+            "bands_db": bands_db,
+            "centroid_hz": centroid,
+            "flux": flux,
+            "onset": onset,
+            "pitch_hz": pitch,
+            "pitch_confidence": confidence,
+        }
+
+    def _detect_onsets(self, flux: np.ndarray) -> np.ndarray:
+        # 批内帧数很少（通常 1~10），逐帧维护历史即可
+        onset = np.zeros(flux.shape[0], dtype=bool)
+        size = self._flux_hist.shape[0]
+        for i, f in enumerate(flux):
+            filled = min(self._flux_count, size)
+            baseline = float(np.median(self._flux_hist[:filled])) if filled else 0.0
+            threshold = max(self.onset_min_flux, baseline * self.onset_ratio)
+
+            self._since_onset += 1
+            if filled >= self.onset_min_interval and f > threshold and self._since_onset >= self.onset_min_interval:
+                onset[i] = True
+                self._since_onset = 0
+
+            self._flux_hist[self._flux_count % size] = f
+            self._flux_count += 1
+        return onset
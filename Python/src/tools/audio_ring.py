@@ -0,0 +1,242 @@
+# Python/src/tools/audio_ring.py
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import AsyncIterator, Optional
+
+import numpy as np
+
+from Python.src.tools.profiler import PROFILER
+
+
+logger = logging.getLogger(__name__)
+
+
+class AudioRingBuffer:
+    """
+    单生产者 / 单消费者的无锁音频环形缓冲区（单声道 float32）。
+
+    - 生产者（音频回调线程）只写 _write_pos，消费者（事件循环）只写 _read_pos，
+      两个计数器都是单调递增的总样本数，CPython 下整数赋值是原子的，不需要锁；
+    - 存储区长度是 2 * capacity，每个样本同时写入 i 和 i + capacity 两处（镜像），
+      因此任意长度 <= capacity 的区间都是连续内存，peek / latest 返回的都是零拷贝视图；
+    - 缓冲区满时丢弃新到的整块数据并计数（生产者不能移动读指针）。
+    """
+
+    def __init__(self, capacity: int) -> None:
+        if capacity <= 0:
+            raise ValueError("capacity 必须为正数")
+        self.capacity = capacity
+        self._buf = np.zeros(2 * capacity, dtype=np.float32)
+        self._write_pos = 0
+        self._read_pos = 0
+
+        # 因缓冲区满而丢弃的块数 / 样本数
+        self.dropped_blocks = 0
+        self.dropped_samples = 0
+
+    # ---------- 生产者侧（音频线程） ----------
+
+    def write(self, samples: np.ndarray) -> bool:
+        """写入一块样本；空间不足时整块丢弃并返回 False。"""
+        n = len(samples)
+        w = self._write_pos
+        if n > self.capacity - (w - self._read_pos):
+            self.dropped_blocks += 1
+            self.dropped_samples += n
+            return False
+
+        cap = self.capacity
+        start = w % cap
+        first = min(n, cap - start)
+        # 主区 + 镜像区
+        self._buf[start:start + first] = samples[:first]
+        self._buf[start + cap:start + cap + first] = samples[:first]
+        if first < n:
+            rest = n - first
+            self._buf[:rest] = samples[first:]
+            self._buf[cap:cap + rest] = samples[first:]
+
+        # 数据写完后再发布写指针
+        self._write_pos = w + n
+        return True
+
+    # ---------- 消费者侧（事件循环） ----------
+
+    def available(self) -> int:
+        """尚未被消费的样本数。"""
+        return self._write_pos - self._read_pos
+
+    def peek(self, n: int) -> np.ndarray:
+        """返回从读指针开始 n 个样本的只读视图（不移动读指针）。"""
+        if n > self.available():
+            raise ValueError(f"可读样本不足: 需要 {n}, 只有 {self.available()}")
+        start = self._read_pos % self.capacity
+        view = self._buf[start:start + n]
+        view.flags.writeable = False
+        return view
+
+    def frames(self, window: int, hop: int, max_frames: Optional[int] = None) -> np.ndarray:
+        """
+        从读指针开始，按 (window, hop) 切出尽可能多的重叠帧，返回 (n, window) 的只读跨步视图。
+        不拷贝任何数据；可读样本不足一个 window 时返回 (0, window) 的空数组。
+        调用方处理完后应 advance(n * hop)。
+        """
+        if window > self.capacity:
+            raise ValueError("window 不能超过环形缓冲区容量")
+        avail = self.available()
+        if avail < window:
+            return np.empty((0, window), dtype=np.float32)
+
+        n = (avail - window) // hop + 1
+        # 跨步视图覆盖的样本总数不能超过容量（超过就不再是连续内存）
+        n = min(n, (self.capacity - window) // hop + 1)
+        if max_frames is not None:
+            n = min(n, max_frames)
+
+        start = self._read_pos % self.capacity
+        region = self._buf[start:start + (n - 1) * hop + window]
+        item = region.itemsize
+        return np.lib.stride_tricks.as_strided(
+            region,
+            shape=(n, window),
+            strides=(hop * item, item),
+            writeable=False,
+        )
+
+    def advance(self, n: int) -> None:
+        """消费 n 个样本（移动读指针）。"""
+        if n > self.available():
+            raise ValueError(f"可读样本不足: 需要 {n}, 只有 {self.available()}")
+        self._read_pos += n
+
+
+class AudioBlockReader:
+    """
+    把 sounddevice 的回调流接到 asyncio：
+
+    - callback(...) 直接作为 sd.InputStream(callback=...) 使用，在音频线程里把数据写进环形缓冲区，
+      凑够一个块时通过 loop.call_soon_threadsafe 唤醒事件循环（同一时间最多挂一个唤醒）；
+    - blocks(block_size) 是异步生成器，按块产出环形缓冲区的零拷贝视图；
+      windows(window, hop) 则按“窗长 / 跳步”产出一批重叠帧的跨步视图 (n, window)。
+      视图在下一次迭代前都有效，因此分析可以放进线程池里做，不阻塞事件循环。
+
+    统计：
+    - overflows:      设备报告的输入溢出次数（status.input_overflow）
+    - dropped_blocks: 消费太慢导致环形缓冲区满而丢弃的块数
+
+    有限长度的输入（WAV 文件等）结束时调用 close_threadsafe()，
+    剩余数据不足一帧后 blocks / windows 会正常结束迭代。
+    interrupt() 让 blocks / windows 在下一次取数据时结束（不关闭输入），
+    消费者处理完别的事情（例如运行时改参数）后清掉 interrupted 再重新迭代。
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        capacity: int,
+        wake_threshold: int = 1,
+    ) -> None:
+        self.ring = AudioRingBuffer(capacity)
+        self._loop = loop
+        self._event = asyncio.Event()
+        self._wake_threshold = max(1, wake_threshold)
+        self._wake_pending = False
+        self._closed = False
+        self.interrupted = False
+        self.overflows = 0
+
+        # 最近一次回调写入的时刻（time.monotonic），作为该块的采集时间
+        self.last_write_time = 0.0
+
+    @property
+    def dropped_blocks(self) -> int:
+        return self.ring.dropped_blocks
+
+    def callback(self, indata: np.ndarray, frames: int, time_info, status) -> None:
+        """sounddevice 回调（运行在音频线程，必须快速返回）。"""
+        if status and getattr(status, "input_overflow", False):
+            self.overflows += 1
+
+        samples = indata[:, 0] if indata.ndim == 2 else indata
+        with PROFILER.stage("audio.callback"):
+            self.ring.write(samples)
+        self.last_write_time = time.monotonic()
+
+        if not self._wake_pending and self.ring.available() >= self._wake_threshold:
+            self._wake_pending = True
+            try:
+                self._loop.call_soon_threadsafe(self._wake)
+            except RuntimeError:
+                # 事件循环已关闭（程序退出中），忽略
+                pass
+
+    def _wake(self) -> None:
+        self._wake_pending = False
+        self._event.set()
+
+    def close(self) -> None:
+        """标记输入已结束（在事件循环线程调用）。"""
+        self._closed = True
+        self._event.set()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def interrupt(self) -> None:
+        """让当前的 wait_for 返回 False（在事件循环线程调用）。"""
+        self.interrupted = True
+        self._event.set()
+
+    def discard(self) -> None:
+        """丢弃所有尚未消费的样本（在事件循环线程调用，例如输入暂停后恢复时）。"""
+        self.ring.advance(self.ring.available())
+
+    def close_threadsafe(self) -> None:
+        """标记输入已结束（可在任意线程调用，例如音频源线程）。"""
+        try:
+            self._loop.call_soon_threadsafe(self.close)
+        except RuntimeError:
+            pass
+
+    async def wait_for(self, n: int) -> bool:
+        """等待直到至少有 n 个样本可读；输入已结束且数据不足、或被 interrupt 时返回 False。"""
+        if self.interrupted:
+            return False
+        while self.ring.available() < n:
+            if self._closed or self.interrupted:
+                return False
+            self._event.clear()
+            # clear 之后再检查一次，避免错过 clear 之前到达的唤醒
+            if self.ring.available() >= n or self._closed or self.interrupted:
+                continue
+            await self._event.wait()
+        return True
+
+    async def blocks(self, block_size: int) -> AsyncIterator[np.ndarray]:
+        """按 block_size 产出不重叠的样本块视图。"""
+        self._wake_threshold = block_size
+        while await self.wait_for(block_size):
+            yield self.ring.peek(block_size)
+            self.ring.advance(block_size)
+
+    async def windows(
+        self,
+        window: int,
+        hop: int,
+        max_batch: Optional[int] = None,
+    ) -> AsyncIterator[np.ndarray]:
+        """
+        按 (window, hop) 产出重叠帧。每次产出当前所有已就绪的帧 (n, window)，
+        消费者落后时 n > 1，可以一次向量化处理整批。
+        """
+        if hop <= 0 or hop > window:
+            raise ValueError("hop 必须在 1..window 之间")
+        self._wake_threshold = hop
+        while await self.wait_for(window):
+            batch = self.ring.frames(window, hop, max_batch)
+            yield batch
+            self.ring.advance(batch.shape[0] * hop)
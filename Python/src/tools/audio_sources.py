@@ -0,0 +1,321 @@
+# Python/src/tools/audio_sources.py
+from __future__ import annotations
+
+import logging
+import threading
+import time
+import wave
+from typing import Callable, Optional
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+
+# 回调签名与 sounddevice 一致：callback(indata, frames, time_info, status)
+# indata 形状为 (frames, 1) 的 float32，取值范围 [-1, 1]
+AudioCallback = Callable[[np.ndarray, int, object, object], None]
+
+
+class AudioSource:
+    """
+    音频输入接口。所有实现都以“回调推块”的方式工作（与 sounddevice 回调流一致），
+    因此 audio_loop 和各种特征提取器不需要关心数据来自麦克风、文件还是合成信号。
+
+    子类需要提供：
+    - name:        设备 / 文件名，写进 payload 的 device.name
+    - source_id:   写进顶层消息的 source 字段
+    - sample_rate: 采样率（Hz），构造后即可读取
+    - start(callback, block_size, on_end=None) / stop()
+
+    on_end 只对有限长度的输入（文件 / 限定时长的合成信号）有意义，输入耗尽后被调用一次。
+    """
+
+    name: str = "unknown"
+    source_id: str = "audio"
+    sample_rate: int = 48000
+
+    def start(
+        self,
+        callback: AudioCallback,
+        block_size: int,
+        on_end: Optional[Callable[[], None]] = None,
+    ) -> None:
+        raise NotImplementedError
+
+    def stop(self) -> None:
+        raise NotImplementedError
+
+
+# ---------- 实时设备（sounddevice） ----------
+
+def find_c922_device_index(preferred_hostapis=("Windows WASAPI", "Windows DirectSound")):
+    import sounddevice as sd
+
+    devices = sd.query_devices()
+    hostapis = sd.query_hostapis()
+
+    candidates = []
+    for idx, dev in enumerate(devices):
+        if dev["max_input_channels"] <= 0:
+            continue
+        if "C922 Pro Stream Webcam" in dev["name"]:
+            hostapi_name = hostapis[dev["hostapi"]]["name"]
+            candidates.append((idx, dev["name"], hostapi_name))
+
+    if not candidates:
+        return None
+
+    # 按首选 hostapi 排序
+    for pref in preferred_hostapis:
+        for idx, name, hostapi_name in candidates:
+            if hostapi_name == pref:
+                return idx
+
+    # 实在不行就随便拿第一个
+    return candidates[0][0]
+
+
+class DeviceAudioSource(AudioSource):
+    """
+    实时麦克风输入（sounddevice 回调流）。
+
+    device 为 None 时优先找 C922，找不到就用系统默认输入设备。
+    sounddevice 只在这里按需导入，没有 PortAudio 的环境也能使用其它音频源。
+    """
+
+    source_id = "c922_mic"
+
+    def __init__(self, device: Optional[int | str] = None) -> None:
+        import sounddevice as sd
+
+        self._sd = sd
+        if device is None:
+            device = find_c922_device_index()
+        logger.info("初始化音频输入 device=%r", device)
+
+        if device is None:
+            # 真找不到 C922 的话，就用系统默认输入设备
+            device_info = sd.query_devices(kind="input")
+            self.device_index = sd.default.device[0]
+        else:
+            device_info = sd.query_devices(device, "input")
+            self.device_index = device
+
+        self.name = device_info["name"]
+        self.sample_rate = int(device_info["default_samplerate"])
+        self._stream = None
+
+    def start(
+        self,
+        callback: AudioCallback,
+        block_size: int,
+        on_end: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self._stream = self._sd.InputStream(
+            device=self.device_index,
+            channels=1,          # 单声道即可
+            samplerate=self.sample_rate,
+            blocksize=block_size,
+            dtype="float32",     # [-1, 1]
+            callback=callback,
+        )
+        self._stream.start()
+
+    def stop(self) -> None:
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+
+
+# ---------- 离线输入：在后台线程里按节奏推块 ----------
+
+class _ThreadedAudioSource(AudioSource):
+    """
+    文件 / 合成信号的公共部分：后台线程按块生成数据并调用 callback。
+
+    speed: 1.0 = 实时节奏；10.0 = 10 倍速（用于基准测试）
+    """
+
+    def __init__(self, speed: float = 1.0) -> None:
+        if speed <= 0:
+            raise ValueError("speed 必须为正数")
+        self.speed = speed
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def _next_block(self, n: int) -> Optional[np.ndarray]:
+        """返回下一块 (n,) float32 样本；输入耗尽时返回 None（最后一块可以短于 n）。"""
+        raise NotImplementedError
+
+    def start(
+        self,
+        callback: AudioCallback,
+        block_size: int,
+        on_end: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(callback, block_size, on_end),
+            name=f"audio-{self.source_id}",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self, callback: AudioCallback, block_size: int, on_end) -> None:
+        period = block_size / self.sample_rate / self.speed
+        next_t = time.monotonic()
+        while not self._stop.is_set():
+            block = self._next_block(block_size)
+            if block is None or len(block) == 0:
+                break
+
+            # 按节奏推送：睡到这一块“应该采集完成”的时刻
+            next_t += len(block) / self.sample_rate / self.speed
+            delay = next_t - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            elif delay < -10 * period:
+                # 落后太多（例如被调试器暂停），不追赶，重新对齐
+                next_t = time.monotonic()
+
+            callback(block.reshape(-1, 1), len(block), None, None)
+
+        if on_end is not None and not self._stop.is_set():
+            on_end()
+
+
+class WavFileAudioSource(_ThreadedAudioSource):
+    """
+    WAV（PCM 8/16/24/32 位整数）文件输入，多声道会被平均为单声道。
+
+    speed:     播放速度倍率（1.0 = 实时）
+    loop:      播放到结尾后是否从头循环
+    """
+
+    source_id = "wav_file"
+
+    def __init__(self, path: str, speed: float = 1.0, loop: bool = False) -> None:
+        super().__init__(speed)
+        self.path = path
+        self.name = path
+        self.loop = loop
+
+        with wave.open(path, "rb") as wf:
+            self.sample_rate = wf.getframerate()
+            channels = wf.getnchannels()
+            width = wf.getsampwidth()
+            raw = wf.readframes(wf.getnframes())
+
+        self._samples = _pcm_to_float32(raw, width, channels)
+        self._pos = 0
+
+    @property
+    def duration(self) -> float:
+        return len(self._samples) / self.sample_rate
+
+    def _next_block(self, n: int) -> Optional[np.ndarray]:
+        if self._pos >= len(self._samples):
+            if not self.loop or len(self._samples) == 0:
+                return None
+            self._pos = 0
+        block = self._samples[self._pos:self._pos + n]
+        self._pos += len(block)
+        return block
+
+
+def _pcm_to_float32(raw: bytes, width: int, channels: int) -> np.ndarray:
+    """把 WAV 的 PCM 字节转成 [-1, 1] 的单声道 float32。"""
+    if width == 1:
+        # 8 位 PCM 是无符号的
+        data = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif width == 2:
+        data = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
+    elif width == 3:
+        b = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        ints = b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16)
+        ints = np.where(ints >= 1 << 23, ints - (1 << 24), ints)
+        data = ints.astype(np.float32) / float(1 << 23)
+    elif width == 4:
+        data = np.frombuffer(raw, dtype="<i4").astype(np.float32) / float(1 << 31)
+    else:
+        raise ValueError(f"不支持的 WAV 采样宽度: {width} 字节")
+
+    if channels > 1:
+        data = data.reshape(-1, channels).mean(axis=1)
+    return np.ascontiguousarray(data, dtype=np.float32)
+
+
+class SyntheticAudioSource(_ThreadedAudioSource):
+    """
+    合成信号输入，用于无麦克风环境下的测试与基准：
+
+    - "tone":  正弦波（frequency, amplitude）
+    - "noise": 高斯白噪声（amplitude 为标准差）
+    - "burst": 安静底噪上每隔 burst_interval 秒出现一次 burst_length 秒的噪声爆发
+
+    所有类型都叠加 noise_floor 标准差的底噪；duration 为 None 时无限生成。
+    同样的 seed 生成完全相同的信号，便于复现。
+    """
+
+    source_id = "synthetic"
+
+    def __init__(
+        self,
+        kind: str = "tone",
+        sample_rate: int = 48000,
+        frequency: float = 440.0,
+        amplitude: float = 0.3,
+        noise_floor: float = 0.0,
+        burst_interval: float = 0.5,
+        burst_length: float = 0.02,
+        duration: Optional[float] = None,
+        speed: float = 1.0,
+        seed: int = 0,
+    ) -> None:
+        if kind not in ("tone", "noise", "burst"):
+            raise ValueError(f"未知的合成信号类型: {kind!r}")
+        super().__init__(speed)
+        self.kind = kind
+        self.name = f"synthetic:{kind}"
+        self.sample_rate = sample_rate
+        self.frequency = frequency
+        self.amplitude = amplitude
+        self.noise_floor = noise_floor
+        self.burst_interval = burst_interval
+        self.burst_length = burst_length
+        self.total_samples = None if duration is None else int(duration * sample_rate)
+
+        self._rng = np.random.default_rng(seed)
+        self._pos = 0
+
+    def _next_block(self, n: int) -> Optional[np.ndarray]:
+        if self.total_samples is not None:
+            n = min(n, self.total_samples - self._pos)
+            if n <= 0:
+                return None
+
+        idx = self._pos + np.arange(n)
+        if self.kind == "tone":
+            block = self.amplitude * np.sin(2.0 * np.pi * self.frequency * idx / self.sample_rate)
+        elif self.kind == "noise":
+            block = self.amplitude * self._rng.standard_normal(n)
+        else:
+            phase = (idx / self.sample_rate) % self.burst_interval
+            gate = phase < self.burst_length
+            block = self.amplitude * self._rng.standard_normal(n) * gate
+
+        if self.noise_floor > 0:
+            block = block + self.noise_floor * self._rng.standard_normal(n)
+
+        self._pos += n
+        return block.astype(np.float32)
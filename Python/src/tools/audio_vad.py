@@ -0,0 +1,189 @@
+# Python/src/tools/audio_vad.py
+from __future__ import annotations
+
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+
+class NoiseFloorTracker:
+    """
+    最小值统计（minimum statistics）噪声底估计，输入输出都是 dBFS。
+
+    - 先对逐帧电平做一阶平滑（smoothing），压掉单帧抖动；
+    - 把最近 window_sec 秒分成 n_subwindows 段，每段只记一个最小值，
+      噪声底 = 这些段最小值里的最小值 + bias_db（最小值天然偏低，需要补偿）；
+    - 说话 / 拍手这类活动很少连续占满整个窗口，因此会被“最小值”自动忽略，
+      房间底噪变化（空调开关等）则在 window_sec 左右被跟上；
+    - 持续的声音（长句、音乐、嗡嗡声）会占满整个窗口：调用方判定为活动的帧以 weight < 1 计入，
+      窗口按帧数计的推进相应变慢，活动期间旧的安静段最小值能保留 1 / weight 倍的时间。
+
+    每帧只做 O(1) 更新 + 一次 n_subwindows 长度的 min，开销可以忽略。
+    """
+
+    def __init__(
+        self,
+        frame_rate: float,
+        window_sec: float = 5.0,
+        n_subwindows: int = 8,
+        smoothing: float = 0.7,
+        bias_db: float = 1.5,
+        min_floor_dbfs: float = -100.0,
+    ) -> None:
+        self.sub_len = max(1, int(round(frame_rate * window_sec / n_subwindows)))
+        self.smoothing = smoothing
+        self.bias_db = bias_db
+        self.min_floor_dbfs = min_floor_dbfs
+
+        self._sub_mins = np.full(n_subwindows, np.inf)
+        self.reset()
+
+    def reset(self) -> None:
+        self._sub_mins[:] = np.inf
+        self._sub_index = 0
+        self._sub_count = 0.0
+        self._cur_min = np.inf
+        self._smoothed: Optional[float] = None
+
+    @property
+    def floor_dbfs(self) -> Optional[float]:
+        """当前噪声底估计；还没有任何输入时为 None。"""
+        m = min(float(self._sub_mins.min()), self._cur_min)
+        if not np.isfinite(m):
+            return None
+        return max(m + self.bias_db, self.min_floor_dbfs)
+
+    def step(self, level: float, weight: float = 1.0) -> Optional[float]:
+        """输入一帧电平，weight 为这一帧占的“时间”（活动帧 < 1），返回更新后的噪声底。"""
+        a = self.smoothing
+        s = level if self._smoothed is None else a * self._smoothed + (1.0 - a) * level
+        self._smoothed = s
+
+        if s < self._cur_min:
+            self._cur_min = s
+        self._sub_count += weight
+        if self._sub_count >= self.sub_len:
+            # 当前段结束：写进环形的段最小值数组，覆盖最旧的一段
+            self._sub_mins[self._sub_index] = self._cur_min
+            self._sub_index = (self._sub_index + 1) % self._sub_mins.shape[0]
+            self._sub_count = 0.0
+            self._cur_min = np.inf
+        return self.floor_dbfs
+
+    def update(self, dbfs: np.ndarray) -> np.ndarray:
+        """输入 (n,) 逐帧电平，返回 (n,) 每帧之后的噪声底估计。"""
+        dbfs = np.atleast_1d(np.asarray(dbfs, dtype=np.float64))
+        out = np.empty_like(dbfs)
+        for i, level in enumerate(dbfs):
+            out[i] = self.step(level)
+        return out
+
+
+class VoiceActivityDetector:
+    """
+    轻量的能量 + 频谱 VAD（逐帧，批量输入）：
+
+    1. 能量：电平相对噪声底的 SNR；
+    2. 频谱：band 频段内的谱平坦度（几何均值 / 算术均值，白噪声约 0.5~0.6，
+       人声 / 乐音等有结构的声音明显更低）。
+
+    判定：
+    - 进入活动：SNR >= snr_on_db 且谱平坦度 <= flatness_max；
+      或者 SNR >= strong_snr_db（拍手、敲击等宽带但很响的声音）；
+    - 保持活动：SNR >= snr_off_db（滞回，避免在阈值附近抖动）；
+    - 条件不再满足后再保持 hangover_sec，不切掉句尾 / 字间停顿。
+
+    噪声底由 NoiseFloorTracker 自适应估计，不同房间不需要手调阈值；处于活动（含 hangover）的帧
+    以 active_floor_weight 计入噪声底窗口，持续的声音不会被当成底噪
+    （否则超过窗口长度的说话 / 音乐 / 嗡嗡声会变成“静音”）。
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        frame_size: int,
+        hop_sec: float,
+        snr_on_db: float = 6.0,
+        snr_off_db: float = 3.0,
+        strong_snr_db: float = 15.0,
+        flatness_max: float = 0.35,
+        band: Tuple[float, float] = (100.0, 4000.0),
+        floor_window_sec: float = 5.0,
+        hangover_sec: float = 0.3,
+        active_floor_weight: float = 0.05,
+    ) -> None:
+        self.snr_on_db = snr_on_db
+        self.snr_off_db = snr_off_db
+        self.strong_snr_db = strong_snr_db
+        self.flatness_max = flatness_max
+        self.hangover_frames = max(0, int(round(hangover_sec / hop_sec)))
+        self.active_floor_weight = active_floor_weight
+
+        self.window = np.hanning(frame_size).astype(np.float32)
+        freqs = np.fft.rfftfreq(frame_size, 1.0 / sample_rate)
+        self._band = (freqs >= band[0]) & (freqs <= min(band[1], sample_rate / 2.0))
+
+        self.floor = NoiseFloorTracker(frame_rate=1.0 / hop_sec, window_sec=floor_window_sec)
+        self._active = False
+        self._hang = 0
+
+    @property
+    def active(self) -> bool:
+        return self._active
+
+    def reset(self) -> None:
+        self.floor.reset()
+        self._active = False
+        self._hang = 0
+
+    def spectral_flatness(self, frames: np.ndarray) -> np.ndarray:
+        """(n, frame_size) -> (n,) band 频段内的谱平坦度（0~1）。"""
+        spec = np.fft.rfft(frames * self.window, axis=1)[:, self._band]
+        power = spec.real ** 2 + spec.imag ** 2 + 1e-12
+        geo = np.exp(np.mean(np.log(power), axis=1))
+        return geo / np.mean(power, axis=1)
+
+    def process(self, frames: np.ndarray, dbfs: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        frames: (n, frame_size) 帧；dbfs: (n,) 对应的电平（调用方通常已经算过）。
+
+        返回 dict（每个值的第一维都是 n）：
+        active (bool), noise_floor_dbfs, snr_db, flatness
+        """
+        x = np.atleast_2d(np.asarray(frames, dtype=np.float32))
+        dbfs = np.atleast_1d(np.asarray(dbfs, dtype=np.float64))
+
+        flatness = self.spectral_flatness(x)
+        n = x.shape[0]
+        active = np.zeros(n, dtype=bool)
+        floors = np.empty(n)
+        snr = np.empty(n)
+        floor = self.floor.floor_dbfs
+        for i in range(n):
+            # 先用“更新前”的噪声底算 SNR：活动开始的那一帧不会被自己抬高的底噪吃掉
+            level = dbfs[i]
+            s = 0.0 if floor is None else level - floor
+            snr[i] = s
+            if (s >= self.snr_on_db and flatness[i] <= self.flatness_max) or s >= self.strong_snr_db \
+                    or (self._active and s >= self.snr_off_db):
+                self._active = True
+                self._hang = self.hangover_frames
+            elif self._active:
+                if self._hang > 0:
+                    self._hang -= 1
+                else:
+                    self._active = False
+            active[i] = self._active
+
+            # 活动帧几乎不推进噪声底窗口
+            # （只看活动判定：SNR 高但谱平坦的底噪抬升，例如风扇打开，仍按正常速度跟上）
+            weight = self.active_floor_weight if self._active else 1.0
+            floor = self.floor.step(level, weight)
+            floors[i] = floor
+
+        return {
+            "active": active,
+            "noise_floor_dbfs": floors,
+            "snr_db": snr,
+            "flatness": flatness,
+        }
@@ -0,0 +1,82 @@
+# Python/src/tools/clock_sync.py
+from __future__ import annotations
+
+from collections import deque
+from typing import Deque, Optional, Tuple
+
+import numpy as np
+
+
+# ping / pong 消息类型
+CLOCK_PING = "clock_ping"
+CLOCK_PONG = "clock_pong"
+
+
+def make_clock_ping(t0: float) -> dict:
+    """客户端发送：t0 = 客户端发送时刻（客户端时钟）。"""
+    return {"type": CLOCK_PING, "t0": t0}
+
+
+def make_clock_pong(t0: float, t1: float, t2: float) -> dict:
+    """
+    服务端回复（NTP 风格四时间戳中的前三个）：
+    t0 = 客户端发送时刻（原样带回）
+    t1 = 服务端收到时刻（服务端时钟）
+    t2 = 服务端回复时刻（服务端时钟）
+    客户端收到时再记录 t3，即可调用 ClockOffsetEstimator.add_sample。
+    """
+    return {"type": CLOCK_PONG, "t0": t0, "t1": t1, "t2": t2}
+
+
+class ClockOffsetEstimator:
+    """
+    NTP 风格的时钟偏移估计：
+
+        offset = ((t1 - t0) + (t2 - t3)) / 2     # 服务端时钟 - 客户端时钟
+        delay  = (t3 - t0) - (t2 - t1)           # 往返网络延迟
+
+    保留最近 max_samples 个样本；估计值取往返延迟最小的一半样本的 offset 中位数，
+    这样偶发的排队延迟不会把偏移带偏。
+
+    用法：
+        est = ClockOffsetEstimator()
+        est.add_sample(t0, t1, t2, t3)
+        local = est.to_local(server_time)
+    """
+
+    def __init__(self, max_samples: int = 32) -> None:
+        self._samples: Deque[Tuple[float, float]] = deque(maxlen=max_samples)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def add_sample(self, t0: float, t1: float, t2: float, t3: float) -> Tuple[float, float]:
+        """加入一次 ping/pong 的四个时间戳，返回 (offset, delay)。"""
+        offset = ((t1 - t0) + (t2 - t3)) / 2.0
+        delay = (t3 - t0) - (t2 - t1)
+        self._samples.append((offset, delay))
+        return offset, delay
+
+    @property
+    def offset(self) -> Optional[float]:
+        """当前偏移估计（服务端时钟 - 客户端时钟，秒）；还没有样本时为 None。"""
+        if not self._samples:
+            return None
+        arr = np.array(self._samples)
+        order = np.argsort(arr[:, 1])
+        best = arr[order[: max(1, len(order) // 2)], 0]
+        return float(np.median(best))
+
+    @property
+    def delay(self) -> Optional[float]:
+        """往返延迟中位数（秒）。"""
+        if not self._samples:
+            return None
+        return float(np.median([d for _, d in self._samples]))
+
+    def to_local(self, server_time: float) -> Optional[float]:
+        """把服务端时钟的时刻换算为客户端时钟；还没有样本时返回 None。"""
+        offset = self.offset
+        if offset is None:
+            return None
+        return server_time - offset
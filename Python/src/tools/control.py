@@ -0,0 +1,319 @@
+# Python/src/tools/control.py
+from __future__ import annotations
+
+import asyncio
+import inspect
+import json
+import logging
+import math
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, NamedTuple, Optional, Tuple, Union
+
+from Python.src.tools.messages.base import make_message
+from Python.src.tools.messages.control import (
+    ACTION_GET,
+    ACTION_PAUSE,
+    ACTION_RESUME,
+    ACTION_SET,
+    CONTROL,
+    CONTROL_ACK,
+    build_control_ack_payload,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+PAUSED = "paused"
+
+
+class ControlError(ValueError):
+    """控制请求无法执行：参数不合法，或者当前输入不支持该修改。"""
+
+
+class Param(NamedTuple):
+    """一个可在运行时修改的参数：类型 + 取值范围 / 可选值。"""
+
+    kind: type                      # bool / int / float
+    low: Optional[float] = None
+    high: Optional[float] = None
+    choices: Optional[Tuple] = None
+
+    def coerce(self, name: str, value: Any) -> Any:
+        if self.kind is bool:
+            if not isinstance(value, bool):
+                raise ControlError(f"{name} 必须是 true / false")
+            return value
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ControlError(f"{name} 必须是数字")
+        # json.loads 接受 NaN / Infinity：NaN 能通过所有范围比较，int(inf) 会抛 OverflowError；
+        # 超出 float 范围的整数字面量在 isfinite 里就会 OverflowError
+        try:
+            finite = math.isfinite(value)
+        except OverflowError:
+            finite = False
+        if not finite:
+            raise ControlError(f"{name} 必须是有限的数字")
+        if self.kind is int:
+            if value != int(value):
+                raise ControlError(f"{name} 必须是整数")
+            value = int(value)
+        else:
+            value = float(value)
+        if self.choices is not None and value not in self.choices:
+            raise ControlError(f"{name} 只能是 {list(self.choices)} 之一")
+        if (self.low is not None and value < self.low) or (self.high is not None and value > self.high):
+            raise ControlError(f"{name} 超出范围 [{self.low}, {self.high}]")
+        return value
+
+
+ApplyFn = Callable[[Dict[str, Any]], Union[None, Dict[str, Any], Awaitable[Optional[Dict[str, Any]]]]]
+
+
+class LoopControl:
+    """
+    一个 loop 的运行时配置（由客户端的 control 消息修改）：
+
+    - config:   当前生效的配置（总是包含 paused）
+    - submit:   在事件循环线程里校验并排队一个请求（由 ControlRegistry 调用）
+    - checkpoint(apply): 由 loop 在帧边界调用；依次把排队的修改交给 apply(changes)
+      （只含真正变化的键，可以是协程；返回 dict 时用其中的实际值覆盖，例如摄像头实际接受的分辨率；
+      抛 ControlError 表示拒绝），成功后写入 config 并应答；paused 为 True 时在这里一直等到恢复
+
+    loop 里的用法：
+        control = CONTROLS.register(LoopControl("motion", {"target_fps": Param(float, 0, 240)}, target_fps=0.0))
+        while True:
+            if control.pending:
+                await control.checkpoint(apply)
+            ...处理一帧...
+    """
+
+    def __init__(self, name: str, params: Dict[str, Param], **defaults: Any) -> None:
+        self.name = name
+        self.params: Dict[str, Param] = {PAUSED: Param(bool), **params}
+        self.config: Dict[str, Any] = {PAUSED: False, **defaults}
+        # 有待处理的请求（loop 每帧只检查这个属性，没有请求时几乎没有开销）
+        self.pending = False
+        self._requests: Deque[Tuple[Any, str, Dict[str, Any]]] = deque()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._registry: Optional[ControlRegistry] = None
+        # 有新请求时调用（事件循环线程）：loop 可能正阻塞在等待输入上，需要被叫醒才能到达帧边界
+        self.on_request: Optional[Callable[[], None]] = None
+
+    @property
+    def paused(self) -> bool:
+        return self.config[PAUSED]
+
+    def submit(self, request_id: Any, action: str, params: Any = None) -> None:
+        if action == ACTION_GET:
+            self._ack(request_id, action, True)
+            return
+        if action == ACTION_PAUSE:
+            changes = {PAUSED: True}
+        elif action == ACTION_RESUME:
+            changes = {PAUSED: False}
+        elif action == ACTION_SET:
+            if not isinstance(params, dict) or not params:
+                raise ControlError("set 需要非空的 params")
+            changes = {}
+            for key, value in params.items():
+                spec = self.params.get(key)
+                if spec is None:
+                    raise ControlError(f"未知参数 {key!r}，可用: {sorted(self.params)}")
+                changes[key] = spec.coerce(key, value)
+        else:
+            raise ControlError(f"未知动作 {action!r}")
+
+        self._requests.append((request_id, action, changes))
+        self.pending = True
+        if self._wakeup is not None:
+            self._wakeup.set()
+        if self.on_request is not None:
+            self.on_request()
+
+    async def checkpoint(self, apply: Optional[ApplyFn] = None, block: bool = True) -> None:
+        """block=False 时 paused 也立即返回（暂停由调用方自己实现，例如采集线程停止读帧）。"""
+        while True:
+            while self._requests:
+                request_id, action, changes = self._requests.popleft()
+                changes = {k: v for k, v in changes.items() if self.config.get(k) != v}
+                try:
+                    if changes and apply is not None:
+                        actual = apply(dict(changes))
+                        if inspect.isawaitable(actual):
+                            actual = await actual
+                        if actual:
+                            changes.update(actual)
+                except ControlError as e:
+                    self._ack(request_id, action, False, str(e))
+                    continue
+                except Exception as e:
+                    logger.exception("[%s] 应用控制请求失败: %s", self.name, changes)
+                    self._ack(request_id, action, False, repr(e))
+                    continue
+                self.config.update(changes)
+                if changes:
+                    logger.info("[%s] 配置已更新: %s", self.name, changes)
+                self._ack(request_id, action, True)
+
+            self.pending = False
+            if not (block and self.config[PAUSED]):
+                return
+            if self._wakeup is None:
+                self._wakeup = asyncio.Event()
+            self._wakeup.clear()
+            await self._wakeup.wait()
+
+    def close(self) -> None:
+        """loop 退出时调用：还没来得及生效的请求一律应答失败。"""
+        while self._requests:
+            request_id, action, _ = self._requests.popleft()
+            self._ack(request_id, action, False, "loop 已结束")
+        self.pending = False
+
+    def _ack(self, request_id: Any, action: str, ok: bool, error: Optional[str] = None) -> None:
+        if self._registry is not None:
+            self._registry.ack(request_id, self.name, action, ok, dict(self.config), error)
+
+
+class ControlRegistry:
+    """
+    进程内的 LoopControl 表 + 控制消息分发（每个进程一个全局 CONTROLS）：
+
+    - loop 启动时 register 自己的 LoopControl，退出时 unregister
+    - serve(bridge) 消费 bridge.incoming，把 type = "control" 的消息交给对应的 LoopControl
+    - 多进程模式下桥进程里没有 loop：target 不在本进程时交给 Supervisor 转发到拥有它的工作进程，
+      工作进程通过 PipeBridge.announce_controls 上报自己有哪些 target
+    - 应答（control_ack）通过 attach 的 bridge 发送
+    """
+
+    def __init__(self) -> None:
+        self._controls: Dict[str, LoopControl] = {}
+        self.bridge = None
+        self.supervisor = None
+
+    def register(self, control: LoopControl) -> LoopControl:
+        if control.name in self._controls:
+            # 同类 loop 开了多个（例如两个摄像头各一个 motion_loop）：第二个起叫 motion.2, motion.3 …
+            base, n = control.name, 2
+            while f"{base}.{n}" in self._controls:
+                n += 1
+            control.name = f"{base}.{n}"
+            logger.warning("控制名字 %s 已被占用，改用 %s", base, control.name)
+        control._registry = self
+        self._controls[control.name] = control
+        self._announce()
+        return control
+
+    def unregister(self, control: LoopControl) -> None:
+        if self._controls.get(control.name) is control:
+            del self._controls[control.name]
+            control.close()
+            self._announce()
+
+    def get(self, name: str) -> Optional[LoopControl]:
+        return self._controls.get(name)
+
+    def names(self) -> list:
+        return sorted(self._controls)
+
+    def attach(self, bridge) -> None:
+        self.bridge = bridge
+        self._announce()
+
+    def _announce(self) -> None:
+        announce = getattr(self.bridge, "announce_controls", None)
+        if announce is not None:
+            announce(self.names())
+
+    def ack(
+        self,
+        request_id: Any,
+        target: str,
+        action: str,
+        ok: bool,
+        config: Optional[Dict[str, Any]],
+        error: Optional[str] = None,
+    ) -> None:
+        if not ok:
+            logger.warning("控制请求失败 target=%s action=%s: %s", target, action, error)
+        if self.bridge is not None:
+            self.bridge.send_json(make_message(
+                msg_type=CONTROL_ACK,
+                payload=build_control_ack_payload(request_id, target, action, ok, config, error),
+                source="control",
+            ))
+
+    def handle(self, msg: dict) -> None:
+        """处理一条已解析的 control 消息（事件循环线程）。"""
+        target = msg.get("target")
+        action = msg.get("action")
+        request_id = msg.get("id")
+        params = msg.get("params")
+        if not isinstance(target, str) or not isinstance(action, str):
+            self.ack(request_id, target, action, False, None, "target / action 必须是字符串")
+            return
+        if params is not None and not isinstance(params, dict):
+            self.ack(request_id, target, action, False, None, "params 必须是对象")
+            return
+        control = self._controls.get(target)
+        if control is None:
+            if self.supervisor is not None and self.supervisor.route_control(target, msg):
+                return
+            self.ack(request_id, target, action, False, None, f"未知的 target {target!r}，可用: {self.names()}")
+            return
+        try:
+            control.submit(request_id, action, params)
+        except ControlError as e:
+            self.ack(request_id, target, action, False, dict(control.config), str(e))
+
+    def handle_text(self, text: str) -> bool:
+        """客户端发来的一条文本；是 control 消息时处理并返回 True。"""
+        try:
+            msg = json.loads(text)
+        except (TypeError, ValueError):
+            return False
+        if not isinstance(msg, dict) or msg.get("type") != CONTROL:
+            return False
+        self.handle(msg)
+        return True
+
+    async def serve(self, bridge, supervisor=None) -> None:
+        """消费 bridge.incoming 里的控制消息（其它消息忽略）。"""
+        self.attach(bridge)
+        self.supervisor = supervisor
+        while True:
+            text = await bridge.incoming.get()
+            try:
+                if not self.handle_text(text):
+                    logger.debug("忽略非控制消息: %.80s", text)
+            except Exception:
+                # 一条畸形的客户端消息不能结束控制循环（它和 bridge 在同一个 gather 里）
+                logger.exception("处理控制消息失败: %.200s", text)
+
+
+class RateLimiter:
+    """
+    按墙钟限制 loop 的处理频率（fps <= 0 表示不限）：每帧处理前 await wait()。
+    落后超过一个周期时重新对齐，不会为了“追赶”连续处理。
+    """
+
+    def __init__(self, fps: float = 0.0) -> None:
+        self.fps = fps
+        self._next: Optional[float] = None
+
+    async def wait(self) -> None:
+        if self.fps <= 0:
+            return
+        period = 1.0 / self.fps
+        now = time.monotonic()
+        if self._next is None or now - self._next > period:
+            self._next = now
+        elif self._next > now:
+            await asyncio.sleep(self._next - now)
+        self._next += period
+
+
+# 进程内全局实例
+CONTROLS = ControlRegistry()
@@ -0,0 +1,252 @@
+# Python/src/tools/detectors.py
+from __future__ import annotations
+
+import logging
+import math
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Deque, Dict, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from Python.src.tools.frame_graph import FrameProducts
+
+
+logger = logging.getLogger(__name__)
+
+
+class Detector:
+    """
+    可被 DetectorScheduler 调度的模型插件（hands / 运动 / 目标检测 …），
+    让多个模型轮流使用同一个推理线程和同一路共享采集，而不是各开一个 loop 抢 CPU。
+
+    子类需要提供：
+    - name:       控制 / 统计里的名字
+    - msg_type:   process 返回的 payload 作为哪种顶层消息发送；source 写进消息的 source 字段
+    - every:      期望的运行间隔（采集帧数），1 = 每帧
+    - priority:   预算不够时先保证谁（数字越小越重要）
+    - cost_hint:  单次 process 的预估耗时（秒），实测到之前用来排程
+    - max_every:  预算不够时最多放宽到每多少帧运行一次
+    - init():     阻塞的初始化（加载模型 / 预热），在线程池里调用
+    - process(products) -> Optional[dict]: 在调度线程里处理一帧（FrameProducts，取所需的缓存节点），
+      返回 payload；None 表示本帧不发送
+    - deadline:   process 之后读取：本帧 payload 的发送截止时间（None = 按消息 type 的默认策略，
+                  NO_DEADLINE = 不过期，例如 emit 策略的 settle 帧）
+    - events():   process 之后额外要发送的 [(msg_type, payload), ...]（例如手势事件），默认没有
+    - close()
+    """
+
+    name: str = "detector"
+    msg_type: str = "detection"
+    source: Optional[str] = None
+    every: int = 1
+    priority: int = 1
+    cost_hint: float = 0.005
+    max_every: int = 30
+    deadline: Optional[float] = None
+
+    def __init__(
+        self,
+        every: Optional[int] = None,
+        priority: Optional[int] = None,
+        max_every: Optional[int] = None,
+    ) -> None:
+        if every is not None:
+            self.every = every
+        if priority is not None:
+            self.priority = priority
+        if max_every is not None:
+            self.max_every = max_every
+        if self.every < 1 or self.max_every < self.every:
+            raise ValueError(f"{self.name}: 需要 1 <= every <= max_every")
+
+    def init(self) -> None:
+        pass
+
+    def process(self, products: "FrameProducts") -> Optional[dict]:
+        raise NotImplementedError
+
+    def events(self) -> List[Tuple[str, dict]]:
+        return []
+
+    def close(self) -> None:
+        pass
+
+
+class _Slot:
+    """调度器里每个模型的状态。"""
+
+    def __init__(self, detector: Detector) -> None:
+        self.detector = detector
+        self.stride = detector.every        # 当前实际间隔（预算不够时大于 every）
+        self.cost = detector.cost_hint      # 单次耗时的指数滑动平均（秒）
+        self.last_frame: Optional[int] = None   # 第一次 plan 时初始化
+        self.runs = 0
+        self.deferred = 0                   # 到期但因本帧预算不够推迟的次数
+        self.errors = 0
+        self.max_cost = 0.0
+
+    def lateness(self, frame_id: int) -> int:
+        """距离上次运行已经超过间隔多少帧（< 0 表示还没到期）。"""
+        return frame_id - self.last_frame - self.stride
+
+
+class DetectorScheduler:
+    """
+    在共享帧流上给多个 Detector 分时（只做排程和记账，不涉及线程 / asyncio）：
+
+    - 每帧 plan(frame_id) 选出到期的模型：按 priority、再按迟到帧数排序，
+      预估耗时（实测的滑动平均）累计不超过 budget 秒的才在本帧运行，其余推迟到下一帧；
+      本帧至少运行一个，迟到超过一个间隔的强制运行（不会被更重要的模型饿死）；
+      单次耗时就超过预算的模型到期即运行，它所在的帧必然超预算，调度能保证的是平均负载
+    - run(...) 在推理线程里依次运行选中的模型并记录耗时
+    - rebalance(): 平均每帧负载 sum(cost / every) 超过预算时，从最不重要的模型开始放大间隔
+      （不超过 max_every），直到放得下；耗时下降后间隔自动回到 every
+    - set_budget(budget): 运行时修改预算，新间隔全部算好后才与预算一起生效
+    """
+
+    def __init__(
+        self,
+        detectors: Sequence[Detector],
+        budget: float,
+        alpha: float = 0.2,
+        max_samples: int = 1000,
+    ) -> None:
+        if budget <= 0:
+            raise ValueError("budget 必须为正数")
+        self.slots = [_Slot(d) for d in detectors]
+        self.budget = budget
+        self.alpha = alpha
+
+        # 统计（stats() 读取）
+        self.frames = 0
+        self.over_budget = 0
+        # 最近 max_samples 帧的耗时（p50 / max 只看这个窗口，长时间不 reset 也不会无限增长）
+        self.frame_costs: Deque[float] = deque(maxlen=max_samples)
+        self.rebalance()
+
+    def plan(self, frame_id: int) -> List[_Slot]:
+        for slot in self.slots:
+            if slot.last_frame is None:
+                # 从第一帧开始到期
+                slot.last_frame = frame_id - slot.stride
+        due = [s for s in self.slots if s.lateness(frame_id) >= 0]
+        due.sort(key=lambda s: (s.detector.priority, -s.lateness(frame_id)))
+        chosen: List[_Slot] = []
+        total = 0.0
+        for slot in due:
+            # 单次就超过整帧预算的模型永远“放不下”，到期就运行（这一帧的次要模型让给它）
+            forced = slot.lateness(frame_id) >= slot.stride or slot.cost > self.budget
+            if chosen and not forced and total + slot.cost > self.budget:
+                slot.deferred += 1
+                continue
+            chosen.append(slot)
+            total += slot.cost
+        return chosen
+
+    def run(
+        self,
+        chosen: Sequence[_Slot],
+        products: "FrameProducts",
+    ) -> List[Tuple[Detector, Optional[dict], float, float]]:
+        """在推理线程里调用：依次运行，返回 [(detector, payload, t_start, t_end), ...]（time.monotonic）。"""
+        results = []
+        frame_start = time.perf_counter()
+        for slot in chosen:
+            t_start = time.monotonic()
+            t0 = time.perf_counter()
+            try:
+                payload = slot.detector.process(products)
+            except Exception:
+                slot.errors += 1
+                logger.exception("[%s] process 失败", slot.detector.name)
+                payload = None
+            elapsed = time.perf_counter() - t0
+            self._record(slot, products.frame_id, elapsed)
+            results.append((slot.detector, payload, t_start, time.monotonic()))
+        frame_cost = time.perf_counter() - frame_start
+        self.frames += 1
+        self.frame_costs.append(frame_cost)
+        if frame_cost > self.budget:
+            self.over_budget += 1
+        self.rebalance()
+        return results
+
+    def _record(self, slot: _Slot, frame_id: int, elapsed: float) -> None:
+        slot.last_frame = frame_id
+        slot.runs += 1
+        slot.max_cost = max(slot.max_cost, elapsed)
+        slot.cost += self.alpha * (elapsed - slot.cost)
+
+    def load(self) -> float:
+        """按当前间隔估计的平均每帧耗时（秒）。"""
+        return sum(s.cost / s.stride for s in self.slots)
+
+    def _plan_strides(self, budget: float) -> List[int]:
+        """按给定预算算出每个 slot 的运行间隔（与 self.slots 同序），不修改任何状态。"""
+        strides = [s.stride for s in self.slots]
+        load = sum(s.cost / s.detector.every for s in self.slots)
+        # 最不重要的先让步；同样重要时先放大贵的
+        order = sorted(enumerate(self.slots), key=lambda item: (-item[1].detector.priority, -item[1].cost))
+        for i, slot in order:
+            base = slot.detector.every
+            if load <= budget:
+                stride = base
+            else:
+                others = load - slot.cost / base
+                room = budget - others
+                stride = slot.detector.max_every if room <= 0 else math.ceil(slot.cost / room)
+                stride = min(slot.detector.max_every, max(base, stride))
+                load = others + slot.cost / stride
+            strides[i] = stride
+        return strides
+
+    def _apply_strides(self, strides: List[int]) -> None:
+        for slot, stride in zip(self.slots, strides):
+            if stride != slot.stride:
+                logger.debug(
+                    "[%s] 运行间隔 %d -> %d 帧（预估 %.1f ms / 次）",
+                    slot.detector.name, slot.stride, stride, slot.cost * 1e3,
+                )
+                slot.stride = stride
+
+    def rebalance(self) -> None:
+        self._apply_strides(self._plan_strides(self.budget))
+
+    def set_budget(self, budget: float) -> None:
+        """修改每帧预算（秒）并重新分配间隔；新预算不合法或算不出间隔时抛 ValueError，状态不变。"""
+        if not math.isfinite(budget) or budget <= 0:
+            raise ValueError("budget 必须为正数")
+        strides = self._plan_strides(budget)
+        self.budget = budget
+        self._apply_strides(strides)
+
+    def stats(self, reset: bool = False) -> Dict:
+        costs = sorted(self.frame_costs)
+        stats = {
+            "budget_ms": self.budget * 1e3,
+            "frames": self.frames,
+            "over_budget": self.over_budget,
+            "frame_ms_p50": costs[len(costs) // 2] * 1e3 if costs else 0.0,
+            "frame_ms_max": costs[-1] * 1e3 if costs else 0.0,
+            "load_ms": self.load() * 1e3,
+            "detectors": [
+                {
+                    "name": s.detector.name,
+                    "every": s.detector.every,
+                    "stride": s.stride,
+                    "cost_ms": s.cost * 1e3,
+                    "max_cost_ms": s.max_cost * 1e3,
+                    "runs": s.runs,
+                    "deferred": s.deferred,
+                    "errors": s.errors,
+                }
+                for s in self.slots
+            ],
+        }
+        if reset:
+            self.frames = self.over_budget = 0
+            self.frame_costs.clear()
+            for s in self.slots:
+                s.runs = s.deferred = s.errors = 0
+                s.max_cost = 0.0
+        return stats
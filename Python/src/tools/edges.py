@@ -0,0 +1,84 @@
+# Python/src/tools/edges.py
+from __future__ import annotations
+
+from typing import List, Tuple
+
+import cv2
+import numpy as np
+
+
+class EdgeExtractor:
+    """
+    低分辨率 Canny 边缘 + 轮廓简化（阈值 / 模糊与 test_demos/Edge_demo.py 的默认值一致）。
+
+    - edges(frame):     BGR 原图 -> 缩小到 (width, height) -> 灰度 -> 高斯模糊 -> Canny
+    - polylines(edges): 边缘图上找轮廓，按弧长过滤掉碎边，approxPolyDP 简化为折线，
+                        返回 (k, 2) int32 点数组的列表（缩小后的像素坐标）
+    - bitmask(edges):   再缩小到 (mask_width, mask_height) 的二值掩码，按行 packbits 成字节串
+
+    epsilon 是 approxPolyDP 的容差（缩小后的像素），越大折线越粗略、点越少；
+    max_points 限制单帧所有折线的总点数，超过时优先保留最长的轮廓。
+    """
+
+    def __init__(
+        self,
+        width: int = 320,
+        height: int = 180,
+        threshold1: int = 50,
+        threshold2: int = 150,
+        blur: int = 3,
+        epsilon: float = 1.5,
+        min_length: float = 12.0,
+        max_points: int = 1500,
+        mask_width: int = 64,
+        mask_height: int = 36,
+    ) -> None:
+        self.width = width
+        self.height = height
+        self.threshold1 = threshold1
+        self.threshold2 = threshold2
+        self.blur = blur if blur % 2 == 1 else blur + 1
+        self.epsilon = epsilon
+        self.min_length = min_length
+        self.max_points = max_points
+        self.mask_width = mask_width
+        self.mask_height = mask_height
+
+    def edges(self, frame: np.ndarray) -> np.ndarray:
+        small = cv2.resize(frame, (self.width, self.height), interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        # 可选高斯模糊降噪（边缘更稳定）
+        if self.blur >= 3:
+            gray = cv2.GaussianBlur(gray, (self.blur, self.blur), 0)
+        return self.edges_gray(gray)
+
+    def edges_gray(self, gray: np.ndarray) -> np.ndarray:
+        """gray 已经是 width x height 的（模糊后）灰度图，例如 FrameHub 共享的 blur2。"""
+        return cv2.Canny(gray, threshold1=self.threshold1, threshold2=self.threshold2)
+
+    def polylines(self, edges: np.ndarray) -> List[np.ndarray]:
+        contours, _ = cv2.findContours(edges, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
+
+        # Canny 的边缘是 1 像素宽的线，轮廓会沿线走一个来回，按开放曲线处理
+        lengths = np.array([cv2.arcLength(c, False) for c in contours])
+        order = np.argsort(-lengths) if len(contours) else []
+
+        out: List[np.ndarray] = []
+        total = 0
+        for i in order:
+            if lengths[i] < self.min_length:
+                break
+            poly = cv2.approxPolyDP(contours[i], self.epsilon, False).reshape(-1, 2)
+            if len(poly) < 2:
+                continue
+            if total + len(poly) > self.max_points:
+                break
+            out.append(poly)
+            total += len(poly)
+        return out
+
+    def bitmask(self, edges: np.ndarray) -> Tuple[bytes, int, int]:
+        """返回 (packed_bytes, mask_width, mask_height)，行优先、每行按 8 位对齐、高位在前。"""
+        small = cv2.resize(edges, (self.mask_width, self.mask_height), interpolation=cv2.INTER_AREA)
+        bits = np.packbits(small > 0, axis=1)
+        return bits.tobytes(), self.mask_width, self.mask_height
@@ -0,0 +1,153 @@
+# Python/src/tools/emission.py
+from __future__ import annotations
+
+from typing import Dict, Optional
+
+import numpy as np
+
+from Python.src.tools.outgoing import NO_DEADLINE
+
+
+# 发送原因
+EMIT_CHANGED = "changed"
+EMIT_KEEPALIVE = "keepalive"
+EMIT_ACTIVE = "active"
+EMIT_SETTLE = "settle"      # 变化停下来之后的第一帧（手不动了 / 手消失后 / 活动 -> 静默）
+
+
+def emit_deadline(reason: Optional[str]) -> Optional[float]:
+    """
+    按发送原因给出 send_json 的 deadline：EMIT_SETTLE 帧不过期，其余按消息 type 的默认策略（None）。
+
+    逐帧消息在发送队列里过期会被丢弃；而策略在排队时就把它记为“已发送”，之后相同的帧都被抑制。
+    如果被丢的正好是变化停下来前的最后一帧（例如手消失后的空帧），客户端会一直停在旧状态，
+    直到下一次 keepalive。settle 帧不过期，保证客户端最终总能收到当前状态。
+    """
+    return NO_DEADLINE if reason == EMIT_SETTLE else None
+
+
+class HandsEmitPolicy:
+    """
+    hands 消息的“只发变化”策略：
+
+    1. 当前帧没有手、且上一次发送的也是“没有手” -> 不发；
+    2. 手的集合没变、且所有关键点相对上一次 *已发送* 帧的最大变化 < epsilon -> 不发；
+       （和已发送帧比较而不是和上一帧比较，这样缓慢漂移最终也会累积到阈值被发出去）
+    3. 距离上一次发送超过 keepalive_interval 秒，无论是否变化都发一次，
+       客户端据此区分“画面没变”和“连接断了”；
+    4. 变化停下来之后的第一帧（本该被抑制）作为 EMIT_SETTLE 再发一次，用 emit_deadline 发送时不过期：
+       前面的变化帧在发送队列里过期被丢掉时，客户端仍能收到最终状态。
+
+    用法：
+        policy = HandsEmitPolicy(epsilon=0.002, keepalive_interval=1.0)
+        reason = policy.decide(extract_hand_arrays(results), time.monotonic())
+        if reason is not None:
+            ...发送...
+    """
+
+    def __init__(self, epsilon: float = 0.002, keepalive_interval: float = 1.0) -> None:
+        self.epsilon = epsilon
+        self.keepalive_interval = keepalive_interval
+
+        self._last_sent: Optional[Dict[str, np.ndarray]] = None
+        self._last_sent_time: float = float("-inf")
+        self._settle = False
+
+        # 统计信息，方便估算节省了多少带宽
+        self.sent = 0
+        self.suppressed = 0
+
+    def reset(self) -> None:
+        """忘记上一次发送的内容，下一帧一定会被发送。"""
+        self._last_sent = None
+        self._last_sent_time = float("-inf")
+        self._settle = False
+
+    def decide(self, hands: Dict[str, np.ndarray], now: float) -> Optional[str]:
+        """
+        判断本帧是否需要发送。
+
+        hands: {label: (21, 3)}（见 extract_hand_arrays）
+        now:   单调时钟时间（秒）
+
+        返回 EMIT_CHANGED / EMIT_SETTLE / EMIT_KEEPALIVE；返回 None 表示本帧应被抑制。
+        """
+        if self._changed(hands):
+            reason = EMIT_CHANGED
+        elif self._settle:
+            reason = EMIT_SETTLE
+        elif now - self._last_sent_time >= self.keepalive_interval:
+            reason = EMIT_KEEPALIVE
+        else:
+            self.suppressed += 1
+            return None
+
+        # 拷贝一份，避免调用方复用数组时把基准帧改掉
+        self._last_sent = {label: lm.copy() for label, lm in hands.items()}
+        self._last_sent_time = now
+        self._settle = reason == EMIT_CHANGED
+        self.sent += 1
+        return reason
+
+    def _changed(self, hands: Dict[str, np.ndarray]) -> bool:
+        prev = self._last_sent
+        if prev is None:
+            return True
+
+        # 手的集合变化（出现 / 消失 / 左右换了）一定要发
+        if hands.keys() != prev.keys():
+            return True
+
+        # 两帧都没有手
+        if not hands:
+            return False
+
+        # 所有手、所有点中最大的单点位移（欧氏距离，归一化坐标）
+        max_delta = max(
+            float(np.linalg.norm(lm - prev[label], axis=-1).max())
+            for label, lm in hands.items()
+        )
+        return max_delta >= self.epsilon
+
+
+class AudioEmitPolicy:
+    """
+    音频消息的 VAD 门控策略：
+
+    1. 有声音活动（VAD active）的帧全部发送；
+    2. 活动 -> 静默的第一帧发送一次（EMIT_SETTLE，用 emit_deadline 发送时不过期），客户端能看到电平回落；
+    3. 静默期间每 heartbeat_interval 秒发送一次心跳（带最新的噪声底估计），
+       其余帧都被抑制。
+
+    now 使用音频时间（已处理的样本时长）而不是墙钟，这样用加速播放的文件做测试时
+    结果和实时采集一致。
+    """
+
+    def __init__(self, heartbeat_interval: float = 1.0) -> None:
+        self.heartbeat_interval = heartbeat_interval
+        self._was_active = False
+        self._last_sent_time: float = float("-inf")
+
+        self.sent = 0
+        self.suppressed = 0
+
+    def reset(self) -> None:
+        self._was_active = False
+        self._last_sent_time = float("-inf")
+
+    def decide(self, active: bool, now: float) -> Optional[str]:
+        """返回 EMIT_ACTIVE / EMIT_SETTLE / EMIT_KEEPALIVE；返回 None 表示本帧应被抑制。"""
+        if active:
+            reason = EMIT_ACTIVE
+        elif self._was_active:
+            reason = EMIT_SETTLE
+        elif now - self._last_sent_time >= self.heartbeat_interval:
+            reason = EMIT_KEEPALIVE
+        else:
+            self.suppressed += 1
+            return None
+
+        self._was_active = active
+        self._last_sent_time = now
+        self.sent += 1
+        return reason
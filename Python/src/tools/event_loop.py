@@ -0,0 +1,217 @@
+# Python/src/tools/event_loop.py
+from __future__ import annotations
+
+import asyncio
+import bisect
+import logging
+import sys
+import threading
+import time
+import traceback
+from typing import Awaitable, Callable, List, Optional
+
+from Python.src.tools.messages.base import make_message
+from Python.src.tools.messages.stats import build_loop_stats_payload
+
+
+logger = logging.getLogger(__name__)
+
+
+# 延迟直方图各桶上界（毫秒），最后还有一个 +inf 桶
+LAG_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+
+def current_runtime() -> str:
+    """当前事件循环的实现："uvloop" 或 "asyncio"。"""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        policy = asyncio.get_event_loop_policy()
+        return "uvloop" if type(policy).__module__.startswith("uvloop") else "asyncio"
+    return "uvloop" if type(loop).__module__.startswith("uvloop") else "asyncio"
+
+
+def run(main: Callable[[], Awaitable[None]], use_uvloop: bool = False) -> None:
+    """
+    asyncio.run(main()) 的替代：use_uvloop=True 且安装了 uvloop 时在 uvloop 上运行。
+    uvloop 不支持 Windows；没装或不支持时记一条警告，退回标准 asyncio。
+    """
+    if use_uvloop:
+        try:
+            import uvloop
+        except ImportError:
+            logger.warning("未安装 uvloop（pip install uvloop，仅 Linux / macOS），使用标准 asyncio")
+        else:
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+            logger.info("事件循环: uvloop %s", getattr(uvloop, "__version__", ""))
+    asyncio.run(main())
+
+
+class LoopMonitor:
+    """
+    事件循环卡顿监视器。
+
+    - 探针协程每 interval 秒醒来一次，实际醒来时间与预定时间之差即事件循环延迟（lag），
+      记入对数分桶的直方图；同步阻塞调用（hands.process、stream.read …）会直接体现为大 lag
+    - 看门狗线程检查探针心跳：事件循环卡住超过 stall_threshold 时，立刻抓取事件循环线程的
+      调用栈和当前 task 写日志（卡顿还没结束时就能看到是谁卡住了循环）
+    - 每 report_interval 秒把本窗口的统计作为 type = "stats" 的消息发给 bridge（可选），然后清零
+
+    用法：
+        monitor = LoopMonitor(bridge)
+        await asyncio.gather(bridge.run_forever(), monitor.run(), ...)
+    """
+
+    def __init__(
+        self,
+        bridge=None,
+        name: str = "main",
+        interval: float = 0.005,
+        stall_threshold: float = 0.1,
+        report_interval: float = 5.0,
+        stack_limit: int = 12,
+    ) -> None:
+        self.bridge = bridge
+        self.name = name
+        self.interval = interval
+        self.stall_threshold = stall_threshold
+        self.report_interval = report_interval
+        self.stack_limit = stack_limit
+
+        self.bounds_ms = LAG_BUCKETS_MS
+        self.stalls_total = 0
+        self.max_lag_total = 0.0
+        self.last_stall: Optional[dict] = None
+        self._reset_window(time.monotonic())
+
+        # 看门狗状态（跨线程读写的都是简单赋值）
+        self._beat = time.monotonic()
+        self._stall_reported = False
+        self._pending_stall: Optional[dict] = None
+        self._stop = threading.Event()
+
+    def _reset_window(self, now: float) -> None:
+        self.counts: List[int] = [0] * (len(self.bounds_ms) + 1)
+        self.probes = 0
+        self.max_lag = 0.0
+        self.stalls = 0
+        self.window_start = now
+
+    def record(self, lag: float) -> None:
+        """记录一次延迟（秒）。"""
+        lag_ms = lag * 1e3
+        self.counts[bisect.bisect_left(self.bounds_ms, lag_ms)] += 1
+        self.probes += 1
+        if lag > self.max_lag:
+            self.max_lag = lag
+        if lag > self.max_lag_total:
+            self.max_lag_total = lag
+        if lag >= self.stall_threshold:
+            self.stalls += 1
+            self.stalls_total += 1
+            stall = self._pending_stall or {"task": None, "where": None}
+            self.last_stall = {"lag_ms": round(lag_ms, 1), "task": stall["task"], "where": stall["where"]}
+            self._pending_stall = None
+
+    def percentile_ms(self, q: float) -> float:
+        """由直方图估计第 q 分位（0~1）的延迟：所在桶的上界，最后一桶用本窗口的最大值。"""
+        if self.probes == 0:
+            return 0.0
+        target = q * self.probes
+        acc = 0
+        for i, c in enumerate(self.counts):
+            acc += c
+            if acc >= target and c:
+                return float(self.bounds_ms[i]) if i < len(self.bounds_ms) else self.max_lag * 1e3
+        return self.max_lag * 1e3
+
+    def snapshot(self) -> dict:
+        return build_loop_stats_payload(
+            window_sec=time.monotonic() - self.window_start,
+            probes=self.probes,
+            bucket_bounds_ms=self.bounds_ms,
+            bucket_counts=self.counts,
+            p50_ms=self.percentile_ms(0.5),
+            p99_ms=self.percentile_ms(0.99),
+            max_ms=self.max_lag * 1e3,
+            stalls=self.stalls,
+            stall_threshold_ms=self.stall_threshold * 1e3,
+            runtime=current_runtime(),
+            last_stall=self.last_stall,
+            loop_name=self.name,
+        )
+
+    # ---------- 看门狗线程 ----------
+
+    def _watchdog(self, loop: asyncio.AbstractEventLoop, loop_thread_id: int) -> None:
+        period = max(0.005, self.stall_threshold / 4)
+        while not self._stop.wait(period):
+            blocked = time.monotonic() - self._beat
+            if blocked < self.stall_threshold:
+                self._stall_reported = False
+                continue
+            if self._stall_reported:
+                continue
+            self._stall_reported = True
+
+            frame = sys._current_frames().get(loop_thread_id)
+            if frame is None:
+                continue
+            stack = traceback.extract_stack(frame)[-self.stack_limit:]
+            try:
+                # 只读 asyncio 内部的 current task 表，不会修改事件循环状态
+                task = asyncio.current_task(loop)
+            except RuntimeError:
+                task = None
+            task_name = task.get_name() if task is not None else None
+            where = f"{stack[-1].filename}:{stack[-1].lineno} in {stack[-1].name}" if stack else None
+            self._pending_stall = {"task": task_name, "where": where}
+            logger.warning(
+                "[%s] 事件循环已阻塞 %.0f ms（阈值 %.0f ms），task=%s，调用栈：\n%s",
+                self.name, blocked * 1e3, self.stall_threshold * 1e3, task_name,
+                "".join(traceback.format_list(stack)).rstrip(),
+            )
+
+    # ---------- 探针 ----------
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        watchdog = threading.Thread(
+            target=self._watchdog, args=(loop, threading.get_ident()), name="loop-watchdog", daemon=True,
+        )
+        self._beat = time.monotonic()
+        watchdog.start()
+        logger.info(
+            "LoopMonitor 启动: runtime=%s, 探针间隔 %.1f ms, 卡顿阈值 %.0f ms",
+            current_runtime(), self.interval * 1e3, self.stall_threshold * 1e3,
+        )
+
+        next_report = time.monotonic() + self.report_interval
+        try:
+            while True:
+                expected = loop.time() + self.interval
+                await asyncio.sleep(self.interval)
+                lag = max(0.0, loop.time() - expected)
+                self._beat = time.monotonic()
+                self.record(lag)
+
+                if self._beat >= next_report:
+                    self._publish()
+                    next_report = self._beat + self.report_interval
+        finally:
+            self._stop.set()
+
+    def _publish(self) -> None:
+        payload = self.snapshot()
+        logger.info(
+            "[%s] 事件循环延迟: p50 %.1f ms, p99 %.1f ms, max %.1f ms, 卡顿 %d 次 (%d 次探针)",
+            self.name, payload["lag_ms"]["p50"], payload["lag_ms"]["p99"], payload["lag_ms"]["max"],
+            payload["stalls"], payload["probes"],
+        )
+        if self.bridge is not None:
+            self.bridge.send_json(make_message(
+                msg_type="stats",
+                payload=payload,
+                source="loop_monitor",
+            ))
+        self._reset_window(self._beat)
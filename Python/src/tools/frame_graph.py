@@ -0,0 +1,387 @@
+# Python/src/tools/frame_graph.py
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import logging
+import threading
+from typing import AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from Python.src.tools.control import CONTROLS, ControlError, LoopControl, Param
+from Python.src.tools.frame_sources import FrameSource
+from Python.src.tools.messages.base import trace_now
+from Python.src.tools.profiler import PROFILER
+from Python.src.tools.startup import STARTUP
+
+
+logger = logging.getLogger(__name__)
+
+
+# 节点名
+FRAME = "frame"          # 原始 BGR 帧
+MIRRORED = "mirrored"    # 水平镜像（自拍视角），mirror=False 时与 frame 相同
+
+
+def pyr(level: int) -> str:
+    """第 level 层金字塔（BGR，宽高为 mirrored 的 1 / 2^level，第 0 层即 mirrored）。"""
+    return f"pyr{level}"
+
+
+def rgb(level: int) -> str:
+    """第 level 层的 RGB（MediaPipe 等模型的输入）。"""
+    return f"rgb{level}"
+
+
+def gray(level: int) -> str:
+    """第 level 层的灰度图。"""
+    return f"gray{level}"
+
+
+def blurred(level: int) -> str:
+    """第 level 层的高斯模糊灰度图。"""
+    return f"blur{level}"
+
+
+class FrameGraph:
+    """
+    每帧派生图像的依赖图：节点 = 名字 + 依赖的节点 + 计算函数。
+    图本身是无状态的，每一帧的计算结果缓存在 FrameProducts 里。
+
+    default() 构建常用的图：
+        frame -> mirrored -> pyr0 -> pyr1 -> pyr2 -> ...（每层 INTER_AREA 缩小一半）
+        pyrK -> rgbK / grayK -> blurK
+    例如 1280x720 采集时：rgb1 (640x360) 正好是 hands_loop 的推理输入，
+    gray2 / blur2 (320x180) 正好是 motion_loop 的分割输入和 edges_loop 的 Canny 输入。
+    """
+
+    def __init__(self) -> None:
+        self._nodes: Dict[str, Tuple[Tuple[str, ...], Callable[..., np.ndarray]]] = {}
+        self._stage_names: Dict[str, str] = {}
+        self.levels = 0
+        self.blur_ksize = 0     # blurK 节点的高斯核大小（< 3 表示不模糊）
+
+    def add(self, name: str, deps: Sequence[str], fn: Callable[..., np.ndarray]) -> None:
+        """注册节点：fn(*[依赖节点的结果]) -> 图像。依赖必须已经注册（保证无环）。"""
+        for d in deps:
+            if d not in self._nodes and d != FRAME:
+                raise KeyError(f"节点 {name!r} 依赖了未注册的节点 {d!r}")
+        self._nodes[name] = (tuple(deps), fn)
+        self._stage_names[name] = f"frame.{name}"
+
+    def node(self, name: str) -> Tuple[Tuple[str, ...], Callable[..., np.ndarray]]:
+        try:
+            return self._nodes[name]
+        except KeyError:
+            raise KeyError(f"未注册的帧节点: {name!r}") from None
+
+    def __contains__(self, name: str) -> bool:
+        return name == FRAME or name in self._nodes
+
+    @classmethod
+    def default(cls, levels: int = 3, blur_ksize: int = 3, mirror: bool = True) -> "FrameGraph":
+        g = cls()
+        g.levels = levels
+        g.blur_ksize = blur_ksize
+        if mirror:
+            g.add(MIRRORED, [FRAME], lambda f: cv2.flip(f, 1))
+        else:
+            g.add(MIRRORED, [FRAME], lambda f: f)
+
+        g.add(pyr(0), [MIRRORED], lambda f: f)
+        for k in range(1, levels + 1):
+            g.add(pyr(k), [pyr(k - 1)], _half)
+
+        for k in range(levels + 1):
+            g.add(rgb(k), [pyr(k)], lambda f: cv2.cvtColor(f, cv2.COLOR_BGR2RGB))
+            g.add(gray(k), [pyr(k)], lambda f: cv2.cvtColor(f, cv2.COLOR_BGR2GRAY))
+            if blur_ksize >= 3:
+                g.add(blurred(k), [gray(k)], lambda f: cv2.GaussianBlur(f, (blur_ksize, blur_ksize), 0))
+            else:
+                g.add(blurred(k), [gray(k)], lambda f: f)
+        return g
+
+
+def _half(img: np.ndarray) -> np.ndarray:
+    h, w = img.shape[:2]
+    return cv2.resize(img, (max(1, w // 2), max(1, h // 2)), interpolation=cv2.INTER_AREA)
+
+
+class FrameProducts:
+    """
+    一帧及其派生图像的惰性缓存：get(name) 第一次调用时按依赖计算并缓存，
+    之后（包括其它线程里的其它消费者）直接返回同一个数组。
+
+    - 每个节点一把锁，多个消费者同时请求同一个节点时只算一次；
+      请求不同节点时互不阻塞
+    - 返回的数组都是只读的（多个消费者共享，不能原地修改）
+    """
+
+    def __init__(
+        self,
+        graph: FrameGraph,
+        frame: np.ndarray,
+        frame_id: int,
+        timestamp: float,
+        capture_time: float,
+    ) -> None:
+        self.graph = graph
+        self.frame_id = frame_id
+        self.timestamp = timestamp          # 媒体时间（见 FrameSource.timestamp）
+        self.capture_time = capture_time    # trace_now() 时钟下的采集完成时刻
+        frame.flags.writeable = False
+        self._cache: Dict[str, np.ndarray] = {FRAME: frame}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+        # 统计：本帧实际计算过的节点（用于验证“每帧最多算一次”）
+        self.computed: List[str] = []
+
+    @property
+    def width(self) -> int:
+        return self._cache[FRAME].shape[1]
+
+    @property
+    def height(self) -> int:
+        return self._cache[FRAME].shape[0]
+
+    def level_size(self, level: int) -> Tuple[int, int]:
+        """第 level 层金字塔的 (宽, 高)，与 _half 逐层取整的结果一致。"""
+        w, h = self.width, self.height
+        for _ in range(level):
+            w, h = max(1, w // 2), max(1, h // 2)
+        return w, h
+
+    def _lock_for(self, name: str) -> threading.Lock:
+        with self._locks_guard:
+            lock = self._locks.get(name)
+            if lock is None:
+                lock = self._locks[name] = threading.Lock()
+            return lock
+
+    def get(self, name: str) -> np.ndarray:
+        img = self._cache.get(name)
+        if img is not None:
+            return img
+
+        deps, fn = self.graph.node(name)
+        inputs = [self.get(d) for d in deps]
+        with self._lock_for(name):
+            img = self._cache.get(name)
+            if img is None:
+                with PROFILER.stage(self.graph._stage_names[name]):
+                    img = fn(*inputs)
+                if img.flags.writeable and not any(img is x for x in inputs):
+                    img.flags.writeable = False
+                self._cache[name] = img
+                self.computed.append(name)
+        return img
+
+
+class FrameSubscription:
+    """FrameHub 的一个订阅者：只关心最新帧，处理不过来时自动跳过中间帧。"""
+
+    def __init__(self, hub: "FrameHub", name: str) -> None:
+        self.hub = hub
+        self.name = name
+        self._event = asyncio.Event()
+        self._last_id = -1
+        self.skipped = 0
+
+    def _notify(self) -> None:
+        self._event.set()
+
+    async def next(self) -> Optional[FrameProducts]:
+        """等待比上一次拿到的更新的一帧；输入结束时返回 None。"""
+        while True:
+            latest = self.hub.latest
+            if latest is not None and latest.frame_id > self._last_id:
+                if self._last_id >= 0:
+                    self.skipped += latest.frame_id - self._last_id - 1
+                self._last_id = latest.frame_id
+                return latest
+            if self.hub.closed:
+                return None
+            self._event.clear()
+            await self._event.wait()
+
+    async def frames(self) -> AsyncIterator[FrameProducts]:
+        while True:
+            products = await self.next()
+            if products is None:
+                return
+            yield products
+
+    def close(self) -> None:
+        self.hub._unsubscribe(self)
+
+
+class FrameHub:
+    """
+    单一采集阶段：一个后台线程从 FrameSource 读帧，每帧包成 FrameProducts 发布给所有订阅者。
+
+    - 摄像头只打开一次；灰度 / 缩放 / 模糊等公共转换通过 FrameProducts 的惰性缓存只算一次
+    - 订阅者（hands_loop / motion_loop / edges_loop …）各自按自己的速度取“最新帧”，
+      慢的消费者只会跳帧，不会拖慢采集或其它消费者
+
+    - 运行时控制（LoopControl "capture"）：paused 时采集线程停止读帧（所有订阅者都拿不到新帧）；
+      width / height / fps 在两次读帧之间交给 source.configure()，应答里是摄像头实际接受的值
+
+    用法：
+        hub = FrameHub(CameraFrameSource())
+        await asyncio.gather(hub.run(), hands_loop(bridge, frames=hub), motion_loop(bridge, frames=hub))
+    """
+
+    CONTROL_PARAMS = {
+        "width": Param(int, 160, 3840),
+        "height": Param(int, 120, 2160),
+        "fps": Param(float, 1, 240),
+    }
+
+    def __init__(self, source: FrameSource, graph: Optional[FrameGraph] = None) -> None:
+        self.source = source
+        self.graph = graph or FrameGraph.default()
+        self.latest: Optional[FrameProducts] = None
+        self.closed = False
+        self._subs: List[FrameSubscription] = []
+        self._stop = threading.Event()
+        self.frames_captured = 0
+        # 暂停 / 改采集参数：由事件循环线程设置，采集线程在两次读帧之间处理
+        self._running = threading.Event()
+        self._running.set()
+        self._reconfigure: Optional[Tuple[dict, concurrent.futures.Future]] = None
+        self.control: Optional[LoopControl] = None
+
+    def subscribe(self, name: str = "consumer") -> FrameSubscription:
+        sub = FrameSubscription(self, name)
+        self._subs.append(sub)
+        return sub
+
+    def _unsubscribe(self, sub: FrameSubscription) -> None:
+        if sub in self._subs:
+            self._subs.remove(sub)
+
+    def _publish(self, products: Optional[FrameProducts]) -> None:
+        # 在事件循环线程里执行
+        if products is None:
+            self.closed = True
+        else:
+            self.latest = products
+        for sub in self._subs:
+            sub._notify()
+
+    def _apply_reconfigure(self) -> None:
+        # 在采集线程里执行
+        request, self._reconfigure = self._reconfigure, None
+        if request is None:
+            return
+        changes, future = request
+        if not future.set_running_or_notify_cancel():
+            return   # 请求已超时撤销（客户端收到的是失败应答），不能再生效
+        try:
+            future.set_result(self.source.configure(**changes))
+        except Exception as e:
+            future.set_exception(e)
+
+    def _capture(self, loop: asyncio.AbstractEventLoop) -> None:
+        frame_id = 0
+        try:
+            while not self._stop.is_set():
+                if self._reconfigure is not None:
+                    self._apply_reconfigure()
+                if not self._running.is_set():
+                    # 暂停：不读帧，但仍响应停止和改参数
+                    self._running.wait(0.1)
+                    continue
+                with PROFILER.stage("frame.read"):
+                    ok, frame = self.source.read()
+                t_capture = trace_now()
+                if not ok:
+                    logger.info("FrameHub 输入结束: %s", self.source.name)
+                    break
+                products = FrameProducts(self.graph, frame, frame_id, self.source.timestamp, t_capture)
+                frame_id += 1
+                self.frames_captured = frame_id
+                loop.call_soon_threadsafe(self._publish, products)
+        except RuntimeError:
+            # 事件循环已关闭（程序退出中）
+            return
+        finally:
+            try:
+                loop.call_soon_threadsafe(self._publish, None)
+            except RuntimeError:
+                pass
+
+    def _open(self) -> bool:
+        # 在线程池里执行，与模型加载 / 音频设备探测并行
+        with STARTUP.phase("camera.open"):
+            return self.source.open()
+
+    async def _apply_control(self, changes: dict) -> Optional[dict]:
+        if "paused" in changes:
+            if changes["paused"]:
+                self._running.clear()
+            else:
+                self._running.set()
+        settings = {k: v for k, v in changes.items() if k in self.CONTROL_PARAMS}
+        if not settings:
+            return None
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        self._reconfigure = (settings, future)
+        try:
+            try:
+                # 采集线程在下一次读帧之前处理；线程已经退出时不会有结果
+                return await asyncio.wait_for(asyncio.wrap_future(future), timeout=5.0)
+            except asyncio.TimeoutError:
+                # wait_for 超时时已经取消了 future：采集线程还没开始的请求撤销，之后也不会再执行
+                if future.cancelled():
+                    if self._reconfigure is not None and self._reconfigure[1] is future:
+                        self._reconfigure = None
+                    raise ControlError("采集线程没有响应") from None
+                # 采集线程正在执行这次修改：等它的实际结果，应答与 config 保持一致
+                return await asyncio.wrap_future(future)
+        except NotImplementedError as e:
+            raise ControlError(str(e)) from None
+
+    async def run(self) -> None:
+        """打开输入并在后台线程里持续采集，直到输入结束或 stop()。"""
+        loop = asyncio.get_running_loop()
+        ok = await loop.run_in_executor(None, self._open)
+        if not ok:
+            logger.error("FrameHub 无法打开帧输入 %s", self.source.name)
+            self._publish(None)
+            return
+        STARTUP.ready("camera")
+
+        logger.info("FrameHub 开始采集: %s (%dx%d)", self.source.name, self.source.width, self.source.height)
+        control = self.control = CONTROLS.register(LoopControl(
+            "capture", self.CONTROL_PARAMS,
+            width=self.source.width, height=self.source.height, fps=float(self.source.fps),
+        ))
+        # 有控制请求时立即处理，不必等到下一次轮询
+        wakeup = asyncio.Event()
+        control.on_request = wakeup.set
+        thread = threading.Thread(target=self._capture, args=(loop,), name="frame-hub", daemon=True)
+        thread.start()
+        try:
+            while thread.is_alive():
+                if control.pending:
+                    # 暂停由采集线程自己处理，这里不阻塞（仍要监视线程是否退出）
+                    await control.checkpoint(self._apply_control, block=False)
+                wakeup.clear()
+                try:
+                    await asyncio.wait_for(wakeup.wait(), timeout=0.1)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            CONTROLS.unregister(control)
+            self._running.set()
+            self._stop.set()
+            await loop.run_in_executor(None, thread.join)
+            self.source.release()
+            logger.info("FrameHub 结束，共采集 %d 帧", self.frames_captured)
+
+    def stop(self) -> None:
+        self._stop.set()
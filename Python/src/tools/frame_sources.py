@@ -0,0 +1,275 @@
+# Python/src/tools/frame_sources.py
+from __future__ import annotations
+
+import logging
+import time
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+
+class FrameSource:
+    """
+    视频帧输入接口（阻塞式，和 cv2.VideoCapture 的用法一致），
+    让 motion_loop 等视觉循环不关心帧来自摄像头、视频文件还是合成画面。
+
+    子类需要提供：
+    - name:          摄像头 / 文件名
+    - width, height: 输出帧尺寸（像素），open() 之后有效
+    - open() -> bool
+    - read() -> (ok, frame)：frame 为 BGR uint8；输入结束或失败时 ok=False
+    - release()
+
+    timestamp 是最近一帧的“媒体时间”（秒）：摄像头为单调时钟，
+    文件 / 合成画面为帧序号 / fps。速度等随时间变化的量应该用它来算，
+    这样加速回放时结果和实时运行一致。
+    """
+
+    name: str = "unknown"
+    width: int = 0
+    height: int = 0
+    fps: float = 30.0
+    timestamp: float = 0.0
+
+    def open(self) -> bool:
+        raise NotImplementedError
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        raise NotImplementedError
+
+    def release(self) -> None:
+        pass
+
+    def configure(
+        self,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        fps: Optional[float] = None,
+    ) -> dict:
+        """
+        运行中修改采集参数（在读帧的线程里、两次 read() 之间调用），
+        返回实际生效的 {"width", "height", "fps"}；不支持的输入抛 NotImplementedError。
+        """
+        raise NotImplementedError(f"{self.name} 不支持修改采集参数")
+
+
+class CameraFrameSource(FrameSource):
+    """
+    实时摄像头（MJPG + 指定分辨率 / FPS，与 hands_loop 的摄像头配置一致）。
+    """
+
+    def __init__(
+        self,
+        cam_index: int = 0,
+        width: int = 1280,
+        height: int = 720,
+        fps: float = 60,
+        api_preference: int = cv2.CAP_DSHOW,
+    ) -> None:
+        self.cam_index = cam_index
+        self.name = f"camera:{cam_index}"
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.api_preference = api_preference
+        self._cap: Optional[cv2.VideoCapture] = None
+
+    def open(self) -> bool:
+        logger.info("打开摄像头 index=%d", self.cam_index)
+        cap = cv2.VideoCapture(self.cam_index, self.api_preference)
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*"MJPG"))
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        cap.set(cv2.CAP_PROP_FPS, self.fps)
+        if not cap.isOpened():
+            logger.error("无法打开摄像头 %d", self.cam_index)
+            return False
+
+        # 摄像头不一定接受请求的分辨率，以实际值为准
+        self.width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)) or self.width
+        self.height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) or self.height
+        self._cap = cap
+        return True
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        ok, frame = self._cap.read()
+        self.timestamp = time.monotonic()
+        return ok, frame
+
+    def configure(
+        self,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        fps: Optional[float] = None,
+    ) -> dict:
+        cap = self._cap
+        if width is not None:
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        if height is not None:
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        if fps is not None:
+            cap.set(cv2.CAP_PROP_FPS, fps)
+        # 和 open() 一样以摄像头实际接受的值为准
+        self.width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)) or self.width
+        self.height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) or self.height
+        self.fps = cap.get(cv2.CAP_PROP_FPS) or fps or self.fps
+        logger.info("摄像头参数: %dx%d @ %.1f fps", self.width, self.height, self.fps)
+        return {"width": self.width, "height": self.height, "fps": float(self.fps)}
+
+    def release(self) -> None:
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+
+
+class VideoFileFrameSource(FrameSource):
+    """
+    视频文件输入（录好的素材，用于复现问题和基准测试）。
+
+    speed: 1.0 = 按文件 FPS 实时回放；2.0 = 两倍速；None = 不限速（尽可能快）
+    loop:  播放到结尾后是否从头循环
+    """
+
+    def __init__(self, path: str, speed: Optional[float] = None, loop: bool = False) -> None:
+        if speed is not None and speed <= 0:
+            raise ValueError("speed 必须为正数或 None")
+        self.path = path
+        self.name = path
+        self.speed = speed
+        self.loop = loop
+        self._cap: Optional[cv2.VideoCapture] = None
+        self._index = 0
+        self._next_t = 0.0
+
+    def open(self) -> bool:
+        cap = cv2.VideoCapture(self.path)
+        if not cap.isOpened():
+            logger.error("无法打开视频文件 %s", self.path)
+            return False
+        self.width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self._cap = cap
+        self._index = 0
+        self._next_t = time.monotonic()
+        return True
+
+    @property
+    def frame_count(self) -> int:
+        return int(self._cap.get(cv2.CAP_PROP_FRAME_COUNT)) if self._cap is not None else 0
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        ok, frame = self._cap.read()
+        if not ok and self.loop and self._index > 0:
+            self._cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, frame = self._cap.read()
+        if not ok:
+            return False, None
+
+        self.timestamp = self._index / self.fps
+        self._index += 1
+        if self.speed is not None:
+            self._next_t += 1.0 / (self.fps * self.speed)
+            delay = self._next_t - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            elif delay < -1.0:
+                # 落后太多就不追赶了
+                self._next_t = time.monotonic()
+        return True, frame
+
+    def release(self) -> None:
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+
+
+class SyntheticFrameSource(FrameSource):
+    """
+    合成画面：带噪声的静态背景上有若干矩形匀速运动、碰到边缘反弹。
+    同样的 seed 生成完全相同的画面，可以在没有摄像头 / 素材的环境下做基准，
+    ground_truth() 给出当前帧每个物体的真实框 (x, y, w, h)，用于评估检测 / 跟踪精度。
+
+    speed: 同 VideoFileFrameSource（None = 不限速）
+    """
+
+    def __init__(
+        self,
+        width: int = 1280,
+        height: int = 720,
+        n_objects: int = 3,
+        n_frames: Optional[int] = 300,
+        fps: float = 30.0,
+        object_size: Tuple[int, int] = (60, 140),
+        max_speed: float = 300.0,
+        noise: float = 4.0,
+        speed: Optional[float] = None,
+        seed: int = 0,
+    ) -> None:
+        self.name = f"synthetic:{n_objects}obj"
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.n_frames = n_frames
+        self.speed = speed
+
+        rng = np.random.default_rng(seed)
+        # 背景：平滑的纹理，避免纯色背景让背景建模过于简单
+        bg = rng.integers(60, 120, size=(height // 16 + 1, width // 16 + 1, 3), dtype=np.uint8)
+        bg = cv2.resize(bg, (width, height), interpolation=cv2.INTER_LINEAR)
+        # 传感器噪声：预先生成几张加噪背景轮流使用，避免每帧生成整幅随机数
+        self._backgrounds = [
+            np.clip(bg + rng.normal(0.0, noise, size=bg.shape), 0, 255).astype(np.uint8)
+            for _ in range(8 if noise > 0 else 1)
+        ]
+
+        lo, hi = object_size
+        self._sizes = rng.integers(lo, hi, size=(n_objects, 2)).astype(np.float64)
+        self._pos = rng.uniform([0, 0], [width - hi, height - hi], size=(n_objects, 2))
+        self._vel = rng.uniform(-max_speed, max_speed, size=(n_objects, 2))
+        self._colors = rng.integers(150, 255, size=(n_objects, 3))
+        self._index = 0
+        self._next_t = 0.0
+
+    def open(self) -> bool:
+        self._next_t = time.monotonic()
+        return True
+
+    def ground_truth(self) -> List[Tuple[int, int, int, int]]:
+        """最近一次 read() 返回的帧里各物体的真实框。"""
+        return [
+            (int(x), int(y), int(w), int(h))
+            for (x, y), (w, h) in zip(self._last_pos, self._sizes)
+        ]
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        if self.n_frames is not None and self._index >= self.n_frames:
+            return False, None
+
+        frame = self._backgrounds[self._index % len(self._backgrounds)].copy()
+        for (x, y), (w, h), color in zip(self._pos, self._sizes, self._colors):
+            cv2.rectangle(frame, (int(x), int(y)), (int(x + w) - 1, int(y + h) - 1), color.tolist(), -1)
+
+        self._last_pos = self._pos.copy()
+        self.timestamp = self._index / self.fps
+        self._index += 1
+
+        # 推进到下一帧：匀速运动，碰到边缘反弹
+        dt = 1.0 / self.fps
+        self._pos += self._vel * dt
+        limit = np.array([self.width, self.height]) - self._sizes
+        out_low = self._pos < 0
+        out_high = self._pos > limit
+        self._vel[out_low | out_high] *= -1
+        self._pos = np.clip(self._pos, 0, limit)
+
+        if self.speed is not None:
+            self._next_t += dt / self.speed
+            delay = self._next_t - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        return True, frame
@@ -0,0 +1,255 @@
+# Python/src/tools/gestures.py
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from Python.src.tools.messages.gestures import build_gesture_event_payload
+from Python.src.tools.messages.hands import LANDMARK_COUNT
+
+
+# MediaPipe Hands 关键点索引
+WRIST = 0
+THUMB_TIP = 4
+INDEX_MCP = 5
+INDEX_TIP = 8
+MIDDLE_MCP = 9
+MIDDLE_TIP = 12
+RING_TIP = 16
+PINKY_MCP = 17
+PINKY_TIP = 20
+
+FINGER_TIPS = (THUMB_TIP, INDEX_TIP, MIDDLE_TIP, RING_TIP, PINKY_TIP)
+
+# 手势引擎只跟踪左右两只手，槽位顺序固定
+HAND_LABELS = ("Left", "Right")
+
+# 手指伸直 / 弯曲阈值：指尖到掌心距离 / 手掌尺寸（手腕 -> 中指根部）
+# 与 Unity HandFeatureExtractor 的思路一致，但按手掌尺寸归一化，
+# 这样手离摄像头远近不同时阈值依然有效。
+FINGER_EXTENDED_RATIO = 1.3
+FINGER_BENT_RATIO = 0.9
+PINCH_RATIO = 0.35
+
+
+# ---------- 向量化几何特征（输入形状均为 (..., 21, 3)） ----------
+
+def palm_centers(lm: np.ndarray) -> np.ndarray:
+    """掌心 = (手腕 + 食指根 + 小指根) / 3，返回 (..., 3)。"""
+    return (lm[..., WRIST, :] + lm[..., INDEX_MCP, :] + lm[..., PINKY_MCP, :]) / 3.0
+
+
+def palm_sizes(lm: np.ndarray) -> np.ndarray:
+    """手掌尺寸（手腕 -> 中指根部距离），返回 (...)，已避免除零。"""
+    size = np.linalg.norm(lm[..., MIDDLE_MCP, :] - lm[..., WRIST, :], axis=-1)
+    return np.maximum(size, 1e-6)
+
+
+def fingertip_ratios(lm: np.ndarray) -> np.ndarray:
+    """
+    五根手指指尖到掌心的距离 / 手掌尺寸，返回 (..., 5)。
+    顺序：拇指、食指、中指、无名指、小指。
+    """
+    tips = lm[..., FINGER_TIPS, :]
+    center = palm_centers(lm)[..., None, :]
+    dist = np.linalg.norm(tips - center, axis=-1)
+    return dist / palm_sizes(lm)[..., None]
+
+
+def is_open_palm(lm: np.ndarray) -> np.ndarray:
+    """至少 4 根手指伸直。"""
+    return (fingertip_ratios(lm) > FINGER_EXTENDED_RATIO).sum(axis=-1) >= 4
+
+
+def is_fist(lm: np.ndarray) -> np.ndarray:
+    """至少 4 根手指弯曲。"""
+    return (fingertip_ratios(lm) < FINGER_BENT_RATIO).sum(axis=-1) >= 4
+
+
+def is_pinch(lm: np.ndarray) -> np.ndarray:
+    """拇指尖与食指尖贴近。"""
+    gap = np.linalg.norm(lm[..., THUMB_TIP, :] - lm[..., INDEX_TIP, :], axis=-1)
+    return gap / palm_sizes(lm) < PINCH_RATIO
+
+
+def is_point(lm: np.ndarray) -> np.ndarray:
+    """食指伸直，中指 / 无名指 / 小指弯曲。"""
+    r = fingertip_ratios(lm)
+    return (
+        (r[..., 1] > FINGER_EXTENDED_RATIO)
+        & (r[..., 2] < FINGER_BENT_RATIO)
+        & (r[..., 3] < FINGER_BENT_RATIO)
+        & (r[..., 4] < FINGER_BENT_RATIO)
+    )
+
+
+# ---------- 声明式手势定义 ----------
+
+@dataclass(frozen=True)
+class GestureSpec:
+    """
+    一个手势 = 姿态谓词 + 最短保持时间。
+
+    predicate:     输入 (N, 21, 3) 的 landmarks，返回 (N,) 的 bool 数组
+    min_hold:      谓词连续为真多久（秒）才算手势开始
+    release_grace: 谓词变假后的宽限时间（秒），避免单帧抖动导致手势中断
+    hands:         允许触发该手势的手（"Left" / "Right"）
+    """
+    name: str
+    predicate: Callable[[np.ndarray], np.ndarray]
+    min_hold: float = 0.2
+    release_grace: float = 0.1
+    hands: Sequence[str] = HAND_LABELS
+
+
+DEFAULT_GESTURES: tuple[GestureSpec, ...] = (
+    GestureSpec("open_palm", is_open_palm, min_hold=0.25),
+    GestureSpec("fist", is_fist, min_hold=0.25),
+    GestureSpec("pinch", is_pinch, min_hold=0.1),
+    GestureSpec("point", is_point, min_hold=0.2),
+)
+
+
+class GestureEngine:
+    """
+    在 Python 侧做手势判定，只在状态切换时产出事件：
+
+    - 每只手最近 history 帧的 landmarks 存在环形缓冲区 (2, history, 21, 3) 中；
+    - 每帧对最近 smooth_frames 帧取平均，再一次性对所有手势 × 两只手做向量化判定；
+    - 状态机（开始时间 / 最近为真时间 / 是否激活）也都是 (手势数, 2) 的数组，
+      没有逐手势的 Python 对象。
+
+    用法：
+        engine = GestureEngine()
+        for event in engine.update(extract_hand_arrays(results), time.monotonic()):
+            bridge.send_json(make_message("gesture_event", event, ...))
+    """
+
+    def __init__(
+        self,
+        gestures: Sequence[GestureSpec] = DEFAULT_GESTURES,
+        history: int = 8,
+        smooth_frames: int = 3,
+    ) -> None:
+        if not gestures:
+            raise ValueError("gestures 不能为空")
+        if not 1 <= smooth_frames <= history:
+            raise ValueError("smooth_frames 必须在 1..history 之间")
+
+        self.gestures = tuple(gestures)
+        self.history = history
+        self.smooth_frames = smooth_frames
+
+        n_hands = len(HAND_LABELS)
+        n_gestures = len(self.gestures)
+
+        # 环形缓冲区：landmarks + 该帧是否有这只手
+        self._frames = np.zeros((n_hands, history, LANDMARK_COUNT, 3), dtype=np.float32)
+        self._valid = np.zeros((n_hands, history), dtype=bool)
+        self._head = 0
+
+        # 每个手势的参数，展开成数组方便广播
+        self._min_hold = np.array([g.min_hold for g in self.gestures], dtype=np.float64)[:, None]
+        self._grace = np.array([g.release_grace for g in self.gestures], dtype=np.float64)[:, None]
+        self._allowed = np.array(
+            [[label in g.hands for label in HAND_LABELS] for g in self.gestures],
+            dtype=bool,
+        )
+
+        # 状态机：NaN 表示“当前没有候选”
+        shape = (n_gestures, n_hands)
+        self._start = np.full(shape, np.nan)
+        self._last_true = np.full(shape, np.nan)
+        self._active = np.zeros(shape, dtype=bool)
+
+    def reset(self) -> None:
+        """清空缓冲区和所有手势状态（不产出 end 事件）。"""
+        self._valid[:] = False
+        self._head = 0
+        self._start[:] = np.nan
+        self._last_true[:] = np.nan
+        self._active[:] = False
+
+    def active_gestures(self) -> List[tuple[str, str]]:
+        """当前处于激活状态的 (手势名, 手) 列表。"""
+        gi, hi = np.nonzero(self._active)
+        return [(self.gestures[g].name, HAND_LABELS[h]) for g, h in zip(gi, hi)]
+
+    def update(self, hands: Dict[str, np.ndarray], t: float) -> List[dict]:
+        """
+        推入一帧并返回本帧产生的手势事件（通常是空列表）。
+
+        hands: {"Left": (21, 3), "Right": (21, 3)}，缺失的手不出现在 dict 里
+        t:     单调时钟时间（秒），例如 time.monotonic()
+        """
+        # 1. 写入环形缓冲区
+        slot = self._head
+        for h, label in enumerate(HAND_LABELS):
+            lm = hands.get(label)
+            if lm is None:
+                self._valid[h, slot] = False
+            else:
+                self._frames[h, slot] = lm
+                self._valid[h, slot] = True
+        self._head = (slot + 1) % self.history
+
+        # 2. 对最近 smooth_frames 帧做带掩码的平均 -> (2, 21, 3)
+        idx = (slot - np.arange(self.smooth_frames)) % self.history
+        recent = self._frames[:, idx]
+        weights = self._valid[:, idx].astype(np.float32)
+        count = weights.sum(axis=1)
+        smoothed = (recent * weights[:, :, None, None]).sum(axis=1)
+        smoothed /= np.maximum(count, 1.0)[:, None, None]
+
+        # 当前帧没有这只手，就当它所有手势都不成立
+        present = self._valid[:, slot]
+
+        # 3. 所有手势 × 两只手的谓词 -> (G, 2)
+        cond = np.stack([np.asarray(g.predicate(smoothed), dtype=bool) for g in self.gestures])
+        cond &= present[None, :] & self._allowed
+
+        # 4. 状态机
+        self._last_true[cond] = t
+        self._start[cond & np.isnan(self._start)] = t
+
+        with np.errstate(invalid="ignore"):
+            released = ~cond & ((t - self._last_true) > self._grace)
+        ended_start = self._start.copy()
+        ended_last = self._last_true.copy()
+        self._start[released] = np.nan
+        self._last_true[released] = np.nan
+
+        with np.errstate(invalid="ignore"):
+            now_active = (t - self._start) >= self._min_hold
+
+        began = now_active & ~self._active
+        ended = self._active & ~now_active
+        self._active = now_active
+
+        # 5. 只有状态切换才产出事件
+        events: List[dict] = []
+        if began.any() or ended.any():
+            centers = palm_centers(smoothed)
+            for g, h in zip(*np.nonzero(ended)):
+                events.append(self._event(g, h, "end", ended_last[g, h] - ended_start[g, h], centers[h]))
+            for g, h in zip(*np.nonzero(began)):
+                events.append(self._event(g, h, "start", t - self._start[g, h], centers[h]))
+        return events
+
+    def _event(
+        self,
+        g: int,
+        h: int,
+        phase: str,
+        held_sec: float,
+        palm: Optional[np.ndarray],
+    ) -> dict:
+        return build_gesture_event_payload(
+            gesture=self.gestures[g].name,
+            hand=HAND_LABELS[h],
+            phase=phase,
+            held_sec=float(held_sec),
+            palm=None if palm is None else palm.tolist(),
+        )
@@ -0,0 +1,216 @@
+# Python/src/tools/loudness.py
+from __future__ import annotations
+
+from typing import Dict, Tuple
+
+import numpy as np
+
+
+def k_weighting_coefficients(sample_rate: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    ITU-R BS.1770 的 K 加权滤波器（高架 + 高通两级 biquad 级联），
+    按任意采样率重新计算系数，返回合并后的四阶 (b, a)，a[0] == 1。
+
+    48 kHz 时与标准给出的系数一致：
+        高架 b = [1.53512486, -2.69169619, 1.19839281], a = [1, -1.69065929, 0.73248077]
+        高通 b = [1, -2, 1],                            a = [1, -1.99004745, 0.99007225]
+    """
+    # 第一级：头部声学效应的高架滤波（约 +4 dB @ 1.5 kHz 以上）
+    fc, gain_db, q = 1681.9744509555319, 3.99984385397, 0.7071752369554193
+    k = np.tan(np.pi * fc / sample_rate)
+    vh = 10.0 ** (gain_db / 20.0)
+    vb = vh ** 0.499666774155
+    a0 = 1.0 + k / q + k * k
+    b1 = np.array([(vh + vb * k / q + k * k) / a0, 2.0 * (k * k - vh) / a0, (vh - vb * k / q + k * k) / a0])
+    a1 = np.array([1.0, 2.0 * (k * k - 1.0) / a0, (1.0 - k / q + k * k) / a0])
+
+    # 第二级：RLB 高通（约 38 Hz）
+    fc, q = 38.13547087613982, 0.5003270373253953
+    k = np.tan(np.pi * fc / sample_rate)
+    a0 = 1.0 + k / q + k * k
+    b2 = np.array([1.0, -2.0, 1.0])
+    a2 = np.array([1.0, 2.0 * (k * k - 1.0) / a0, (1.0 - k / q + k * k) / a0])
+
+    return np.convolve(b1, b2), np.convolve(a1, a2)
+
+
+def lfilter_reference(b: np.ndarray, a: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """逐样本的直接型 IIR（零初始状态），只用于校验 BlockIIRFilter，很慢。"""
+    p = len(a) - 1
+    y = np.zeros(len(x))
+    for n in range(len(x)):
+        acc = 0.0
+        for i in range(p + 1):
+            if n - i >= 0:
+                acc += b[i] * x[n - i]
+        for i in range(1, p + 1):
+            if n - i >= 0:
+                acc -= a[i] * y[n - i]
+        y[n] = acc
+    return y
+
+
+class BlockIIRFilter:
+    """
+    带状态的分块 IIR 滤波，结果与逐样本递推完全等价，但每块的开销只有一次 FFT 卷积：
+
+        y = (x * h)[:N] + Z @ s
+
+    - h: 零状态下的冲激响应前 N 个样本（块内只有前 N 个系数会起作用，所以没有截断误差）
+    - s: 上一块留下的直接 I 型状态 (x[-1..-p], y[-1..-p])
+    - Z: (N, 2p) 零输入响应矩阵，第 j 列是只有 s[j] = 1 时的输出
+
+    h 和 Z 只依赖块长 N，第一次遇到某个块长时预先算好并缓存；
+    之后每块的开销与流已经跑了多久、状态多“长”都无关。
+    """
+
+    def __init__(self, b: np.ndarray, a: np.ndarray) -> None:
+        self.b = np.asarray(b, dtype=np.float64)
+        self.a = np.asarray(a, dtype=np.float64)
+        if self.a[0] != 1.0:
+            self.b = self.b / self.a[0]
+            self.a = self.a / self.a[0]
+        self.order = max(len(self.a), len(self.b)) - 1
+        self.b = np.pad(self.b, (0, self.order + 1 - len(self.b)))
+        self.a = np.pad(self.a, (0, self.order + 1 - len(self.a)))
+
+        self._plans: Dict[int, Tuple[int, np.ndarray, np.ndarray]] = {}
+        self.reset()
+
+    def reset(self) -> None:
+        p = self.order
+        # [x[-1], ..., x[-p], y[-1], ..., y[-p]]
+        self._state = np.zeros(2 * p)
+
+    def _plan(self, n: int) -> Tuple[int, np.ndarray, np.ndarray]:
+        plan = self._plans.get(n)
+        if plan is not None:
+            return plan
+
+        p = self.order
+        b, a = self.b, self.a
+        # 同时递推 1 + 2p 个系统：第 0 列为冲激响应，其余列为各状态分量的零输入响应
+        cols = 1 + 2 * p
+        xs = np.zeros((n + p, cols))      # 前 p 行是“过去”的输入
+        ys = np.zeros((n + p, cols))
+        xs[p, 0] = 1.0
+        for j in range(p):
+            xs[p - 1 - j, 1 + j] = 1.0    # x[-1-j]
+            ys[p - 1 - j, 1 + p + j] = 1.0  # y[-1-j]
+        for t in range(p, n + p):
+            ys[t] = b @ xs[t - p:t + 1][::-1] - a[1:] @ ys[t - p:t][::-1]
+
+        h = ys[p:, 0]
+        zir = ys[p:, 1:].copy()
+        size = 1 << int(np.ceil(np.log2(2 * n)))
+        plan = (size, np.fft.rfft(h, size), zir)
+        self._plans[n] = plan
+        return plan
+
+    def process(self, x: np.ndarray) -> np.ndarray:
+        """滤波一块连续样本 (N,)，返回 (N,) float64，并更新内部状态。"""
+        x = np.asarray(x, dtype=np.float64)
+        n = x.shape[0]
+        if n == 0:
+            return x.copy()
+        size, hf, zir = self._plan(n)
+
+        y = np.fft.irfft(np.fft.rfft(x, size) * hf, size)[:n] + zir @ self._state
+
+        p = self.order
+        s = np.empty(2 * p)
+        # 块比阶数短时，旧状态中的一部分还要继续保留
+        xs = np.concatenate([self._state[:p][::-1], x])[-p:][::-1]
+        ys = np.concatenate([self._state[p:][::-1], y])[-p:][::-1]
+        s[:p] = xs
+        s[p:] = ys
+        self._state = s
+        return y
+
+
+class LoudnessMeter:
+    """
+    增量式响度计（ITU-R BS.1770 / EBU R128，单声道）：
+
+    - 每个输入块先经过带状态的 K 加权（BlockIIRFilter，状态跨块保留）；
+    - 每块只算一次均方并放进环形数组；瞬时（momentary, 400 ms）和短期（short-term, 3 s）
+      响度由两个滑动窗口的累加和得到：新块加进来、滑出窗口的旧块减掉，不回看历史；
+    - 环形数组每转一圈用精确求和重新同步一次累加和，防止浮点误差累积。
+
+    因此每块的开销与窗口长度无关。窗口还没填满时用已有的块计算。
+
+        LUFS = -0.691 + 10 * log10(均方)
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        block_size: int,
+        momentary_sec: float = 0.4,
+        short_term_sec: float = 3.0,
+        min_lufs: float = -120.0,
+    ) -> None:
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+        self.min_lufs = min_lufs
+        self.filter = BlockIIRFilter(*k_weighting_coefficients(sample_rate))
+
+        block_sec = block_size / sample_rate
+        self.momentary_blocks = max(1, int(round(momentary_sec / block_sec)))
+        self.short_term_blocks = max(1, int(round(short_term_sec / block_sec)))
+
+        # 短期窗口覆盖瞬时窗口，两个累加和共用同一个环形数组
+        self._energy = np.zeros(max(self.momentary_blocks, self.short_term_blocks))
+        self.reset()
+
+    def reset(self) -> None:
+        self.filter.reset()
+        self._energy[:] = 0.0
+        self._count = 0
+        self._sum_m = 0.0
+        self._sum_s = 0.0
+
+    def _lufs(self, mean_square: float) -> float:
+        if mean_square <= 0.0:
+            return self.min_lufs
+        return max(self.min_lufs, -0.691 + 10.0 * np.log10(mean_square))
+
+    def process(self, blocks: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        blocks: (n, block_size) 连续的新样本块（按时间顺序）。
+
+        返回 dict：momentary_lufs (n,), short_term_lufs (n,)
+        """
+        blocks = np.atleast_2d(blocks)
+        n = blocks.shape[0]
+        # 逐块滤波（块长固定，只需要一份预计算的 h / Z）
+        energy = np.array([np.mean(np.square(self.filter.process(blk))) for blk in blocks])
+
+        ring = self._energy
+        size = ring.shape[0]
+        nm, ns = self.momentary_blocks, self.short_term_blocks
+        momentary = np.empty(n)
+        short_term = np.empty(n)
+        for i in range(n):
+            c = self._count
+            idx = c % size
+            self._sum_m += energy[i]
+            self._sum_s += energy[i]
+            if c >= nm:
+                self._sum_m -= ring[(c - nm) % size]
+            if c >= ns:
+                self._sum_s -= ring[(c - ns) % size]
+            ring[idx] = energy[i]
+            self._count = c + 1
+
+            if idx == size - 1:
+                # 每转一圈重新精确求和一次（摊销到每块仍是 O(1)）
+                self._sum_m = float(ring[size - nm:].sum())
+                self._sum_s = float(ring[size - ns:].sum())
+
+            filled_m = min(self._count, nm)
+            filled_s = min(self._count, ns)
+            momentary[i] = self._lufs(self._sum_m / filled_m)
+            short_term[i] = self._lufs(self._sum_s / filled_s)
+
+        return {"momentary_lufs": momentary, "short_term_lufs": short_term}
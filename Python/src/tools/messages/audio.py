@@ -1,7 +1,7 @@
 # Python/src/tools/messages/audio.py
 from __future__ import annotations
 
-from typing import Optional
+from typing import List, Optional
 
 
 def build_audio_payload(
@@ -10,14 +10,24 @@ def build_audio_payload(
     device_name: str | None = None,
     sample_rate: int | None = None,
     block_duration: float | None = None,
+    overflows: int | None = None,
+    dropped_blocks: int | None = None,
+    hop_duration: float | None = None,
+    lufs_momentary: float | None = None,
+    lufs_short_term: float | None = None,
 ) -> dict:
     """
     构造音频分贝 payload.
 
     level_dbfs: 以 dBFS（相对满幅度 0 dB）表示的音量值，越大越响，一般是负数。
     rms:        原始归一化 RMS（0~1）。
+    block_duration / hop_duration: 分析窗长 / 跳步（秒）；跳步不传时 window 中不出现 hop_sec。
+    overflows / dropped_blocks: 采集统计（设备输入溢出次数 / 消费不及时丢弃的块数），
+                不传时 payload 中不出现 capture 字段。
+    lufs_momentary / lufs_short_term: K 加权响度（LUFS，400 ms / 3 s 窗口），
+                比 dBFS 更接近人耳感知；传入时写进 level 下。
     """
-    return {
+    payload = {
         "device": {
             "name": device_name,
             "sample_rate": sample_rate,
@@ -30,3 +40,90 @@ def build_audio_payload(
             "rms": rms,
         },
     }
+    if hop_duration is not None:
+        payload["window"]["hop_sec"] = hop_duration
+    if lufs_momentary is not None:
+        payload["level"]["lufs_momentary"] = lufs_momentary
+    if lufs_short_term is not None:
+        payload["level"]["lufs_short_term"] = lufs_short_term
+    if overflows is not None or dropped_blocks is not None:
+        payload["capture"] = {
+            "overflows": overflows,
+            "dropped_blocks": dropped_blocks,
+        }
+    return payload
+
+
+def build_audio_features_payload(
+    level_dbfs: float,
+    rms: float,
+    bands_db: List[float],
+    centroid_hz: float,
+    flux: float,
+    onset: bool,
+    pitch_hz: float,
+    pitch_confidence: float,
+    device_name: str | None = None,
+    sample_rate: int | None = None,
+    block_duration: float | None = None,
+    overflows: int | None = None,
+    dropped_blocks: int | None = None,
+    hop_duration: float | None = None,
+    band_scale: str = "mel",
+    lufs_momentary: float | None = None,
+    lufs_short_term: float | None = None,
+) -> dict:
+    """
+    构造扩展的音频特征 payload（顶层 type = "audio_features"）。
+
+    在 build_audio_payload 的基础上增加：
+    - spectrum.bands_db:    各频带能量（dB），频带按 band_scale（mel）从低到高排列
+    - spectrum.centroid_hz: 谱质心，越大声音越“亮”
+    - spectrum.flux:        谱通量，声音变化的剧烈程度
+    - onset:                本块是否检测到起音（拍手、敲击等）
+    - pitch.hz:             基频估计，没有明显音高时为 0
+    - pitch.confidence:     基频置信度（归一化自相关峰值，0~1）
+    """
+    payload = build_audio_payload(
+        level_dbfs=level_dbfs,
+        rms=rms,
+        device_name=device_name,
+        sample_rate=sample_rate,
+        block_duration=block_duration,
+        overflows=overflows,
+        dropped_blocks=dropped_blocks,
+        hop_duration=hop_duration,
+        lufs_momentary=lufs_momentary,
+        lufs_short_term=lufs_short_term,
+    )
+    payload["spectrum"] = {
+        "band_scale": band_scale,
+        "bands_db": bands_db,
+        "centroid_hz": centroid_hz,
+        "flux": flux,
+    }
+    payload["onset"] = onset
+    payload["pitch"] = {
+        "hz": pitch_hz,
+        "confidence": pitch_confidence,
+    }
+    return payload
+
+
+def build_vad_payload(
+    active: bool,
+    noise_floor_dbfs: float,
+    snr_db: float,
+) -> dict:
+    """
+    VAD 字段（附加在 audio_level / audio_features payload 的 "vad" 下）：
+
+    - active:           当前是否有声音活动
+    - noise_floor_dbfs: 自适应噪声底估计（dBFS），客户端可以据此代替固定的静音 / 响度阈值
+    - snr_db:           当前电平高出噪声底多少 dB
+    """
+    return {
+        "active": active,
+        "noise_floor_dbfs": noise_floor_dbfs,
+        "snr_db": snr_db,
+    }
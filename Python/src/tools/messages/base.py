@@ -1,6 +1,40 @@
 from __future__ import annotations
+import json
 import time
-from typing import Any, Optional
+from typing import Any, Optional, Tuple
+
+
+# 可选的链路追踪字段（全部是发送端 time.monotonic() 秒数）：
+# - capture:     采集完成（摄像头帧 / 音频块到手）的时刻
+# - infer_start: 推理 / 分析开始
+# - infer_end:   推理 / 分析结束
+# - enqueue:     进入 WsBridge 发送队列（由 WsBridge.send_json 自动填写）
+# - send:        真正写 socket 之前（由 WsBridge 发送循环自动填写）
+# 客户端通过 clock_ping / clock_pong 估计时钟偏移后，即可把这些时刻换算到本地时钟。
+TRACE_STAGES = ("capture", "infer_start", "infer_end", "enqueue", "send")
+
+
+def trace_now() -> float:
+    """追踪字段统一使用的时钟（单调时钟，秒）。"""
+    return time.monotonic()
+
+
+def encode_traced(msg: dict) -> Tuple[str, dict]:
+    """
+    带 trace 的消息排队时调用：编码 trace 以外的部分，返回 (body, trace)。
+    不可序列化的数据在这里就抛 TypeError（与不带 trace 的消息一样由 send_json 的调用方看到），
+    发送前只需用 finish_traced 填上 send 时刻、把 trace 拼到末尾。
+    """
+    trace = msg["trace"]
+    body = json.dumps({k: v for k, v in msg.items() if k != "trace"})
+    json.dumps(trace)   # trace 也要在排队时检查，发送时不再出错
+    return body, trace
+
+
+def finish_traced(body: str, trace: dict) -> str:
+    """把 trace 拼进 encode_traced 编码好的 body（trace 成为最后一个键，type 仍在最前面）。"""
+    sep = "" if body == "{}" else ", "
+    return f'{body[:-1]}{sep}"trace": {json.dumps(trace)}}}'
 
 
 def make_message(
@@ -9,12 +43,15 @@ def make_message(
     frame_id: Optional[int] = None,
     source: str = "mediapipe",
     version: int = 1,
+    trace: Optional[dict] = None,
 ) -> dict:
     """
     构造顶层标准消息结构。
     所有的 payload（hands, yolo, pose...）都使用这个函数包上一层。
+
+    trace: 可选的追踪时间戳 dict（见 TRACE_STAGES），为 None 时消息中不出现 trace 字段。
     """
-    return {
+    msg = {
         "type": msg_type,
         "version": version,
         "timestamp": time.time(),   # 秒（float）
@@ -22,3 +59,6 @@ def make_message(
         "source": source,
         "payload": payload,
     }
+    if trace is not None:
+        msg["trace"] = trace
+    return msg
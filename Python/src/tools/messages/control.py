@@ -0,0 +1,72 @@
+from __future__ import annotations
+from typing import Any, Dict, Optional
+
+
+# 客户端 -> Python 的控制消息，以及 Python 的应答
+CONTROL = "control"
+CONTROL_ACK = "control_ack"
+
+# 动作
+ACTION_SET = "set"          # 修改参数：params = { "target_fps": 15, ... }
+ACTION_PAUSE = "pause"      # 等价于 set paused = true
+ACTION_RESUME = "resume"    # 等价于 set paused = false
+ACTION_GET = "get"          # 只读取当前配置
+ACTIONS = (ACTION_SET, ACTION_PAUSE, ACTION_RESUME, ACTION_GET)
+
+
+def make_control_request(
+    target: str,
+    action: str,
+    params: Optional[Dict[str, Any]] = None,
+    request_id: Any = None,
+) -> dict:
+    """
+    客户端发送的控制消息（不经过 make_message，字段尽量少，方便 Unity 手写）：
+
+    {
+        "type": "control",
+        "id": any,                     # 可选，原样带回 control_ack，用于匹配请求
+        "target": "hands",             # loop 名字：hands / capture / audio / motion / edges
+        "action": "set" | "pause" | "resume" | "get",
+        "params": { ... }              # 仅 set 需要
+    }
+    """
+    msg = {"type": CONTROL, "target": target, "action": action}
+    if request_id is not None:
+        msg["id"] = request_id
+    if params:
+        msg["params"] = params
+    return msg
+
+
+def build_control_ack_payload(
+    request_id: Any,
+    target: str,
+    action: str,
+    ok: bool,
+    config: Optional[Dict[str, Any]] = None,
+    error: Optional[str] = None,
+) -> dict:
+    """
+    构造控制应答 payload（顶层 type = "control_ack"）。
+
+    {
+        "id": any,                     # 请求里的 id（没有时为 null）
+        "target": str,
+        "action": str,
+        "ok": bool,
+        "config": { "paused": false, "target_fps": 15, ... },   # 应答时实际生效的完整配置
+        "error": str                   # 仅 ok = false 时出现
+    }
+    set / pause / resume 在 loop 的下一个帧边界生效后才应答；get 和校验失败立即应答。
+    """
+    payload = {
+        "id": request_id,
+        "target": target,
+        "action": action,
+        "ok": ok,
+        "config": config,
+    }
+    if error is not None:
+        payload["error"] = error
+    return payload
@@ -0,0 +1,62 @@
+from __future__ import annotations
+import base64
+from typing import List, Optional
+
+import numpy as np
+
+
+# 边缘数据的两种编码
+EDGES_POLYLINES = "polylines"
+EDGES_BITMASK = "bitmask"
+
+
+def build_edges_payload(
+    width: int,
+    height: int,
+    polylines: Optional[List[np.ndarray]] = None,
+    bitmask: Optional[bytes] = None,
+    mask_width: Optional[int] = None,
+    mask_height: Optional[int] = None,
+) -> dict:
+    """
+    构造 edges payload（顶层 type = "edges"）。
+
+    polylines 编码（format = "polylines"）：
+    {
+        "format": "polylines",
+        "image": { "width": W, "height": H },      # 边缘计算所用的（缩小后的）分辨率
+        "polylines": [[x0, y0, x1, y1, ...], ...], # 整数像素坐标，除以 W/H 即得归一化坐标
+        "points": int                              # 总点数
+    }
+
+    bitmask 编码（format = "bitmask"）：
+    {
+        "format": "bitmask",
+        "image": { "width": W, "height": H },
+        "mask": {
+            "width": w, "height": h,
+            "row_bytes": ceil(w / 8),
+            "data": base64 字符串                   # 行优先，每行按字节对齐，高位在前
+        }
+    }
+    """
+    payload = {
+        "image": {
+            "width": width,
+            "height": height,
+        },
+    }
+    if bitmask is not None:
+        payload["format"] = EDGES_BITMASK
+        payload["mask"] = {
+            "width": mask_width,
+            "height": mask_height,
+            "row_bytes": (mask_width + 7) // 8,
+            "data": base64.b64encode(bitmask).decode("ascii"),
+        }
+    else:
+        polylines = polylines or []
+        payload["format"] = EDGES_POLYLINES
+        payload["polylines"] = [p.reshape(-1).tolist() for p in polylines]
+        payload["points"] = int(sum(len(p) for p in polylines))
+    return payload
@@ -0,0 +1,30 @@
+# Python/src/tools/messages/gestures.py
+from __future__ import annotations
+
+from typing import List, Optional
+
+
+def build_gesture_event_payload(
+    gesture: str,
+    hand: str,
+    phase: str,
+    held_sec: float,
+    palm: Optional[List[float]] = None,
+) -> dict:
+    """
+    构造手势事件 payload（顶层 type = "gesture_event"）。
+
+    只在手势状态切换时发送：
+    - phase = "start": 姿态已连续保持 min_hold 秒，手势开始
+    - phase = "end":   姿态消失（超过宽限时间），手势结束
+
+    held_sec: start 时为已保持的时间；end 时为整个手势的持续时间。
+    palm:     掌心归一化坐标 [x, y, z]，方便客户端做瞄准等操作。
+    """
+    return {
+        "gesture": gesture,
+        "hand": hand,
+        "phase": phase,
+        "held_sec": held_sec,
+        "palm": palm,
+    }
@@ -1,6 +1,12 @@
 from __future__ import annotations
+from itertools import chain
+from operator import attrgetter
 from typing import Any, List, Dict
 
+import numpy as np
+
+LANDMARK_COUNT = 21
+
 
 def _extract_label_and_score(handedness) -> tuple[str, float]:
     """
@@ -104,3 +110,188 @@ def build_hands_payload(results: Any, img_width: int, img_height: int) -> dict:
         payload["hands"].append(hand_entry)
 
     return payload
+
+
+def extract_hand_arrays(results: Any) -> Dict[str, np.ndarray]:
+    """
+    把 MediaPipe 结果按左右手标签整理成 {label: (21, 3) float32 数组}。
+    供手势引擎等只关心几何计算的模块使用，不构造任何 dict。
+
+    同一标签出现两次时（MediaPipe 偶尔会误判），只保留第一只。
+    """
+    hands: Dict[str, np.ndarray] = {}
+    if results is None:
+        return hands
+
+    lm_list = results.multi_hand_landmarks
+    hd_list = results.multi_handedness
+    if lm_list is None or hd_list is None:
+        return hands
+
+    for lm, hd in zip(lm_list, hd_list):
+        label, _ = _extract_label_and_score(hd)
+        if label in hands:
+            continue
+        arr = np.fromiter(
+            (v for p in lm.landmark for v in (p.x, p.y, p.z)),
+            dtype=np.float32,
+            count=LANDMARK_COUNT * 3,
+        )
+        hands[label] = arr.reshape(LANDMARK_COUNT, 3)
+
+    return hands
+
+
+# hands payload 的两种 JSON 布局
+LAYOUT_DICTS = "dicts"        # 旧布局：每个点一个 {"i","x","y","z","px","py"}，Unity 当前使用
+LAYOUT_COLUMNAR = "columnar"  # 列式布局：每只手一个扁平数组 "xyz": [x0, y0, z0, x1, ...]
+
+
+_XYZ = attrgetter("x", "y", "z")
+
+
+class HandsPayloadBuilder:
+    """
+    基于预分配 NumPy 数组的 hands payload 构造器。
+
+    - fill(results): 一次遍历把所有手的 landmarks 拷进 (max_hands, 21, 3) float32 数组，
+      不为每个点创建 dict；
+    - hand_arrays(): 按左右手返回数组视图，供变化检测 / 手势引擎直接使用；
+    - build(...):   按指定布局生成 payload。
+        * LAYOUT_DICTS:    与 build_hands_payload 完全相同的结构（兼容旧客户端）
+        * LAYOUT_COLUMNAR: 每只手 "xyz" 扁平列表；px/py 只有 include_pixels=True 时
+                           才计算，以 "pxy": [px0, py0, px1, ...] 输出
+
+    注意：hand_arrays() 返回的是内部缓冲区的视图，下一次 fill() 会覆盖它们。
+    """
+
+    def __init__(
+        self,
+        max_hands: int = 2,
+        layout: str = LAYOUT_DICTS,
+        precision: int = 5,
+    ) -> None:
+        if layout not in (LAYOUT_DICTS, LAYOUT_COLUMNAR):
+            raise ValueError(f"未知的 hands 布局: {layout!r}")
+
+        self.max_hands = max_hands
+        self.layout = layout
+        self.precision = precision
+
+        self.landmarks = np.zeros((max_hands, LANDMARK_COUNT, 3), dtype=np.float32)
+        self.count = 0
+        self.labels: List[str] = [""] * max_hands
+        self.scores: List[float] = [0.0] * max_hands
+
+        # 扁平视图：fill 时直接写入，避免每帧 reshape
+        self._flat = self.landmarks.reshape(max_hands, LANDMARK_COUNT * 3)
+        # fill 时取出的 Python float（x0, y0, z0, x1, ...），旧布局直接复用，不再从数组转回列表
+        self._values: List[List[float]] = [[] for _ in range(max_hands)]
+
+    def fill(self, results: Any) -> int:
+        """把 MediaPipe 结果拷进内部缓冲区，返回手的数量。"""
+        self.count = 0
+        if results is None:
+            return 0
+
+        lm_list = results.multi_hand_landmarks
+        hd_list = results.multi_handedness
+        if lm_list is None or hd_list is None:
+            return 0
+
+        n = 0
+        for lm, hd in zip(lm_list, hd_list):
+            if n >= self.max_hands:
+                break
+            values = list(chain.from_iterable(map(_XYZ, lm.landmark)))
+            self._flat[n] = values
+            self._values[n] = values
+            self.labels[n], self.scores[n] = _extract_label_and_score(hd)
+            n += 1
+
+        self.count = n
+        return n
+
+    def hand_arrays(self) -> Dict[str, np.ndarray]:
+        """与 extract_hand_arrays 语义相同（同标签只保留第一只），但返回缓冲区视图。"""
+        hands: Dict[str, np.ndarray] = {}
+        for i in range(self.count):
+            label = self.labels[i]
+            if label not in hands:
+                hands[label] = self.landmarks[i]
+        return hands
+
+    def build(
+        self,
+        img_width: int,
+        img_height: int,
+        layout: str | None = None,
+        include_pixels: bool = False,
+    ) -> dict:
+        """
+        用当前缓冲区内容构造 payload。
+
+        layout:         None 表示使用构造时指定的布局
+        include_pixels: 仅对列式布局有效；旧布局总是包含 px/py（兼容 Unity 的解析结构）
+        """
+        layout = layout or self.layout
+        payload = {
+            "image": {
+                "width": img_width,
+                "height": img_height
+            },
+            "hands": []
+        }
+        if self.count == 0:
+            return payload
+
+        if layout == LAYOUT_DICTS:
+            self._append_dict_hands(payload["hands"], img_width, img_height)
+        elif layout == LAYOUT_COLUMNAR:
+            payload["layout"] = LAYOUT_COLUMNAR
+            self._append_columnar_hands(payload["hands"], img_width, img_height, include_pixels)
+        else:
+            raise ValueError(f"未知的 hands 布局: {layout!r}")
+        return payload
+
+    def _append_dict_hands(self, out: list, img_width: int, img_height: int) -> None:
+        # 直接用 fill 时取出的 Python float（与 float(lm.x) 完全一致），像素按旧实现 int(x * W) 截断
+        for h in range(self.count):
+            values = self._values[h]
+            xs, ys, zs = values[0::3], values[1::3], values[2::3]
+            out.append({
+                "id": h,
+                "label": self.labels[h],
+                "score": self.scores[h],
+                "landmarks": [
+                    {"i": i, "x": x, "y": y, "z": z, "px": int(x * img_width), "py": int(y * img_height)}
+                    for i, x, y, z in zip(range(LANDMARK_COUNT), xs, ys, zs)
+                ],
+            })
+
+    def _append_columnar_hands(
+        self,
+        out: list,
+        img_width: int,
+        img_height: int,
+        include_pixels: bool,
+    ) -> None:
+        # 先转 float64 再舍入，避免 float32 的长尾小数让 JSON 变大
+        coords = self.landmarks[:self.count].astype(np.float64)
+        xyz = np.round(coords, self.precision).reshape(self.count, -1).tolist()
+
+        pxy = None
+        if include_pixels:
+            scale = np.array([img_width, img_height], dtype=np.float64)
+            pxy = (coords[..., :2] * scale).astype(np.int32).reshape(self.count, -1).tolist()
+
+        for h in range(self.count):
+            entry = {
+                "id": h,
+                "label": self.labels[h],
+                "score": self.scores[h],
+                "xyz": xyz[h],
+            }
+            if pxy is not None:
+                entry["pxy"] = pxy[h]
+            out.append(entry)
@@ -0,0 +1,61 @@
+from __future__ import annotations
+from typing import List
+
+from Python.src.tools.tracking import TrackSnapshot
+
+
+def build_motion_payload(
+    tracks: TrackSnapshot,
+    img_width: int,
+    img_height: int,
+    media_time: float | None = None,
+) -> dict:
+    """
+    构造 motion payload（顶层 type = "motion"）。
+    tracks 为 ArrayTracker.step 返回的快照（旧的 Track 列表可用 TrackSnapshot.from_tracks 转换）。
+
+    返回:
+    {
+        "image": { "width": W, "height": H },
+        "media_time": float | None,      # 帧的媒体时间（秒），文件回放时为文件内时间
+        "tracks": [
+            {
+                "id": int,
+                "box": { "x", "y", "w", "h" },
+                "center": { "x", "y" },
+                "velocity": { "vx", "vy" },    # 像素 / 秒
+                "hits": int,                   # 累计命中帧数
+                "age": int,                    # 连续丢失帧数（0 = 本帧命中）
+                "trail": [[x, y], ...]         # 最近的中心点轨迹，旧 -> 新
+            }
+        ]
+    }
+    """
+    # 先整体转成 Python 列表，避免逐元素访问 numpy 标量
+    ids = tracks.ids.tolist()
+    boxes = tracks.boxes.tolist()
+    centers = tracks.centers.tolist()
+    velocities = tracks.velocities.round(2).tolist()
+    hits = tracks.hits.tolist()
+    ages = tracks.ages.tolist()
+
+    track_list: List[dict] = [
+        {
+            "id": ids[i],
+            "box": {"x": boxes[i][0], "y": boxes[i][1], "w": boxes[i][2], "h": boxes[i][3]},
+            "center": {"x": centers[i][0], "y": centers[i][1]},
+            "velocity": {"vx": velocities[i][0], "vy": velocities[i][1]},
+            "hits": hits[i],
+            "age": ages[i],
+            "trail": tracks.trails[i].tolist(),
+        }
+        for i in range(len(ids))
+    ]
+    return {
+        "image": {
+            "width": img_width,
+            "height": img_height,
+        },
+        "media_time": media_time,
+        "tracks": track_list,
+    }
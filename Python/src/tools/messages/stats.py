@@ -0,0 +1,191 @@
+from __future__ import annotations
+from typing import Dict, List, Optional, Sequence
+
+
+# stats 消息（顶层 type = "stats"）的种类
+STATS_EVENT_LOOP = "event_loop"
+STATS_PROFILE = "profile"
+STATS_OUTGOING = "outgoing"
+STATS_SCHEDULER = "scheduler"
+
+
+def build_loop_stats_payload(
+    window_sec: float,
+    probes: int,
+    bucket_bounds_ms: Sequence[float],
+    bucket_counts: Sequence[int],
+    p50_ms: float,
+    p99_ms: float,
+    max_ms: float,
+    stalls: int,
+    stall_threshold_ms: float,
+    runtime: str,
+    last_stall: Optional[dict] = None,
+    loop_name: str = "main",
+) -> dict:
+    """
+    构造事件循环延迟统计 payload（顶层 type = "stats"，kind = "event_loop"）。
+
+    {
+        "kind": "event_loop",
+        "loop": str,                          # 事件循环所在进程的名字（多进程模式下区分各工作进程）
+        "runtime": "asyncio" | "uvloop",
+        "window_sec": float,                  # 本次统计覆盖的时长
+        "probes": int,                        # 探针次数
+        "lag_ms": { "p50": float, "p99": float, "max": float },
+        "histogram": {
+            "bounds_ms": [1, 2, 5, ...],      # 各桶上界（最后一桶为 +inf，不列出）
+            "counts": [n0, n1, ..., n_last]   # 长度 = len(bounds_ms) + 1
+        },
+        "stalls": int,                        # 延迟超过 stall_threshold_ms 的次数
+        "stall_threshold_ms": float,
+        "last_stall": {                       # 可选：最近一次卡顿
+            "lag_ms": float, "task": str, "where": str
+        }
+    }
+    p50 / p99 由直方图估计（取所在桶的上界，最后一桶取 max）。
+    """
+    payload = {
+        "kind": STATS_EVENT_LOOP,
+        "loop": loop_name,
+        "runtime": runtime,
+        "window_sec": round(window_sec, 3),
+        "probes": int(probes),
+        "lag_ms": {
+            "p50": round(p50_ms, 3),
+            "p99": round(p99_ms, 3),
+            "max": round(max_ms, 3),
+        },
+        "histogram": {
+            "bounds_ms": list(bucket_bounds_ms),
+            "counts": [int(c) for c in bucket_counts],
+        },
+        "stalls": int(stalls),
+        "stall_threshold_ms": stall_threshold_ms,
+    }
+    if last_stall is not None:
+        payload["last_stall"] = last_stall
+    return payload
+
+
+def build_profile_payload(
+    stages: List[dict],
+    bucket_bounds_us: Sequence[float],
+    window_sec: float,
+    process_name: str = "main",
+) -> dict:
+    """
+    构造分阶段耗时 payload（顶层 type = "stats"，kind = "profile"）。
+
+    {
+        "kind": "profile",
+        "process": str,
+        "window_sec": float,
+        "bounds_us": [1.024, 2.048, ...],   # 直方图各桶上界（最后一桶为 +inf，不列出）
+        "stages": [
+            {
+                "stage": "hands.process",
+                "count": int, "total_ms": float,
+                "mean_us": float, "p50_us": float, "p99_us": float, "max_us": float,
+                "counts": [n0, n1, ...]     # 长度 = len(bounds_us) + 1
+            },
+            ...
+        ]
+    }
+    """
+    return {
+        "kind": STATS_PROFILE,
+        "process": process_name,
+        "window_sec": round(window_sec, 3),
+        "bounds_us": [round(b, 3) for b in bucket_bounds_us],
+        "stages": stages,
+    }
+
+
+def build_outgoing_stats_payload(
+    enqueued: int,
+    dequeued: int,
+    expired: Dict[str, int],
+    depths: Sequence[int],
+    window_sec: float,
+    process_name: str = "main",
+) -> dict:
+    """
+    构造发送队列统计 payload（顶层 type = "stats"，kind = "outgoing"）。
+
+    {
+        "kind": "outgoing",
+        "process": str,
+        "window_sec": float,
+        "enqueued": int,                       # 本窗口排队的消息数
+        "dequeued": int,                       # 取出发送的消息数（无客户端时取出后即丢弃）
+        "expired": { "hands": 12, ... },       # 超过截止时间、未发送就丢弃的条数（按消息 type）
+        "depths": [high, normal, low]          # 统计时各优先级队列的长度
+    }
+    """
+    return {
+        "kind": STATS_OUTGOING,
+        "process": process_name,
+        "window_sec": round(window_sec, 3),
+        "enqueued": int(enqueued),
+        "dequeued": int(dequeued),
+        "expired": {k: int(v) for k, v in expired.items()},
+        "depths": [int(d) for d in depths],
+    }
+
+
+def build_scheduler_stats_payload(
+    budget_ms: float,
+    frames: int,
+    over_budget: int,
+    frame_ms_p50: float,
+    frame_ms_max: float,
+    load_ms: float,
+    detectors: List[dict],
+    window_sec: float,
+    process_name: str = "main",
+) -> dict:
+    """
+    构造模型调度统计 payload（顶层 type = "stats"，kind = "scheduler"）。
+
+    {
+        "kind": "scheduler",
+        "process": str,
+        "window_sec": float,
+        "budget_ms": float,                    # 每帧推理预算
+        "frames": int,                         # 本窗口运行过模型的帧数
+        "over_budget": int,                    # 其中总耗时超过预算的帧数
+        "frame_ms": { "p50": float, "max": float },
+        "load_ms": float,                      # 按当前间隔估计的平均每帧耗时
+        "detectors": [
+            {
+                "name": "hands",
+                "every": 1,                    # 期望间隔（帧）
+                "stride": 1,                   # 当前实际间隔（预算不够时放大）
+                "cost_ms": float,              # 单次耗时（滑动平均）
+                "max_cost_ms": float,
+                "runs": int,
+                "deferred": int,               # 到期但推迟到下一帧的次数
+                "errors": int
+            }, ...
+        ]
+    }
+    """
+    return {
+        "kind": STATS_SCHEDULER,
+        "process": process_name,
+        "window_sec": round(window_sec, 3),
+        "budget_ms": round(budget_ms, 3),
+        "frames": int(frames),
+        "over_budget": int(over_budget),
+        "frame_ms": {"p50": round(frame_ms_p50, 3), "max": round(frame_ms_max, 3)},
+        "load_ms": round(load_ms, 3),
+        "detectors": [
+            {
+                **d,
+                "cost_ms": round(d["cost_ms"], 3),
+                "max_cost_ms": round(d["max_cost_ms"], 3),
+            }
+            for d in detectors
+        ],
+    }
@@ -0,0 +1,30 @@
+from __future__ import annotations
+from typing import Dict, List, Tuple
+
+
+def build_ready_payload(
+    time_to_ready_sec: float,
+    components: Dict[str, float],
+    phases: List[Tuple[str, float, float]],
+) -> dict:
+    """
+    构造就绪通知 payload（顶层 type = "ready"，每个进程启动完成时发送一次）。
+
+    {
+        "time_to_ready_sec": float,               # 从进程启动到全部组件就绪
+        "components": { "camera": 0.41, ... },    # 各组件就绪时刻（秒，相对进程启动）
+        "phases": [                               # 各初始化阶段（按开始时间排序，可能重叠）
+            { "name": "hands.model", "start": 0.02, "end": 0.73 },
+            ...
+        ]
+    }
+    客户端（Unity）收到后即可认为数据流马上开始，不必再按固定时间等待。
+    """
+    return {
+        "time_to_ready_sec": round(time_to_ready_sec, 3),
+        "components": {k: round(v, 3) for k, v in components.items()},
+        "phases": [
+            {"name": name, "start": round(start, 3), "end": round(end, 3)}
+            for name, start, end in phases
+        ],
+    }
@@ -0,0 +1,345 @@
+# Python/src/tools/motion.py
+from __future__ import annotations
+
+from collections import deque
+from typing import Deque, List, Tuple
+
+import cv2
+import numpy as np
+
+from Python.src.tools.tracking import TrackSnapshot, merge_boxes_array
+
+
+# 框统一用 (x, y, w, h) 整数像素表示
+Box = Tuple[int, int, int, int]
+
+
+# ---------- 框工具（来自 test_demos/MotionStable_demo.py） ----------
+# iou / merge_boxes / Track / Tracker 是逐对象的参考实现，
+# 实际使用的是 tools/tracking.py 里的向量化版本（结果一致，见 MotionTracker_bench）。
+
+def iou(a: Box, b: Box) -> float:
+    ax1, ay1, aw, ah = a
+    ax2, ay2 = ax1 + aw, ay1 + ah
+    bx1, by1, bw, bh = b
+    bx2, by2 = bx1 + bw, by1 + bh
+    inter_w = max(0, min(ax2, bx2) - max(ax1, bx1))
+    inter_h = max(0, min(ay2, by2) - max(ay1, by1))
+    inter = inter_w * inter_h
+    union = aw * ah + bw * bh - inter
+    return inter / union if union > 0 else 0.0
+
+
+def merge_boxes(boxes: List[Box], iou_th: float = 0.3) -> List[Box]:
+    """简单贪心合并：IOU 超过阈值的两个框合并为并集框，反复进行直到稳定。"""
+    boxes = boxes[:]
+    changed = True
+    while changed:
+        changed = False
+        out = []
+        used = [False] * len(boxes)
+        for i in range(len(boxes)):
+            if used[i]:
+                continue
+            a = boxes[i]
+            for j in range(i + 1, len(boxes)):
+                if used[j]:
+                    continue
+                b = boxes[j]
+                if iou(a, b) >= iou_th:
+                    # 合并为并集框
+                    ax, ay, aw, ah = a
+                    bx, by, bw, bh = b
+                    x1, y1 = min(ax, bx), min(ay, by)
+                    x2, y2 = max(ax + aw, bx + bw), max(ay + ah, by + bh)
+                    a = (x1, y1, x2 - x1, y2 - y1)
+                    used[j] = True
+                    changed = True
+            used[i] = True
+            out.append(a)
+        boxes = out
+    return boxes
+
+
+# ---------- 前景检测：MOG2 + 形态学 + 连通域 ----------
+
+class MotionDetector:
+    """
+    背景减除 + 连通域的运动检测（参数与 MotionStable_demo 一致）。
+
+    detect(frame) 返回 (boxes, fg_mask)：
+    - 灰度 + 高斯模糊 -> MOG2 -> 阈值去阴影 -> 开运算去噪 + 闭运算补洞
+    - 连通域按面积 / 填充率 / 长宽比过滤（向量化），再合并重叠框（与 merge_boxes 结果相同的数组版）
+
+    多分辨率：
+    - pyramid_level = k 时分割在 1 / 2^k 分辨率上进行（INTER_AREA 缩小，相当于金字塔第 k 层），
+      面积阈值、模糊 / 闭运算核随之缩小，框再放大回原图坐标；
+      每帧开销大约按 4^k 下降（缩小本身只剩一次原图大小的读）；
+    - refine=True 时只在检测到的区域（外扩 refine_margin 像素）里回到原图分辨率，
+      用当前帧与（放大的）MOG2 背景做差，取前景的外接矩形作为精修后的框，
+      抵消低分辨率带来的边缘误差。
+    boxes 总是原图坐标；fg_mask 是分割所用分辨率上的掩码。
+    """
+
+    def __init__(
+        self,
+        history: int = 300,
+        var_threshold: float = 10,
+        learning_rate: float = 0.004,
+        detect_shadows: bool = False,
+        min_area: int = 800,
+        min_solidity: float = 0.4,
+        aspect_range: Tuple[float, float] = (0.2, 5.0),
+        merge_iou: float = 0.3,
+        blur: int = 5,
+        pyramid_level: int = 0,
+        refine: bool = False,
+        refine_threshold: int = 25,
+        refine_margin: int = 8,
+    ) -> None:
+        self.history = history
+        self.var_threshold = var_threshold
+        self.learning_rate = learning_rate
+        self.detect_shadows = detect_shadows
+        self.min_area = min_area
+        self.min_solidity = min_solidity
+        self.aspect_range = aspect_range
+        self.merge_iou = merge_iou
+        self.blur = blur
+        self.refine = refine
+        self.refine_threshold = refine_threshold
+        self.refine_margin = refine_margin
+
+        if pyramid_level < 0:
+            raise ValueError("pyramid_level 不能为负数")
+        self.pyramid_level = pyramid_level
+        # 与分辨率相关的参数按层缩放（核大小保持奇数，缩到 1 就跳过该步骤）
+        self._level_min_area = min_area / 4 ** pyramid_level
+        self._level_blur = (blur >> pyramid_level) | 1
+
+        self._open_kernel = np.ones((3, 3), np.uint8)
+        close = (5 >> pyramid_level) | 1
+        self._close_kernel = np.ones((close, close), np.uint8) if close > 1 else None
+        self._refine_kernel = np.ones((3, 3), np.uint8)
+        self.reset()
+
+    def reset(self) -> None:
+        """重建背景模型（场景变化 / 摄像头移动后调用）。"""
+        self._mog2 = cv2.createBackgroundSubtractorMOG2(
+            history=self.history,
+            varThreshold=self.var_threshold,
+            detectShadows=self.detect_shadows,
+        )
+
+    def level_size(self, width: int, height: int) -> Tuple[int, int]:
+        """原图尺寸 -> 分割所用的 (宽, 高)。"""
+        k = self.pyramid_level
+        return max(1, width >> k), max(1, height >> k)
+
+    def downscale(self, frame: np.ndarray) -> np.ndarray:
+        """BGR 原图 -> 分割分辨率的灰度图（先缩小再转灰度，原图只读一遍）。"""
+        if self.pyramid_level > 0:
+            h, w = frame.shape[:2]
+            frame = cv2.resize(frame, self.level_size(w, h), interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+    def foreground(self, frame: np.ndarray) -> np.ndarray:
+        """BGR 帧 -> 清理后的二值前景掩码（分割分辨率）。"""
+        return self.foreground_gray(self.downscale(frame))
+
+    def foreground_gray(self, gray: np.ndarray) -> np.ndarray:
+        """已经缩小到分割分辨率的灰度图 -> 清理后的二值前景掩码。"""
+        if self._level_blur > 1:
+            gray = cv2.GaussianBlur(gray, (self._level_blur, self._level_blur), 0)
+
+        fg = self._mog2.apply(gray, learningRate=self.learning_rate)
+        # 阈值化（去阴影/噪声）
+        _, fg = cv2.threshold(fg, 200, 255, cv2.THRESH_BINARY)
+        # 形态学清理
+        fg = cv2.morphologyEx(fg, cv2.MORPH_OPEN, self._open_kernel, iterations=1)
+        if self._close_kernel is not None:
+            fg = cv2.morphologyEx(fg, cv2.MORPH_CLOSE, self._close_kernel, iterations=1)
+        return fg
+
+    def boxes_from_mask(self, fg: np.ndarray) -> np.ndarray:
+        """连通域 -> 过滤 -> 合并后的框，(k, 4) int64 数组。"""
+        _, _, stats, _ = cv2.connectedComponentsWithStats(fg, connectivity=8)
+        stats = stats[1:].astype(np.int64)  # 0 是背景
+        w = stats[:, cv2.CC_STAT_WIDTH]
+        h = stats[:, cv2.CC_STAT_HEIGHT]
+        area = stats[:, cv2.CC_STAT_AREA]
+
+        # 几何过滤：面积太小、过于扁/细、填充率低的过滤掉
+        lo, hi = self.aspect_range
+        solidity = area / (w * h + 1e-6)
+        aspect = w / (h + 1e-6)
+        keep = (
+            (area >= self._level_min_area)
+            & (solidity >= self.min_solidity)
+            & (aspect >= lo)
+            & (aspect <= hi)
+        )
+
+        # 合并重叠框
+        return merge_boxes_array(stats[keep, :4], iou_th=self.merge_iou)
+
+    def detect(self, frame: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        return self.detect_gray(self.downscale(frame), frame)
+
+    def detect_gray(self, gray: np.ndarray, frame: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        gray 已经是分割分辨率的灰度图（例如 FrameHub 共享的 gray{pyramid_level}），
+        frame 是对应的原图（用于把框放大回原图坐标和精修）。
+        """
+        fg = self.foreground_gray(gray)
+        boxes = self.boxes_from_mask(fg)
+        if self.pyramid_level > 0 and len(boxes):
+            boxes = self._scale_up(boxes, fg.shape, frame.shape)
+            if self.refine:
+                boxes = self._refine(frame, boxes)
+        return boxes, fg
+
+    @staticmethod
+    def _scale_up(boxes: np.ndarray, small_shape, full_shape) -> np.ndarray:
+        """分割分辨率上的框 -> 原图坐标（按实际宽高比例，兼容奇数尺寸）。"""
+        sx = full_shape[1] / small_shape[1]
+        sy = full_shape[0] / small_shape[0]
+        scale = np.array([sx, sy, sx, sy])
+        return np.round(boxes * scale).astype(np.int64)
+
+    def _refine(self, frame: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+        """只在检测区域内回到原图分辨率，用与背景的差重新求外接矩形。"""
+        bg_small = self._mog2.getBackgroundImage()
+        if bg_small is None:
+            return boxes
+        full_h, full_w = frame.shape[:2]
+        sy = bg_small.shape[0] / full_h
+        sx = bg_small.shape[1] / full_w
+        m = self.refine_margin
+
+        out = boxes.copy()
+        for i, (x, y, w, h) in enumerate(boxes.tolist()):
+            x0, y0 = max(0, x - m), max(0, y - m)
+            x1, y1 = min(full_w, x + w + m), min(full_h, y + h + m)
+            if x1 - x0 < 2 or y1 - y0 < 2:
+                continue
+
+            gray = cv2.cvtColor(frame[y0:y1, x0:x1], cv2.COLOR_BGR2GRAY)
+            if self.blur > 1:
+                gray = cv2.GaussianBlur(gray, (self.blur, self.blur), 0)
+            # 背景图对应区域（低分辨率）放大到 ROI 尺寸
+            bx0, by0 = int(x0 * sx), int(y0 * sy)
+            bx1 = max(bx0 + 1, int(np.ceil(x1 * sx)))
+            by1 = max(by0 + 1, int(np.ceil(y1 * sy)))
+            bg = cv2.resize(bg_small[by0:by1, bx0:bx1], (x1 - x0, y1 - y0), interpolation=cv2.INTER_LINEAR)
+
+            diff = cv2.absdiff(gray, bg)
+            _, mask = cv2.threshold(diff, self.refine_threshold, 255, cv2.THRESH_BINARY)
+            mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, self._refine_kernel, iterations=1)
+            rx, ry, rw, rh = cv2.boundingRect(mask)
+            if rw > 0 and rh > 0:
+                out[i] = (x0 + rx, y0 + ry, rw, rh)
+        return out
+
+
+# ---------- 多目标跟踪：IOU 匹配 + 年龄/命中计数 + 轨迹 ----------
+
+class Track:
+    def __init__(self, track_id: int, box: Box, t: float, trail_len: int = 24) -> None:
+        self.id = track_id
+        self.box = box
+        self.hits = 1
+        self.age = 0   # 连续丢失帧数
+        self.trail: Deque[Tuple[int, int]] = deque(maxlen=trail_len)
+        self.trail.append(self.center)
+
+        # 中心点速度（像素 / 秒），对逐帧差分做指数平滑
+        self.velocity = (0.0, 0.0)
+        self._last_t = t
+
+    @property
+    def center(self) -> Tuple[int, int]:
+        x, y, w, h = self.box
+        return x + w // 2, y + h // 2
+
+    def update(self, box: Box, t: float) -> None:
+        # 平滑更新
+        bx, by, bw, bh = self.box
+        nx, ny, nw, nh = box
+        px, py = self.center
+        self.box = (int(0.7 * bx + 0.3 * nx), int(0.7 * by + 0.3 * ny),
+                    int(0.7 * bw + 0.3 * nw), int(0.7 * bh + 0.3 * nh))
+        self.hits += 1
+        self.age = 0
+
+        cx, cy = self.center
+        dt = t - self._last_t
+        if dt > 0:
+            vx, vy = self.velocity
+            self.velocity = (0.5 * vx + 0.5 * (cx - px) / dt, 0.5 * vy + 0.5 * (cy - py) / dt)
+        self._last_t = t
+        self.trail.append((cx, cy))
+
+
+class Tracker:
+    """
+    简易多目标跟踪器（MotionStable_demo 的 Tracker）：
+    每条轨迹贪心匹配 IOU 最高的检测，未匹配的检测新建轨迹，
+    连续丢失超过 max_age 帧的轨迹被删除，命中 min_hits 次以上才算“已确认”。
+
+    轨迹 ID 在每个 Tracker 内部从 1 开始递增，同样的输入得到同样的 ID。
+    """
+
+    def __init__(
+        self,
+        iou_th: float = 0.3,
+        max_age: int = 20,
+        min_hits: int = 6,
+        trail_len: int = 24,
+    ) -> None:
+        self.iou_th = iou_th
+        self.max_age = max_age
+        self.min_hits = min_hits
+        self.trail_len = trail_len
+        self.reset()
+
+    def reset(self) -> None:
+        self.tracks: List[Track] = []
+        self._next_id = 1
+
+    def step(self, detections: List[Box], t: float) -> List[Track]:
+        """输入本帧检测框和媒体时间 t（秒），返回已确认的轨迹。"""
+        # 1) 先把所有轨迹 age+1（缺省认为丢失）
+        for tr in self.tracks:
+            tr.age += 1
+        # 2) 用 IOU 贪心匹配
+        unmatched = set(range(len(detections)))
+        for tr in self.tracks:
+            # 找与 tr IOU 最高的候选
+            best_j, best_iou = -1, 0.0
+            for j in sorted(unmatched):
+                iou_val = iou(tr.box, detections[j])
+                if iou_val > best_iou:
+                    best_iou, best_j = iou_val, j
+            if best_iou >= self.iou_th:
+                tr.update(detections[best_j], t)
+                unmatched.discard(best_j)
+        # 3) 对未匹配的检测，新建轨迹
+        for j in sorted(unmatched):
+            self.tracks.append(Track(self._next_id, detections[j], t, self.trail_len))
+            self._next_id += 1
+        # 4) 清理长期丢失的轨迹
+        self.tracks = [tr for tr in self.tracks if tr.age <= self.max_age]
+        # 返回“已确认”的轨迹（命中次数足够）
+        return [tr for tr in self.tracks if tr.hits >= self.min_hits]
+
+
+def draw_tracks(frame: np.ndarray, tracks: TrackSnapshot) -> np.ndarray:
+    """调试用：在帧的副本上画出轨迹框、ID 和轨迹线。"""
+    out = frame.copy()
+    for track_id, (x, y, w, h), trail in zip(tracks.ids, tracks.boxes.tolist(), tracks.trails):
+        cv2.rectangle(out, (x, y), (x + w, y + h), (0, 200, 255), 2)
+        cv2.putText(out, f"ID {track_id}", (x, y - 6), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 200, 255), 2)
+        if len(trail) > 1:
+            cv2.polylines(out, [trail.astype(np.int32)], False, (255, 100, 0), 2)
+    return out
@@ -0,0 +1,187 @@
+# Python/src/tools/outgoing.py
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import Counter, deque
+from typing import Any, Deque, Dict, List, NamedTuple, Optional, Tuple
+
+from Python.src.tools.messages.base import make_message
+from Python.src.tools.messages.stats import build_outgoing_stats_payload
+
+
+logger = logging.getLogger(__name__)
+
+
+# 优先级（数字越小越先发）
+PRIORITY_HIGH = 0     # 事件类：手势、ready …；不设截止时间，不会被丢弃
+PRIORITY_NORMAL = 1   # 逐帧状态：hands / motion / audio …；过期即丢弃
+PRIORITY_LOW = 2      # 统计类：stats；队列空闲时才发
+N_PRIORITIES = 3
+
+
+# 显式“不过期”的 deadline：覆盖 MESSAGE_POLICIES 里按 type 的 max_age（例如状态切换帧必须送达）
+NO_DEADLINE = float("inf")
+
+
+class MessagePolicy(NamedTuple):
+    priority: int
+    max_age: Optional[float]    # 秒，从排队时刻算起；None = 永不过期
+
+
+# 按消息 type 的默认策略；生产者可以在 send_json / send_text 里单独覆盖
+DEFAULT_POLICY = MessagePolicy(PRIORITY_NORMAL, None)
+MESSAGE_POLICIES: Dict[str, MessagePolicy] = {
+    "gesture_event": MessagePolicy(PRIORITY_HIGH, None),
+    "ready": MessagePolicy(PRIORITY_HIGH, None),
+    "control_ack": MessagePolicy(PRIORITY_HIGH, None),
+    "hands": MessagePolicy(PRIORITY_NORMAL, 0.05),
+    "motion": MessagePolicy(PRIORITY_NORMAL, 0.1),
+    "edges": MessagePolicy(PRIORITY_NORMAL, 0.1),
+    "audio_level": MessagePolicy(PRIORITY_NORMAL, 0.1),
+    "audio_features": MessagePolicy(PRIORITY_NORMAL, 0.1),
+    "stats": MessagePolicy(PRIORITY_LOW, None),
+}
+
+
+def schedule(
+    msg_type: Optional[str],
+    priority: Optional[int] = None,
+    max_age: Optional[float] = None,
+    deadline: Optional[float] = None,
+) -> Tuple[int, Optional[float]]:
+    """
+    决定一条消息的 (priority, deadline)：显式参数优先，否则用 MESSAGE_POLICIES[msg_type]。
+    deadline 是 time.monotonic() 的绝对时刻（与 trace 时间戳同一时钟，跨进程可比）；
+    只给 max_age 时从现在算起。
+    """
+    policy = MESSAGE_POLICIES.get(msg_type, DEFAULT_POLICY)
+    if priority is None:
+        priority = policy.priority
+    if deadline is None:
+        if max_age is None:
+            max_age = policy.max_age
+        if max_age is not None:
+            deadline = time.monotonic() + max_age
+    return priority, deadline
+
+
+class OutgoingQueue:
+    """
+    WsBridge 的发送队列：按优先级分开的 FIFO + 截止时间。
+
+    - put_nowait(item, priority, deadline, label): 与 asyncio.Queue 一样只能在事件循环线程里调用；
+      不带参数时等价于原来的 FIFO（普通优先级、不过期）
+    - get(): 先取高优先级；取出时已过截止时间的条目直接丢弃并按 label（消息 type）计数，
+      所以卡顿之后不会先补发一串过时的 hands 帧
+    - 优先级是严格的：只要有高优先级条目，低优先级就等着（低优先级只放低频的统计消息）
+    """
+
+    def __init__(self) -> None:
+        self._queues: List[Deque[Tuple[Optional[float], Optional[str], Any]]] = [
+            deque() for _ in range(N_PRIORITIES)
+        ]
+        self._getters: Deque[asyncio.Future] = deque()
+        self._size = 0
+
+        # 统计（stats() 读取）
+        self.enqueued = 0
+        self.dequeued = 0
+        self.expired: Counter = Counter()
+
+    def qsize(self) -> int:
+        return self._size
+
+    def empty(self) -> bool:
+        return self._size == 0
+
+    def depths(self) -> List[int]:
+        return [len(q) for q in self._queues]
+
+    def put_nowait(
+        self,
+        item: Any,
+        priority: int = PRIORITY_NORMAL,
+        deadline: Optional[float] = None,
+        label: Optional[str] = None,
+    ) -> None:
+        self._queues[priority].append((deadline, label, item))
+        self._size += 1
+        self.enqueued += 1
+        while self._getters:
+            getter = self._getters.popleft()
+            if not getter.done():
+                getter.set_result(None)
+                break
+
+    def get_nowait(self) -> Any:
+        """取出优先级最高、且未过期的一条；没有时抛 asyncio.QueueEmpty。"""
+        now = None
+        for q in self._queues:
+            while q:
+                deadline, label, item = q.popleft()
+                self._size -= 1
+                if deadline is not None:
+                    if now is None:
+                        now = time.monotonic()
+                    if now > deadline:
+                        self.expired[label or "?"] += 1
+                        continue
+                self.dequeued += 1
+                return item
+        raise asyncio.QueueEmpty
+
+    async def get(self) -> Any:
+        while True:
+            try:
+                return self.get_nowait()
+            except asyncio.QueueEmpty:
+                pass
+            getter = asyncio.get_running_loop().create_future()
+            self._getters.append(getter)
+            try:
+                await getter
+            except BaseException:
+                getter.cancel()
+                try:
+                    self._getters.remove(getter)
+                except ValueError:
+                    pass
+                raise
+
+    def stats(self, reset: bool = False) -> dict:
+        stats = {
+            "enqueued": self.enqueued,
+            "dequeued": self.dequeued,
+            "expired": dict(self.expired),
+            "depths": self.depths(),
+        }
+        if reset:
+            self.enqueued = 0
+            self.dequeued = 0
+            self.expired = Counter()
+        return stats
+
+
+async def report_outgoing(bridge, interval: float = 5.0, name: str = "main") -> None:
+    """
+    每 interval 秒把发送队列的统计（排队 / 发出 / 过期条数，各优先级当前深度）写日志，
+    并以 type = "stats"（kind = "outgoing"）的低优先级消息发出，然后清零。
+    """
+    window_start = asyncio.get_running_loop().time()
+    while True:
+        await asyncio.sleep(interval)
+        now = asyncio.get_running_loop().time()
+        stats = bridge.outgoing.stats(reset=True)
+        if stats["expired"]:
+            logger.info(
+                "[%s] 发送队列: 排队 %d, 发出 %d, 过期丢弃 %s, 当前深度 %s",
+                name, stats["enqueued"], stats["dequeued"], stats["expired"], stats["depths"],
+            )
+        bridge.send_json(make_message(
+            msg_type="stats",
+            payload=build_outgoing_stats_payload(window_sec=now - window_start, process_name=name, **stats),
+            source="outgoing_queue",
+        ))
+        window_start = now
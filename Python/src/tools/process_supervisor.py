@@ -0,0 +1,403 @@
+# Python/src/tools/process_supervisor.py
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import multiprocessing as mp
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from multiprocessing.connection import Connection
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from Python.src.tools.control import CONTROLS
+from Python.src.tools.messages.base import encode_traced, trace_now
+from Python.src.tools.outgoing import PRIORITY_NORMAL, schedule
+from Python.src.tools.profiler import PROFILER
+from Python.src.tools.startup import STARTUP
+
+
+logger = logging.getLogger(__name__)
+
+
+# 管道里传的条目：(kind, data)；_TEXT / _OBJ 的 data 是 (消息, priority, deadline, label)
+_TEXT = "text"      # 已经编码好的 JSON 字符串，桥进程原样广播
+_OBJ = "obj"        # 带 trace 的消息 (body, trace)，桥进程发送前再拼上 trace（以便写入 send 时刻）
+_STATS = "stats"    # 工作进程自报的资源占用
+_RETAIN = "retain"  # (key, text)：保留消息，桥进程以 "<worker>.<key>" 保存并广播
+_CONTROLS = "controls"  # [target, ...]：工作进程里注册的 LoopControl（桥进程据此转发 control 消息）
+
+# 重启策略
+RESTART_ON_FAILURE = "on-failure"   # 只在异常退出（退出码非 0）时重启
+RESTART_ALWAYS = "always"           # 正常返回也重启（例如摄像头被拔掉后 loop 自己退出）
+RESTART_NEVER = "never"
+
+
+# 工作进程入口：async def worker(bridge) -> None，bridge 只需要 send_json / send_text
+WorkerTarget = Callable[[Any], Awaitable[None]]
+
+
+@dataclass
+class WorkerSpec:
+    """
+    一个生产者 loop 对应一个工作进程。
+
+    target 必须是模块顶层的协程函数（Windows 下用 spawn 启动子进程，要能按名字 pickle），
+    参数只有 bridge，例如：
+        async def audio_worker(bridge):
+            await audio_loop(bridge, vad=True)
+    需要共享同一个摄像头的 loop（FrameHub 的订阅者）应放在同一个 target 里。
+    """
+
+    name: str
+    target: WorkerTarget
+    restart: str = RESTART_ON_FAILURE
+
+
+@dataclass
+class WorkerStats:
+    name: str
+    pid: Optional[int] = None
+    alive: bool = False
+    restarts: int = 0
+    exit_code: Optional[int] = None
+    messages: int = 0
+    cpu_percent: Optional[float] = None     # 占一个核的百分比（可超过 100）
+    rss_bytes: Optional[int] = None
+    started_at: float = 0.0
+    # 上一次 stats 报告（用来算 CPU 占用）
+    _last_cpu: Optional[float] = field(default=None, repr=False)
+    _last_wall: Optional[float] = field(default=None, repr=False)
+
+    def as_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "pid": self.pid,
+            "alive": self.alive,
+            "restarts": self.restarts,
+            "exit_code": self.exit_code,
+            "messages": self.messages,
+            "cpu_percent": None if self.cpu_percent is None else round(self.cpu_percent, 1),
+            "rss_mb": None if self.rss_bytes is None else round(self.rss_bytes / 2**20, 1),
+        }
+
+
+# ---------- 工作进程侧 ----------
+
+def _rss_bytes() -> Optional[int]:
+    """当前进程的常驻内存；有 psutil 时用 psutil，否则 Linux 下读 /proc，都没有时返回 None。"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class PipeBridge:
+    """
+    工作进程里代替 WsBridge 的对象：send_json / send_text 把消息写进管道，
+    由桥进程里的 Supervisor 转给真正的 WsBridge。loop 代码不需要任何改动。
+    """
+
+    def __init__(self, conn: Connection) -> None:
+        self._conn = conn
+
+    def send_text(
+        self,
+        text: str,
+        priority: int = PRIORITY_NORMAL,
+        deadline: Optional[float] = None,
+        label: Optional[str] = None,
+    ) -> None:
+        with PROFILER.stage("bridge.pipe_write"):
+            self._conn.send((_TEXT, (text, priority, deadline, label)))
+
+    def retain(self, key: str, text: str) -> None:
+        self._conn.send((_RETAIN, (key, text)))
+
+    def announce_controls(self, names: List[str]) -> None:
+        self._conn.send((_CONTROLS, names))
+
+    def send_json(
+        self,
+        obj: Any,
+        priority: Optional[int] = None,
+        max_age: Optional[float] = None,
+        deadline: Optional[float] = None,
+    ) -> None:
+        # 与 WsBridge.send_json 相同：在这里编码（错误交给调用方），带 trace 的消息记下 enqueue 时刻，
+        # trace 留到桥进程发送前再拼上；截止时间按 time.monotonic() 算好（跨进程可比），管道上的耗时也计入消息年龄
+        trace = None
+        msg_type = None
+        if isinstance(obj, dict):
+            trace = obj.get("trace")
+            msg_type = obj.get("type")
+            STARTUP.first_message(msg_type or "?")
+        priority, deadline = schedule(msg_type, priority, max_age, deadline)
+        try:
+            with PROFILER.stage("bridge.json_dumps"):
+                if isinstance(trace, dict):
+                    trace["enqueue"] = trace_now()
+                    item = encode_traced(obj)
+                else:
+                    item = json.dumps(obj)
+        except TypeError as e:
+            logger.error("send_json 失败，数据不可被 JSON 序列化: %r", e)
+            raise
+        if isinstance(item, str):
+            self.send_text(item, priority, deadline, msg_type)
+            return
+        with PROFILER.stage("bridge.pipe_write"):
+            self._conn.send((_OBJ, (item, priority, deadline, msg_type)))
+
+
+async def _report_stats(conn: Connection, interval: float) -> None:
+    while True:
+        conn.send((_STATS, {"cpu_time": time.process_time(), "wall": time.monotonic(), "rss": _rss_bytes()}))
+        await asyncio.sleep(interval)
+
+
+def _read_controls(loop: asyncio.AbstractEventLoop, ctl_conn: Connection) -> None:
+    """子进程里的线程：把桥进程转发来的 control 消息交给本进程的 CONTROLS。"""
+    try:
+        while True:
+            msg = ctl_conn.recv()
+            loop.call_soon_threadsafe(CONTROLS.handle, msg)
+    except (EOFError, OSError, RuntimeError):
+        pass
+
+
+async def _run_worker(target: WorkerTarget, conn: Connection, ctl_conn: Connection, stats_interval: float) -> None:
+    reporter = asyncio.create_task(_report_stats(conn, stats_interval))
+    bridge = PipeBridge(conn)
+    CONTROLS.attach(bridge)
+    threading.Thread(
+        target=_read_controls, args=(asyncio.get_running_loop(), ctl_conn), name="control-reader", daemon=True,
+    ).start()
+    try:
+        await target(bridge)
+    finally:
+        reporter.cancel()
+
+
+def _worker_main(
+    name: str,
+    target: WorkerTarget,
+    conn: Connection,
+    ctl_conn: Connection,
+    stats_interval: float,
+    log_level: int,
+) -> None:
+    """子进程入口（必须是模块顶层函数）。"""
+    logging.basicConfig(level=log_level, format=f"[%(levelname)s] [{name}] %(name)s: %(message)s")
+    try:
+        asyncio.run(_run_worker(target, conn, ctl_conn, stats_interval))
+    except KeyboardInterrupt:
+        pass
+    except Exception:
+        logger.exception("工作进程 %s 异常退出", name)
+        sys.exit(1)
+    finally:
+        conn.close()
+
+
+# ---------- 桥进程侧 ----------
+
+class Supervisor:
+    """
+    在桥进程里启动 / 监视各个工作进程：
+
+    - 每个 WorkerSpec 一个子进程（各自的解释器和 GIL，可以用上多个核），
+      子进程里的 loop 通过 PipeBridge 发送消息，这里按到达顺序转给 WsBridge
+    - 子进程崩溃时按指数退避重启（restart_delay 起步，每次翻倍到 max_restart_delay；
+      连续运行超过 stable_after 秒后退避清零）
+    - 子进程每 stats_interval 秒自报 CPU 时间和 RSS，每 report_interval 秒写一次日志；
+      stats() 随时返回最新快照
+    - 桥进程收到的 control 消息由 route_control 经第二条管道转给注册了该 target 的工作进程
+
+    用法：
+        supervisor = Supervisor(bridge, [WorkerSpec("vision", vision_worker), WorkerSpec("audio", audio_worker)])
+        await asyncio.gather(bridge.run_forever(), supervisor.run())
+    """
+
+    def __init__(
+        self,
+        bridge,
+        specs: List[WorkerSpec],
+        restart_delay: float = 0.5,
+        max_restart_delay: float = 30.0,
+        stable_after: float = 10.0,
+        stats_interval: float = 2.0,
+        report_interval: float = 10.0,
+        start_method: Optional[str] = "spawn",
+    ) -> None:
+        names = [s.name for s in specs]
+        if len(set(names)) != len(names):
+            raise ValueError(f"工作进程名字重复: {names}")
+        self.bridge = bridge
+        self.specs = list(specs)
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.stable_after = stable_after
+        self.stats_interval = stats_interval
+        self.report_interval = report_interval
+        # 统一用 spawn：Windows 只能 spawn；Linux 下 fork 会把桥进程的事件循环 / 线程状态带进子进程
+        self._ctx = mp.get_context(start_method)
+        self._workers: Dict[str, WorkerStats] = {s.name: WorkerStats(s.name) for s in specs}
+        self._procs: Dict[str, mp.process.BaseProcess] = {}
+        # control 消息转发：target -> 工作进程名，工作进程名 -> 控制管道（桥进程写端）
+        self._routes: Dict[str, str] = {}
+        self._control_conns: Dict[str, Connection] = {}
+        self._closing = False
+
+    def stats(self) -> List[dict]:
+        return [w.as_dict() for w in self._workers.values()]
+
+    def _forward(self, worker: WorkerStats, kind: str, data: Any) -> None:
+        # 在事件循环线程里执行
+        if kind == _CONTROLS:
+            self._set_routes(worker.name, data)
+            return
+        if kind == _STATS:
+            if worker._last_cpu is not None and data["wall"] > worker._last_wall:
+                worker.cpu_percent = 100.0 * (data["cpu_time"] - worker._last_cpu) / (data["wall"] - worker._last_wall)
+            worker._last_cpu, worker._last_wall = data["cpu_time"], data["wall"]
+            worker.rss_bytes = data["rss"]
+            return
+        worker.messages += 1
+        if worker.messages == 1:
+            STARTUP.first_message(f"worker.{worker.name}")
+        if kind == _RETAIN:
+            # 重启后的工作进程会用新的 ready 覆盖旧的
+            key, text = data
+            self.bridge.retain(f"{worker.name}.{key}", text)
+            return
+        # 与 WsBridge.send_text / send_json 排队的内容一致：字符串或带 trace 的 (body, trace)，
+        # 连同工作进程里定好的优先级 / 截止时间
+        item, priority, deadline, label = data
+        self.bridge.outgoing.put_nowait(item, priority, deadline, label)
+
+    def _set_routes(self, worker_name: str, targets: List[str]) -> None:
+        self._routes = {t: w for t, w in self._routes.items() if w != worker_name}
+        self._routes.update((t, worker_name) for t in targets)
+
+    def route_control(self, target: str, msg: dict) -> bool:
+        """把 control 消息转给注册了 target 的工作进程；没有这样的进程时返回 False。"""
+        worker_name = self._routes.get(target)
+        conn = self._control_conns.get(worker_name)
+        if conn is None:
+            return False
+        try:
+            conn.send(msg)
+        except (OSError, ValueError):
+            return False
+        return True
+
+    def _pump(self, loop: asyncio.AbstractEventLoop, worker: WorkerStats, conn: Connection) -> None:
+        """在线程里读管道直到子进程关闭它（退出 / 崩溃）。"""
+        try:
+            while True:
+                kind, data = conn.recv()
+                loop.call_soon_threadsafe(self._forward, worker, kind, data)
+        except (EOFError, OSError):
+            pass
+        except RuntimeError:
+            # 事件循环已关闭
+            pass
+        finally:
+            conn.close()
+
+    async def _supervise(self, spec: WorkerSpec, executor: ThreadPoolExecutor) -> None:
+        loop = asyncio.get_running_loop()
+        worker = self._workers[spec.name]
+        delay = self.restart_delay
+
+        while not self._closing:
+            recv_conn, send_conn = self._ctx.Pipe(duplex=False)
+            ctl_recv, ctl_send = self._ctx.Pipe(duplex=False)
+            proc = self._ctx.Process(
+                target=_worker_main,
+                args=(spec.name, spec.target, send_conn, ctl_recv, self.stats_interval, logging.getLogger().level),
+                name=f"worker-{spec.name}",
+                daemon=True,
+            )
+            proc.start()
+            # 父进程不写管道；关掉自己这一端，子进程退出时 recv 才会收到 EOF
+            send_conn.close()
+            ctl_recv.close()
+            self._control_conns[spec.name] = ctl_send
+            self._procs[spec.name] = proc
+            worker.pid, worker.alive, worker.exit_code = proc.pid, True, None
+            worker._last_cpu = worker._last_wall = None
+            worker.started_at = time.monotonic()
+            logger.info("工作进程 %s 启动 pid=%d", spec.name, proc.pid)
+
+            await loop.run_in_executor(executor, self._pump, loop, worker, recv_conn)
+            await loop.run_in_executor(executor, proc.join)
+            self._set_routes(spec.name, [])
+            self._control_conns.pop(spec.name, None)
+            ctl_send.close()
+            worker.alive = False
+            worker.exit_code = proc.exitcode
+            worker.cpu_percent = None
+            uptime = time.monotonic() - worker.started_at
+            if self._closing:
+                break
+
+            failed = proc.exitcode != 0
+            logger.log(
+                logging.WARNING if failed else logging.INFO,
+                "工作进程 %s 退出 code=%s，运行 %.1f s", spec.name, proc.exitcode, uptime,
+            )
+            if spec.restart == RESTART_NEVER or (spec.restart == RESTART_ON_FAILURE and not failed):
+                break
+
+            if uptime >= self.stable_after:
+                delay = self.restart_delay
+            logger.info("%.1f s 后重启工作进程 %s", delay, spec.name)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_restart_delay)
+            worker.restarts += 1
+
+    async def _report(self) -> None:
+        while True:
+            await asyncio.sleep(self.report_interval)
+            for w in self.stats():
+                logger.info(
+                    "worker %-8s pid=%-6s alive=%-5s restarts=%d msgs=%d cpu=%s%% rss=%s MB",
+                    w["name"], w["pid"], w["alive"], w["restarts"], w["messages"], w["cpu_percent"], w["rss_mb"],
+                )
+
+    async def run(self) -> None:
+        """启动全部工作进程并监视，直到它们都不再需要重启（或本协程被取消）。"""
+        executor = ThreadPoolExecutor(max_workers=2 * len(self.specs), thread_name_prefix="supervisor")
+        reporter = asyncio.create_task(self._report())
+        try:
+            await asyncio.gather(*(self._supervise(s, executor) for s in self.specs))
+        finally:
+            reporter.cancel()
+            self._closing = True
+            self.shutdown()
+            executor.shutdown(wait=False)
+
+    def shutdown(self, timeout: float = 2.0) -> None:
+        """结束所有仍在运行的工作进程（先 terminate，超时再 kill）。"""
+        self._closing = True
+        for name, proc in self._procs.items():
+            if proc.is_alive():
+                logger.info("结束工作进程 %s pid=%d", name, proc.pid)
+                proc.terminate()
+        for proc in self._procs.values():
+            proc.join(timeout)
+            if proc.is_alive():
+                proc.kill()
+                proc.join()
@@ -0,0 +1,211 @@
+# Python/src/tools/profiler.py
+from __future__ import annotations
+
+import array
+import asyncio
+import functools
+import logging
+from time import perf_counter_ns
+from typing import Callable, Dict, List, Optional
+
+from Python.src.tools.messages.base import make_message
+from Python.src.tools.messages.stats import build_profile_payload
+
+
+logger = logging.getLogger(__name__)
+
+
+# 固定的 2 的幂分桶：第 i 桶 = 耗时 < 2^i * 1024 ns（约 2^i µs），最后一桶兜底（≥ 约 4 s）
+N_BUCKETS = 23
+
+
+def bucket_upper_us(i: int) -> float:
+    """第 i 桶的上界（µs）。"""
+    return (1 << (i + 10)) / 1000.0
+
+
+class _NullStage:
+    """关闭时 stage() 返回的共享空上下文：不计时、不分配。"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        return None
+
+
+_NULL = _NullStage()
+
+
+class Stage:
+    """
+    一个阶段的计时器 + 直方图。每个阶段名只有一个实例，反复作为上下文管理器使用：
+    计数都存在预先分配的 array 里，记录一次样本不产生新的对象（除了 Python 的整数本身）。
+
+    同一个阶段不要在多个线程里同时计时（起点存在实例上）；不同阶段可以分属不同线程
+    （例如 hands.* 在事件循环线程、audio.analyze 在分析线程、audio.callback 在音频线程）。
+    """
+
+    __slots__ = ("name", "counts", "n", "total_ns", "max_ns", "_t0")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.counts = array.array("q", bytes(8 * N_BUCKETS))
+        self.n = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self._t0 = 0
+
+    def __enter__(self) -> "Stage":
+        self._t0 = perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.record(perf_counter_ns() - self._t0)
+
+    def record(self, ns: int) -> None:
+        i = (ns >> 10).bit_length()
+        self.counts[i if i < N_BUCKETS else N_BUCKETS - 1] += 1
+        self.n += 1
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    def reset(self) -> None:
+        for i in range(N_BUCKETS):
+            self.counts[i] = 0
+        self.n = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def percentile_us(self, q: float) -> float:
+        """由直方图估计第 q 分位（取桶上界，不超过最大值）。"""
+        if self.n == 0:
+            return 0.0
+        target = q * self.n
+        acc = 0
+        for i in range(N_BUCKETS):
+            acc += self.counts[i]
+            if acc >= target and self.counts[i]:
+                return min(bucket_upper_us(i), self.max_ns / 1000.0)
+        return self.max_ns / 1000.0
+
+    def summary(self) -> dict:
+        return {
+            "stage": self.name,
+            "count": self.n,
+            "total_ms": round(self.total_ns / 1e6, 3),
+            "mean_us": round(self.total_ns / self.n / 1000.0, 2) if self.n else 0.0,
+            "p50_us": round(self.percentile_us(0.5), 2),
+            "p99_us": round(self.percentile_us(0.99), 2),
+            "max_us": round(self.max_ns / 1000.0, 2),
+            "counts": list(self.counts),
+        }
+
+
+class Profiler:
+    """
+    分阶段计时。用法：
+
+        from Python.src.tools.profiler import PROFILER
+
+        with PROFILER.stage("hands.process"):
+            results = hands.process(small_rgb)
+
+        @PROFILER.timed("audio.analyze")
+        def _analyze_batch(...): ...
+
+    关闭（默认）时 stage() 只做一次属性判断并返回共享的空上下文，开销约等于一次方法调用。
+    每个进程一个全局 PROFILER；main.py 的 --profile 打开它，并周期性写日志 + 发 stats 消息。
+    """
+
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self._stages: Dict[str, Stage] = {}
+
+    def stage(self, name: str):
+        if not self.enabled:
+            return _NULL
+        s = self._stages.get(name)
+        if s is None:
+            s = self._stages.setdefault(name, Stage(name))
+        return s
+
+    def record(self, name: str, ns: int) -> None:
+        """记录一段在别处测得的耗时（例如跨 await 的两个时间点）。"""
+        if self.enabled:
+            self.stage(name).record(ns)
+
+    def timed(self, name: str) -> Callable[[Callable], Callable]:
+        """函数装饰器版本（是否计时在每次调用时判断，可以先装饰、后打开）。"""
+        def decorator(fn: Callable) -> Callable:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                with self.stage(name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def stages(self) -> List[Stage]:
+        return sorted(self._stages.values(), key=lambda s: s.name)
+
+    def snapshot(self, reset: bool = False) -> List[dict]:
+        out = [s.summary() for s in self.stages() if s.n]
+        if reset:
+            self.reset()
+        return out
+
+    def reset(self) -> None:
+        for s in self._stages.values():
+            s.reset()
+
+    def format_table(self, rows: Optional[List[dict]] = None) -> str:
+        rows = self.snapshot() if rows is None else rows
+        lines = [f"{'stage':28s} {'count':>7s} {'mean µs':>9s} {'p50 µs':>9s} {'p99 µs':>9s} {'max µs':>10s} {'total ms':>10s}"]
+        for r in rows:
+            lines.append(
+                f"{r['stage']:28s} {r['count']:7d} {r['mean_us']:9.1f} {r['p50_us']:9.1f} "
+                f"{r['p99_us']:9.1f} {r['max_us']:10.1f} {r['total_ms']:10.1f}"
+            )
+        return "\n".join(lines)
+
+
+# 进程内全局实例
+PROFILER = Profiler()
+
+
+async def report_profile(
+    bridge=None,
+    interval: float = 5.0,
+    profiler: Profiler = PROFILER,
+    name: str = "main",
+) -> None:
+    """
+    每 interval 秒：把本窗口的各阶段统计写日志，并以 type = "stats"（kind = "profile"）
+    的消息发给 bridge（可选），然后清零进入下一个窗口。退出时再打印一次。
+    """
+    window_start = asyncio.get_running_loop().time()
+    try:
+        while True:
+            await asyncio.sleep(interval)
+            now = asyncio.get_running_loop().time()
+            rows = profiler.snapshot(reset=True)
+            if rows:
+                logger.info("[%s] 各阶段耗时（最近 %.1f s）:\n%s", name, now - window_start, profiler.format_table(rows))
+                if bridge is not None:
+                    bridge.send_json(make_message(
+                        msg_type="stats",
+                        payload=build_profile_payload(
+                            rows, [bucket_upper_us(i) for i in range(N_BUCKETS - 1)], now - window_start, name,
+                        ),
+                        source="profiler",
+                    ))
+            window_start = now
+    finally:
+        rows = profiler.snapshot()
+        if rows:
+            logger.info("[%s] 各阶段耗时（退出前最后窗口）:\n%s", name, profiler.format_table(rows))
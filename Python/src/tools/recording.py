@@ -0,0 +1,534 @@
+# Python/src/tools/recording.py
+from __future__ import annotations
+
+import glob
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+from Python.src.tools.audio_sources import AudioCallback, AudioSource, _ThreadedAudioSource
+from Python.src.tools.frame_sources import FrameSource
+
+
+logger = logging.getLogger(__name__)
+
+
+# 录制目录的结构（视频和音频可以由不同进程写进同一个目录）：
+#
+#   video.json                 {"source", "segment_frames", "segment_bytes", "clock"}
+#   video_000.frames.npy       (segment_frames, H, W, 3) uint8，创建时预分配（每段帧数见 SEGMENT_BYTES）
+#   video_000.index.npy        (segment_frames, 2) float64: [timestamp, capture_time]，未写的行为 NaN
+#   audio.json                 {"source", "sample_rate", "segment_samples", "clock"}
+#   audio_000.pcm.npy          (segment_samples,) float32
+#   audio_000.index.npy        (segment_blocks, 3) float64: [段内起始样本, 样本数, capture_time]
+#
+# 所有 capture_time 都是 time.monotonic()（与 trace 时间戳同一时钟），音视频据此对齐。
+# 数据先写、索引行后写，索引里第一行 NaN 之前的内容都是完整的：进程被杀掉也不需要修复文件。
+# 分辨率变化（运行时改采集参数）时开新的一段。
+
+VIDEO = "video"
+AUDIO = "audio"
+CLOCK = "time.monotonic"
+
+# 每段视频文件的大小上限。open_memmap(mode="w+") 创建时就按整段分配：
+# 只有部分文件系统（ext4 等）是写到哪占到哪，NTFS 上会立即占满，所以段要小。
+# 帧数按帧大小算：1280x720 每段 48 帧（约 1.6 s @ 30 fps），640x480 每段 145 帧
+SEGMENT_BYTES = 128 * 1024 * 1024
+SEGMENT_SECONDS = 60.0      # 每段音频时长
+QUEUE_FRAMES = 64           # 写盘线程落后时最多缓存多少帧，再多就丢弃并计数
+QUEUE_BLOCKS = 1024
+MIN_BLOCK = 32              # 估算音频索引行数用的最小块长（样本）
+
+
+def _segment_path(directory: str, stream: str, segment: int, part: str) -> str:
+    return os.path.join(directory, f"{stream}_{segment:03d}.{part}.npy")
+
+
+def _segment_paths(directory: str, stream: str, part: str) -> List[Tuple[str, str]]:
+    """按段号排序的 [(数据文件, 索引文件), ...]。"""
+    data = sorted(glob.glob(os.path.join(directory, f"{stream}_*.{part}.npy")))
+    return [(path, path[:-len(f".{part}.npy")] + ".index.npy") for path in data]
+
+
+def _valid_rows(index: np.ndarray) -> int:
+    """索引里已写入的行数（第一行 NaN 之前）。"""
+    empty = np.isnan(index[:, -1])
+    return int(empty.argmax()) if empty.any() else len(index)
+
+
+def _new_index(path: str, rows: int, columns: int) -> np.ndarray:
+    index = np.lib.format.open_memmap(path, mode="w+", dtype=np.float64, shape=(rows, columns))
+    index[:] = np.nan
+    return index
+
+
+class _BackgroundWriter:
+    """
+    写盘线程：采集线程 / 音频回调只把数据放进有界队列（不做任何 I/O），
+    由这个线程拷进 memmap。队列满时丢弃并计数，绝不阻塞采集。
+    """
+
+    def __init__(self, directory: str, stream: str, meta: dict, queue_size: int) -> None:
+        os.makedirs(directory, exist_ok=True)
+        if glob.glob(os.path.join(directory, f"{stream}_*.npy")):
+            raise FileExistsError(f"{directory} 里已经有 {stream} 录制")
+        with open(os.path.join(directory, f"{stream}.json"), "w", encoding="utf-8") as f:
+            json.dump({"clock": CLOCK, **meta}, f, ensure_ascii=False, indent=2)
+
+        self.directory = directory
+        self.stream = stream
+        self.segment = -1
+        self.written = 0
+        self.dropped = 0
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._thread = threading.Thread(target=self._run, name=f"record-{stream}", daemon=True)
+        self._thread.start()
+
+    def _submit(self, item) -> bool:
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    self._flush()
+                    return
+                self._write(item)
+                self.written += 1
+            except Exception:
+                logger.exception("[%s] 录制写入失败", self.stream)
+            finally:
+                self._queue.task_done()
+
+    def _write(self, item) -> None:
+        raise NotImplementedError
+
+    def _flush(self) -> None:
+        raise NotImplementedError
+
+    def drain(self) -> None:
+        """等写盘线程把已排队的数据全部写完（输入停止时调用）。"""
+        self._queue.join()
+
+    def close(self) -> None:
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        logger.info(
+            "[%s] 录制结束: %s, 写入 %d, 丢弃 %d, %d 段",
+            self.stream, self.directory, self.written, self.dropped, self.segment + 1,
+        )
+
+
+class FrameRecorder(_BackgroundWriter):
+    """
+    视频帧录制：write(frame, timestamp, capture_time) 只入队（帧不拷贝，来源每次 read 都返回新数组），
+    写盘线程拷进预分配的 memmap 段文件并写索引。
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        source_name: str = "unknown",
+        segment_frames: Optional[int] = None,
+        queue_size: int = QUEUE_FRAMES,
+        segment_bytes: int = SEGMENT_BYTES,
+    ) -> None:
+        # segment_frames 为 None 时每段帧数由 segment_bytes 和第一帧的大小决定
+        self.segment_frames = segment_frames
+        self.segment_bytes = segment_bytes
+        self._frames: Optional[np.ndarray] = None
+        self._index: Optional[np.ndarray] = None
+        self._row = 0
+        meta = {"source": source_name, "segment_frames": segment_frames, "segment_bytes": segment_bytes}
+        super().__init__(directory, VIDEO, meta, queue_size)
+
+    def write(self, frame: np.ndarray, timestamp: float, capture_time: float) -> bool:
+        return self._submit((frame, timestamp, capture_time))
+
+    def _open_segment(self, frame: np.ndarray) -> None:
+        self._flush()
+        self.segment += 1
+        rows = self.segment_frames or max(1, self.segment_bytes // frame.nbytes)
+        self._frames = np.lib.format.open_memmap(
+            _segment_path(self.directory, VIDEO, self.segment, "frames"),
+            mode="w+", dtype=frame.dtype, shape=(rows,) + frame.shape,
+        )
+        self._index = _new_index(_segment_path(self.directory, VIDEO, self.segment, "index"), rows, 2)
+        self._row = 0
+
+    def _write(self, item) -> None:
+        frame, timestamp, capture_time = item
+        if (
+            self._frames is None
+            or self._row >= len(self._frames)
+            or frame.shape != self._frames.shape[1:]
+            or frame.dtype != self._frames.dtype
+        ):
+            self._open_segment(frame)
+        self._frames[self._row] = frame
+        self._index[self._row] = (timestamp, capture_time)
+        self._row += 1
+
+    def _flush(self) -> None:
+        if self._frames is not None:
+            self._frames.flush()
+            self._index.flush()
+
+
+class AudioRecorder(_BackgroundWriter):
+    """
+    音频录制：write(samples, capture_time) 在音频回调线程里拷贝一份样本后入队
+    （sounddevice 会复用 indata 的缓冲区），写盘线程按块追加到 memmap 的 PCM 段文件。
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        sample_rate: int,
+        source_name: str = "unknown",
+        segment_seconds: float = SEGMENT_SECONDS,
+        queue_size: int = QUEUE_BLOCKS,
+    ) -> None:
+        self.sample_rate = sample_rate
+        self.segment_samples = int(sample_rate * segment_seconds)
+        self._pcm: Optional[np.ndarray] = None
+        self._index: Optional[np.ndarray] = None
+        self._pos = 0
+        self._row = 0
+        super().__init__(
+            directory, AUDIO,
+            {"source": source_name, "sample_rate": sample_rate, "segment_samples": self.segment_samples},
+            queue_size,
+        )
+
+    def write(self, samples: np.ndarray, capture_time: float) -> bool:
+        return self._submit((np.array(samples, dtype=np.float32), capture_time))
+
+    def _open_segment(self) -> None:
+        self._flush()
+        self.segment += 1
+        self._pcm = np.lib.format.open_memmap(
+            _segment_path(self.directory, AUDIO, self.segment, "pcm"),
+            mode="w+", dtype=np.float32, shape=(self.segment_samples,),
+        )
+        self._index = _new_index(
+            _segment_path(self.directory, AUDIO, self.segment, "index"), self.segment_samples // MIN_BLOCK + 1, 3,
+        )
+        self._pos = 0
+        self._row = 0
+
+    def _write(self, item) -> None:
+        samples, capture_time = item
+        n = len(samples)
+        if n > self.segment_samples:
+            raise ValueError(f"音频块（{n} 样本）比一段还长")
+        if self._pcm is None or self._pos + n > self.segment_samples or self._row >= len(self._index):
+            self._open_segment()
+        self._pcm[self._pos:self._pos + n] = samples
+        self._index[self._row] = (self._pos, n, capture_time)
+        self._pos += n
+        self._row += 1
+
+    def _flush(self) -> None:
+        if self._pcm is not None:
+            self._pcm.flush()
+            self._index.flush()
+
+
+# ---------- 录制：包装现有输入，读到什么就录什么 ----------
+
+class RecordingFrameSource(FrameSource):
+    """
+    包装任意 FrameSource，把每一帧连同 timestamp / 采集时刻录进 directory；
+    对使用者（FrameHub、motion_loop …）来说与原输入完全一样。
+    """
+
+    def __init__(self, source: FrameSource, directory: str, segment_frames: Optional[int] = None) -> None:
+        self.source = source
+        self.directory = directory
+        self.segment_frames = segment_frames
+        self.name = source.name
+        self.recorder: Optional[FrameRecorder] = None
+
+    @property
+    def width(self) -> int:
+        return self.source.width
+
+    @property
+    def height(self) -> int:
+        return self.source.height
+
+    @property
+    def fps(self) -> float:
+        return self.source.fps
+
+    @property
+    def timestamp(self) -> float:
+        return self.source.timestamp
+
+    def open(self) -> bool:
+        if not self.source.open():
+            return False
+        if self.recorder is None:
+            self.recorder = FrameRecorder(self.directory, self.source.name, self.segment_frames)
+            logger.info("录制视频到 %s", self.directory)
+        return True
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        ok, frame = self.source.read()
+        if ok:
+            self.recorder.write(frame, self.source.timestamp, time.monotonic())
+        return ok, frame
+
+    def configure(self, width=None, height=None, fps=None) -> dict:
+        return self.source.configure(width, height, fps)
+
+    def release(self) -> None:
+        self.source.release()
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+
+
+class RecordingAudioSource(AudioSource):
+    """
+    包装任意 AudioSource，回调里先把这一块交给 AudioRecorder（只拷贝 + 入队），再交给原回调。
+    stop() 只等待已排队的数据写完，录制文件保持打开：暂停 / 改块长后再 start() 会接着录，
+    中断的时间可以从索引里的 capture_time 看出来。
+    """
+
+    def __init__(self, source: AudioSource, directory: str, segment_seconds: float = SEGMENT_SECONDS) -> None:
+        self.source = source
+        self.directory = directory
+        self.segment_seconds = segment_seconds
+        self.name = source.name
+        self.source_id = source.source_id
+        self.sample_rate = source.sample_rate
+        self.recorder: Optional[AudioRecorder] = None
+
+    def start(
+        self,
+        callback: AudioCallback,
+        block_size: int,
+        on_end: Optional[Callable[[], None]] = None,
+    ) -> None:
+        if self.recorder is None:
+            self.recorder = AudioRecorder(self.directory, self.sample_rate, self.source.name, self.segment_seconds)
+            logger.info("录制音频到 %s", self.directory)
+        recorder = self.recorder
+
+        def record(indata: np.ndarray, frames: int, time_info, status) -> None:
+            recorder.write(indata[:, 0] if indata.ndim == 2 else indata, time.monotonic())
+            callback(indata, frames, time_info, status)
+
+        self.source.start(record, block_size, on_end=on_end)
+
+    def stop(self) -> None:
+        self.source.stop()
+        if self.recorder is not None:
+            self.recorder.drain()
+
+    def close(self) -> None:
+        self.stop()
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+
+
+# ---------- 回放 ----------
+
+def load_meta(directory: str, stream: str) -> Optional[dict]:
+    path = os.path.join(directory, f"{stream}.json")
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def recording_origin(directory: str) -> float:
+    """
+    录制开始的时刻（视频第一帧和音频第一块中较早的那个，time.monotonic() 时钟）。
+    音视频回放源默认都以它为起点，同时启动时就能保持录制时的相对时序。
+    """
+    starts = []
+    for path, index_path in _segment_paths(directory, VIDEO, "frames")[:1]:
+        index = np.load(index_path, mmap_mode="r")
+        if _valid_rows(index):
+            starts.append(float(index[0, 1]))
+    meta = load_meta(directory, AUDIO)
+    for path, index_path in _segment_paths(directory, AUDIO, "pcm")[:1]:
+        index = np.load(index_path, mmap_mode="r")
+        if _valid_rows(index):
+            # capture_time 是一块到达的时刻，这一块从 n / sample_rate 秒之前开始
+            starts.append(float(index[0, 2] - index[0, 1] / meta["sample_rate"]))
+    if not starts:
+        raise FileNotFoundError(f"{directory} 里没有录制数据")
+    return min(starts)
+
+
+class RecordedFrameSource(FrameSource):
+    """
+    回放 RecordingFrameSource 录下的帧：逐帧与录制时完全相同，timestamp 也是录制时的值。
+
+    speed:  1.0 = 按录制时的采集时刻回放（帧间隔的抖动也原样重现）；None = 不限速
+    origin: 回放起点对应的录制时刻，默认 recording_origin(directory)（与 RecordedAudioSource 同步）
+    loop:   播放到结尾后是否从头循环
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        speed: Optional[float] = 1.0,
+        loop: bool = False,
+        origin: Optional[float] = None,
+    ) -> None:
+        if speed is not None and speed <= 0:
+            raise ValueError("speed 必须为正数或 None")
+        self.directory = directory
+        self.name = f"recording:{directory}"
+        self.speed = speed
+        self.loop = loop
+        self.origin = origin
+        self._segments: List[Tuple[np.ndarray, np.ndarray]] = []
+        self._seg = 0
+        self._row = 0
+        self._start = 0.0
+
+    def open(self) -> bool:
+        self._segments = []
+        for path, index_path in _segment_paths(self.directory, VIDEO, "frames"):
+            index = np.load(index_path, mmap_mode="r")
+            n = _valid_rows(index)
+            if n:
+                self._segments.append((np.load(path, mmap_mode="r")[:n], index[:n]))
+        if not self._segments:
+            logger.error("%s 里没有录好的视频帧", self.directory)
+            return False
+        frames, index = self._segments[0]
+        self.height, self.width = frames.shape[1:3]
+        if self.frame_count > 1:
+            self.fps = (self.frame_count - 1) / max(1e-6, self._segments[-1][1][-1, 1] - index[0, 1])
+        if self.origin is None:
+            self.origin = recording_origin(self.directory)
+        self._seg = self._row = 0
+        self._start = time.monotonic()
+        return True
+
+    @property
+    def frame_count(self) -> int:
+        return sum(len(frames) for frames, _ in self._segments)
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        if self._seg >= len(self._segments):
+            if not self.loop:
+                return False, None
+            self._seg = self._row = 0
+            self._start = time.monotonic()
+            self.origin = float(self._segments[0][1][0, 1])
+
+        frames, index = self._segments[self._seg]
+        frame = np.array(frames[self._row])
+        timestamp, capture_time = index[self._row]
+        self._row += 1
+        if self._row >= len(frames):
+            self._seg += 1
+            self._row = 0
+
+        if self.speed is not None:
+            delay = self._start + (capture_time - self.origin) / self.speed - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        self.timestamp = float(timestamp)
+        # 分辨率在录制中途变过时，width / height 跟着当前帧走
+        self.height, self.width = frame.shape[:2]
+        return True, frame
+
+
+class RecordedAudioSource(_ThreadedAudioSource):
+    """
+    回放 RecordingAudioSource 录下的 PCM：样本与录制时完全相同（块长由 start 的 block_size 决定）。
+
+    speed:  播放速度倍率（1.0 = 实时）；开始前先等到第一块在录制里对应的时刻（相对 origin）
+    origin: 同 RecordedFrameSource，默认 recording_origin(directory)
+    loop:   播放到结尾后是否从头循环
+    录制中途暂停过的空档不会重现（样本是连续播放的）。
+    """
+
+    source_id = "recording"
+
+    def __init__(
+        self,
+        directory: str,
+        speed: float = 1.0,
+        loop: bool = False,
+        origin: Optional[float] = None,
+    ) -> None:
+        super().__init__(speed)
+        meta = load_meta(directory, AUDIO)
+        if meta is None:
+            raise FileNotFoundError(f"{directory} 里没有录好的音频")
+        self.directory = directory
+        self.name = f"recording:{directory}"
+        self.sample_rate = int(meta["sample_rate"])
+        self.loop = loop
+
+        self._pcm: List[np.ndarray] = []
+        first_start = None
+        for path, index_path in _segment_paths(directory, AUDIO, "pcm"):
+            index = np.load(index_path, mmap_mode="r")
+            n = _valid_rows(index)
+            if not n:
+                continue
+            if first_start is None:
+                first_start = float(index[0, 2] - index[0, 1] / self.sample_rate)
+            self._pcm.append(np.load(path, mmap_mode="r")[:int(index[n - 1, 0] + index[n - 1, 1])])
+        self.total_samples = sum(len(pcm) for pcm in self._pcm)
+        if origin is None and first_start is not None:
+            origin = recording_origin(directory)
+        self._lead = 0.0 if first_start is None else max(0.0, first_start - origin)
+        self._seg = 0
+        self._pos = 0
+
+    @property
+    def duration(self) -> float:
+        return self.total_samples / self.sample_rate
+
+    def _run(self, callback: AudioCallback, block_size: int, on_end) -> None:
+        # 第一块之前的空档（例如视频比音频早开始）照样等出来
+        if self._lead > 0:
+            if self._stop.wait(self._lead / self.speed):
+                return
+            self._lead = 0.0
+        super()._run(callback, block_size, on_end)
+
+    def _next_block(self, n: int) -> Optional[np.ndarray]:
+        parts = []
+        while n > 0:
+            if self._seg >= len(self._pcm):
+                if not self.loop or self.total_samples == 0:
+                    break
+                self._seg = self._pos = 0
+            pcm = self._pcm[self._seg]
+            chunk = pcm[self._pos:self._pos + n]
+            parts.append(chunk)
+            self._pos += len(chunk)
+            n -= len(chunk)
+            if self._pos >= len(pcm):
+                self._seg += 1
+                self._pos = 0
+        if not parts:
+            return None
+        return np.concatenate(parts).astype(np.float32)
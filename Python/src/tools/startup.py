@@ -0,0 +1,121 @@
+# Python/src/tools/startup.py
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from Python.src.tools.messages.base import make_message
+from Python.src.tools.messages.status import build_ready_payload
+
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTracker:
+    """
+    启动过程计时（每个进程一个全局 STARTUP）：
+
+    - phase(name):  记录一个初始化阶段（打开摄像头、加载模型、预热推理、探测音频设备 …）的起止；
+                    各阶段可以在不同线程里并行，报告里能看出哪些是重叠的
+    - expect(...) / ready(name): 声明需要就绪的组件；全部就绪时记录 time-to-ready，
+                    写日志，并（设置了 bridge 时）发送一条 type = "ready" 的保留消息（见 WsBridge.retain）
+    - first_message(kind): 每类消息第一次发出的时刻（time-to-first-message）
+
+    所有时间都相对 begin()（main.py 在导入其它模块之前调用）。
+    """
+
+    def __init__(self) -> None:
+        self.t0 = time.monotonic()
+        self.bridge = None
+        self._lock = threading.Lock()
+        self._phases: List[Tuple[str, float, float, str]] = []   # (name, start, end, thread)
+        self._expected: List[str] = []
+        self._ready: Dict[str, float] = {}
+        self._first: Dict[str, float] = {}
+        self.ready_at: Optional[float] = None
+        self.announced = False
+
+    def begin(self, t0: Optional[float] = None) -> None:
+        self.t0 = time.monotonic() if t0 is None else t0
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.t0
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = self.elapsed()
+        try:
+            yield
+        finally:
+            end = self.elapsed()
+            with self._lock:
+                self._phases.append((name, start, end, threading.current_thread().name))
+            logger.info("启动阶段 %s: %.0f ms（%.3f -> %.3f s）", name, (end - start) * 1e3, start, end)
+
+    def expect(self, *components: str) -> None:
+        with self._lock:
+            for c in components:
+                if c not in self._expected:
+                    self._expected.append(c)
+
+    def ready(self, component: str) -> None:
+        """组件完成初始化（在事件循环线程里调用：全部就绪时会直接 bridge.send_json）。"""
+        with self._lock:
+            if component in self._ready:
+                return
+            self._ready[component] = self.elapsed()
+            pending = [c for c in self._expected if c not in self._ready]
+            if pending or self.announced:
+                logger.info("%s 就绪 (%.3f s)，等待: %s", component, self._ready[component], pending or "-")
+                return
+            self.announced = True
+            self.ready_at = self.elapsed()
+
+        logger.info("全部组件就绪: time-to-ready %.3f s\n%s", self.ready_at, self.format_phases())
+        if self.bridge is not None:
+            # 作为保留消息发送：就绪之后才连上的客户端也会先收到它
+            self.first_message("ready")
+            self.bridge.retain("ready", json.dumps(make_message(
+                msg_type="ready",
+                payload=self.payload(),
+                source="startup",
+            )))
+
+    def first_message(self, kind: str) -> None:
+        """某类消息第一次发出时调用（重复调用只记第一次，开销是一次字典查找）。"""
+        if kind in self._first:
+            return
+        t = self.elapsed()
+        with self._lock:
+            if kind in self._first:
+                return
+            self._first[kind] = t
+        logger.info("time-to-first-message[%s] = %.3f s", kind, t)
+
+    def first_messages(self) -> Dict[str, float]:
+        return dict(self._first)
+
+    def phases(self) -> List[Tuple[str, float, float, str]]:
+        with self._lock:
+            return sorted(self._phases, key=lambda p: p[1])
+
+    def payload(self) -> dict:
+        return build_ready_payload(
+            time_to_ready_sec=self.ready_at if self.ready_at is not None else self.elapsed(),
+            components=dict(self._ready),
+            phases=[(name, start, end) for name, start, end, _ in self.phases()],
+        )
+
+    def format_phases(self) -> str:
+        lines = [f"{'phase':24s} {'start s':>8s} {'end s':>8s} {'ms':>8s}  thread"]
+        for name, start, end, thread in self.phases():
+            lines.append(f"{name:24s} {start:8.3f} {end:8.3f} {(end - start) * 1e3:8.0f}  {thread}")
+        return "\n".join(lines)
+
+
+# 进程内全局实例
+STARTUP = StartupTracker()
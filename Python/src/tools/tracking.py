@@ -0,0 +1,349 @@
+# Python/src/tools/tracking.py
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+
+# 匹配方式
+ASSIGN_SEQUENTIAL = "sequential"   # 按轨迹顺序逐条取 IOU 最高的检测（与 motion.Tracker 完全一致）
+ASSIGN_GREEDY = "greedy"           # 全局按 IOU 从高到低贪心（不受轨迹顺序影响）
+
+
+def as_boxes(boxes) -> np.ndarray:
+    """(x, y, w, h) 列表 / 数组 -> (n, 4) int64 数组。"""
+    arr = np.asarray(boxes, dtype=np.int64)
+    return arr.reshape(-1, 4)
+
+
+def iou_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    两组 (x, y, w, h) 框两两之间的 IOU，广播计算，返回 (len(a), len(b)) float64。
+    与 motion.iou 逐元素结果完全相同（同样的整数交并面积，同样的一次除法）。
+    """
+    a = as_boxes(a)
+    b = as_boxes(b)
+    ax1, ay1 = a[:, 0:1], a[:, 1:2]
+    ax2, ay2 = ax1 + a[:, 2:3], ay1 + a[:, 3:4]
+    bx1, by1 = b[:, 0], b[:, 1]
+    bx2, by2 = bx1 + b[:, 2], by1 + b[:, 3]
+
+    inter_w = np.maximum(0, np.minimum(ax2, bx2) - np.maximum(ax1, bx1))
+    inter_h = np.maximum(0, np.minimum(ay2, by2) - np.maximum(ay1, by1))
+    inter = inter_w * inter_h
+    union = (a[:, 2] * a[:, 3])[:, None] + (b[:, 2] * b[:, 3])[None, :] - inter
+
+    out = np.zeros(inter.shape, dtype=np.float64)
+    np.divide(inter, union, out=out, where=union > 0)
+    return out
+
+
+# ---------- 框合并 ----------
+
+def _union_box(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    x1, y1 = min(a[0], b[0]), min(a[1], b[1])
+    x2, y2 = max(a[0] + a[2], b[0] + b[2]), max(a[1] + a[3], b[1] + b[3])
+    return np.array([x1, y1, x2 - x1, y2 - y1], dtype=np.int64)
+
+
+def merge_boxes_array(boxes, iou_th: float = 0.3) -> np.ndarray:
+    """
+    motion.merge_boxes 的数组版，结果逐框相同（同样的比较顺序，同样的整数并集框）：
+    每一轮按下标顺序取尚未合并的框 a，依次与后面尚未合并、IOU(a, b) >= iou_th 的框 b 合并，
+    a 随之长大、后面的比较用长大后的 a；有合并就再来一轮，直到稳定。
+
+    每轮先算一次 IOU 矩阵：a 还没长大时直接查矩阵这一行（没有候选的框不进循环），
+    长大之后只用一次广播算 a 与剩余框的 IOU，循环次数与合并次数成正比，而不是与框对数成正比。
+    返回 (m, 4) int64 数组。
+    """
+    boxes = as_boxes(boxes)
+    changed = True
+    while changed and len(boxes) > 1:
+        changed = False
+        n = len(boxes)
+        hits = np.triu(iou_matrix(boxes, boxes) >= iou_th, k=1)
+        has_hits = hits.any(axis=1)
+        used = np.zeros(n, dtype=bool)
+        out = []
+        for i in range(n):
+            if used[i]:
+                continue
+            used[i] = True
+            a = boxes[i]
+            start, grown = i + 1, False
+            while has_hits[i] and start < n:
+                if grown:
+                    row = iou_matrix(a, boxes[start:])[0] >= iou_th
+                else:
+                    row = hits[i, start:]
+                candidates = np.flatnonzero(row & ~used[start:])
+                if candidates.size == 0:
+                    break
+                j = start + int(candidates[0])
+                a = _union_box(a, boxes[j])
+                used[j] = True
+                changed = grown = True
+                start = j + 1
+            out.append(a)
+        boxes = np.array(out, dtype=np.int64).reshape(-1, 4)
+    return boxes
+
+
+# ---------- 匹配 ----------
+
+def assign_sequential(iou: np.ndarray, iou_th: float) -> np.ndarray:
+    """
+    逐行（按轨迹顺序）在尚未被占用的列里取 IOU 最大者（并列取最小列号），
+    最大值 >= iou_th 才算匹配。返回 (n_rows,) 匹配到的列号，未匹配为 -1。
+    """
+    n_rows, n_cols = iou.shape
+    match = np.full(n_rows, -1, dtype=np.int64)
+    if n_rows == 0 or n_cols == 0:
+        return match
+    free = np.ones(n_cols, dtype=bool)
+    masked = np.where(iou > 0, iou, -1.0)
+    for i in range(n_rows):
+        row = np.where(free, masked[i], -1.0)
+        j = int(row.argmax())
+        if row[j] > 0 and row[j] >= iou_th:
+            match[i] = j
+            free[j] = False
+    return match
+
+
+def assign_greedy(iou: np.ndarray, iou_th: float) -> np.ndarray:
+    """
+    全局贪心：所有 IOU >= iou_th 的 (行, 列) 按 IOU 从高到低依次接受（行列都还空闲时）。
+    候选对通常很稀疏，排序是向量化的，循环只走候选对。
+    """
+    n_rows, _ = iou.shape
+    match = np.full(n_rows, -1, dtype=np.int64)
+    ii, jj = np.nonzero((iou >= iou_th) & (iou > 0))
+    if ii.size == 0:
+        return match
+    order = np.argsort(-iou[ii, jj], kind="stable")
+    col_used = np.zeros(iou.shape[1], dtype=bool)
+    for i, j in zip(ii[order].tolist(), jj[order].tolist()):
+        if match[i] < 0 and not col_used[j]:
+            match[i] = j
+            col_used[j] = True
+    return match
+
+
+# ---------- 数组化的轨迹存储 + 跟踪器 ----------
+
+@dataclass
+class TrackSnapshot:
+    """
+    某一帧的轨迹（通常是已确认轨迹）的只读快照，全部是数组：
+
+    ids (n,), boxes (n, 4) [x, y, w, h], centers (n, 2), velocities (n, 2) 像素 / 秒,
+    hits (n,), ages (n,), trails: 长度为 n 的列表，每项 (k, 2) 中心点轨迹（旧 -> 新）
+    """
+
+    ids: np.ndarray
+    boxes: np.ndarray
+    centers: np.ndarray
+    velocities: np.ndarray
+    hits: np.ndarray
+    ages: np.ndarray
+    trails: List[np.ndarray]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def from_tracks(cls, tracks: Sequence) -> "TrackSnapshot":
+        """由 motion.Track 对象列表构造（兼容旧的逐对象跟踪器）。"""
+        return cls(
+            ids=np.array([t.id for t in tracks], dtype=np.int64),
+            boxes=as_boxes([t.box for t in tracks]),
+            centers=np.array([t.center for t in tracks], dtype=np.int64).reshape(-1, 2),
+            velocities=np.array([t.velocity for t in tracks], dtype=np.float64).reshape(-1, 2),
+            hits=np.array([t.hits for t in tracks], dtype=np.int64),
+            ages=np.array([t.age for t in tracks], dtype=np.int64),
+            trails=[np.array(t.trail, dtype=np.int64).reshape(-1, 2) for t in tracks],
+        )
+
+
+class ArrayTracker:
+    """
+    数组化的 IOU 跟踪器，语义与 motion.Tracker 相同（平滑系数、年龄 / 命中计数、
+    速度平滑、轨迹长度都一致），默认的 ASSIGN_SEQUENTIAL 匹配下逐帧输出完全相同：
+
+    - 轨迹状态存放在按容量预分配的数组里（框、命中、年龄、速度、轨迹环形缓冲），
+      删除轨迹时整体压缩，保持创建顺序；
+    - 每帧一次广播算出 (轨迹 x 检测) 的 IOU 矩阵，匹配在矩阵上进行；
+    - 命中轨迹的平滑 / 速度 / 轨迹更新都是整批向量化的。
+
+    assignment=ASSIGN_GREEDY 时改为全局按 IOU 贪心，拥挤场景下比顺序匹配更稳定，
+    但结果不再与旧跟踪器逐帧相同。
+    """
+
+    def __init__(
+        self,
+        iou_th: float = 0.3,
+        max_age: int = 20,
+        min_hits: int = 6,
+        trail_len: int = 24,
+        assignment: str = ASSIGN_SEQUENTIAL,
+        capacity: int = 64,
+    ) -> None:
+        if assignment not in (ASSIGN_SEQUENTIAL, ASSIGN_GREEDY):
+            raise ValueError(f"未知的匹配方式: {assignment!r}")
+        self.iou_th = iou_th
+        self.max_age = max_age
+        self.min_hits = min_hits
+        self.trail_len = trail_len
+        self.assignment = assignment
+        self._initial_capacity = capacity
+        self.reset()
+
+    def reset(self) -> None:
+        cap = self._initial_capacity
+        self.n = 0
+        self._next_id = 1
+        self._ids = np.zeros(cap, dtype=np.int64)
+        self._boxes = np.zeros((cap, 4), dtype=np.int64)
+        self._hits = np.zeros(cap, dtype=np.int64)
+        self._ages = np.zeros(cap, dtype=np.int64)
+        self._vel = np.zeros((cap, 2), dtype=np.float64)
+        self._last_t = np.zeros(cap, dtype=np.float64)
+        self._trail = np.zeros((cap, self.trail_len, 2), dtype=np.int64)
+        self._trail_count = np.zeros(cap, dtype=np.int64)
+        self._trail_head = np.zeros(cap, dtype=np.int64)   # 下一次写入的位置
+
+    # ---------- 存储 ----------
+
+    def _grow(self, need: int) -> None:
+        cap = len(self._ids)
+        if need <= cap:
+            return
+        new_cap = max(need, 2 * cap)
+        for name in ("_ids", "_boxes", "_hits", "_ages", "_vel", "_last_t",
+                     "_trail", "_trail_count", "_trail_head"):
+            old = getattr(self, name)
+            arr = np.zeros((new_cap,) + old.shape[1:], dtype=old.dtype)
+            arr[:cap] = old
+            setattr(self, name, arr)
+
+    def _compact(self, keep: np.ndarray) -> None:
+        k = int(keep.sum())
+        if k == self.n:
+            return
+        for name in ("_ids", "_boxes", "_hits", "_ages", "_vel", "_last_t",
+                     "_trail", "_trail_count", "_trail_head"):
+            arr = getattr(self, name)
+            arr[:k] = arr[:self.n][keep]
+        self.n = k
+
+    @staticmethod
+    def _centers(boxes: np.ndarray) -> np.ndarray:
+        return boxes[:, 0:2] + boxes[:, 2:4] // 2
+
+    def _push_trail(self, rows: np.ndarray, centers: np.ndarray) -> None:
+        head = self._trail_head[rows]
+        self._trail[rows, head] = centers
+        self._trail_head[rows] = (head + 1) % self.trail_len
+        self._trail_count[rows] = np.minimum(self._trail_count[rows] + 1, self.trail_len)
+
+    # ---------- 跟踪 ----------
+
+    def step(self, detections, t: float) -> TrackSnapshot:
+        """输入本帧检测框 (k, 4) 和媒体时间 t（秒），返回已确认轨迹的快照。"""
+        dets = as_boxes(detections)
+        n = self.n
+
+        # 1) 所有轨迹 age+1（缺省认为丢失）
+        self._ages[:n] += 1
+
+        # 2) IOU 矩阵上做匹配
+        iou = iou_matrix(self._boxes[:n], dets)
+        if self.assignment == ASSIGN_SEQUENTIAL:
+            match = assign_sequential(iou, self.iou_th)
+        else:
+            match = assign_greedy(iou, self.iou_th)
+
+        rows = np.nonzero(match >= 0)[0]
+        if rows.size:
+            old = self._boxes[rows]
+            new = dets[match[rows]]
+            prev_c = self._centers(old)
+            # 平滑更新（与 Track.update 相同的运算顺序，int() 截断）
+            self._boxes[rows] = (0.7 * old + 0.3 * new).astype(np.int64)
+            self._hits[rows] += 1
+            self._ages[rows] = 0
+
+            cur_c = self._centers(self._boxes[rows])
+            dt = t - self._last_t[rows]
+            moving = dt > 0
+            if moving.any():
+                r = rows[moving]
+                diff = cur_c[moving] - prev_c[moving]
+                # 与 Track.update 相同的运算顺序：0.5 * v + 0.5 * d / dt
+                self._vel[r] = 0.5 * self._vel[r] + 0.5 * diff / dt[moving][:, None]
+            self._last_t[rows] = t
+            self._push_trail(rows, cur_c)
+
+        # 3) 未匹配的检测新建轨迹（按检测下标顺序）
+        used = np.zeros(len(dets), dtype=bool)
+        used[match[rows]] = True
+        fresh = np.nonzero(~used)[0]
+        if fresh.size:
+            k = fresh.size
+            self._grow(n + k)
+            new_rows = np.arange(n, n + k)
+            self._ids[new_rows] = np.arange(self._next_id, self._next_id + k)
+            self._next_id += k
+            self._boxes[new_rows] = dets[fresh]
+            self._hits[new_rows] = 1
+            self._ages[new_rows] = 0
+            self._vel[new_rows] = 0.0
+            self._last_t[new_rows] = t
+            self._trail_count[new_rows] = 0
+            self._trail_head[new_rows] = 0
+            self._push_trail(new_rows, self._centers(dets[fresh]))
+            self.n = n + k
+
+        # 4) 清理长期丢失的轨迹
+        self._compact(self._ages[:self.n] <= self.max_age)
+
+        # 返回“已确认”的轨迹
+        return self.snapshot(np.nonzero(self._hits[:self.n] >= self.min_hits)[0])
+
+    def snapshot(self, rows: np.ndarray | None = None) -> TrackSnapshot:
+        """指定行（默认全部轨迹）的快照，数组都是拷贝，之后的 step 不会改变它。"""
+        if rows is None:
+            rows = np.arange(self.n)
+        boxes = self._boxes[rows].copy()
+        trails = []
+        for r in rows.tolist():
+            count = int(self._trail_count[r])
+            idx = (self._trail_head[r] - count + np.arange(count)) % self.trail_len
+            trails.append(self._trail[r, idx].copy())
+        return TrackSnapshot(
+            ids=self._ids[rows].copy(),
+            boxes=boxes,
+            centers=self._centers(boxes),
+            velocities=self._vel[rows].copy(),
+            hits=self._hits[rows].copy(),
+            ages=self._ages[rows].copy(),
+            trails=trails,
+        )
+
+
+def snapshot_rows(snapshot: TrackSnapshot) -> List[Tuple]:
+    """把快照转成可直接比较的元组列表（用于新旧跟踪器的一致性校验）。"""
+    return [
+        (
+            int(snapshot.ids[i]),
+            tuple(int(v) for v in snapshot.boxes[i]),
+            tuple(float(v) for v in snapshot.velocities[i]),
+            int(snapshot.hits[i]),
+            int(snapshot.ages[i]),
+            tuple(map(tuple, snapshot.trails[i].tolist())),
+        )
+        for i in range(len(snapshot))
+    ]
@@ -1,11 +1,17 @@
 import asyncio
 import json
 import logging
-from typing import Any, Set
+from typing import Any, Dict, Optional, Set
 
 import websockets
 from websockets.server import WebSocketServerProtocol
 
+from Python.src.tools.clock_sync import CLOCK_PING, make_clock_pong
+from Python.src.tools.messages.base import encode_traced, finish_traced, trace_now
+from Python.src.tools.outgoing import PRIORITY_HIGH, PRIORITY_NORMAL, OutgoingQueue, schedule
+from Python.src.tools.profiler import PROFILER
+from Python.src.tools.startup import STARTUP
+
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +22,7 @@ class WsBridge:
     - 作为“中心”监听某个端口（默认 ws://127.0.0.1:8765）
     - 维护当前所有连接的客户端（例如 Unity）
     - 提供 outgoing / incoming 队列供其它模块使用
+    - 直接应答客户端的 clock_ping（用于估计时钟偏移，不进入 incoming 队列）
     """
 
     def __init__(self, host: str = "127.0.0.1", port: int = 8765) -> None:
@@ -26,35 +33,83 @@ class WsBridge:
         self._clients: Set[WebSocketServerProtocol] = set()
 
         # 供外部使用的队列：
-        # - 你把要发送的消息塞进 outgoing（字符串）
+        # - 你把要发送的消息塞进 outgoing（字符串；带 trace 的消息是 (body, trace)，发送前再拼上 trace）；
+        #   outgoing 按优先级出队，过了截止时间的条目直接丢弃（见 tools/outgoing.py）
         # - 收到的消息会被放进 incoming（字符串）
-        self.outgoing: "asyncio.Queue[str]" = asyncio.Queue()
+        self.outgoing = OutgoingQueue()
         self.incoming: "asyncio.Queue[str]" = asyncio.Queue()
 
+        # 保留消息：key -> 最近一条文本，新客户端连上时先补发（例如各进程的 ready 通知）
+        self.retained: Dict[str, str] = {}
+
         self._server: websockets.server.Serve | None = None
         self._sender_task: asyncio.Task | None = None
 
     # ---------- 对外调用的便捷方法 ----------
 
-    def send_text(self, text: str) -> None:
+    def send_text(
+        self,
+        text: str,
+        priority: int = PRIORITY_NORMAL,
+        deadline: Optional[float] = None,
+        label: Optional[str] = None,
+    ) -> None:
         """
         将一条文本消息排队，稍后会广播给所有已连接的客户端。
 
         注意：这是一个快速调用函数，不是协程，可以在普通代码里直接用。
+        priority / deadline（time.monotonic() 时刻）见 tools/outgoing.py；
+        label 只用于过期计数（一般是消息 type）。
         """
         # put_nowait: 如果队列没有被 await 消费，这里也不会卡住。
-        self.outgoing.put_nowait(text)
-
-    def send_json(self, obj: Any) -> None:
+        self.outgoing.put_nowait(text, priority, deadline, label)
+
+    def send_json(
+        self,
+        obj: Any,
+        priority: Optional[int] = None,
+        max_age: Optional[float] = None,
+        deadline: Optional[float] = None,
+    ) -> None:
         """
         将一个 Python 对象（dict / list 等）编码为 JSON 字符串并排队发送。
+
+        如果消息带有 trace 字段（见 make_message），会自动填写 enqueue 时刻，
+        并推迟到发送循环里再编码，以便写入 send 时刻。
+
+        优先级和截止时间默认按消息 type 取 MESSAGE_POLICIES（例如 hands 排队超过 50 ms 即丢弃），
+        也可以用 priority / max_age（秒，从现在算起）/ deadline（绝对时刻）覆盖。
         """
+        trace = None
+        msg_type = None
+        if isinstance(obj, dict):
+            trace = obj.get("trace")
+            msg_type = obj.get("type")
+            # 每类消息第一次排队的时刻（time-to-first-message）
+            STARTUP.first_message(msg_type or "?")
+        priority, deadline = schedule(msg_type, priority, max_age, deadline)
         try:
-            text = json.dumps(obj)
+            with PROFILER.stage("bridge.json_dumps"):
+                if isinstance(trace, dict):
+                    trace["enqueue"] = trace_now()
+                    item = encode_traced(obj)
+                else:
+                    item = json.dumps(obj)
         except TypeError as e:
             logger.error("send_json 失败，数据不可被 JSON 序列化: %r", e)
             raise
-        self.send_text(text)
+        if isinstance(item, str):
+            self.send_text(item, priority, deadline, msg_type)
+        else:
+            self.outgoing.put_nowait(item, priority, deadline, msg_type)
+
+    def retain(self, key: str, text: str) -> None:
+        """
+        广播一条消息，并把它保存为 key 的最新值：之后连上的客户端会先收到所有保留消息。
+        用于只发一次、但晚连上的客户端也需要知道的状态（例如 ready）。
+        """
+        self.retained[key] = text
+        self.send_text(text, PRIORITY_HIGH, label=key)
 
     async def recv_text(self) -> str:
         """
@@ -71,15 +126,33 @@ class WsBridge:
         """
         每当有一个客户端连进来，就会跑一个 handler 协程。
         负责：
-        - 把该连接加入 clients 集合；
+        - 补发保留消息（见 retain），然后把该连接加入 clients 集合；
         - 持续读取客户端发来的消息，丢进 incoming 队列；
         - 连接断开时把它移出集合。
         """
         client_name = f"{websocket.remote_address}"
         logger.info("客户端连接: %s", client_name)
-        self._clients.add(websocket)
         try:
+            # 先补发保留消息，再加入广播集合（保证保留消息排在实时消息前面）。
+            # 补发过程中 await 期间可能有新的 retain()，它的广播只发给已在集合里的客户端，
+            # 所以补发完再检查一遍，直到没有变化的键；最后一次检查到 add 之间没有 await
+            replayed: Dict[str, str] = {}
+            while True:
+                missing = [(k, t) for k, t in self.retained.items() if replayed.get(k) != t]
+                if not missing:
+                    break
+                for key, text in missing:
+                    await websocket.send(text)
+                    replayed[key] = text
+            self._clients.add(websocket)
             async for message in websocket:
+                recv_time = trace_now()
+
+                # 时钟同步请求直接在这里应答，尽量减少 t1 -> t2 之间的处理时间
+                if isinstance(message, str) and CLOCK_PING in message:
+                    if await self._reply_clock_ping(websocket, message, recv_time):
+                        continue
+
                 # 当前我们只保存原始文本；后续可以再做 JSON 解析封装。
                 await self.incoming.put(message)
         except websockets.ConnectionClosed:
@@ -87,6 +160,30 @@ class WsBridge:
         finally:
             self._clients.discard(websocket)
 
+    async def _reply_clock_ping(
+        self,
+        websocket: WebSocketServerProtocol,
+        message: str,
+        recv_time: float,
+    ) -> bool:
+        """
+        应答一条 clock_ping，返回 True 表示已处理。
+        解析失败或类型不符时返回 False，消息按普通消息进入 incoming。
+        """
+        try:
+            obj = json.loads(message)
+        except ValueError:
+            return False
+        if not isinstance(obj, dict) or obj.get("type") != CLOCK_PING:
+            return False
+
+        pong = make_clock_pong(obj.get("t0"), recv_time, trace_now())
+        try:
+            await websocket.send(json.dumps(pong))
+        except websockets.ConnectionClosed:
+            pass
+        return True
+
     async def _sender_loop(self) -> None:
         """
         独立的发送协程：
@@ -96,19 +193,28 @@ class WsBridge:
         logger.info("发送循环启动")
         try:
             while True:
-                text = await self.outgoing.get()
+                item = await self.outgoing.get()
 
                 if not self._clients:
                     # 当前没有客户端，消息直接丢弃（或按需缓存）
-                    logger.debug("无客户端连接，丢弃消息: %s", text[:80])
+                    logger.debug("无客户端连接，丢弃消息: %.80s", item)
                     continue
 
+                if isinstance(item, str):
+                    text = item
+                else:
+                    # 带 trace 的消息：排队时已编码并检查过，这里只写入 send 时刻（写 socket 前的最后时刻）
+                    body, trace = item
+                    trace["send"] = trace_now()
+                    text = finish_traced(body, trace)
+
                 to_remove = []
 
                 # 用一个快照/临时列表来遍历，避免遍历过程中修改 set
                 for ws in list(self._clients):
                     try:
-                        await ws.send(text)
+                        with PROFILER.stage("bridge.socket_write"):
+                            await ws.send(text)
                     except websockets.ConnectionClosed:
                         logger.info(
                             "发送失败，连接已关闭，将移除客户端: %s",
@@ -140,6 +246,7 @@ class WsBridge:
 
         # 启动服务器
         await self._server
+        STARTUP.ready("bridge")
 
         # 启动发送任务
         self._sender_task = asyncio.create_task(self._sender_loop())